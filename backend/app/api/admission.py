@@ -0,0 +1,74 @@
+"""Admission control middleware: queue or turn away expensive requests."""
+from __future__ import annotations
+
+import base64
+import json
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.api.metrics import route_template
+from app.services.admission import Rejected, pool_for_route
+
+
+class AdmissionMiddleware:
+    """Run requests to pooled endpoints (``services.admission.ROUTE_POOLS``)
+    inside a pool slot; answer 429 with ``Retry-After`` when rejected.
+
+    The slot is held until the response has been sent and its background
+    tasks have run, so streamed reports and report / portfolio jobs count
+    for as long as they run.  Other routes pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        pool = pool_for_route(scope["method"], route_template(scope))
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            async with pool.slot(client_key(scope)):
+                await self.app(scope, receive, send)
+        except Rejected as e:
+            response = JSONResponse(
+                {"detail": _REASONS.get(e.reason, "Server busy, retry later."),
+                 "retry_after": e.retry_after},
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+
+
+_REASONS = {
+    "queue_full": "Too many requests in progress; retry later.",
+    "queue_timeout": "Request waited too long for capacity; retry later.",
+    "user_limit": "You already have the maximum number of these requests in progress.",
+}
+
+
+def client_key(scope: Scope) -> str:
+    """Who a request is from, for per-user caps.
+
+    The ``sub`` claim of a Bearer token, read without verifying it (it
+    only decides which cap applies).  Anonymous requests get "" and only
+    the pool limits apply: behind a proxy the client address would lump
+    every user together.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            return _token_subject(value[7:].decode("latin-1").strip())
+    return ""
+
+
+def _token_subject(token: str) -> str:
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return str(claims.get("sub") or "")
+    except (IndexError, ValueError, AttributeError):
+        return ""
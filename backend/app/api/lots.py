@@ -8,11 +8,16 @@ Provides endpoints for:
 
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Query
 
-from app.services.geocoding import geocode_address, BOROUGH_CODE_TO_NAME
-from app.services.pluto import fetch_pluto_data
-from app.services.geometry import fetch_lot_geometry, fetch_zoning_layers, fetch_adjacent_lots
+from app.services.geocoding import geocode_address, parse_bbl, BOROUGH_CODE_TO_NAME
+from app.services.pluto import fetch_pluto_data, fetch_pluto_many
+from app.services.geometry import (
+    fetch_lot_geometry, fetch_lot_geometry_many, fetch_zoning_layers, fetch_adjacent_lots,
+)
+from app.services.singleflight import coalesce, default_key, normalize_address
 from app.services.street_width import determine_street_width
 from app.config import settings
 from app.models.schemas import LotProfile
@@ -25,6 +30,14 @@ router = APIRouter(prefix="/api/v1/saas/lots", tags=["lots"])
 # SHARED LOT BUILDER (mirrors routes.py _build_lot_profile)
 # ──────────────────────────────────────────────────────────────────
 
+def _lot_key(address: str | None = None, bbl: str | None = None):
+    """Concurrent lookups of the same address or BBL share one resolution."""
+    if address:
+        return default_key("address", normalize_address(address))
+    return default_key("bbl", (parse_bbl(bbl) or bbl) if bbl else None)
+
+
+@coalesce("resolve_lot", key=_lot_key)
 async def resolve_lot(
     address: str | None = None,
     bbl: str | None = None,
@@ -42,7 +55,6 @@ async def resolve_lot(
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"Geocoding error: {e}")
     elif bbl:
-        from app.services.geocoding import parse_bbl
         from app.models.schemas import BBLResponse
         parsed = parse_bbl(bbl)
         if not parsed:
@@ -143,6 +155,23 @@ async def resolve_lot(
     return lot_profile, geometry
 
 
+async def prefetch_lots(bbls: list[str]) -> None:
+    """Load PLUTO, geometry and zoning layers for many lots at once.
+
+    Cached entries take one Redis round trip per data set; uncached PLUTO
+    and geometry are fetched in batches (``fetch_pluto_many``, which also
+    yields the polygons, then ``fetch_lot_geometry_many`` for any it
+    couldn't).  Resolving the lots one by one afterwards is then served
+    from the in-process cache.
+    """
+    bbls = [parsed for parsed in map(parse_bbl, bbls) if parsed]
+    await asyncio.gather(
+        fetch_pluto_many(bbls, settings.socrata_app_token),
+        fetch_zoning_layers.prefetch(bbls),
+    )
+    await fetch_lot_geometry_many(bbls)
+
+
 # ──────────────────────────────────────────────────────────────────
 # ENDPOINTS
 # ──────────────────────────────────────────────────────────────────
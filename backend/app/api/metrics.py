@@ -0,0 +1,74 @@
+"""Prometheus metrics endpoint and per-route request latency middleware."""
+from __future__ import annotations
+
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import CONTENT_TYPE, Counter, LatencyHistogram, render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+REQUEST_LATENCY = LatencyHistogram(
+    "http_request_duration_seconds",
+    "API request latency by route template",
+    ("method", "route"),
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "API requests by route template and response status",
+    ("method", "route", "status"),
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """Record latency and status of every HTTP request, labelled by route.
+
+    Routes are labelled with their path template (``/api/v1/saas/reports/{report_id}``)
+    so lot and report ids don't create new series; unmatched paths share
+    the label ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_template(scope)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, scope["method"], route)
+            REQUESTS.inc(scope["method"], route, status)
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route *scope* matches (``/api/lot/{bbl}``),
+    or ``"unmatched"``; keeps per-route labels bounded."""
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
@@ -19,6 +19,11 @@ from app.services.geocoding import geocode_address, parse_address
 from app.services.pluto import fetch_pluto_data
 from app.services.geometry import fetch_lot_geometry, fetch_zoning_layers, fetch_block_description
 from app.services.report import generate_report
+from app.services.portfolio import render_portfolio
+from app.services.deadline import Deadline, Stage, run_stage, run_stages
+from app.services.timing import collect_timings, span
+from app.services.metrics import register_collector
+from app.services.singleflight import coalesce, default_key, normalize_address
 from app.services.street_width import determine_street_width
 from app.services.maps import (
     fetch_satellite_image, fetch_street_map_image,
@@ -41,6 +46,21 @@ calculator = ZoningCalculator()
 # ── In-memory store (replace with DB later) ──
 _reports: dict[str, dict] = {}
 _preview_cache: dict[str, dict] = {}
+_portfolios: dict[str, dict] = {}
+
+
+def _job_queue_depth():
+    """Report jobs not yet finished, by kind (exported on /metrics)."""
+    yield {"kind": "report"}, sum(1 for r in list(_reports.values()) if r["status"] == "processing")
+    yield {"kind": "portfolio"}, sum(
+        1 for p in list(_portfolios.values()) if p["status"] == "processing")
+    yield {"kind": "portfolio_lot"}, sum(
+        1 for p in list(_portfolios.values()) for lot in p["lots"]
+        if lot["status"] in ("pending", "analyzing", "rendering"))
+
+
+register_collector("report_job_queue_depth", "Report jobs pending or in progress",
+                   "gauge", _job_queue_depth)
 
 
 # ── Request / Response models ──
@@ -57,6 +77,10 @@ class GenerateRequest(BaseModel):
     preview_id: Optional[str] = None  # reuse cached preview
 
 
+class PortfolioRequest(BaseModel):
+    bbls: list[str]
+
+
 class ReportSummary(BaseModel):
     id: str
     bbl: str
@@ -69,6 +93,13 @@ class ReportSummary(BaseModel):
 
 
 # ── Helper: run the zoning analysis (no PDF) ──
+def _analysis_key(address: str = None, bbl: str = None, **kwargs):
+    """Identical previews/reports of the same lot share one analysis."""
+    return default_key(normalize_address(address) if address else None, bbl,
+                       kwargs.get("calc_options") or {})
+
+
+@coalesce("analysis", key=_analysis_key)
 async def _run_analysis(address: str = None, bbl: str = None, **kwargs):
     """Run the full zoning analysis pipeline, returning structured data."""
     from app.api.routes import _build_lot_profile
@@ -129,19 +160,19 @@ async def _run_analysis(address: str = None, bbl: str = None, **kwargs):
         except Exception:
             pass
 
-    # Populate cross streets
+    # Populate cross streets (optional: shed under load)
     if lot_profile.latitude and lot_profile.longitude:
-        try:
-            lot_profile.cross_streets = await fetch_cross_streets(
-                lot_profile.latitude, lot_profile.longitude
-            )
-        except Exception:
-            pass
+        lot_profile.cross_streets = await run_stage(Stage(
+            "cross_streets",
+            lambda: fetch_cross_streets(lot_profile.latitude, lot_profile.longitude),
+            optional=True,
+        ))
 
     # Zoning calc
     calc_options = kwargs.get("calc_options", {})
     try:
-        calc_result = calculator.calculate(lot_profile, options=calc_options if calc_options else None)
+        with span("calculate"):
+            calc_result = calculator.calculate(lot_profile, options=calc_options if calc_options else None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Zoning calculation error: {e}")
 
@@ -150,13 +181,14 @@ async def _run_analysis(address: str = None, bbl: str = None, **kwargs):
 
     # Massing geometry
     primary_district = lot_profile.zoning_districts[0] if lot_profile.zoning_districts else ""
-    if geometry:
-        for scenario in scenarios:
-            massing = compute_massing_geometry(
-                geometry, zoning_envelope, scenario.floors,
-                district=primary_district,
-            )
-            scenario.massing_geometry = massing
+    with span("massing.geometry"):
+        if geometry:
+            for scenario in scenarios:
+                massing = compute_massing_geometry(
+                    geometry, zoning_envelope, scenario.floors,
+                    district=primary_district,
+                )
+                scenario.massing_geometry = massing
 
     return {
         "bbl_result": bbl_result,
@@ -171,12 +203,20 @@ async def _run_analysis(address: str = None, bbl: str = None, **kwargs):
 
 # ── POST /preview ──
 @router.post("/preview")
-async def preview_report(req: PreviewRequest, user: UserInfo | None = Depends(get_optional_user)):
-    """Run zoning analysis (no PDF) and return summary + price quote."""
-    analysis = await _run_analysis(
-        address=req.address, bbl=req.bbl,
-        calc_options={"include_cellar": req.include_cellar, "include_inclusionary": req.include_inclusionary},
-    )
+async def preview_report(
+    req: PreviewRequest,
+    debug: bool = False,
+    user: UserInfo | None = Depends(get_optional_user),
+):
+    """Run zoning analysis (no PDF) and return summary + price quote.
+
+    With ``debug=true`` the response includes per-stage ``timings`` (ms).
+    """
+    with collect_timings(debug) as timings:
+        analysis = await _run_analysis(
+            address=req.address, bbl=req.bbl,
+            calc_options={"include_cellar": req.include_cellar, "include_inclusionary": req.include_inclusionary},
+        )
 
     lot = analysis["lot_profile"]
     envelope = analysis["zoning_envelope"]
@@ -219,7 +259,7 @@ async def preview_report(req: PreviewRequest, user: UserInfo | None = Depends(ge
 
     resolved_address = lot.address or req.address or req.bbl or ""
 
-    return {
+    response = {
         "preview_id": preview_id,
         "bbl": lot.bbl,
         "address": resolved_address,
@@ -240,6 +280,9 @@ async def preview_report(req: PreviewRequest, user: UserInfo | None = Depends(ge
             "quality_housing": envelope.quality_housing,
         },
     }
+    if timings:
+        response["timings"] = timings.as_dict()
+    return response
 
 
 # ── POST /generate ──
@@ -276,28 +319,68 @@ async def generate_report_endpoint(
 
 async def _generate_report_task(report_id: str, req: GenerateRequest, user: UserInfo):
     """Background task: run full analysis + generate PDF."""
-    try:
-        # Check if we have a cached preview
-        analysis = None
-        if req.preview_id and req.preview_id in _preview_cache:
-            cached = _preview_cache[req.preview_id]
-            if cached["user_id"] == user.clerk_user_id or cached["user_id"] == "anonymous":
-                analysis = cached["analysis"]
-
-        if analysis is None:
-            analysis = await _run_analysis(
-                address=req.address, bbl=req.bbl,
-                calc_options={"include_cellar": req.include_cellar, "include_inclusionary": req.include_inclusionary},
-            )
+    with collect_timings() as timings:
+        try:
+            # Check if we have a cached preview
+            analysis = None
+            if req.preview_id and req.preview_id in _preview_cache:
+                cached = _preview_cache[req.preview_id]
+                if cached["user_id"] == user.clerk_user_id or cached["user_id"] == "anonymous":
+                    analysis = cached["analysis"]
+
+            if analysis is None:
+                analysis = await _run_analysis(
+                    address=req.address, bbl=req.bbl,
+                    calc_options={"include_cellar": req.include_cellar, "include_inclusionary": req.include_inclusionary},
+                )
+
+            inputs = await _prepare_report_inputs(analysis)
+            lot_profile = analysis["lot_profile"]
+
+            # Generate PDF
+            with span("report"):
+                pdf_path = generate_report(
+                    inputs["result"],
+                    parking_layout_result=inputs["parking_layout_result"],
+                    assemblage_data=None,
+                    map_images=inputs["map_images"],
+                    massing_models=inputs["massing_models"],
+                )
+
+            billing_sf = inputs["billing_sf"]
+            pricing = calculate_price(billing_sf)
+
+            # Update record
+            _reports[report_id].update({
+                "bbl": lot_profile.bbl,
+                "address": lot_profile.address or "",
+                "status": "completed",
+                "buildable_sf": billing_sf,
+                "price_cents": pricing["price_cents"],
+                "pdf_path": pdf_path,
+                "scenarios_count": len(analysis["scenarios"]),
+            })
+
+        except Exception as e:
+            _reports[report_id]["status"] = "failed"
+            _reports[report_id]["error"] = str(e)
+    _reports[report_id]["timings"] = timings.as_dict()
+
+
+async def _prepare_report_inputs(analysis: dict) -> dict:
+    """Everything the PDF needs beyond the analysis: parking, maps, massing.
 
-        lot_profile = analysis["lot_profile"]
-        calc_result = analysis["calc_result"]
-        zoning_envelope = analysis["zoning_envelope"]
-        scenarios = analysis["scenarios"]
-        geometry = analysis["geometry"]
-        primary_district = analysis["primary_district"]
+    Returns a dict with ``result`` (CalculationResult), ``parking_layout_result``,
+    ``map_images``, ``massing_models`` and ``billing_sf``.
+    """
+    lot_profile = analysis["lot_profile"]
+    calc_result = analysis["calc_result"]
+    zoning_envelope = analysis["zoning_envelope"]
+    scenarios = analysis["scenarios"]
+    primary_district = analysis["primary_district"]
 
-        # Building programs
+    # Building programs
+    with span("building_program"):
         building_programs = []
         for scenario in scenarios:
             scenario_dict = {
@@ -319,9 +402,10 @@ async def _generate_report_task(report_id: str, req: GenerateRequest, user: User
             )
             building_programs.append(bp.to_dict())
 
-        # Parking
-        parking_layout_result = None
-        scenarios_with_parking = [s for s in scenarios if s.parking and s.parking.total_spaces_required > 0]
+    # Parking
+    parking_layout_result = None
+    scenarios_with_parking = [s for s in scenarios if s.parking and s.parking.total_spaces_required > 0]
+    with span("parking_layout"):
         if scenarios_with_parking:
             max_parking = max(scenarios_with_parking, key=lambda s: s.parking.total_spaces_required)
             footprint = (lot_profile.lot_area or 5000) * (
@@ -338,37 +422,42 @@ async def _generate_report_task(report_id: str, req: GenerateRequest, user: User
                 waiver_eligible=max_parking.parking.waiver_eligible,
             )
 
-        # Map images
-        map_images = None
-        lat = lot_profile.latitude
-        lng = lot_profile.longitude
-        lot_geom = lot_profile.geometry
-        if lat and lng:
-            sat, street, zmap, ctx, city, nbhd, sv, block_desc = await asyncio.gather(
-                fetch_satellite_image(lat, lng, lot_geom, width=800, height=800),
-                fetch_street_map_image(lat, lng, lot_geom),
-                fetch_zoning_map_image(lat, lng, lot_geom),
-                fetch_context_map_image(lat, lng, lot_geom),
-                fetch_city_overview_map(lat, lng),
-                fetch_neighborhood_map_image(lat, lng, lot_geom),
-                fetch_street_view_image(lat, lng),
-                fetch_block_description(lot_profile.bbl),
-            )
-            if any([sat, street, zmap, ctx, city, nbhd, sv]):
-                map_images = {
-                    "satellite_bytes": sat,
-                    "street_bytes": street,
-                    "zoning_map_bytes": zmap,
-                    "context_map_bytes": ctx,
-                    "city_overview_bytes": city,
-                    "neighborhood_map_bytes": nbhd,
-                    "street_view_bytes": sv,
-                }
-            # Set block description on lot profile
-            if block_desc:
-                lot_profile.block_description = block_desc
-
-        # Massing models
+    # Map images
+    map_images = None
+    lat = lot_profile.latitude
+    lng = lot_profile.longitude
+    lot_geom = lot_profile.geometry
+    if lat and lng:
+        # Each fetch has a time budget; optional ones are shed under load
+        with span("maps"):
+            fetched = await run_stages([
+                Stage("satellite", lambda: fetch_satellite_image(lat, lng, lot_geom, width=800, height=800)),
+                Stage("street", lambda: fetch_street_map_image(lat, lng, lot_geom)),
+                Stage("zoning", lambda: fetch_zoning_map_image(lat, lng, lot_geom)),
+                Stage("context", lambda: fetch_context_map_image(lat, lng, lot_geom)),
+                Stage("city_overview", lambda: fetch_city_overview_map(lat, lng)),
+                Stage("neighborhood", lambda: fetch_neighborhood_map_image(lat, lng, lot_geom),
+                      optional=True),
+                Stage("street_view", lambda: fetch_street_view_image(lat, lng), optional=True),
+                Stage("block_description", lambda: fetch_block_description(lot_profile.bbl)),
+            ], Deadline(settings.report_deadline_seconds))
+        sat, street, zmap, ctx, city, nbhd, sv, block_desc = fetched.values()
+        if any([sat, street, zmap, ctx, city, nbhd, sv]):
+            map_images = {
+                "satellite_bytes": sat,
+                "street_bytes": street,
+                "zoning_map_bytes": zmap,
+                "context_map_bytes": ctx,
+                "city_overview_bytes": city,
+                "neighborhood_map_bytes": nbhd,
+                "street_view_bytes": sv,
+            }
+        # Set block description on lot profile
+        if block_desc:
+            lot_profile.block_description = block_desc
+
+    # Massing models
+    with span("massing.models"):
         massing_models = {}
         for scenario in scenarios:
             try:
@@ -384,50 +473,185 @@ async def _generate_report_task(report_id: str, req: GenerateRequest, user: User
             except Exception:
                 pass
 
-        # Build CalculationResult for report generator
-        result_obj = CalculationResult(
-            lot_profile=lot_profile,
-            zoning_envelope=zoning_envelope,
-            scenarios=scenarios,
-            building_type=calc_result.get("building_type"),
-            street_wall=calc_result.get("street_wall"),
-            special_districts=(
-                SpecialDistrictInfo(**calc_result["special_districts"])
-                if calc_result.get("special_districts") else None
-            ),
-            city_of_yes=calc_result.get("city_of_yes"),
-            programs=_build_programs_summary(calc_result),
-        )
+    # Build CalculationResult for report generator
+    result_obj = CalculationResult(
+        lot_profile=lot_profile,
+        zoning_envelope=zoning_envelope,
+        scenarios=scenarios,
+        building_type=calc_result.get("building_type"),
+        street_wall=calc_result.get("street_wall"),
+        special_districts=(
+            SpecialDistrictInfo(**calc_result["special_districts"])
+            if calc_result.get("special_districts") else None
+        ),
+        city_of_yes=calc_result.get("city_of_yes"),
+        programs=_build_programs_summary(calc_result),
+    )
+
+    # Pricing — billing SF = lot_area × max(res_far, comm_far), excludes CF
+    lot_area_val = lot_profile.lot_area or 0
+    billing_far = max(zoning_envelope.residential_far or 0, zoning_envelope.commercial_far or 0)
+
+    return {
+        "result": result_obj,
+        "parking_layout_result": parking_layout_result,
+        "map_images": map_images,
+        "massing_models": massing_models,
+        "billing_sf": lot_area_val * billing_far,
+    }
+
 
-        # Generate PDF
-        pdf_path = generate_report(
-            result_obj,
-            parking_layout_result=parking_layout_result,
-            assemblage_data=None,
-            map_images=map_images,
-            massing_models=massing_models,
+# ── POST /portfolio ──
+@router.post("/portfolio")
+async def generate_portfolio_endpoint(
+    req: PortfolioRequest,
+    background_tasks: BackgroundTasks,
+    user: UserInfo = Depends(get_current_user),
+):
+    """Generate reports for a portfolio of lots in one job.
+
+    Produces one combined PDF (portfolio summary + every lot) and a PDF per
+    lot.  Returns a portfolio ID; poll it for per-lot progress.
+    """
+    bbls = list(dict.fromkeys(b.strip() for b in req.bbls if b.strip()))
+    if not bbls:
+        raise HTTPException(status_code=400, detail="At least one BBL is required.")
+    if len(bbls) > settings.portfolio_max_lots:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A portfolio can include at most {settings.portfolio_max_lots} lots.",
         )
 
-        # Pricing — billing SF = lot_area × max(res_far, comm_far), excludes CF
-        lot_area_val = lot_profile.lot_area or 0
-        billing_far = max(zoning_envelope.residential_far or 0, zoning_envelope.commercial_far or 0)
-        billing_sf = lot_area_val * billing_far
-        pricing = calculate_price(billing_sf)
+    portfolio_id = str(uuid.uuid4())
+    _portfolios[portfolio_id] = {
+        "id": portfolio_id,
+        "user_id": user.clerk_user_id if user else "anonymous",
+        "status": "processing",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "pdf_path": None,
+        # status: pending | analyzing | rendering | completed | failed
+        "lots": [
+            {"bbl": bbl, "address": "", "status": "pending", "error": None, "pdf_path": None}
+            for bbl in bbls
+        ],
+    }
 
-        # Update record
-        _reports[report_id].update({
-            "bbl": lot_profile.bbl,
-            "address": lot_profile.address or "",
-            "status": "completed",
-            "buildable_sf": billing_sf,
-            "price_cents": pricing["price_cents"],
-            "pdf_path": pdf_path,
-            "scenarios_count": len(scenarios),
-        })
+    background_tasks.add_task(_generate_portfolio_task, portfolio_id)
+
+    return {"portfolio_id": portfolio_id, "status": "processing", "lots_count": len(bbls)}
+
+
+async def _generate_portfolio_task(portfolio_id: str):
+    """Background task: analyze every lot concurrently, then build the PDFs."""
+    portfolio = _portfolios[portfolio_id]
+    semaphore = asyncio.Semaphore(max(1, settings.portfolio_concurrency))
+
+    async def _analyze(entry: dict) -> Optional[dict]:
+        async with semaphore:
+            entry["status"] = "analyzing"
+            try:
+                analysis = await _run_analysis(bbl=entry["bbl"])
+                inputs = await _prepare_report_inputs(analysis)
+            except HTTPException as e:
+                entry.update(status="failed", error=str(e.detail))
+                return None
+            except Exception as e:
+                entry.update(status="failed", error=str(e))
+                return None
+            entry.update(status="rendering", address=analysis["lot_profile"].address or "")
+            return inputs
+
+    try:
+        prepared = await asyncio.gather(*(_analyze(entry) for entry in portfolio["lots"]))
+        ready = [(entry, inputs) for entry, inputs in zip(portfolio["lots"], prepared) if inputs]
+        if not ready:
+            portfolio.update(status="failed", error="None of the lots could be analyzed.")
+            return
+
+        def _on_lot_done(index: int, pdf_path: Optional[str], error: Optional[str]):
+            entry = ready[index][0]
+            if pdf_path:
+                entry.update(status="completed", pdf_path=pdf_path)
+            else:
+                entry.update(status="failed", error=error)
+
+        unavailable = [entry["bbl"] for entry in portfolio["lots"] if entry["status"] == "failed"]
+        reports = await asyncio.to_thread(
+            render_portfolio, [inputs for _, inputs in ready], unavailable, _on_lot_done,
+        )
+        portfolio.update(status="completed", pdf_path=reports.combined_path)
 
     except Exception as e:
-        _reports[report_id]["status"] = "failed"
-        _reports[report_id]["error"] = str(e)
+        portfolio["status"] = "failed"
+        portfolio["error"] = str(e)
+
+
+def _get_user_portfolio(portfolio_id: str, user: UserInfo) -> dict:
+    portfolio = _portfolios.get(portfolio_id)
+    if not portfolio:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    if portfolio["user_id"] != user.clerk_user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return portfolio
+
+
+# ── GET /portfolio/{portfolio_id} ──
+@router.get("/portfolio/{portfolio_id}")
+async def get_portfolio(portfolio_id: str, user: UserInfo = Depends(get_current_user)):
+    """Get portfolio status with per-lot progress (for polling)."""
+    portfolio = _get_user_portfolio(portfolio_id, user)
+    lots = portfolio["lots"]
+    return {
+        "id": portfolio["id"],
+        "status": portfolio["status"],
+        "created_at": portfolio["created_at"],
+        "lots_count": len(lots),
+        "completed_count": sum(1 for lot in lots if lot["status"] == "completed"),
+        "failed_count": sum(1 for lot in lots if lot["status"] == "failed"),
+        "lots": [
+            {"bbl": lot["bbl"], "address": lot["address"],
+             "status": lot["status"], "error": lot["error"]}
+            for lot in lots
+        ],
+        "error": portfolio.get("error"),
+    }
+
+
+# ── GET /portfolio/{portfolio_id}/pdf ──
+@router.get("/portfolio/{portfolio_id}/pdf")
+async def download_portfolio_pdf(portfolio_id: str, user: UserInfo = Depends(get_current_user)):
+    """Download the combined portfolio PDF."""
+    from fastapi.responses import FileResponse
+
+    portfolio = _get_user_portfolio(portfolio_id, user)
+    if portfolio["status"] != "completed":
+        raise HTTPException(status_code=400, detail=f"Portfolio status: {portfolio['status']}")
+    pdf_path = portfolio.get("pdf_path")
+    if not pdf_path or not os.path.isfile(pdf_path):
+        raise HTTPException(status_code=404, detail="PDF file not found")
+    return FileResponse(pdf_path, media_type="application/pdf",
+                        filename=f"portfolio-report-{portfolio_id[:8]}.pdf")
+
+
+# ── GET /portfolio/{portfolio_id}/lots/{bbl}/pdf ──
+@router.get("/portfolio/{portfolio_id}/lots/{bbl}/pdf")
+async def download_portfolio_lot_pdf(
+    portfolio_id: str, bbl: str, user: UserInfo = Depends(get_current_user),
+):
+    """Download one lot's PDF from a portfolio (available as soon as it is done)."""
+    from fastapi.responses import FileResponse
+
+    portfolio = _get_user_portfolio(portfolio_id, user)
+    lot = next((lot for lot in portfolio["lots"] if lot["bbl"] == bbl), None)
+    if not lot:
+        raise HTTPException(status_code=404, detail="Lot not in portfolio")
+    if lot["status"] != "completed":
+        raise HTTPException(status_code=400, detail=f"Lot status: {lot['status']}")
+    pdf_path = lot.get("pdf_path")
+    if not pdf_path or not os.path.isfile(pdf_path):
+        raise HTTPException(status_code=404, detail="PDF file not found")
+    return FileResponse(pdf_path, media_type="application/pdf",
+                        filename=f"zoning-report-{bbl}.pdf")
 
 
 # ── GET / — list user reports ──
@@ -455,15 +679,23 @@ async def list_reports(user: UserInfo = Depends(get_current_user)):
 
 # ── GET /{report_id} ──
 @router.get("/{report_id}")
-async def get_report(report_id: str, user: UserInfo = Depends(get_current_user)):
-    """Get report metadata + status (for polling)."""
+async def get_report(
+    report_id: str,
+    debug: bool = False,
+    user: UserInfo = Depends(get_current_user),
+):
+    """Get report metadata + status (for polling).
+
+    With ``debug=true`` the response includes per-stage ``timings`` (ms)
+    once the report has finished.
+    """
     report = _reports.get(report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     if report["user_id"] != user.clerk_user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return {
+    response = {
         "id": report["id"],
         "bbl": report["bbl"],
         "address": report["address"],
@@ -474,6 +706,9 @@ async def get_report(report_id: str, user: UserInfo = Depends(get_current_user))
         "scenarios_count": report.get("scenarios_count"),
         "error": report.get("error"),
     }
+    if debug:
+        response["timings"] = report.get("timings")
+    return response
 
 
 # ── GET /{report_id}/pdf ──
@@ -541,11 +776,12 @@ async def preview_assemblage(
                    "(not keeping existing building).",
         )
 
-    from app.api.lots import resolve_lot
+    from app.api.lots import prefetch_lots, resolve_lot
     from app.zoning_engine.assemblage import merge_lots, validate_contiguity
     from app.zoning_engine.air_rights import calculate_air_rights, adjust_scenarios_for_air_rights
 
     # ── Resolve each lot ──
+    await prefetch_lots([lot_input.bbl for lot_input in req.lots])
     lot_profiles = []
     lot_geometries = []
     for lot_input in req.lots:
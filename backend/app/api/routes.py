@@ -16,12 +16,18 @@ import asyncio
 from app.services.geocoding import geocode_address, parse_address, BOROUGH_CODE_TO_NAME
 from app.services.pluto import fetch_pluto_data
 from app.services.geometry import fetch_lot_geometry, fetch_zoning_layers
-from app.services.report import generate_report, generate_report_bytes
+from app.services import report as report_service
+from app.services.cache import cache_bypass
+from app.services.deadline import Deadline, Stage, run_stages
+from app.services.invalidation import invalidate_bbl
+from app.services.report import generate_report, spool_report
 from app.services.street_width import determine_street_width
+from app.services.timing import collect_timings, span
 from app.services.maps import fetch_satellite_image, fetch_street_map_image, fetch_zoning_map_image, fetch_context_map_image
 from app.zoning_engine.calculator import ZoningCalculator
 from app.zoning_engine.massing import compute_massing_geometry
 from app.zoning_engine.massing_builder import build_massing_model
+from app.zoning_engine.massing_lod import apply_lod, LOD_FULL, LOD_LEVELS
 from app.zoning_engine.building_program import generate_building_program
 from app.zoning_engine.parking_layout import evaluate_parking_layouts
 from app.zoning_engine.assemblage import analyze_assemblage, AssemblageAnalysis
@@ -31,6 +37,8 @@ from app.config import settings
 router = APIRouter(prefix="/api")
 calculator = ZoningCalculator()
 
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes per chunk when streaming generated PDFs
+
 # Default calculation options (can be overridden per-request)
 _DEFAULT_CALC_OPTIONS = {
     "include_cellar": True,
@@ -226,6 +234,8 @@ async def create_assemblage(request: AssemblageRequest):
         raise HTTPException(status_code=400, detail="Assemblage requires at least 2 BBLs.")
 
     # Fetch all lots
+    from app.api.lots import prefetch_lots
+    await prefetch_lots(request.bbls)
     lots_data = []
     for bbl in request.bbls:
         pluto = await fetch_pluto_data(bbl, settings.socrata_app_token)
@@ -319,26 +329,26 @@ async def create_assemblage(request: AssemblageRequest):
     }
 
 
-@router.post("/report")
-async def create_report(request: ReportRequest):
-    """Generate a PDF feasibility report."""
-    pluto = await fetch_pluto_data(request.bbl, settings.socrata_app_token)
+async def _prepare_report(bbl: str) -> tuple[CalculationResult, dict | None]:
+    """Fetch lot data, run the calculator and fetch map images for a report."""
+    pluto = await fetch_pluto_data(bbl, settings.socrata_app_token)
     if not pluto:
-        raise HTTPException(status_code=404, detail=f"No data found for BBL {request.bbl}")
+        raise HTTPException(status_code=404, detail=f"No data found for BBL {bbl}")
 
-    geometry = await fetch_lot_geometry(request.bbl)
-    zoning_layers = await fetch_zoning_layers(request.bbl)
+    geometry = await fetch_lot_geometry(bbl)
+    zoning_layers = await fetch_zoning_layers(bbl)
 
     from app.models.schemas import BBLResponse
     bbl_result = BBLResponse(
-        bbl=request.bbl,
-        borough=int(request.bbl[0]),
-        block=int(request.bbl[1:6]),
-        lot=int(request.bbl[6:10]),
+        bbl=bbl,
+        borough=int(bbl[0]),
+        block=int(bbl[1:6]),
+        lot=int(bbl[6:10]),
     )
     lot_profile = await _build_lot_profile(bbl_result, pluto, geometry, zoning_layers)
 
-    calc_result = calculator.calculate(lot_profile)
+    with span("calculate"):
+        calc_result = calculator.calculate(lot_profile)
 
     result = CalculationResult(
         lot_profile=lot_profile,
@@ -356,41 +366,86 @@ async def create_report(request: ReportRequest):
     lat = lot_profile.latitude
     lng = lot_profile.longitude
     if lat and lng:
-        satellite_bytes, street_bytes = await asyncio.gather(
-            fetch_satellite_image(lat, lng, geometry),
-            fetch_street_map_image(lat, lng, geometry),
-        )
+        with span("maps"):
+            fetched = await run_stages([
+                Stage("satellite", lambda: fetch_satellite_image(lat, lng, geometry)),
+                Stage("street", lambda: fetch_street_map_image(lat, lng, geometry)),
+            ], Deadline(settings.report_deadline_seconds))
+        satellite_bytes, street_bytes = fetched.values()
         if satellite_bytes or street_bytes:
             map_images = {
                 "satellite_bytes": satellite_bytes,
                 "street_bytes": street_bytes,
             }
 
-    # Rank scenarios by estimated value
-    valuation_rankings = rank_scenarios(calc_result["scenarios"], lot_profile.borough)
+    return result, map_images
 
-    filepath = generate_report(
-        result,
-        map_images=map_images,
-        valuation_rankings=valuation_rankings,
-    )
+
+@router.post("/report")
+async def create_report(request: ReportRequest):
+    """Generate a PDF feasibility report."""
+    result, map_images = await _prepare_report(request.bbl)
+    filepath = await asyncio.to_thread(generate_report, result, map_images=map_images)
     return {"report_path": filepath, "bbl": request.bbl}
 
 
+@router.get("/report/{bbl}/stream")
+async def stream_report(bbl: str):
+    """Generate a PDF feasibility report and stream it without storing it.
+
+    The PDF is built into a spooled temp file (memory, spilling to disk for
+    large reports) and sent in chunks, so the response never holds a second
+    full copy of the document.  Stored reports (``/report/{bbl}/download``,
+    ``/v1/reports/{report_id}``) support HTTP Range requests for resuming.
+    """
+    result, map_images = await _prepare_report(bbl)
+    spool, report_id = await asyncio.to_thread(spool_report, result, map_images=map_images)
+    size = spool.seek(0, os.SEEK_END)
+    spool.seek(0)
+
+    def _chunks():
+        try:
+            while chunk := spool.read(STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            spool.close()
+
+    filename = f"zoning_feasibility_{bbl}_{report_id}.pdf"
+    return StreamingResponse(
+        _chunks(),
+        media_type="application/pdf",
+        headers={
+            "Content-Length": str(size),
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Accept-Ranges": "none",
+        },
+    )
+
+
+def _pdf_file_response(path: str) -> FileResponse:
+    """Serve a stored PDF.
+
+    ``FileResponse`` streams the file in chunks and answers ``Range``
+    requests (single and multi-range, 206 / 416), so large reports can be
+    resumed or fetched progressively by PDF viewers.
+    """
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=os.path.basename(path),
+    )
+
+
 @router.get("/report/{bbl}/download")
 async def download_report(bbl: str):
     """Download a previously generated report."""
     import glob as globlib
-    output_dir = os.path.join(os.path.dirname(__file__), "..", "..", "output")
+    output_dir = report_service.OUTPUT_DIR
     pattern = os.path.join(output_dir, f"zoning_feasibility_{bbl}_*.pdf")
     files = sorted(globlib.glob(pattern), reverse=True)
     if not files:
         raise HTTPException(status_code=404, detail="No report found for this BBL. Generate one first.")
-    return FileResponse(
-        files[0],
-        media_type="application/pdf",
-        filename=os.path.basename(files[0]),
-    )
+    return _pdf_file_response(files[0])
 
 
 from pydantic import BaseModel as PydanticBaseModel
@@ -407,12 +462,25 @@ from app.models.schemas import BBLResponse
 async def get_massing(
     bbl: str,
     scenario: Opt[str] = None,
+    lod: str = Query(LOD_FULL, description="Level of detail: full, blocks or envelope"),
+    tolerance: float = Query(0.0, ge=0, description="Polygon simplification tolerance (ft)"),
 ):
     """Get floor-by-floor massing model for a lot.
 
     Returns detailed massing data for Three.js rendering.
     Optionally filter to a specific scenario name.
+
+    List and comparison views can request a cheaper payload with
+    ``lod=blocks`` (identical floors collapsed into extruded blocks) or
+    ``lod=envelope`` (lot + zoning envelope wireframe only), optionally
+    combined with ``tolerance`` to simplify footprints.
     """
+    if lod not in LOD_LEVELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid lod '{lod}'. Use one of: {', '.join(LOD_LEVELS)}",
+        )
+
     parsed = parse_bbl(bbl)
     if not parsed:
         raise HTTPException(status_code=400, detail=f"Invalid BBL: {bbl}")
@@ -431,10 +499,7 @@ async def get_massing(
     )
     lot_profile = await _build_lot_profile(bbl_result, pluto, geometry, zoning_layers)
 
-    calc_result = calculator.calculate(lot_profile, options={
-        "include_cellar": getattr(request, "include_cellar", True),
-        "include_inclusionary": getattr(request, "include_inclusionary", False),
-    })
+    calc_result = calculator.calculate(lot_profile, options=_DEFAULT_CALC_OPTIONS)
     zoning_envelope = calc_result["zoning_envelope"]
     scenarios = calc_result["scenarios"]
     district = lot_profile.zoning_districts[0] if lot_profile.zoning_districts else ""
@@ -459,7 +524,7 @@ async def get_massing(
             district=district,
             lot_geojson=geometry,
         )
-        massing_models.append(model)
+        massing_models.append(apply_lod(model, lod=lod, tolerance=tolerance))
 
     # Return combined response (first scenario's lot data + all scenario massings)
     if not massing_models:
@@ -492,6 +557,7 @@ class FullAnalysisRequest(PydanticBaseModel):
 async def full_analysis(
     request: FullAnalysisRequest,
     nocache: bool = False,
+    debug: bool = False,
 ):
     """Full end-to-end analysis: lot → zoning → building program → parking → report.
 
@@ -500,8 +566,18 @@ async def full_analysis(
     When multiple lots are provided, includes assemblage delta analysis.
 
     Query params:
-        nocache: bypass Redis cache for fresh results
+        nocache: bypass Redis cache for fresh results (which are then cached,
+            and other workers drop their local copies of the lots)
+        debug: include per-stage ``timings`` (ms) in the response
     """
+    with collect_timings(debug) as timings, cache_bypass(nocache):
+        response = await _full_analysis(request, nocache)
+    if timings:
+        response["timings"] = timings.as_dict()
+    return response
+
+
+async def _full_analysis(request: FullAnalysisRequest, nocache: bool) -> dict:
     # ── Resolve all BBLs from the request ──
     # Store full BBLResponse objects to preserve lat/lng from geocoding
     bbl_responses: list[BBLResponse] = []
@@ -558,6 +634,9 @@ async def full_analysis(
         raise HTTPException(status_code=400, detail="Provide address, bbl, bbls, or addresses.")
 
     # ── Build LotProfile for each BBL ──
+    if len(bbl_responses) > 1:
+        from app.api.lots import prefetch_lots
+        await prefetch_lots([bbl_obj.bbl for bbl_obj in bbl_responses])
     lot_profiles = []
     for bbl_obj in bbl_responses:
         bbl = bbl_obj.bbl
@@ -583,15 +662,16 @@ async def full_analysis(
     # ── If assemblage (2+ lots), run assemblage analysis ──
     assemblage_result = None
     if len(lot_profiles) >= 2:
-        try:
-            assemblage_result = analyze_assemblage(lot_profiles, calculator)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Assemblage analysis error: {type(e).__name__}: {e}",
-            )
+        with span("assemblage"):
+            try:
+                assemblage_result = analyze_assemblage(lot_profiles, calculator)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Assemblage analysis error: {type(e).__name__}: {e}",
+                )
         # Use the merged lot for the primary analysis
         lot_profile = assemblage_result.merged_lot
         bbl = lot_profile.bbl
@@ -613,7 +693,8 @@ async def full_analysis(
         "include_inclusionary": getattr(request, "include_inclusionary", False),
     }
     try:
-        calc_result = calculator.calculate(lot_profile, options=calc_options)
+        with span("calculate"):
+            calc_result = calculator.calculate(lot_profile, options=calc_options)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -624,55 +705,58 @@ async def full_analysis(
 
     # Generate massing geometry
     primary_district = lot_profile.zoning_districts[0] if lot_profile.zoning_districts else ""
-    if geometry:
-        for scenario in scenarios:
-            massing = compute_massing_geometry(
-                geometry, zoning_envelope, scenario.floors,
-                district=primary_district,
-            )
-            scenario.massing_geometry = massing
+    with span("massing.geometry"):
+        if geometry:
+            for scenario in scenarios:
+                massing = compute_massing_geometry(
+                    geometry, zoning_envelope, scenario.floors,
+                    district=primary_district,
+                )
+                scenario.massing_geometry = massing
 
     # Building program for each scenario
-    building_programs = []
-    for scenario in scenarios:
-        scenario_dict = {
-            "total_gross_sf": scenario.total_gross_sf,
-            "zoning_floor_area": scenario.zoning_floor_area or scenario.total_gross_sf,
-            "residential_sf": scenario.residential_sf,
-            "commercial_sf": scenario.commercial_sf,
-            "cf_sf": scenario.cf_sf,
-            "total_units": scenario.total_units,
-            "num_floors": scenario.num_floors,
-            "max_height_ft": scenario.max_height_ft,
-            "floors": [f.dict() for f in scenario.floors] if scenario.floors else [],
-        }
-        bp = generate_building_program(
-            scenario_dict,
-            lot_depth=lot_profile.lot_depth or 100,
-            lot_frontage=lot_profile.lot_frontage or 50,
-            borough=lot_profile.borough,
-        )
-        building_programs.append(bp.to_dict())
+    with span("building_program"):
+        building_programs = []
+        for scenario in scenarios:
+            scenario_dict = {
+                "total_gross_sf": scenario.total_gross_sf,
+                "zoning_floor_area": scenario.zoning_floor_area or scenario.total_gross_sf,
+                "residential_sf": scenario.residential_sf,
+                "commercial_sf": scenario.commercial_sf,
+                "cf_sf": scenario.cf_sf,
+                "total_units": scenario.total_units,
+                "num_floors": scenario.num_floors,
+                "max_height_ft": scenario.max_height_ft,
+                "floors": [f.dict() for f in scenario.floors] if scenario.floors else [],
+            }
+            bp = generate_building_program(
+                scenario_dict,
+                lot_depth=lot_profile.lot_depth or 100,
+                lot_frontage=lot_profile.lot_frontage or 50,
+                borough=lot_profile.borough,
+            )
+            building_programs.append(bp.to_dict())
 
     # Parking layout for representative scenario (highest parking requirement)
     parking_layout = None
     scenarios_with_parking = [s for s in scenarios if s.parking and s.parking.total_spaces_required > 0]
-    if scenarios_with_parking:
-        max_parking_scenario = max(scenarios_with_parking, key=lambda s: s.parking.total_spaces_required)
-        building_footprint = (lot_profile.lot_area or 5000) * (
-            zoning_envelope.lot_coverage_max / 100 if zoning_envelope.lot_coverage_max else 0.65
-        )
-        parking_layout_result = evaluate_parking_layouts(
-            required_spaces=max_parking_scenario.parking.total_spaces_required,
-            lot_area=lot_profile.lot_area or 5000,
-            building_footprint=building_footprint,
-            typical_floor_sf=building_footprint,
-            lot_frontage=lot_profile.lot_frontage or 50,
-            lot_depth=lot_profile.lot_depth or 100,
-            is_quality_housing=zoning_envelope.quality_housing,
-            waiver_eligible=max_parking_scenario.parking.waiver_eligible,
-        )
-        parking_layout = parking_layout_result.to_dict()
+    with span("parking_layout"):
+        if scenarios_with_parking:
+            max_parking_scenario = max(scenarios_with_parking, key=lambda s: s.parking.total_spaces_required)
+            building_footprint = (lot_profile.lot_area or 5000) * (
+                zoning_envelope.lot_coverage_max / 100 if zoning_envelope.lot_coverage_max else 0.65
+            )
+            parking_layout_result = evaluate_parking_layouts(
+                required_spaces=max_parking_scenario.parking.total_spaces_required,
+                lot_area=lot_profile.lot_area or 5000,
+                building_footprint=building_footprint,
+                typical_floor_sf=building_footprint,
+                lot_frontage=lot_profile.lot_frontage or 50,
+                lot_depth=lot_profile.lot_depth or 100,
+                is_quality_housing=zoning_envelope.quality_housing,
+                waiver_eligible=max_parking_scenario.parking.waiver_eligible,
+            )
+            parking_layout = parking_layout_result.to_dict()
 
     # Build CalculationResult
     result = CalculationResult(
@@ -692,12 +776,14 @@ async def full_analysis(
     lng = lot_profile.longitude
     lot_geometry = lot_profile.geometry
     if lat and lng:
-        satellite_bytes, street_bytes, zoning_map_bytes, context_map_bytes = await asyncio.gather(
-            fetch_satellite_image(lat, lng, lot_geometry),
-            fetch_street_map_image(lat, lng, lot_geometry),
-            fetch_zoning_map_image(lat, lng, lot_geometry),
-            fetch_context_map_image(lat, lng, lot_geometry),
-        )
+        with span("maps"):
+            fetched = await run_stages([
+                Stage("satellite", lambda: fetch_satellite_image(lat, lng, lot_geometry)),
+                Stage("street", lambda: fetch_street_map_image(lat, lng, lot_geometry)),
+                Stage("zoning", lambda: fetch_zoning_map_image(lat, lng, lot_geometry)),
+                Stage("context", lambda: fetch_context_map_image(lat, lng, lot_geometry)),
+            ], Deadline(settings.report_deadline_seconds))
+        satellite_bytes, street_bytes, zoning_map_bytes, context_map_bytes = fetched.values()
         if satellite_bytes or street_bytes or zoning_map_bytes or context_map_bytes:
             map_images = {
                 "satellite_bytes": satellite_bytes,
@@ -707,33 +793,36 @@ async def full_analysis(
             }
 
     # Build detailed massing models for each scenario (for 3D rendering in report)
-    massing_models = {}
-    for scenario in scenarios:
-        try:
-            model = build_massing_model(
-                lot=lot_profile,
-                scenario=scenario,
-                envelope=zoning_envelope,
-                district=primary_district,
-                lot_geojson=lot_geometry,
-            )
-            if model and "error" not in model:
-                massing_models[scenario.name] = model
-        except Exception as e:
-            warnings.append(f"Massing model failed for '{scenario.name}': {e}")
+    with span("massing.models"):
+        massing_models = {}
+        for scenario in scenarios:
+            try:
+                model = build_massing_model(
+                    lot=lot_profile,
+                    scenario=scenario,
+                    envelope=zoning_envelope,
+                    district=primary_district,
+                    lot_geojson=lot_geometry,
+                )
+                if model and "error" not in model:
+                    massing_models[scenario.name] = model
+            except Exception as e:
+                warnings.append(f"Massing model failed for '{scenario.name}': {e}")
 
     # Rank scenarios by estimated value (kept for API JSON response, not PDF)
-    valuation_rankings = rank_scenarios(scenarios, lot_profile.borough)
+    with span("valuation"):
+        valuation_rankings = rank_scenarios(scenarios, lot_profile.borough)
 
     # Generate PDF report (include assemblage data if available)
     assemblage_data = assemblage_result.to_dict() if assemblage_result else None
-    report_filepath = generate_report(
-        result,
-        parking_layout_result=parking_layout_result if parking_layout else None,
-        assemblage_data=assemblage_data,
-        map_images=map_images,
-        massing_models=massing_models,
-    )
+    with span("report"):
+        report_filepath = generate_report(
+            result,
+            parking_layout_result=parking_layout_result if parking_layout else None,
+            assemblage_data=assemblage_data,
+            map_images=map_images,
+            massing_models=massing_models,
+        )
 
     # Build comparison table
     comparison_table = {}
@@ -782,6 +871,10 @@ async def full_analysis(
 
     if warnings:
         response["warnings"] = warnings
+
+    if nocache:
+        for bbl in {parse_bbl(b.bbl) for b in bbl_responses} - {None}:
+            await invalidate_bbl(bbl)
     return response
 
 
@@ -789,18 +882,15 @@ async def full_analysis(
 async def get_report_pdf(report_id: str):
     """Download a generated PDF report by report ID."""
     import glob as globlib
-    output_dir = os.path.join(os.path.dirname(__file__), "..", "..", "output")
+    output_dir = report_service.OUTPUT_DIR
     pattern = os.path.join(output_dir, f"*_{report_id}.pdf")
     files = sorted(globlib.glob(pattern), reverse=True)
     if not files:
         raise HTTPException(status_code=404, detail=f"No report found with ID {report_id}.")
-    return FileResponse(
-        files[0],
-        media_type="application/pdf",
-        filename=os.path.basename(files[0]),
-    )
+    return _pdf_file_response(files[0])
 
 
+@span("lot_profile")
 async def _build_lot_profile(bbl_result, pluto, geometry, zoning_layers) -> LotProfile:
     """Construct a LotProfile from API data."""
     zoning_districts = []
@@ -68,7 +68,14 @@ export default function App() {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const url = `/api/v1/massing/${bbl}${scenarioName ? `?scenario=${encodeURIComponent(scenarioName)}` : ''}`;
+        // Pass through scenario and level-of-detail options (lod=blocks|envelope,
+        // tolerance=ft) so list/compare embeds can request a lighter payload.
+        const query = new URLSearchParams();
+        if (scenarioName) query.set('scenario', scenarioName);
+        if (params.get('lod')) query.set('lod', params.get('lod'));
+        if (params.get('tolerance')) query.set('tolerance', params.get('tolerance'));
+        const qs = query.toString();
+        const url = `/api/v1/massing/${bbl}${qs ? `?${qs}` : ''}`;
         const resp = await fetch(url);
         if (!resp.ok) {
           const err = await resp.json();
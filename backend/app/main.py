@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,6 +14,31 @@ from app.api.routes import router
 from app.api.reports_saas import router as reports_saas_router
 from app.api.billing import router as billing_router
 from app.api.lots import router as lots_router
+from app.api.admission import AdmissionMiddleware
+from app.api.metrics import MetricsMiddleware, router as metrics_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Preload fonts, report styles and render workers before serving,
+    subscribe to cache invalidations from other workers, and watch for
+    event-loop stalls if enabled."""
+    from app.services.invalidation import start_listener
+    from app.services.loop_monitor import start_monitor
+    from app.services.resources import warm_resources
+    from app.services.render_3d import warm_render_pool, shutdown_render_pool
+
+    await asyncio.to_thread(warm_resources)
+    await asyncio.to_thread(warm_render_pool)
+    invalidation_listener = start_listener()
+    loop_monitor = start_monitor()
+    yield
+    if loop_monitor:
+        loop_monitor.stop()
+    if invalidation_listener:
+        invalidation_listener.cancel()
+    shutdown_render_pool()
+
 
 app = FastAPI(
     title="NYC Zoning Feasibility Engine",
@@ -21,15 +48,20 @@ app = FastAPI(
         "building scenarios, and 3D massing diagrams."
     ),
     version="2.0.0",
+    lifespan=lifespan,
 )
 
+# Innermost: 429s still get CORS headers and are counted in the metrics
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins + ["http://localhost:8000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Core zoning engine routes
 app.include_router(router)
@@ -39,6 +71,9 @@ app.include_router(reports_saas_router)
 app.include_router(billing_router)
 app.include_router(lots_router)
 
+# Prometheus scrape endpoint
+app.include_router(metrics_router)
+
 # Serve massing-viewer (Three.js) built files
 FRONTEND_DIR = os.path.join(os.path.dirname(__file__), "frontend")
 MASSING_VIEWER_DIR = os.path.join(FRONTEND_DIR, "massing-viewer", "dist")
@@ -64,6 +99,7 @@ async def root():
             "web_ui": "/",
             "api_docs": "/docs",
             "health": "/health",
+            "metrics": "/metrics",
             "full_analysis": "POST /api/v1/full-analysis",
             "lookup": "GET /api/lookup?address=...",
             "report": "POST /api/report",
@@ -89,7 +125,7 @@ async def health():
             await r.ping()
             status["redis"] = "connected"
         else:
-            status["redis"] = "not configured"
+            status["redis"] = "unavailable" if settings.redis_url else "not configured"
     except Exception as e:
         status["redis"] = f"error: {e}"
 
@@ -0,0 +1,211 @@
+"""
+Admission control for expensive endpoints.
+
+A full analysis or report geocodes, fetches maps, renders and builds a
+PDF in process; a handful at once saturate a worker and push every
+request past its timeout.  Each such endpoint belongs to an
+``AdmissionPool`` (``ROUTE_POOLS``) that lets ``limit`` requests run at
+once per worker and queues the next ``queue`` in arrival order.  A
+request is turned away immediately with ``Rejected`` — a 429 with
+``Retry-After`` from ``api.admission.AdmissionMiddleware`` — when:
+
+  - the queue is full (``queue_full``)
+  - its user (signed-in requests only) already has ``per_user`` requests
+    running or queued in the pool (``user_limit``)
+  - it has waited ``admission_queue_timeout_seconds`` (``queue_timeout``)
+
+Endpoints not in ``ROUTE_POOLS`` (lot lookups, report listings, metrics)
+are never queued.  Limits come from ``settings.admission_pools``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from app.config import settings
+from app.services.metrics import Counter, LatencyHistogram, register_collector
+
+# (method, route template) -> pool name in settings.admission_pools
+ROUTE_POOLS = {
+    ("POST", "/api/v1/full-analysis"): "analysis",
+    ("POST", "/api/assemblage"): "analysis",
+    ("GET", "/api/massing/{bbl}"): "analysis",
+    ("GET", "/api/v1/massing/{bbl}"): "analysis",
+    ("POST", "/api/v1/saas/reports/preview"): "analysis",
+    ("POST", "/api/v1/saas/reports/preview-assemblage"): "analysis",
+    ("POST", "/api/report"): "report",
+    ("GET", "/api/report/{bbl}/stream"): "report",
+    ("GET", "/api/report/{bbl}/download"): "report",
+    ("POST", "/api/v1/saas/reports/generate"): "report",
+    # Up to portfolio_max_lots analyses and PDFs in one job
+    ("POST", "/api/v1/saas/reports/portfolio"): "portfolio",
+}
+
+# Job duration assumed for Retry-After before any request has finished
+DEFAULT_DURATION_SECONDS = 10.0
+DURATION_WINDOW = 50
+
+ADMISSION_WAIT = LatencyHistogram(
+    "admission_queue_wait_seconds",
+    "Time admitted requests waited in their endpoint's queue",
+    ("pool",),
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests turned away with 429, by pool and reason",
+    ("pool", "reason"),
+)
+
+
+class Rejected(Exception):
+    """Raised instead of queueing a request; carries the Retry-After hint."""
+
+    def __init__(self, pool: str, reason: str, retry_after: int):
+        super().__init__(f"{pool}: {reason}")
+        self.pool = pool
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionPool:
+    """At most *limit* running requests, *queue* waiting (FIFO), and
+    *per_user* running or waiting per user."""
+
+    def __init__(self, name: str, limit: int, queue: int, per_user: int,
+                 queue_timeout: float):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, queue)
+        self.per_user = max(1, per_user)
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._users: dict[str, int] = {}
+        self._durations: deque[float] = deque(maxlen=DURATION_WINDOW)
+
+    @property
+    def queued(self) -> int:
+        return sum(not waiter.done() for waiter in self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: queue ahead x recent duration."""
+        duration = (sum(self._durations) / len(self._durations)
+                    if self._durations else DEFAULT_DURATION_SECONDS)
+        return max(1, math.ceil(duration * (self.queued + 1) / self.limit))
+
+    def _reject(self, reason: str) -> Rejected:
+        ADMISSION_REJECTED.inc(self.name, reason)
+        return Rejected(self.name, reason, self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self, user: str = "") -> AsyncIterator[None]:
+        """Hold a slot for the enclosed request, queueing for it if needed."""
+        if user and self._users.get(user, 0) >= self.per_user:
+            raise self._reject("user_limit")
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+        else:
+            if self.queued >= self.max_queue:
+                raise self._reject("queue_full")
+            self._users[user] = self._users.get(user, 0) + 1
+            try:
+                await self._wait()
+            finally:
+                self._drop_user(user)
+        self._users[user] = self._users.get(user, 0) + 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._durations.append(time.monotonic() - start)
+            self._drop_user(user)
+            self._release()
+
+    async def _wait(self) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # Handed a slot just as we gave up
+            else:
+                self._forget(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("queue_timeout") from None
+            raise
+        ADMISSION_WAIT.observe(time.monotonic() - start, self.name)
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _drop_user(self, user: str) -> None:
+        count = self._users.get(user, 0) - 1
+        if count > 0:
+            self._users[user] = count
+        else:
+            self._users.pop(user, None)
+
+
+_pools: dict[str, AdmissionPool] = {}
+
+
+def get_pool(name: str) -> Optional[AdmissionPool]:
+    """The pool named *name*; None if ``settings.admission_pools`` lacks it."""
+    pool = _pools.get(name)
+    if pool is None:
+        limits = settings.admission_pools.get(name)
+        if not limits:
+            return None
+        pool = _pools[name] = AdmissionPool(
+            name, *limits, queue_timeout=settings.admission_queue_timeout_seconds)
+    return pool
+
+
+def pool_for_route(method: str, route: str) -> Optional[AdmissionPool]:
+    name = ROUTE_POOLS.get((method, route))
+    return get_pool(name) if name else None
+
+
+def queueing() -> bool:
+    """Whether any pool has requests waiting (the worker is at capacity)."""
+    return any(pool.queued for pool in _pools.values())
+
+
+def reset_pools() -> None:
+    """Forget pools and their state (tests, settings changes)."""
+    _pools.clear()
+
+
+def _active_samples():
+    for name, pool in sorted(_pools.items()):
+        yield {"pool": name}, pool.active
+
+
+def _queued_samples():
+    for name, pool in sorted(_pools.items()):
+        yield {"pool": name}, pool.queued
+
+
+register_collector("admission_active", "Requests running per admission pool", "gauge",
+                   _active_samples)
+register_collector("admission_queued", "Requests queued per admission pool", "gauge",
+                   _queued_samples)
@@ -0,0 +1,53 @@
+"""
+In-process Bloom filter.
+
+Answers "definitely not added" or "maybe added" for a string key in a few
+hashes over a fixed bit array.  ``capacity`` keys fit at the target
+false-positive rate; past that the filter starts over, since entries
+cannot be removed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            if self._count >= self.capacity:
+                self._clear()
+            for pos in self._positions(key):
+                self._array[pos >> 3] |= 1 << (pos & 7)
+            self._count += 1
+
+    def __contains__(self, key: str) -> bool:
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._array = bytearray(len(self._array))
+        self._count = 0
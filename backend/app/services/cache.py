@@ -2,54 +2,329 @@
 Redis caching layer for NYC Zoning Engine.
 
 TTLs:
-  - PLUTO data by BBL: 24 hours
+  - PLUTO data, lot geometry, zoning layers by BBL: 24 hours
   - Geocoding results by normalized address: 24 hours
   - Street width results by coordinates: 7 days
   - Full analysis results by BBL: 1 hour
+
+Lot data fetchers are wrapped with ``swr_cached`` (stale-while-revalidate):
+past the TTL above an entry is still served immediately while one
+background task refreshes it; entries expire from Redis at
+``TTL_LOT_DATA_HARD``.  Their keys include the PLUTO release
+(``pluto_release()``), so a new release starts a fresh cache.
+
+Two tiers: a size-bounded in-process LRU (``LocalCache``) in front of
+Redis.  Values read from or written to Redis are kept locally for at most
+``local_cache_ttl_seconds``; while Redis is unavailable the local tier is
+the cache, with each entry's full TTL.  A failed Redis connect or command
+drops the client and backs off (doubling from ``redis_retry_min_seconds``
+to ``redis_retry_max_seconds``) before reconnecting, so an outage costs
+requests nothing beyond the first failure.
+
+Values are stored as compact binary (``cache_codec``: orjson or msgpack,
+compressed above a size threshold); pydantic models round-trip as models.
+Fetchers raise ``NotFound`` for lookups that definitively found nothing
+(no such address, no PLUTO row, no geometry).  With ``negative_ttl`` set,
+``cache_swr`` remembers that for ``TTL_NEGATIVE`` under the same key, so
+repeated bad input fails without calling upstream.  Locally, negative
+results are kept apart from lot data (a Bloom filter in front of a small
+LRU), so a flood of typos can't evict good entries.
+
+Local copies are dropped across workers through the invalidation bus
+(``invalidation``).  ``cache_get_many`` / ``cache_set_many`` batch lookups into one MGET or
+pipeline, and ``swr_cached`` fetchers have a ``prefetch`` that loads many
+lots' entries into the local tier in one round trip.
+
+Lookups are counted per prefix (hit / stale / miss / error) and exported
+on ``/metrics`` with the hit ratio.
 """
 
 from __future__ import annotations
 
-import json
+import asyncio
 import hashlib
-from typing import Optional
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
 
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 from app.config import settings
+from app.services import cache_codec
+from app.services.bloom import BloomFilter
+from app.services.invalidation import Invalidation, register_handler
+from app.services.metrics import Counter, register_collector
+from app.services.singleflight import coalesce, default_key
+from app.services.upstream import upstream_client
+
+logger = logging.getLogger(__name__)
 
 _redis_client: Optional[redis.Redis] = None
+_redis_retry_at = 0.0   # monotonic time before which no reconnect is tried
+_redis_backoff = 0.0
+_connect_lock: Optional[asyncio.Lock] = None  # Created on first connect
+
+# Redis errors that mean the server is unreachable (not a bad command)
+_REDIS_DOWN = (RedisConnectionError, RedisTimeoutError, OSError)
+_UNAVAILABLE = object()
 
 # TTLs in seconds
 TTL_PLUTO = 86400       # 24 hours
 TTL_GEOCODE = 86400     # 24 hours
 TTL_STREET_WIDTH = 604800  # 7 days
 TTL_ANALYSIS = 3600     # 1 hour
+TTL_LOT_DATA_HARD = 2592000  # 30 days: stale lot data is served up to this age
+TTL_NEGATIVE = 600      # 10 minutes: "does not exist" results
+
+# A background refresh holds this lock so only one worker refreshes a key
+REFRESH_LOCK_SECONDS = 60
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Redis cache lookups by key prefix and result (hit, stale, negative, miss, error)",
+    ("cache", "result"),
+)
+
+
+def _hit_ratios():
+    counts: dict[str, dict[str, float]] = {}
+    for (prefix, result), n in CACHE_REQUESTS.samples():
+        counts.setdefault(prefix, {})[result] = n
+    for prefix, results in counts.items():
+        lookups = sum(results.values())
+        if lookups:
+            served = sum(results.get(r, 0.0) for r in ("hit", "stale", "negative"))
+            yield {"cache": prefix}, served / lookups
+
+
+register_collector("cache_hit_ratio", "Redis cache hits (fresh or stale) / lookups by key prefix",
+                   "gauge", _hit_ratios)
+
+
+class NotFound(Exception):
+    """Raised by a fetcher when what it looks up definitively does not exist.
+
+    Not for upstream failures: those must not be cached.
+    """
+
+
+class LocalCache:
+    """Size-bounded in-process LRU of encoded values with per-entry expiry."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        size = len(key) + len(value)
+        with self._lock:
+            self._remove(key)
+            if ttl <= 0 or size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._used += size
+            while self._used > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
+
+    def drop(self, matches: Callable[[str], Any]) -> int:
+        """Remove every entry whose key *matches*; returns the count."""
+        with self._lock:
+            keys = [key for key in self._entries if matches(key)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used
+
+    def _remove(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._used -= len(key) + len(item[1])
+
+
+_local = LocalCache(settings.local_cache_mb * 1024 * 1024)
+
+# Negative results: the filter admits a key to the exact check in _negative
+_negative = LocalCache(4 * 1024 * 1024)
+_negative_filter = BloomFilter(capacity=100_000)
+
+
+def reset_local_cache() -> None:
+    """Empty the in-process tier and forget Redis failures (tests)."""
+    global _redis_retry_at, _redis_backoff, _connect_lock
+    _local.clear()
+    _negative.clear()
+    _negative_filter.clear()
+    _redis_retry_at = _redis_backoff = 0.0
+    _connect_lock = None
+
+
+def _apply_invalidation(message: Invalidation) -> None:
+    global _release
+    if message.kind == "all":
+        _local.clear()
+        _negative.clear()
+        _negative_filter.clear()
+        _release = None  # Re-check the PLUTO release too
+        return
+    if message.kind == "namespace":
+        prefix = _make_key(message.value, "")
+        matches = lambda key: key.startswith(prefix)  # noqa: E731
+    else:
+        matches = message.pattern().search
+    _local.drop(matches)
+    _negative.drop(matches)
+
+
+register_handler(_apply_invalidation)
 
 
 async def get_redis() -> Optional[redis.Redis]:
-    """Get or create Redis client. Returns None if Redis is not configured."""
-    global _redis_client
+    """Get or create Redis client.
+
+    Returns None if Redis is not configured, or is unavailable and the
+    reconnect backoff has not elapsed.
+    """
     if _redis_client is not None:
         return _redis_client
-
-    redis_url = settings.redis_url
-    if not redis_url:
+    if not settings.redis_url or time.monotonic() < _redis_retry_at:
         return None
+    # One reconnect at a time; everyone then shares the one client
+    global _connect_lock
+    if _connect_lock is None:
+        _connect_lock = asyncio.Lock()
+    async with _connect_lock:
+        if _redis_client is None and time.monotonic() >= _redis_retry_at:
+            await _connect_redis()
+    return _redis_client
+
+
+async def _connect_redis() -> None:
+    global _redis_client, _redis_backoff
+    client = redis.from_url(
+        settings.redis_url,
+        encoding="utf-8",
+        decode_responses=False,
+        socket_connect_timeout=3,
+        socket_timeout=3,
+    )
+    try:
+        await client.ping()
+    except Exception as e:
+        _redis_failed(e)
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+        return
+    _redis_client = client
+    _redis_backoff = 0.0
+
+
+def _redis_failed(error: Exception) -> None:
+    """Drop the client and wait (exponential backoff) before reconnecting."""
+    global _redis_client, _redis_retry_at, _redis_backoff
+    _redis_backoff = min(settings.redis_retry_max_seconds,
+                         max(settings.redis_retry_min_seconds, _redis_backoff * 2))
+    _redis_retry_at = time.monotonic() + _redis_backoff
+    if _redis_client is not None:
+        logger.warning("Redis unavailable (%s); in-process cache only for %.0fs",
+                       error, _redis_backoff)
+    _redis_client = None
+
 
+class RedisUnavailable(Exception):
+    """Redis is not configured, or is down and waiting out the reconnect backoff."""
+
+
+async def redis_command(command: str, *args, **kwargs) -> Any:
+    """Run a Redis command for state shared between workers (e.g. rate limits).
+
+    Uses the cache's client and reconnect backoff; raises
+    ``RedisUnavailable`` when Redis can't be reached, so callers can fall
+    back to per-process state.
+    """
+    result = await _redis(command, *args, **kwargs)
+    if result is _UNAVAILABLE:
+        raise RedisUnavailable(command)
+    return result
+
+
+async def _redis(command: str, *args, **kwargs) -> Any:
+    """Run a Redis command; ``_UNAVAILABLE`` if Redis is down or unreachable."""
+    r = await get_redis()
+    if r is None:
+        return _UNAVAILABLE
     try:
-        _redis_client = redis.from_url(
-            redis_url,
-            encoding="utf-8",
-            decode_responses=True,
-            socket_connect_timeout=3,
-            socket_timeout=3,
-        )
-        await _redis_client.ping()
-        return _redis_client
-    except Exception:
-        _redis_client = None
-        return None
+        return await getattr(r, command)(*args, **kwargs)
+    except _REDIS_DOWN as e:
+        _redis_failed(e)
+        return _UNAVAILABLE
+
+
+async def _redis_pipeline(commands: list[tuple]) -> Any:
+    """Run ``(command, *args)`` tuples in one round trip; results or ``_UNAVAILABLE``."""
+    r = await get_redis()
+    if r is None:
+        return _UNAVAILABLE
+    try:
+        async with r.pipeline(transaction=False) as pipe:
+            for command, *args in commands:
+                getattr(pipe, command)(*args)
+            return await pipe.execute()
+    except _REDIS_DOWN as e:
+        _redis_failed(e)
+        return _UNAVAILABLE
+
+
+def _redis_samples():
+    yield {}, 1 if _redis_client is not None else 0
+
+
+def _local_samples():
+    yield {}, _local.used_bytes
+
+
+register_collector("redis_up", "1 while connected to Redis", "gauge", _redis_samples)
+register_collector("local_cache_bytes", "Size of the in-process cache tier", "gauge",
+                   _local_samples)
 
 
 def _make_key(prefix: str, identifier: str) -> str:
@@ -62,29 +337,77 @@ def _normalize_address(address: str) -> str:
     return hashlib.md5(address.lower().strip().encode()).hexdigest()
 
 
-async def cache_get(prefix: str, identifier: str) -> Optional[dict]:
-    """Get a cached value. Returns None on miss or Redis unavailable."""
-    r = await get_redis()
-    if not r:
-        return None
+async def _tier_get(key: str) -> Optional[bytes]:
+    """Encoded value from the in-process tier, else Redis (kept locally)."""
+    return (await _tier_get_many([key]))[0]
+
+
+async def _tier_get_many(keys: list[str]) -> list[Optional[bytes]]:
+    values = [_local.get(key) for key in keys]
+    missing = [i for i, raw in enumerate(values) if raw is None]
+    if not missing:
+        return values
+    if len(missing) == 1:
+        raw = await _redis("get", keys[missing[0]])
+        fetched = _UNAVAILABLE if raw is _UNAVAILABLE else [raw]
+    else:
+        fetched = await _redis("mget", [keys[i] for i in missing])
+    if fetched is _UNAVAILABLE:
+        return values
+    for i, raw in zip(missing, fetched):
+        if raw is not None:
+            values[i] = raw
+            _local.set(keys[i], raw, settings.local_cache_ttl_seconds)
+    return values
+
+
+async def _tier_set_many(items: dict[str, bytes], ttl: int) -> None:
+    if len(items) == 1:
+        (key, raw), = items.items()
+        stored = await _redis("setex", key, ttl, raw)
+    else:
+        stored = await _redis_pipeline([("setex", key, ttl, raw) for key, raw in items.items()])
+    # Without Redis the local copy is the only one: keep it for the full TTL
+    local_ttl = ttl if stored is _UNAVAILABLE else min(ttl, settings.local_cache_ttl_seconds)
+    for key, raw in items.items():
+        _local.set(key, raw, local_ttl)
+
+
+async def cache_get(prefix: str, identifier: str) -> Any:
+    """Get a cached value. Returns None on miss."""
+    return (await cache_get_many(prefix, [identifier])).get(identifier)
+
+
+async def cache_get_many(prefix: str, identifiers: list[str]) -> dict[str, Any]:
+    """Get many cached values in one Redis round trip; misses are left out."""
+    found: dict[str, Any] = {}
     try:
-        key = _make_key(prefix, identifier)
-        val = await r.get(key)
-        if val:
-            return json.loads(val)
+        raws = await _tier_get_many([_make_key(prefix, i) for i in identifiers])
     except Exception:
-        pass
-    return None
+        CACHE_REQUESTS.inc(prefix, "error", amount=len(identifiers))
+        return found
+    for identifier, raw in zip(identifiers, raws):
+        try:
+            data = cache_codec.decode(raw) if raw else None
+        except Exception:
+            CACHE_REQUESTS.inc(prefix, "error")
+            continue
+        CACHE_REQUESTS.inc(prefix, "hit" if data is not None else "miss")
+        if data is not None:
+            found[identifier] = data
+    return found
+
+
+async def cache_set(prefix: str, identifier: str, data: Any, ttl: int = TTL_ANALYSIS) -> bool:
+    """Set a cached value. Returns True on success."""
+    return await cache_set_many(prefix, {identifier: data}, ttl)
 
 
-async def cache_set(prefix: str, identifier: str, data: dict, ttl: int = TTL_ANALYSIS) -> bool:
-    """Set a cached value. Returns True on success."""
-    r = await get_redis()
-    if not r:
-        return False
+async def cache_set_many(prefix: str, items: dict[str, Any], ttl: int = TTL_ANALYSIS) -> bool:
+    """Set many cached values in one pipelined round trip. Returns True on success."""
     try:
-        key = _make_key(prefix, identifier)
-        await r.setex(key, ttl, json.dumps(data, default=str))
+        await _tier_set_many(
+            {_make_key(prefix, i): cache_codec.encode(data) for i, data in items.items()}, ttl)
         return True
     except Exception:
         return False
@@ -92,17 +415,476 @@ async def cache_set(prefix: str, identifier: str, data: dict, ttl: int = TTL_ANA
 
 async def cache_delete(prefix: str, identifier: str) -> bool:
     """Delete a cached value."""
-    r = await get_redis()
-    if not r:
-        return False
+    key = _make_key(prefix, identifier)
+    _local.delete(key)
     try:
-        key = _make_key(prefix, identifier)
-        await r.delete(key)
-        return True
+        return await _redis("delete", key) is not _UNAVAILABLE
     except Exception:
         return False
 
 
+# ──────────────────────────────────────────────────────────────────
+# STALE-WHILE-REVALIDATE
+# ──────────────────────────────────────────────────────────────────
+
+_bypass: ContextVar[bool] = ContextVar("cache_bypass", default=False)
+# Keys stored during the current bypass; those reads are fresh, so allowed
+_bypass_stored: ContextVar[Optional[set[str]]] = ContextVar("cache_bypass_stored", default=None)
+_refresh_tasks: dict[str, asyncio.Task] = {}  # key -> refresh in this process
+_release: Optional[tuple[str, float]] = None  # (release, monotonic time checked)
+
+_RELEASE_KEY = "nyc_zoning:pluto_release"
+_RELEASE_RETRY_SECONDS = 60
+
+
+@contextmanager
+def cache_bypass(enabled: bool = True) -> Iterator[None]:
+    """Skip cached reads in the enclosed work; fresh results are still stored.
+
+    Entries stored by the enclosed work itself can be read back, so a
+    batched prefetch followed by per-lot lookups goes upstream once.
+    """
+    token = _bypass.set(enabled)
+    stored = _bypass_stored.set(set() if enabled else None)
+    try:
+        yield
+    finally:
+        _bypass_stored.reset(stored)
+        _bypass.reset(token)
+
+
+def _readable(key: str) -> bool:
+    """Whether a cached entry for *key* may be served (see ``cache_bypass``)."""
+    if not _bypass.get():
+        return True
+    stored = _bypass_stored.get()
+    return stored is not None and key in stored
+
+
+async def pluto_release() -> str:
+    """Current PLUTO release (e.g. ``"25v1"``), checked periodically.
+
+    ``settings.pluto_release`` pins it.  Otherwise it is read from the PLUTO
+    dataset; if that fails the last known release is kept (in process,
+    then in Redis), so an outage doesn't orphan the cache.
+    """
+    global _release
+    if settings.pluto_release:
+        return settings.pluto_release
+    now = time.monotonic()
+    if _release and now - _release[1] < settings.pluto_release_check_seconds:
+        return _release[0]
+
+    release = await _fetch_pluto_release()
+    if release:
+        checked = now
+        try:
+            await _redis("set", _RELEASE_KEY, release)
+        except Exception:
+            pass
+    else:
+        release = _release[0] if _release else None
+        if not release:
+            try:
+                stored = await _redis("get", _RELEASE_KEY)
+                release = stored.decode() if isinstance(stored, bytes) else None
+            except Exception:
+                release = None
+        release = release or "unknown"
+        # Retry soon rather than after a full check interval
+        checked = now - settings.pluto_release_check_seconds + _RELEASE_RETRY_SECONDS
+    _release = (release, checked)
+    return release
+
+
+@coalesce("pluto_release")
+async def _fetch_pluto_release() -> Optional[str]:
+    from app.services.pluto import PLUTO_SOCRATA_URL
+
+    headers = {"X-App-Token": settings.socrata_app_token} if settings.socrata_app_token else {}
+    try:
+        async with upstream_client(timeout=10) as client:
+            resp = await client.get(PLUTO_SOCRATA_URL, headers=headers,
+                                    params={"$select": "version", "$limit": 1})
+            if resp.status_code != 200:
+                return None
+            rows = resp.json()
+        if not rows or not rows[0].get("version"):
+            return None
+        return str(rows[0]["version"]).strip()
+    except Exception as e:
+        logger.warning("PLUTO release lookup failed: %s", e)
+        return None
+
+
+async def cache_swr(
+    prefix: str,
+    identifier: str,
+    fetch: Callable[[], Any],
+    soft_ttl: int,
+    hard_ttl: int = TTL_LOT_DATA_HARD,
+    encode: Callable[[Any], Any] = lambda value: value,
+    decode: Callable[[Any], Any] = lambda data: data,
+    cacheable: Callable[[Any], bool] = bool,
+    versioned: bool = True,
+    negative_ttl: int = 0,
+    not_found: type[NotFound] = NotFound,
+) -> Any:
+    """Return the cached value for *identifier*, calling ``fetch()`` on a miss.
+
+    Entries older than *soft_ttl* are returned as-is and refreshed in the
+    background; they expire at *hard_ttl*.  Values for which
+    ``cacheable(value)`` is false (failed lookups) are not stored.
+
+    With *negative_ttl*, a ``NotFound`` raised by ``fetch()`` is stored for
+    that long and raised again (as *not_found*) by later calls.
+    """
+    if versioned:
+        identifier = f"{await pluto_release()}:{identifier}"
+    key = _make_key(prefix, identifier)
+
+    if _readable(key):
+        cached = _negative_hit(prefix, key, not_found) if negative_ttl else _MISS
+        if cached is _MISS:
+            try:
+                raw = await _tier_get(key)
+                entry = cache_codec.decode(raw) if raw else None
+            except Exception:
+                CACHE_REQUESTS.inc(prefix, "error")
+            else:
+                cached = _cached_result(
+                    prefix, key, raw, entry, soft_ttl, negative_ttl, decode, not_found,
+                    lambda: _schedule_refresh(key, fetch, hard_ttl, encode, cacheable))
+        if isinstance(cached, NotFound):
+            raise cached
+        if cached is not _MISS:
+            return cached
+
+    try:
+        value = await fetch()
+    except NotFound as e:
+        if negative_ttl:
+            await _store_negative(key, str(e), negative_ttl)
+        raise
+    await _store_entry(key, value, hard_ttl, encode, cacheable)
+    return value
+
+
+async def cache_swr_many(
+    prefix: str,
+    calls: dict[str, Any],
+    fetch_many: Callable[[list], Any],
+    refresh: Callable[[Any], Any],
+    soft_ttl: int,
+    hard_ttl: int = TTL_LOT_DATA_HARD,
+    encode: Callable[[Any], Any] = lambda value: value,
+    decode: Callable[[Any], Any] = lambda data: data,
+    cacheable: Callable[[Any], bool] = bool,
+    versioned: bool = True,
+    negative_ttl: int = 0,
+    not_found: type[NotFound] = NotFound,
+) -> dict[Any, Any]:
+    """``cache_swr`` for many lookups at once.
+
+    *calls* maps identifiers to the argument each lookup is for.  Cached
+    entries are read in one Redis round trip and the misses fetched with
+    one ``fetch_many(arguments)`` call, which returns a dict of argument ->
+    value, or a ``NotFound`` instance for a known-missing one (arguments it
+    leaves out are not cached).  Stale entries are refreshed in the
+    background with ``refresh(argument)``.
+
+    Returns argument -> value; negative results are *not_found* instances.
+    """
+    release = f"{await pluto_release()}:" if versioned else ""
+    keys = {identifier: _make_key(prefix, release + identifier) for identifier in calls}
+    found: dict[str, Any] = {}
+    pending = [i for i in calls if not _readable(keys[i])]
+    readable = [i for i in calls if _readable(keys[i])]
+
+    if readable:
+        if negative_ttl:
+            for identifier in readable:
+                found[identifier] = _negative_hit(prefix, keys[identifier], not_found)
+            readable = [i for i in readable if found[i] is _MISS]
+        try:
+            raws = await _tier_get_many([keys[i] for i in readable])
+            entries = [cache_codec.decode(raw) if raw else None for raw in raws]
+        except Exception:
+            CACHE_REQUESTS.inc(prefix, "error", amount=len(readable))
+            pending += readable
+        else:
+            for identifier, raw, entry in zip(readable, raws, entries):
+                key, argument = keys[identifier], calls[identifier]
+                found[identifier] = _cached_result(
+                    prefix, key, raw, entry, soft_ttl, negative_ttl, decode, not_found,
+                    lambda key=key, argument=argument: _schedule_refresh(
+                        key, lambda: refresh(argument), hard_ttl, encode, cacheable))
+            pending += [i for i in readable if found[i] is _MISS]
+
+    if pending:
+        fetched = await fetch_many([calls[i] for i in pending])
+        fetched = {i: fetched[calls[i]] for i in pending if calls[i] in fetched}
+        await _store_many({keys[i]: value for i, value in fetched.items()},
+                          hard_ttl, encode, cacheable, negative_ttl)
+        for identifier, value in fetched.items():
+            if isinstance(value, NotFound) and not isinstance(value, not_found):
+                value = not_found(str(value))
+            found[identifier] = value
+    return {calls[i]: value for i, value in found.items() if value is not _MISS}
+
+
+async def cache_swr_store(
+    prefix: str,
+    identifier: str,
+    value: Any,
+    hard_ttl: int = TTL_LOT_DATA_HARD,
+    encode: Callable[[Any], Any] = lambda value: value,
+    cacheable: Callable[[Any], bool] = bool,
+    versioned: bool = True,
+    negative_ttl: int = 0,
+) -> None:
+    """Store *value* as if ``cache_swr`` had fetched it.
+
+    For results obtained some other way (e.g. alongside another lookup).
+    A ``NotFound`` is stored as a negative result when *negative_ttl* is set.
+    """
+    await cache_swr_store_many(prefix, {identifier: value}, hard_ttl, encode, cacheable,
+                               versioned, negative_ttl)
+
+
+async def cache_swr_store_many(
+    prefix: str,
+    items: dict[str, Any],
+    hard_ttl: int = TTL_LOT_DATA_HARD,
+    encode: Callable[[Any], Any] = lambda value: value,
+    cacheable: Callable[[Any], bool] = bool,
+    versioned: bool = True,
+    negative_ttl: int = 0,
+) -> None:
+    """``cache_swr_store`` for many identifiers, in one Redis round trip."""
+    release = f"{await pluto_release()}:" if versioned else ""
+    await _store_many({_make_key(prefix, release + i): value for i, value in items.items()},
+                      hard_ttl, encode, cacheable, negative_ttl)
+
+
+_MISS = object()
+
+
+def _negative_hit(prefix: str, key: str, not_found: type[NotFound]) -> Any:
+    """A *not_found* for a negative result held in this process, else ``_MISS``."""
+    if key in _negative_filter:
+        raw = _negative.get(key)
+        if raw is not None:
+            CACHE_REQUESTS.inc(prefix, "negative")
+            return not_found(cache_codec.decode(raw)["x"])
+    return _MISS
+
+
+def _cached_result(prefix, key, raw, entry, soft_ttl, negative_ttl, decode, not_found,
+                   refresh) -> Any:
+    """The value held in *entry*, a *not_found* for a negative one, or ``_MISS``.
+
+    Calls ``refresh()`` when the value is past *soft_ttl*.
+    """
+    if entry is None:
+        CACHE_REQUESTS.inc(prefix, "miss")
+        return _MISS
+    if "x" in entry:
+        # Negative result stored by another worker
+        _local.delete(key)
+        _remember_negative(key, raw, negative_ttl - (time.time() - entry["t"]))
+        CACHE_REQUESTS.inc(prefix, "negative")
+        return not_found(entry["x"])
+    if time.time() - entry["t"] >= soft_ttl:
+        CACHE_REQUESTS.inc(prefix, "stale")
+        refresh()
+    else:
+        CACHE_REQUESTS.inc(prefix, "hit")
+    return decode(entry["d"])
+
+
+def _remember_negative(key: str, raw: bytes, ttl: float) -> None:
+    _negative.set(key, raw, min(ttl, settings.local_cache_ttl_seconds))
+    _negative_filter.add(key)
+
+
+async def _store_negative(key: str, message: str, ttl: int) -> None:
+    await _store_many({key: NotFound(message)}, negative_ttl=ttl)
+
+
+async def _store_entry(key, value, hard_ttl, encode, cacheable) -> None:
+    await _store_many({key: value}, hard_ttl, encode, cacheable)
+
+
+async def _store_many(
+    items: dict[str, Any],
+    hard_ttl: int = TTL_LOT_DATA_HARD,
+    encode: Callable[[Any], Any] = lambda value: value,
+    cacheable: Callable[[Any], bool] = bool,
+    negative_ttl: int = 0,
+) -> None:
+    """Write fetched values, and ``NotFound`` results when *negative_ttl* is
+    set, in one Redis round trip."""
+    now = time.time()
+    try:
+        entries = {key: cache_codec.encode({"t": now, "d": encode(value)})
+                   for key, value in items.items()
+                   if not isinstance(value, NotFound) and cacheable(value)}
+        negatives = {key: cache_codec.encode({"t": now, "x": str(value)})
+                     for key, value in items.items()
+                     if isinstance(value, NotFound) and negative_ttl}
+    except Exception as e:
+        logger.warning("Cache write failed for %s: %s", ", ".join(items), e)
+        return
+    for key, raw in negatives.items():
+        _remember_negative(key, raw, negative_ttl)
+    for key in entries:
+        _negative.delete(key)
+    fresh = _bypass_stored.get()
+    if fresh is not None:
+        fresh.update(entries, negatives)
+    commands = ([("setex", key, hard_ttl, raw) for key, raw in entries.items()]
+                + [("setex", key, negative_ttl, raw) for key, raw in negatives.items()])
+    try:
+        if len(commands) > 1:
+            stored = await _redis_pipeline(commands)
+        elif commands:
+            stored = await _redis(*commands[0])
+        else:
+            return
+    except Exception as e:
+        logger.warning("Cache write failed for %s: %s", ", ".join(items), e)
+        stored = _UNAVAILABLE
+    # Without Redis the local copy is the only one: keep it for the full TTL
+    local_ttl = hard_ttl if stored is _UNAVAILABLE else min(hard_ttl, settings.local_cache_ttl_seconds)
+    for key, raw in entries.items():
+        _local.set(key, raw, local_ttl)
+
+
+def _schedule_refresh(key, fetch, hard_ttl, encode, cacheable) -> None:
+    if key in _refresh_tasks:
+        return
+    task = asyncio.get_running_loop().create_task(
+        _refresh(key, fetch, hard_ttl, encode, cacheable))
+    _refresh_tasks[key] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(key, None))
+
+
+async def _refresh(key, fetch, hard_ttl, encode, cacheable) -> None:
+    try:
+        locked = await _redis("set", f"{key}:refresh", "1", nx=True, ex=REFRESH_LOCK_SECONDS)
+        if locked is None:
+            # Another worker is refreshing it; re-read from Redis next time
+            _local.delete(key)
+            return
+        await _store_entry(key, await fetch(), hard_ttl, encode, cacheable)
+    except Exception as e:
+        logger.warning("Background refresh of %s failed: %s", key, e)
+
+
+_RAISE = object()
+_STORE_OPTIONS = ("hard_ttl", "encode", "cacheable", "versioned", "negative_ttl")
+
+
+async def cache_prefetch(prefix: str, identifiers: list[str], versioned: bool = True) -> int:
+    """Load ``cache_swr`` entries into the in-process tier with one MGET.
+
+    Later ``cache_swr`` calls for these identifiers are served locally.
+    Returns the number of entries found.
+    """
+    if _bypass.get() or not identifiers:
+        return 0
+    if versioned:
+        release = await pluto_release()
+        identifiers = [f"{release}:{i}" for i in identifiers]
+    try:
+        raws = await _tier_get_many([_make_key(prefix, i) for i in dict.fromkeys(identifiers)])
+    except Exception as e:
+        logger.warning("Cache prefetch for %s failed: %s", prefix, e)
+        return 0
+    return sum(raw is not None for raw in raws)
+
+
+def swr_cached(
+    prefix: str,
+    soft_ttl: int,
+    key: Optional[Callable[..., str]] = None,
+    model: Optional[type] = None,
+    missing: Any = _RAISE,
+    **options,
+):
+    """Decorator: serve an async fetcher through ``cache_swr``.
+
+    Args:
+        prefix: Cache key prefix (also the metrics label)
+        soft_ttl: Age (seconds) after which the entry is refreshed
+        key: Called with the fetcher's arguments; defaults to ``default_key``
+        model: Pydantic model the fetcher returns (entries stored as a plain
+            dict are validated into it)
+        missing: Returned instead of raising ``NotFound``
+        **options: Passed to ``cache_swr`` (hard_ttl, encode, decode,
+            cacheable, versioned, negative_ttl, not_found)
+
+    The wrapper's ``prefetch(values)`` loads the entries for calls with
+    each of *values* as the only argument into the in-process tier with
+    one Redis round trip, e.g. ``await fetch_pluto_data.prefetch(bbls)``,
+    and ``prime(value, *args)`` stores a result obtained elsewhere for
+    those arguments (``cache_swr_store``).
+
+    ``many(values, fetch_many, *args)`` looks up the calls with each of
+    *values* as the first argument together (``cache_swr_many``) and
+    returns value -> result, leaving out lookups ``fetch_many`` could not
+    answer; ``prime_many(results, *args)`` stores value -> result pairs.
+    """
+    key_fn = key or default_key
+    if model is not None:
+        options.setdefault(
+            "decode", lambda data: data if isinstance(data, model) else model.model_validate(data))
+
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await cache_swr(prefix, key_fn(*args, **kwargs),
+                                       lambda: fn(*args, **kwargs), soft_ttl, **options)
+            except NotFound:
+                if missing is _RAISE:
+                    raise
+                return missing
+
+        def prefetch(values):
+            return cache_prefetch(prefix, [key_fn(value) for value in values],
+                                  versioned=options.get("versioned", True))
+
+        def prime(value, *args, **kwargs):
+            store_options = {name: options[name] for name in _STORE_OPTIONS if name in options}
+            return cache_swr_store(prefix, key_fn(*args, **kwargs), value, **store_options)
+
+        async def many(values, fetch_many, *args, **kwargs):
+            calls = {key_fn(value, *args, **kwargs): value for value in values}
+            results = await cache_swr_many(prefix, calls, fetch_many,
+                                           lambda value: fn(value, *args, **kwargs),
+                                           soft_ttl, **options)
+            if missing is _RAISE:
+                return results
+            return {value: missing if isinstance(result, NotFound) else result
+                    for value, result in results.items()}
+
+        def prime_many(results, *args, **kwargs):
+            store_options = {name: options[name] for name in _STORE_OPTIONS if name in options}
+            return cache_swr_store_many(
+                prefix, {key_fn(value, *args, **kwargs): result for value, result in results.items()},
+                **store_options)
+
+        wrapper.prefetch = prefetch
+        wrapper.prime = prime
+        wrapper.many = many
+        wrapper.prime_many = prime_many
+        return wrapper
+
+    return decorator
+
+
 # ──────────────────────────────────────────────────────────────────
 # CONVENIENCE FUNCTIONS
 # ──────────────────────────────────────────────────────────────────
@@ -0,0 +1,122 @@
+"""
+Binary codec for cached values.
+
+Cached values are serialized with orjson (or msgpack when installed and
+selected with ``cache_codec``) and compressed above
+``cache_compress_min_bytes`` — zstd when ``zstandard`` is installed,
+zlib otherwise.  Two header bytes name the serializer and compression,
+so entries written under one setting stay readable after switching, and
+plain JSON written before this codec still decodes.
+
+Pydantic models round-trip as models: they are stored as
+``{"__model__": "app.models.schemas.LotProfile", "data": {...}}`` and
+rebuilt with ``model_validate`` on decode.  Only ``app.`` models are
+rebuilt.
+"""
+
+from __future__ import annotations
+
+import importlib
+import zlib
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+from app.config import settings
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is used instead
+    zstandard = None
+
+MODEL_TAG = "__model__"
+_MODEL_MARKER = MODEL_TAG.encode()
+
+# Header: serializer byte + compression byte
+_ORJSON, _MSGPACK = b"j", b"m"
+_RAW, _ZSTD, _ZLIB = b"-", b"z", b"d"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        cls = type(obj)
+        return {MODEL_TAG: f"{cls.__module__}.{cls.__qualname__}",
+                "data": obj.model_dump(mode="python")}
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+def _dumps(value: Any) -> tuple[bytes, bytes]:
+    if settings.cache_codec == "msgpack" and msgpack is not None:
+        return _MSGPACK, msgpack.packb(value, default=_default, use_bin_type=True)
+    return _ORJSON, orjson.dumps(
+        value, default=_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+def encode(value: Any) -> bytes:
+    """Serialize (and maybe compress) a value for the cache."""
+    kind, payload = _dumps(value)
+    if len(payload) < settings.cache_compress_min_bytes:
+        return kind + _RAW + payload
+    if zstandard is not None:
+        return kind + _ZSTD + zstandard.ZstdCompressor(level=3).compress(payload)
+    return kind + _ZLIB + zlib.compress(payload, 6)
+
+
+def decode(data: bytes | str) -> Any:
+    """Inverse of ``encode``; also reads plain JSON entries."""
+    if isinstance(data, str):
+        data = data.encode()
+    kind, compression, payload = data[:1], data[1:2], data[2:]
+    if kind not in (_ORJSON, _MSGPACK) or compression not in (_RAW, _ZSTD, _ZLIB):
+        return _revive(orjson.loads(data)) if _MODEL_MARKER in data else orjson.loads(data)
+
+    if compression == _ZSTD:
+        if zstandard is None:
+            raise ValueError("Cache entry is zstd-compressed but zstandard is not installed")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif compression == _ZLIB:
+        payload = zlib.decompress(payload)
+
+    if kind == _MSGPACK:
+        if msgpack is None:
+            raise ValueError("Cache entry is msgpack-encoded but msgpack is not installed")
+        value = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    else:
+        value = orjson.loads(payload)
+    return _revive(value) if _MODEL_MARKER in payload else value
+
+
+def _revive(value: Any) -> Any:
+    """Rebuild tagged models inside a decoded value."""
+    if isinstance(value, dict):
+        if MODEL_TAG in value and "data" in value and len(value) == 2:
+            model = _model_class(value[MODEL_TAG])
+            if model is not None:
+                return model.model_validate(value["data"])
+        return {k: _revive(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_revive(v) for v in value]
+    return value
+
+
+@lru_cache(maxsize=None)
+def _model_class(path: str) -> type[BaseModel] | None:
+    module_name, _, name = path.rpartition(".")
+    if not module_name.startswith("app."):
+        return None
+    try:
+        cls = getattr(importlib.import_module(module_name), name)
+    except (ImportError, AttributeError):
+        return None
+    return cls if isinstance(cls, type) and issubclass(cls, BaseModel) else None
@@ -0,0 +1,143 @@
+"""
+Time budgets for report pipeline stages.
+
+A report waits on several independent fetches: satellite, street, zoning
+and context maps, the city overview, the neighborhood map, street view,
+the block description.  ``run_stages`` runs them concurrently, each within
+its budget (``settings.report_stage_budgets``) and the pipeline's overall
+``Deadline``.  A stage that runs out of time is abandoned and yields None;
+the report is built without it (with no map at all, it draws the lot
+diagram with ``draw_lot_diagram_reportlab``).  An abandoned stage is not
+cancelled: it finishes in the background and fills its cache (map
+images, block description, cross streets), so a slow upstream costs one
+report its map rather than every report its budget.  One-shot runs (the
+cache warmer) call ``wait_abandoned`` so ``asyncio.run`` does not cancel
+those stages on exit.
+
+Stages marked ``optional`` (street view, neighborhood map, cross streets)
+are not started at all while the worker is under load — requests queueing
+for admission, or more than ``report_shed_inflight`` pipelines running —
+so report latency stays bounded when it matters most.
+
+Outcomes are counted per stage in ``report_stage_outcomes_total``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config import settings
+from app.services import admission
+from app.services.metrics import Counter, register_collector
+
+logger = logging.getLogger(__name__)
+
+STAGE_OUTCOMES = Counter(
+    "report_stage_outcomes_total",
+    "Report pipeline stages by outcome (ok, error, timeout, shed)",
+    ("stage", "outcome"),
+)
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str                            # Key in settings.report_stage_budgets
+    run: Callable[[], Awaitable[Any]]
+    optional: bool = False               # Shed under load; errors yield None
+
+
+class Deadline:
+    """Point in time by which a whole pipeline should be done."""
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires = clock() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - self._clock())
+
+
+_inflight = 0
+_late: set[asyncio.Task] = set()  # Abandoned stages still finishing
+
+
+def under_load() -> bool:
+    """Whether optional stages are being shed."""
+    return _inflight > settings.report_shed_inflight or admission.queueing()
+
+
+async def run_stages(stages: list[Stage], deadline: Optional[Deadline] = None) -> dict[str, Any]:
+    """Run *stages* concurrently within their budgets; name -> result (None
+    for a stage that timed out, was shed, or failed while optional)."""
+    global _inflight
+    shed = under_load()
+    _inflight += 1
+    try:
+        results = await asyncio.gather(*(_run(stage, deadline, shed) for stage in stages))
+    finally:
+        _inflight -= 1
+    return {stage.name: result for stage, result in zip(stages, results)}
+
+
+async def run_stage(stage: Stage, deadline: Optional[Deadline] = None) -> Any:
+    """A single stage within its budget, as in ``run_stages``."""
+    return await _run(stage, deadline, under_load())
+
+
+async def _run(stage: Stage, deadline: Optional[Deadline], shed: bool) -> Any:
+    if stage.optional and shed:
+        STAGE_OUTCOMES.inc(stage.name, "shed")
+        return None
+    timeout = settings.report_stage_budgets.get(stage.name, math.inf)
+    if deadline is not None:
+        timeout = min(timeout, deadline.remaining())
+    task = asyncio.ensure_future(stage.run())
+    try:
+        result = await asyncio.wait_for(asyncio.shield(task),
+                                        None if timeout == math.inf else timeout)
+    except asyncio.TimeoutError:
+        STAGE_OUTCOMES.inc(stage.name, "timeout")
+        logger.info("Report stage %s abandoned after %.1fs", stage.name, timeout)
+        _finish_late(stage.name, task)
+        return None
+    except asyncio.CancelledError:
+        task.cancel()  # The report itself was cancelled
+        raise
+    except Exception as e:
+        STAGE_OUTCOMES.inc(stage.name, "error")
+        if not stage.optional:
+            raise
+        logger.warning("Optional report stage %s failed: %s", stage.name, e)
+        return None
+    STAGE_OUTCOMES.inc(stage.name, "ok")
+    return result
+
+
+def _finish_late(name: str, task: asyncio.Task) -> None:
+    """Keep an abandoned stage running until it completes (and caches)."""
+    def _done(task: asyncio.Task) -> None:
+        _late.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.info("Abandoned report stage %s failed: %s", name, task.exception())
+
+    _late.add(task)
+    task.add_done_callback(_done)
+
+
+async def wait_abandoned() -> None:
+    """Wait until the stages abandoned so far have finished."""
+    if _late:
+        await asyncio.wait(set(_late))  # Unlike gather, never cancels them
+
+
+def _inflight_samples():
+    yield {}, _inflight
+
+
+register_collector("report_pipelines_inflight", "Report pipelines preparing their inputs",
+                   "gauge", _inflight_samples)
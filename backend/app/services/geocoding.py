@@ -20,6 +20,10 @@ import re
 import httpx
 
 from app.models.schemas import BBLResponse
+from app.services.cache import TTL_GEOCODE, TTL_NEGATIVE, NotFound, swr_cached
+from app.services.singleflight import coalesce, normalize_address
+from app.services.timing import span
+from app.services.upstream import upstream_client
 
 # Borough name/abbreviation → code mapping
 BOROUGH_MAP = {
@@ -181,15 +185,33 @@ def validate_nyc_address(address: str) -> str | None:
 # GEOCODING
 # ──────────────────────────────────────────────────────────────────
 
+class AddressNotFound(NotFound, ValueError):
+    """Every geocoder answered and none found the address (cached briefly)."""
+
+
+def _is_transient(error: Exception) -> bool:
+    """Timeouts, connection failures, open circuits, 429 and 5xx responses."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, httpx.TransportError)
+
+
+@span("geocode")
+@swr_cached("geocode", TTL_GEOCODE, key=normalize_address, model=BBLResponse,
+            negative_ttl=TTL_NEGATIVE, not_found=AddressNotFound)
+@coalesce("geocode", key=normalize_address)
 async def geocode_address(address: str) -> BBLResponse:
     """Geocode a NYC address to get BBL.
 
     Uses NYC Planning Geosearch API (free, no auth) as primary,
     with Geoservice as fallback.
 
-    Raises ValueError with a clear message if geocoding fails.
+    Raises ValueError with a clear message if geocoding fails —
+    ``AddressNotFound`` when no geocoder had a transient failure.
     """
     errors = []
+    transient = False
 
     # Check if input is a BBL
     bbl = parse_bbl(address)
@@ -203,10 +225,17 @@ async def geocode_address(address: str) -> BBLResponse:
             return result
     except httpx.TimeoutException:
         errors.append("Geosearch API timeout (>10s)")
+        transient = True
     except httpx.ConnectError:
         errors.append("Geosearch API connection failed — check internet connectivity")
+        transient = True
+    except httpx.HTTPStatusError as e:
+        # Geosearch answers a miss with 200/404; anything else is no answer
+        errors.append(f"Geosearch API HTTP {e.response.status_code}")
+        transient = True
     except Exception as e:
         errors.append(f"Geosearch API error: {type(e).__name__}: {e}")
+        transient = transient or _is_transient(e)
 
     # Fallback: parse address and use Geoservice
     house_number, street_name, borough_code = parse_address(address)
@@ -220,7 +249,7 @@ async def geocode_address(address: str) -> BBLResponse:
         )
         if errors:
             detail += f" Errors: {'; '.join(errors)}"
-        raise ValueError(detail)
+        raise ValueError(detail) if transient else AddressNotFound(detail)
 
     borough_name = BOROUGH_CODE_TO_NAME[borough_code]
 
@@ -230,8 +259,10 @@ async def geocode_address(address: str) -> BBLResponse:
             return result
     except httpx.TimeoutException:
         errors.append("Geoservice 1B timeout")
+        transient = True
     except Exception as e:
         errors.append(f"Geoservice 1B: {type(e).__name__}")
+        transient = transient or _is_transient(e)
 
     try:
         result = await _geocode_geoservice_1a(house_number, street_name, borough_name)
@@ -239,8 +270,10 @@ async def geocode_address(address: str) -> BBLResponse:
             return result
     except httpx.TimeoutException:
         errors.append("Geoservice 1A timeout")
+        transient = True
     except Exception as e:
         errors.append(f"Geoservice 1A: {type(e).__name__}")
+        transient = transient or _is_transient(e)
 
     detail = (
         f"Could not geocode address: '{address}'. "
@@ -249,7 +282,7 @@ async def geocode_address(address: str) -> BBLResponse:
     )
     if errors:
         detail += f" Service errors: {'; '.join(errors)}"
-    raise ValueError(detail)
+    raise ValueError(detail) if transient else AddressNotFound(detail)
 
 
 async def _geocode_geosearch(address: str) -> BBLResponse | None:
@@ -261,10 +294,13 @@ async def _geocode_geosearch(address: str) -> BBLResponse | None:
     url = "https://geosearch.planninglabs.nyc/v2/search"
     params = {"text": address}
 
-    async with httpx.AsyncClient(timeout=10) as client:
+    async with upstream_client(timeout=10) as client:
         resp = await client.get(url, params=params)
-        if resp.status_code != 200:
+        if resp.status_code == 404:
             return None
+        if resp.status_code != 200:
+            raise httpx.HTTPStatusError(
+                f"Geosearch returned HTTP {resp.status_code}", request=resp.request, response=resp)
         data = resp.json()
 
     features = data.get("features", [])
@@ -316,7 +352,7 @@ async def _geocode_geoservice(
         "Key": "",
     }
 
-    async with httpx.AsyncClient(timeout=10) as client:
+    async with upstream_client(timeout=10) as client:
         resp = await client.get(url, params=params)
         resp.raise_for_status()
         data = resp.json()
@@ -366,7 +402,7 @@ async def _geocode_geoservice_1a(
         "Key": "",
     }
 
-    async with httpx.AsyncClient(timeout=10) as client:
+    async with upstream_client(timeout=10) as client:
         resp = await client.get(url, params=params)
         resp.raise_for_status()
         data = resp.json()
@@ -391,12 +427,14 @@ async def _geocode_geoservice_1a(
 # NEIGHBOURHOOD & CROSS-STREET HELPERS
 # ──────────────────────────────────────────────────────────────────
 
+@span("geocode.neighborhood")
+@coalesce("geocode.neighborhood", key=normalize_address)
 async def fetch_neighborhood(address: str) -> str | None:
     """Look up neighborhood name via Geosearch API."""
     try:
         url = "https://geosearch.planninglabs.nyc/v2/search"
         params = {"text": address}
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with upstream_client(timeout=10) as client:
             resp = await client.get(url, params=params)
             if resp.status_code != 200:
                 return None
@@ -410,6 +448,8 @@ async def fetch_neighborhood(address: str) -> str | None:
         return None
 
 
+@span("geocode.cross_streets")
+@coalesce("geocode.cross_streets")
 async def fetch_cross_streets(lat: float, lng: float) -> str | None:
     """Fetch cross streets using OpenStreetMap Overpass API.
 
@@ -424,7 +464,7 @@ async def fetch_cross_streets(lat: float, lng: float) -> str | None:
             nom_url = "https://nominatim.openstreetmap.org/reverse"
             nom_params = {"lat": lat, "lon": lng, "format": "json", "zoom": 18}
             headers = {"User-Agent": "MassingReport/1.0 (zoning analysis)"}
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with upstream_client(timeout=10) as client:
                 resp = await client.get(nom_url, params=nom_params, headers=headers)
                 if resp.status_code == 200:
                     own_street = resp.json().get("address", {}).get("road")
@@ -435,7 +475,7 @@ async def fetch_cross_streets(lat: float, lng: float) -> str | None:
         overpass_url = "https://overpass-api.de/api/interpreter"
         query = f'[out:json];way["highway"]["name"](around:100,{lat},{lng});out tags;'
         headers = {"User-Agent": "MassingReport/1.0 (zoning analysis)"}
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with upstream_client(timeout=15) as client:
             resp = await client.post(
                 overpass_url,
                 data={"data": query},
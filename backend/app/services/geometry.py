@@ -7,12 +7,20 @@ from statistics import median, mode
 
 import httpx
 
+from app.services.cache import TTL_NEGATIVE, TTL_PLUTO, NotFound, swr_cached
+from app.services.singleflight import coalesce
+from app.services.timing import span
+from app.services.upstream import upstream_client
+
 logger = logging.getLogger(__name__)
 
 
-# MapPLUTO table versions to try (newest first)
+# The current MapPLUTO release; the only table PLUTO attributes are read from
+CURRENT_MAPPLUTO_TABLE = "dcp_mappluto"
+
+# MapPLUTO table versions to try for lot polygons (newest first)
 _TABLE_NAMES = [
-    "dcp_mappluto",
+    CURRENT_MAPPLUTO_TABLE,
     "mappluto_25v1",
     "mappluto_24v4",
     "mappluto_24v3",
@@ -23,21 +31,47 @@ _TABLE_NAMES = [
 
 _CARTO_URL = "https://planninglabs.carto.com/api/v2/sql"
 
+# Lots per upstream query in batched lookups (keeps the SQL / SoQL URL short)
+BATCH_SIZE = 100
 
+
+@span("geometry.lot")
+@swr_cached("geometry", TTL_PLUTO, negative_ttl=TTL_NEGATIVE, missing=None)
+@coalesce("geometry.lot")
 async def fetch_lot_geometry(bbl: str) -> dict | None:
     """Fetch lot polygon geometry from Carto (MapPLUTO) as GeoJSON.
 
     Tries multiple MapPLUTO version table names since they change with releases.
+    None if no table has the lot — remembered for ``TTL_NEGATIVE`` when at
+    least one table answered and none had a transient failure (timeout,
+    connection error, 429 or 5xx).
     """
+    not_found = None
+    transient = False
     for table in _TABLE_NAMES:
-        result = await _query_carto(bbl, table)
+        try:
+            result = await _query_carto(bbl, table)
+        except NotFound as e:
+            not_found = e
+            continue
+        except httpx.HTTPError as e:
+            logger.debug("MapPLUTO query on %s failed: %s", table, e)
+            transient = True
+            continue
         if result:
             return result
+    if not_found and not transient:
+        raise not_found
     return None
 
 
 async def _query_carto(bbl: str, table_name: str) -> dict | None:
-    """Query Carto SQL API for lot geometry."""
+    """Query Carto SQL API for lot geometry.
+
+    None if the query fails (e.g. the table doesn't exist); raises
+    ``NotFound`` if the table has no geometry for the lot, and
+    ``httpx.HTTPError`` on a transient failure.
+    """
     query = (
         f"SELECT ST_AsGeoJSON(the_geom) as geom, bbl, lotarea, lotfront, lotdepth "
         f"FROM {table_name} WHERE bbl = '{bbl}'"
@@ -45,25 +79,131 @@ async def _query_carto(bbl: str, table_name: str) -> dict | None:
     params = {"q": query}
 
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with upstream_client(timeout=15) as client:
             resp = await client.get(_CARTO_URL, params=params)
+            _raise_transient(resp)
             if resp.status_code != 200:
                 return None
             data = resp.json()
 
         rows = data.get("rows", [])
-        if not rows:
-            return None
+        geom_str = rows[0].get("geom") if rows else None
+        geometry = json.loads(geom_str) if geom_str else None
+    except httpx.HTTPError:
+        raise
+    except Exception:
+        return None
+    if not geometry:
+        raise NotFound(f"No lot geometry for BBL {bbl}")
+    return geometry
 
-        geom_str = rows[0].get("geom")
-        if not geom_str:
-            return None
 
-        return json.loads(geom_str)
-    except Exception:
+@span("geometry.lot_many")
+async def fetch_lot_geometry_many(bbls: list[str]) -> dict[str, dict | None]:
+    """``fetch_lot_geometry`` for many lots, ``BATCH_SIZE`` per Carto query.
+
+    Cached lots cost nothing upstream.  Returns BBL -> GeoJSON (None if
+    MapPLUTO has no polygon); lots whose lookup failed are left out.
+    """
+    return await fetch_lot_geometry.many(bbls, _fetch_geometry_batch)
+
+
+async def _fetch_geometry_batch(bbls: list[str]) -> dict[str, dict | NotFound]:
+    rows, absent = await query_mappluto_many(
+        [bbl for bbl in bbls if bbl.isdigit()], "ST_AsGeoJSON(the_geom) AS geom, bbl")
+    results: dict[str, dict | NotFound] = {
+        bbl: NotFound(f"No lot geometry for BBL {bbl}") for bbl in absent}
+    for bbl, row in rows.items():
+        results[bbl] = parse_geom(row) or NotFound(f"No lot geometry for BBL {bbl}")
+    return results
+
+
+async def query_mappluto_many(
+    bbls: list[str],
+    columns: str,
+    tables: list[str] | None = None,
+) -> tuple[dict[str, dict], set[str]]:
+    """Rows for *bbls* from the newest MapPLUTO table that has each lot.
+
+    One ``WHERE bbl IN (...)`` query per ``BATCH_SIZE`` lots per table
+    tried (*tables*, default every release newest first).  Returns
+    (BBL -> row, BBLs no table that answered has); lots no table could be
+    queried for, or whose batch had a transient failure on any table, are
+    in neither.
+    """
+    rows: dict[str, dict] = {}
+    absent: set[str] = set()
+    for start in range(0, len(bbls), BATCH_SIZE):
+        remaining = bbls[start:start + BATCH_SIZE]
+        answered = transient = False
+        for table in tables or _TABLE_NAMES:
+            try:
+                found = await _query_carto_rows(remaining, columns, table)
+            except httpx.HTTPError as e:
+                logger.debug("MapPLUTO query on %s failed: %s", table, e)
+                transient = True
+                continue
+            if found is None:
+                continue
+            answered = True
+            rows.update(found)
+            remaining = [bbl for bbl in remaining if bbl not in found]
+            if not remaining:
+                break
+        if answered and not transient:
+            absent.update(remaining)
+    return rows, absent
+
+
+async def _query_carto_rows(bbls: list[str], columns: str, table_name: str) -> dict[str, dict] | None:
+    """BBL -> row for the lots *table_name* has; None if the query fails,
+    ``httpx.HTTPError`` on a transient failure."""
+    in_list = ", ".join(f"'{bbl}'" for bbl in bbls)
+    query = f"SELECT {columns} FROM {table_name} WHERE bbl IN ({in_list})"
+    try:
+        async with upstream_client(timeout=15) as client:
+            resp = await client.get(_CARTO_URL, params={"q": query})
+            _raise_transient(resp)
+            if resp.status_code != 200:
+                return None
+            data = resp.json()
+    except httpx.HTTPError:
+        raise
+    except Exception as e:
+        logger.debug("MapPLUTO query on %s failed: %s", table_name, e)
+        return None
+    wanted = set(bbls)
+    found = {}
+    for row in data.get("rows", []):
+        bbl = normalize_bbl(row.get("bbl"))
+        if bbl in wanted:
+            found.setdefault(bbl, row)
+    return found
+
+
+def _raise_transient(resp: httpx.Response) -> None:
+    """Raise for 429 and 5xx; other errors mean the table can't be queried."""
+    if resp.status_code == 429 or resp.status_code >= 500:
+        resp.raise_for_status()
+
+
+def normalize_bbl(value) -> str:
+    """``3012340001.0`` (Carto, Socrata numeric columns) -> ``"3012340001"``."""
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return ""
+
+
+def parse_geom(row: dict) -> dict | None:
+    """The GeoJSON in a row's ``geom`` column (``ST_AsGeoJSON``)."""
+    try:
+        return json.loads(row["geom"]) if row.get("geom") else None
+    except ValueError:
         return None
 
 
+@span("geometry.adjacent_lots")
 async def fetch_adjacent_lots(
     bbl: str,
     min_boundary_ft: float = 10.0,
@@ -129,7 +269,7 @@ async def _query_adjacent(
     """
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with upstream_client(timeout=30) as client:
             resp = await client.get(_CARTO_URL, params={"q": query})
             if resp.status_code != 200:
                 return None
@@ -163,12 +303,15 @@ async def _query_adjacent(
         return None
 
 
+@span("geometry.zoning_layers")
+@swr_cached("zoning_layers", TTL_PLUTO)
+@coalesce("geometry.zoning_layers")
 async def fetch_zoning_layers(bbl: str) -> dict:
     """Fetch additional zoning layers from NYC Zoning API."""
     url = f"https://zoning.planningdigital.com/api/tax-lots?bbl={bbl}"
 
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with upstream_client(timeout=15) as client:
             resp = await client.get(url)
             if resp.status_code != 200:
                 return {}
@@ -198,6 +341,9 @@ _LAND_USE_DESCRIPTIONS = {
 }
 
 
+@span("geometry.block_description")
+@swr_cached("block_description", TTL_PLUTO)
+@coalesce("geometry.block_description")
 async def fetch_block_description(bbl: str) -> str | None:
     """Generate a natural-language description of the block character.
 
@@ -233,7 +379,7 @@ async def _query_block_data(boro: str, block: str, table_name: str) -> list[dict
         f"LIMIT 150"
     )
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with upstream_client(timeout=15) as client:
             resp = await client.get(_CARTO_URL, params={"q": query})
             if resp.status_code != 200:
                 return None
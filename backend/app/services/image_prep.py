@@ -0,0 +1,110 @@
+"""
+Image preparation for PDF report embedding.
+
+Map tiles and renders arrive larger than they are placed on the page
+(800×800 PNG32 from ESRI/Google placed at 2–4.5 inches).  ReportLab embeds
+images at their native resolution, so every image is prepared once before
+it becomes a flowable:
+
+  1. decode once (JPEG decoded at reduced scale where possible)
+  2. resize to the exact placement size at ``settings.report_image_dpi``
+     (never upscaled)
+  3. encode: photographic content as JPEG (embedded by ReportLab without
+     re-encoding), flat graphics as optimized PNG
+"""
+
+from __future__ import annotations
+
+import logging
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_AUTO = "auto"
+KIND_PHOTO = "photo"        # Satellite, street view, map tiles → JPEG
+KIND_GRAPHIC = "graphic"    # Renders, diagrams, flat-color maps → PNG
+
+# Images with at most this many colors are treated as flat graphics
+GRAPHIC_MAX_COLORS = 256
+
+POINTS_PER_INCH = 72
+
+
+def placement_px(width_pt: float, height_pt: float, dpi: Optional[int] = None) -> tuple[int, int]:
+    """Pixel size for an image placed at *width_pt* × *height_pt* points."""
+    dpi = dpi or settings.report_image_dpi
+    return (max(1, round(width_pt * dpi / POINTS_PER_INCH)),
+            max(1, round(height_pt * dpi / POINTS_PER_INCH)))
+
+
+def decode_image(image_bytes: bytes, size_px: Optional[tuple[int, int]] = None) -> Image.Image:
+    """Decode image bytes once, downsampled to *size_px* if given.
+
+    Returns an RGB image (RGBA if the source has transparency).  Images
+    smaller than *size_px* are left at their native size.
+    """
+    img = Image.open(BytesIO(image_bytes))
+    if size_px and img.format == "JPEG":
+        img.draft("RGB", size_px)  # DCT-domain downscale: decodes at 1/2, 1/4, 1/8
+    has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+    if size_px and (img.width > size_px[0] or img.height > size_px[1]):
+        img = img.resize(size_px, Image.LANCZOS, reducing_gap=3.0)
+    return img
+
+
+def encode_image(img: Image.Image, kind: str = KIND_AUTO) -> bytes:
+    """Encode a prepared image with settings tuned for PDF embedding."""
+    if kind == KIND_AUTO:
+        kind = _classify(img)
+    buf = BytesIO()
+    if kind == KIND_PHOTO:
+        if img.mode == "RGBA":
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        img.save(buf, format="JPEG", quality=settings.report_jpeg_quality,
+                 optimize=True, subsampling="4:2:0")
+    else:
+        img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def prepare_image(
+    image_bytes: bytes,
+    width_pt: float,
+    height_pt: float,
+    kind: str = KIND_AUTO,
+    dpi: Optional[int] = None,
+) -> bytes:
+    """Decode, resize to placement size and re-encode an image.
+
+    Returns the original bytes if they are already no larger than the
+    placement size and in a directly embeddable format (JPEG), or if the
+    image cannot be decoded.
+    """
+    size_px = placement_px(width_pt, height_pt, dpi)
+    try:
+        with Image.open(BytesIO(image_bytes)) as probe:
+            fmt, native = probe.format, probe.size
+        if fmt == "JPEG" and native[0] <= size_px[0] and native[1] <= size_px[1]:
+            return image_bytes
+        prepared = encode_image(decode_image(image_bytes, size_px), kind)
+    except Exception as e:
+        logger.warning("Image preparation failed, embedding original: %s", e)
+        return image_bytes
+    # Re-encoding a small, already-compact image can make it larger
+    resized = native[0] > size_px[0] or native[1] > size_px[1]
+    return prepared if resized or len(prepared) < len(image_bytes) else image_bytes
+
+
+def _classify(img: Image.Image) -> str:
+    """Flat-color images compress better as PNG, everything else as JPEG."""
+    if img.mode == "RGBA" and img.getchannel("A").getextrema()[0] < 255:
+        return KIND_GRAPHIC
+    return KIND_GRAPHIC if img.getcolors(GRAPHIC_MAX_COLORS) is not None else KIND_PHOTO
@@ -0,0 +1,194 @@
+"""
+Cross-worker cache invalidation over Redis pub/sub.
+
+Each process keeps in-process caches (the local tier in ``cache``, the
+render and map image memory tiers).  When lot data changes — a BBL is
+re-fetched, a PLUTO release is ingested, the engine changes — every
+uvicorn and report worker has to drop its copies.  ``publish`` applies an
+``Invalidation`` locally and broadcasts it on ``CHANNEL``; every process
+runs ``listen`` from its lifespan hook and applies what others publish.
+
+Message kinds:
+  - ``bbl``:       entries for one lot (value: 10-digit BBL)
+  - ``block``:     entries for every lot on a tax block (value: borough
+                   digit + 5-digit block, e.g. ``"301234"``)
+  - ``namespace``: every entry under a cache prefix (value: e.g. ``"pluto"``)
+  - ``all``:       everything
+
+Caches register a handler with ``register_handler``.  If the subscription
+drops, messages published meanwhile are lost, so on resubscribing the
+listener applies ``all`` locally.
+
+From the command line: ``scripts/invalidate_cache.py``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import socket
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+import redis.asyncio as redis
+
+from app.config import settings
+from app.services.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "nyc_zoning:invalidate"
+KINDS = ("bbl", "block", "namespace", "all")
+
+# Identifies this process so it skips its own broadcasts (applied on publish)
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+INVALIDATIONS = Counter(
+    "cache_invalidations_total",
+    "Cache invalidations applied, by kind and whether published here or received",
+    ("kind", "source"),
+)
+
+
+@dataclass(frozen=True)
+class Invalidation:
+    kind: str        # One of KINDS
+    value: str = ""  # BBL, borough+block, or cache prefix
+    origin: str = ""
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"Unknown invalidation kind: {self.kind!r}")
+        if self.kind == "bbl" and not re.fullmatch(r"\d{10}", self.value):
+            raise ValueError(f"Invalid BBL: {self.value!r}")
+        if self.kind == "block" and not re.fullmatch(r"\d{6}", self.value):
+            raise ValueError(f"Invalid borough+block: {self.value!r}")
+        if self.kind == "namespace" and not self.value:
+            raise ValueError("Namespace invalidation needs a cache prefix")
+
+    def pattern(self) -> Optional[re.Pattern]:
+        """Regex finding the BBL(s) in a cache key (``bbl`` / ``block`` kinds)."""
+        if self.kind == "bbl":
+            return re.compile(rf"(?<!\d){self.value}(?!\d)")
+        if self.kind == "block":
+            return re.compile(rf"(?<!\d){self.value}\d{{4}}(?!\d)")
+        return None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "Invalidation":
+        data = json.loads(raw)
+        return cls(data["kind"], data.get("value", ""), data.get("origin", ""))
+
+
+Handler = Callable[[Invalidation], None]
+_handlers: list[Handler] = []
+
+
+def register_handler(handler: Handler) -> None:
+    """Call *handler* for every invalidation applied in this process."""
+    _handlers.append(handler)
+
+
+def apply(message: Invalidation, source: str = "local") -> None:
+    """Run every registered handler for *message*."""
+    INVALIDATIONS.inc(message.kind, source)
+    for handler in _handlers:
+        try:
+            handler(message)
+        except Exception as e:
+            logger.warning("Invalidation handler %s failed: %s",
+                           getattr(handler, "__qualname__", handler), e)
+
+
+async def publish(message: Invalidation) -> bool:
+    """Apply *message* here and broadcast it to every other process.
+
+    Returns False if Redis is unavailable (only this process is affected).
+    """
+    from app.services.cache import get_redis
+
+    message = Invalidation(message.kind, message.value, ORIGIN)
+    apply(message)
+    r = await get_redis()
+    if r is None:
+        return False
+    try:
+        await r.publish(CHANNEL, message.to_json())
+        return True
+    except Exception as e:
+        logger.warning("Publishing %s invalidation failed: %s", message.kind, e)
+        return False
+
+
+async def invalidate_bbl(bbl: str) -> bool:
+    return await publish(Invalidation("bbl", bbl))
+
+
+async def invalidate_block(borough: int, block: int) -> bool:
+    return await publish(Invalidation("block", f"{borough}{block:05d}"))
+
+
+async def invalidate_namespace(prefix: str) -> bool:
+    return await publish(Invalidation("namespace", prefix))
+
+
+async def invalidate_all() -> bool:
+    return await publish(Invalidation("all"))
+
+
+def handle_message(raw: str | bytes) -> Optional[Invalidation]:
+    """Apply a message received on ``CHANNEL`` (unless this process sent it)."""
+    try:
+        message = Invalidation.from_json(raw)
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning("Ignoring malformed invalidation %r: %s", raw, e)
+        return None
+    if message.origin == ORIGIN:
+        return None
+    apply(message, source="remote")
+    return message
+
+
+async def listen() -> None:
+    """Subscribe to ``CHANNEL`` and apply invalidations until cancelled.
+
+    Reconnects with the same backoff as the cache client.
+    """
+    backoff = settings.redis_retry_min_seconds
+    subscribed_before = False
+    while True:
+        client = redis.from_url(settings.redis_url, socket_connect_timeout=3)
+        try:
+            async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(CHANNEL)
+                if subscribed_before:
+                    # Messages sent while disconnected are gone
+                    apply(Invalidation("all"), source="resubscribe")
+                subscribed_before = True
+                backoff = settings.redis_retry_min_seconds
+                async for item in pubsub.listen():
+                    if item.get("type") == "message":
+                        handle_message(item["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Invalidation listener disconnected (%s); retrying in %.0fs",
+                           e, backoff)
+        finally:
+            await client.aclose()
+        await asyncio.sleep(backoff)
+        backoff = min(settings.redis_retry_max_seconds, backoff * 2)
+
+
+def start_listener() -> Optional[asyncio.Task]:
+    """Start ``listen`` as a task on the running loop (None without Redis)."""
+    if not settings.redis_url:
+        return None
+    return asyncio.get_running_loop().create_task(listen(), name="cache-invalidation")
@@ -0,0 +1,127 @@
+"""
+Event-loop blocking detector.
+
+Async handlers that make blocking calls (synchronous SDKs, ReportLab,
+matplotlib, Pillow, shapely) stall every other request on the worker.
+``LoopMonitor`` finds them in production:
+
+  - a task on the loop sleeps ``interval`` seconds at a time and records
+    how late it wakes up (``event_loop_lag_seconds``), updating a heartbeat
+  - a watchdog thread checks the heartbeat; when the loop has not run for
+    ``threshold`` seconds it grabs the loop thread's current stack, logs
+    it, and counts the stall under its call site — the innermost frame in
+    this project's code (``event_loop_blocks_total``)
+
+Off by default (``settings.loop_monitor_enabled``); the cost when on is a
+wakeup per interval on the loop and one on the watchdog thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Optional
+
+from app.config import settings
+from app.services.metrics import Counter, LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Frames under this directory (backend/) are "ours" when naming a call site
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LOOP_LAG = LatencyHistogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer callback (time it was blocked)",
+)
+LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Event loop stalls longer than the threshold, by blocking call site",
+    ("site",),
+)
+
+
+def call_site(frame: Optional[FrameType]) -> str:
+    """``path:function`` of the innermost project frame in *frame*'s stack."""
+    innermost = None
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if innermost is None:
+            innermost = frame
+        if filename.startswith(_PROJECT_DIR + os.sep) and filename != os.path.abspath(__file__):
+            path = os.path.relpath(filename, _PROJECT_DIR)
+            return f"{path}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    if innermost is not None:
+        return f"{os.path.basename(innermost.f_code.co_filename)}:{innermost.f_code.co_name}"
+    return "unknown"
+
+
+class LoopMonitor:
+    """Samples lag on the running loop and reports stalls from a thread."""
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self._heartbeat = time.monotonic()
+        self._reported = 0.0  # Heartbeat of the last stall reported
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start on the running loop (call from the loop's thread)."""
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._tick(), name="loop-monitor")
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    async def _tick(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._heartbeat = now = time.monotonic()
+            LOOP_LAG.observe(max(0.0, now - before - self.interval))
+
+    def _watch(self) -> None:
+        while not self._stop.wait(min(self.interval, self.threshold / 2)):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked >= self.threshold and heartbeat != self._reported:
+                self._reported = heartbeat  # Once per stall
+                self.report(blocked)
+
+    def report(self, blocked: float) -> str:
+        """Count and log the loop thread's current stack; returns its call site."""
+        frame = sys._current_frames().get(self._loop_thread)
+        site = call_site(frame)
+        LOOP_BLOCKS.inc(site)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        logger.warning("Event loop blocked for %.0f ms+ at %s\n%s", blocked * 1000, site, stack)
+        return site
+
+
+def start_monitor() -> Optional[LoopMonitor]:
+    """Start a ``LoopMonitor`` on the running loop if enabled in settings."""
+    if not settings.loop_monitor_enabled:
+        return None
+    monitor = LoopMonitor(settings.loop_monitor_interval_seconds,
+                          settings.loop_monitor_threshold_seconds)
+    monitor.start()
+    return monitor
@@ -6,23 +6,61 @@ Google Maps Static API (if key configured).  Also provides Pillow-based
 polygon overlay compositing and a ReportLab fallback drawing.
 
 All functions return ``bytes | None`` — callers should handle the None
-case by skipping the image or using the programmatic fallback.
+case by skipping the image or using the programmatic fallback.  Fetched
+images are kept in the shared map image cache (memory + disk), keyed by
+the fetcher and its arguments; concurrent fetches of the same image share
+one call, which stores the image even if every caller stopped waiting.
 """
 
 from __future__ import annotations
 
+import hashlib
+import inspect
 import logging
 import math
+from functools import wraps
 from io import BytesIO
 from typing import Optional
 
-import httpx
 from shapely.geometry import shape as shapely_shape, Polygon
 
 from app.config import settings
+from app.services.render_cache import get_map_image_cache
+from app.services.singleflight import SingleFlight, default_key
+from app.services.timing import span
+from app.services.upstream import upstream_client
 
 logger = logging.getLogger(__name__)
 
+
+def _cached_image(name: str):
+    """Decorator: serve a map fetcher's images from the map image cache."""
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        flight = SingleFlight(f"maps.{name}")
+
+        async def fetch(key, *args, **kwargs):
+            image = await fn(*args, **kwargs)
+            if image:
+                get_map_image_cache().put(key, {"image": image})
+            return image
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = hashlib.sha256(f"{name}:{default_key(**bound.arguments)}".encode()).hexdigest()
+            cached = get_map_image_cache().get(key)
+            if cached is not None:
+                return cached["image"]
+            return await flight.do(key, fetch, key, *args, **kwargs)
+
+        wrapper.singleflight = flight
+        return wrapper
+
+    return decorator
+
+
 # ──────────────────────────────────────────────────────────────────
 # BBOX HELPERS
 # ──────────────────────────────────────────────────────────────────
@@ -96,7 +134,7 @@ async def _fetch_esri_image(
         "f": "image",
     }
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with upstream_client(timeout=15) as client:
             resp = await client.get(base_url, params=params)
             if resp.status_code == 200 and resp.headers.get("content-type", "").startswith("image"):
                 return resp.content
@@ -157,7 +195,7 @@ async def _fetch_google_map(
             params["path"] = path
 
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with upstream_client(timeout=15) as client:
             resp = await client.get(GOOGLE_STATIC_URL, params=params)
             if resp.status_code == 200 and resp.headers.get("content-type", "").startswith("image"):
                 return resp.content
@@ -393,6 +431,8 @@ def draw_lot_diagram_reportlab(
 # PUBLIC API
 # ──────────────────────────────────────────────────────────────────
 
+@span("maps.satellite")
+@_cached_image("satellite")
 async def fetch_satellite_image(
     lat: float,
     lng: float,
@@ -432,6 +472,8 @@ async def fetch_satellite_image(
     return None
 
 
+@span("maps.street")
+@_cached_image("street")
 async def fetch_street_map_image(
     lat: float,
     lng: float,
@@ -487,6 +529,8 @@ ZONING_DISTRICT_COLORS = {
 }
 
 
+@span("maps.zoning")
+@_cached_image("zoning")
 async def fetch_zoning_map_image(
     lat: float,
     lng: float,
@@ -508,7 +552,8 @@ async def fetch_zoning_map_image(
     Returns PNG bytes or None if all sources fail.
     """
     try:
-        from PIL import Image, ImageDraw, ImageFont
+        from PIL import Image, ImageDraw
+        from app.services.resources import get_font, FONT_BOLD
     except ImportError:
         logger.warning("Pillow not installed — cannot create zoning map")
         return None
@@ -540,19 +585,8 @@ async def fetch_zoning_map_image(
         py = (maxy - gy) / (maxy - miny) * h
         return (px, py)
 
-    # Load font
-    try:
-        label_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 14)
-    except Exception:
-        try:
-            label_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 14)
-        except Exception:
-            label_font = ImageFont.load_default()
-
-    try:
-        small_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 10)
-    except Exception:
-        small_font = ImageFont.load_default()
+    label_font = get_font(14, FONT_BOLD)
+    small_font = get_font(10)
 
     # Step 2: Query zoning districts within bbox
     districts_geojson = await _fetch_zoning_districts(bbox)
@@ -739,6 +773,8 @@ async def fetch_zoning_map_image(
     return buf.getvalue()
 
 
+@span("maps.context")
+@_cached_image("context")
 async def fetch_context_map_image(
     lat: float,
     lng: float,
@@ -809,6 +845,26 @@ async def fetch_context_map_image(
     return buf.getvalue()
 
 
+# Fixed bbox covering all 5 boroughs of NYC
+CITY_OVERVIEW_BBOX = (-74.30, 40.48, -73.68, 40.93)
+
+# City overview base maps by (width, height); fetched once per process
+_city_base_images: dict[tuple[int, int], bytes] = {}
+
+
+async def _fetch_city_base_image(width: int, height: int) -> bytes | None:
+    """City-scale base map, shared by every report (and every portfolio lot)."""
+    key = (width, height)
+    if key not in _city_base_images:
+        base_img = await _fetch_esri_image(ESRI_STREET_URL, CITY_OVERVIEW_BBOX, width, height)
+        if not base_img:
+            return None
+        _city_base_images[key] = base_img
+    return _city_base_images[key]
+
+
+@span("maps.city_overview")
+@_cached_image("city_overview")
 async def fetch_city_overview_map(
     lat: float,
     lng: float,
@@ -821,17 +877,15 @@ async def fetch_city_overview_map(
     can see exactly where in the city the property is located.
     """
     try:
-        from PIL import Image, ImageDraw, ImageFont
+        from PIL import Image, ImageDraw
     except ImportError:
         logger.warning("Pillow not installed — cannot create city overview map")
         return None
 
-    # Fixed bbox covering all 5 boroughs of NYC
-    bbox = (-74.30, 40.48, -73.68, 40.93)
-    minx, miny, maxx, maxy = bbox
+    minx, miny, maxx, maxy = CITY_OVERVIEW_BBOX
 
-    # Fetch base street map at city scale
-    base_img = await _fetch_esri_image(ESRI_STREET_URL, bbox, width, height)
+    # Base street map at city scale — identical for every lot
+    base_img = await _fetch_city_base_image(width, height)
     if not base_img:
         return None
 
@@ -918,6 +972,8 @@ def _make_bbox_square(bbox: tuple[float, float, float, float]) -> tuple[float, f
 # NEIGHBOURHOOD MAP
 # ──────────────────────────────────────────────────────────────────
 
+@span("maps.neighborhood")
+@_cached_image("neighborhood")
 async def fetch_neighborhood_map_image(
     lat: float,
     lng: float,
@@ -931,7 +987,8 @@ async def fetch_neighborhood_map_image(
     the close-up street map but tighter than the city overview.
     """
     try:
-        from PIL import Image, ImageDraw, ImageFont
+        from PIL import Image, ImageDraw
+        from app.services.resources import get_font
     except ImportError:
         logger.warning("Pillow not installed — cannot create neighborhood map")
         return None
@@ -980,10 +1037,7 @@ async def fetch_neighborhood_map_image(
     # Label with background
     label = "Subject Property"
     try:
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 12)
-        except Exception:
-            font = ImageFont.load_default()
+        font = get_font(12)
         label_x = pin_x + 16
         label_y = pin_y - 8
         draw.rectangle(
@@ -1007,6 +1061,8 @@ async def fetch_neighborhood_map_image(
 
 GOOGLE_STREETVIEW_URL = "https://maps.googleapis.com/maps/api/streetview"
 
+@span("maps.street_view")
+@_cached_image("street_view")
 async def fetch_street_view_image(
     lat: float,
     lng: float,
@@ -1035,7 +1091,7 @@ async def fetch_street_view_image(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with upstream_client(timeout=15) as client:
             # First check metadata to see if coverage exists
             meta_params = {**params}
             meta_params.pop("size", None)
@@ -1083,7 +1139,7 @@ async def _fetch_zoning_districts(
         "f": "geojson",
     }
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with upstream_client(timeout=15) as client:
             resp = await client.get(NYC_ZONING_FEATURE_URL, params=params)
             if resp.status_code == 200:
                 return resp.json()
@@ -0,0 +1,193 @@
+"""
+Prometheus metrics in the text exposition format.
+
+Counters and histograms are declared at module level by the code that
+updates them::
+
+    UPSTREAM_TIMEOUTS = Counter(
+        "upstream_timeouts_total", "Upstream requests that timed out", ("upstream",))
+    UPSTREAM_TIMEOUTS.inc("socrata")
+
+Values that already live elsewhere (cache stats, job stores, the render
+pool) are read when scraped through ``register_collector``.  Stage
+histograms from ``services.timing`` are exported as
+``stage_duration_seconds``.  ``render_metrics()`` produces the body of
+``GET /metrics``; no client library is required.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Iterable, Optional
+
+from app.services.timing import BUCKETS, Histogram, histograms
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# collector() -> [(label dict, value), ...]
+Samples = Iterable[tuple[dict, float]]
+
+_metrics: dict[str, "_Metric"] = {}
+_collectors: dict[str, tuple[str, str, Callable[[], Samples]]] = {}
+_lock = threading.Lock()
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        with _lock:
+            _metrics[name] = self
+
+    def _key(self, labels: tuple) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(v) for v in labels)
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[tuple[tuple, float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class LatencyHistogram(_Metric):
+    """Latency histogram (seconds) per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+        self._hists: dict[tuple, Histogram] = {}
+
+    def observe(self, seconds: float, *labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def snapshot(self, *labels) -> Optional[dict]:
+        with self._lock:
+            hist = self._hists.get(self._key(labels))
+            return hist.snapshot() if hist else None
+
+    def samples(self) -> list[tuple[tuple, dict]]:
+        with self._lock:
+            return [(key, hist.snapshot()) for key, hist in sorted(self._hists.items())]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hists.clear()
+
+
+def register_collector(name: str, help: str, kind: str, collect: Callable[[], Samples]) -> None:
+    """Export *name* (``"gauge"`` or ``"counter"``) from ``collect()`` at scrape time.
+
+    Registering the same name again replaces the earlier collector.
+    """
+    with _lock:
+        _collectors[name] = (help, kind, collect)
+
+
+def reset_metrics() -> None:
+    """Zero every counter and histogram (collectors are left registered)."""
+    with _lock:
+        metrics = list(_metrics.values())
+    for metric in metrics:
+        metric.reset()
+
+
+# ──────────────────────────────────────────────────────────────────
+# EXPOSITION
+# ──────────────────────────────────────────────────────────────────
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text format."""
+    with _lock:
+        metrics = sorted(_metrics.items())
+        collectors = sorted(_collectors.items())
+
+    lines: list[str] = []
+    for name, metric in metrics:
+        _header(lines, name, metric.help, metric.kind)
+        for key, value in metric.samples():
+            labels = dict(zip(metric.labelnames, key))
+            if metric.kind == "histogram":
+                _histogram_lines(lines, name, labels, value)
+            else:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    _header(lines, "stage_duration_seconds",
+            "Analysis and report pipeline stage durations", "histogram")
+    for stage, snapshot in histograms().items():
+        _histogram_lines(lines, "stage_duration_seconds", {"stage": stage}, snapshot)
+
+    for name, (help, kind, collect) in collectors:
+        _header(lines, name, help, kind)
+        try:
+            samples = list(collect())
+        except Exception:
+            samples = []
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _header(lines: list[str], name: str, help: str, kind: str) -> None:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram_lines(lines: list[str], name: str, labels: dict, snapshot: dict) -> None:
+    for le, count in snapshot["buckets"]:
+        bucket = {**labels, "le": "+Inf" if math.isinf(le) else _number(le)}
+        lines.append(f"{name}_bucket{_labels(bucket)} {count}")
+    lines.append(f"{name}_sum{_labels(labels)} {_number(snapshot['sum'])}")
+    lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
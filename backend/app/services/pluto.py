@@ -1,8 +1,18 @@
 from __future__ import annotations
 
-import httpx
+import logging
 
 from app.models.schemas import PlutoData
+from app.services.cache import TTL_NEGATIVE, TTL_PLUTO, NotFound, swr_cached
+from app.services.geometry import (
+    BATCH_SIZE, CURRENT_MAPPLUTO_TABLE, fetch_lot_geometry, normalize_bbl, parse_geom,
+    query_mappluto_many,
+)
+from app.services.singleflight import coalesce
+from app.services.timing import span
+from app.services.upstream import upstream_client
+
+logger = logging.getLogger(__name__)
 
 PLUTO_SOCRATA_URL = "https://data.cityofnewyork.us/resource/64uk-42ks.json"
 
@@ -17,28 +27,133 @@ PLUTO_FIELDS = [
     "histdist", "landmark",
 ]
 
+_MAPPLUTO_COLUMNS = f"{', '.join(PLUTO_FIELDS)}, ST_AsGeoJSON(the_geom) AS geom"
+
 
+@span("pluto")
+@swr_cached("pluto", TTL_PLUTO, key=lambda bbl, app_token="": bbl, model=PlutoData,
+            negative_ttl=TTL_NEGATIVE, missing=None)
+@coalesce("pluto", key=lambda bbl, app_token="": bbl)
 async def fetch_pluto_data(bbl: str, app_token: str = "") -> PlutoData | None:
-    """Fetch PLUTO data for a given BBL from NYC Open Data Socrata API."""
-    params = {"bbl": bbl}
+    """Fetch PLUTO data for a given BBL.
+
+    One query of the current MapPLUTO release on Carto returns the
+    ``PLUTO_FIELDS`` and the lot polygon; the polygon is cached for
+    ``fetch_lot_geometry``, so the usual PLUTO-then-geometry sequence
+    costs one upstream request.  If Carto is unavailable or the current
+    release lacks the lot, falls back to the NYC Open Data Socrata API
+    (older MapPLUTO tables are only used for polygons).
+
+    None if PLUTO has no row for the BBL (remembered for ``TTL_NEGATIVE``).
+    """
+    pluto, geometries = await _fetch_mappluto([bbl])
+    await fetch_lot_geometry.prime_many(geometries)
+    if bbl in pluto:
+        return pluto[bbl]
+    return await _fetch_socrata(bbl, app_token)
+
+
+@span("pluto.many")
+async def fetch_pluto_many(bbls: list[str], app_token: str = "") -> dict[str, PlutoData | None]:
+    """``fetch_pluto_data`` for many lots, ``BATCH_SIZE`` per upstream query.
+
+    Cached lots cost nothing upstream; the rest are looked up together in
+    MapPLUTO (priming ``fetch_lot_geometry`` as the single-lot path does),
+    then on Socrata for lots MapPLUTO couldn't answer, so N lots take
+    about ceil(N / ``BATCH_SIZE``) requests instead of N.
+
+    Returns BBL -> PLUTO data (None if PLUTO has no row); lots whose lookup
+    failed are left out.
+    """
+    return await fetch_pluto_data.many(
+        bbls, lambda missing: _fetch_pluto_batch(missing, app_token), app_token)
+
+
+async def _fetch_pluto_batch(bbls: list[str], app_token: str) -> dict[str, PlutoData | NotFound]:
+    results, geometries = await _fetch_mappluto(bbls)
+    await fetch_lot_geometry.prime_many(geometries)
+    rest = [bbl for bbl in bbls if bbl not in results]
+    if rest:
+        results.update(await _fetch_socrata_many(rest, app_token))
+    return results
+
+
+async def _fetch_socrata(bbl: str, app_token: str) -> PlutoData:
+    params = {"bbl": bbl, "$select": ",".join(PLUTO_FIELDS)}
     headers = {}
     if app_token:
         headers["X-App-Token"] = app_token
 
-    async with httpx.AsyncClient(timeout=15) as client:
+    async with upstream_client(timeout=15) as client:
         resp = await client.get(PLUTO_SOCRATA_URL, params=params, headers=headers)
         resp.raise_for_status()
         data = resp.json()
 
     if not data:
-        return None
+        raise NotFound(f"No PLUTO data for BBL {bbl}")
 
     record = data[0]
     return _parse_pluto_record(record)
 
 
+async def _fetch_socrata_many(bbls: list[str], app_token: str) -> dict[str, PlutoData | NotFound]:
+    """Socrata lookups with ``$where=bbl in (...)``; failed chunks are left out."""
+    bbls = [bbl for bbl in bbls if bbl.isdigit()]
+    headers = {"X-App-Token": app_token} if app_token else {}
+    results: dict[str, PlutoData | NotFound] = {}
+    async with upstream_client(timeout=15) as client:
+        for start in range(0, len(bbls), BATCH_SIZE):
+            chunk = bbls[start:start + BATCH_SIZE]
+            in_list = ", ".join(f"'{bbl}'" for bbl in chunk)
+            params = {
+                "$select": ",".join(PLUTO_FIELDS),
+                "$where": f"bbl in ({in_list})",
+                "$limit": str(len(chunk)),
+            }
+            try:
+                resp = await client.get(PLUTO_SOCRATA_URL, params=params, headers=headers)
+                resp.raise_for_status()
+                records = resp.json()
+            except Exception as e:
+                logger.warning("PLUTO batch lookup of %d lots failed: %s", len(chunk), e)
+                continue
+            for record in records:
+                bbl = normalize_bbl(record.get("bbl"))
+                if bbl in chunk and bbl not in results:
+                    results[bbl] = _parse_pluto_record({**record, "bbl": bbl})
+            for bbl in chunk:
+                results.setdefault(bbl, NotFound(f"No PLUTO data for BBL {bbl}"))
+    return results
+
+
+async def _fetch_mappluto(bbls: list[str]) -> tuple[dict[str, PlutoData], dict[str, dict | NotFound]]:
+    """PLUTO attributes and lot geometry from the current MapPLUTO on Carto.
+
+    Returns (BBL -> PLUTO data, BBL -> geometry) for the lots found.  Lots
+    the current release lacks are in neither: an older release may still
+    have their polygon, but its attributes would not be current PLUTO.
+    """
+    rows, _ = await query_mappluto_many([bbl for bbl in bbls if bbl.isdigit()],
+                                        _MAPPLUTO_COLUMNS, [CURRENT_MAPPLUTO_TABLE])
+    pluto = {}
+    geometries: dict[str, dict | NotFound] = {}
+    for bbl, row in rows.items():
+        pluto[bbl] = _parse_pluto_record({**row, "bbl": bbl})
+        geometry = parse_geom(row)
+        if geometry:
+            geometries[bbl] = geometry
+    return pluto, geometries
+
+
 def _parse_pluto_record(record: dict) -> PlutoData:
-    """Parse a raw PLUTO Socrata record into our schema."""
+    """Parse a raw PLUTO record (Socrata, or MapPLUTO on Carto) into our schema."""
+    def _str(val):
+        if val is None:
+            return None
+        if isinstance(val, float) and val.is_integer():
+            val = int(val)  # Carto returns numeric columns as numbers
+        return str(val)
+
     def _float(val):
         if val is None:
             return None
@@ -57,19 +172,19 @@ def _parse_pluto_record(record: dict) -> PlutoData:
 
     return PlutoData(
         bbl=str(record.get("bbl", "")),
-        address=record.get("address"),
-        zonedist1=record.get("zonedist1"),
-        zonedist2=record.get("zonedist2"),
-        zonedist3=record.get("zonedist3"),
-        zonedist4=record.get("zonedist4"),
-        overlay1=record.get("overlay1"),
-        overlay2=record.get("overlay2"),
-        spdist1=record.get("spdist1"),
-        spdist2=record.get("spdist2"),
-        spdist3=record.get("spdist3"),
+        address=_str(record.get("address")),
+        zonedist1=_str(record.get("zonedist1")),
+        zonedist2=_str(record.get("zonedist2")),
+        zonedist3=_str(record.get("zonedist3")),
+        zonedist4=_str(record.get("zonedist4")),
+        overlay1=_str(record.get("overlay1")),
+        overlay2=_str(record.get("overlay2")),
+        spdist1=_str(record.get("spdist1")),
+        spdist2=_str(record.get("spdist2")),
+        spdist3=_str(record.get("spdist3")),
         ltdheight=str(record.get("ltdheight", "")) if record.get("ltdheight") is not None else None,
         splitzone=str(record.get("splitzone", "")) if record.get("splitzone") is not None else None,
-        landuse=record.get("landuse"),
+        landuse=_str(record.get("landuse")),
         lotarea=_float(record.get("lotarea")),
         lotfront=_float(record.get("lotfront")),
         lotdepth=_float(record.get("lotdepth")),
@@ -86,11 +201,11 @@ def _parse_pluto_record(record: dict) -> PlutoData:
         yearalter1=_int(record.get("yearalter1")),
         yearalter2=_int(record.get("yearalter2")),
         irrlotcode=str(record.get("irrlotcode", "")) if record.get("irrlotcode") is not None else None,
-        ext=record.get("ext"),
+        ext=_str(record.get("ext")),
         cd=_int(record.get("cd")),
-        ct2010=record.get("ct2010"),
-        cb2010=record.get("cb2010"),
-        zipcode=record.get("zipcode"),
-        histdist=record.get("histdist"),
-        landmark=record.get("landmark"),
+        ct2010=_str(record.get("ct2010")),
+        cb2010=_str(record.get("cb2010")),
+        zipcode=_str(record.get("zipcode")),
+        histdist=_str(record.get("histdist")),
+        landmark=_str(record.get("landmark")),
     )
@@ -0,0 +1,138 @@
+"""
+Portfolio report rendering — many lots, one job.
+
+The caller analyzes each lot (concurrently, sharing the API and map
+caches) and passes the prepared report inputs here.  This module produces:
+
+  - one PDF per lot, built in the shared render worker pool
+  - one combined PDF: a portfolio summary table followed by every lot's
+    report, built in this process while the workers run
+
+Massing views for every lot are rendered once up front (render cache +
+pool) and handed to both builds, so no view is rendered twice.  Fonts,
+styles and report templates are process-wide and warm in every worker.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from app.services.report import generate_portfolio_report, generate_report
+
+logger = logging.getLogger(__name__)
+
+# Called as on_lot_done(index, pdf_path, error) as each lot's PDF finishes
+LotCallback = Callable[[int, Optional[str], Optional[str]], None]
+
+# Per-lot keys passed through to generate_report
+_REPORT_KWARGS = ("parking_layout_result", "assemblage_data", "map_images", "massing_views")
+
+
+@dataclass
+class PortfolioReports:
+    """Output files of a portfolio job."""
+    combined_path: Optional[str] = None
+    lot_paths: list[Optional[str]] = field(default_factory=list)
+    errors: list[Optional[str]] = field(default_factory=list)
+
+
+def render_portfolio(
+    lots: list[dict],
+    unavailable: Optional[list[str]] = None,
+    on_lot_done: Optional[LotCallback] = None,
+) -> PortfolioReports:
+    """Build per-lot PDFs and the combined portfolio PDF.
+
+    Args:
+        lots: One dict per lot with ``result`` (CalculationResult) and
+            optional ``parking_layout_result``, ``map_images`` and
+            ``massing_models``
+        unavailable: BBLs that could not be analyzed (listed in the summary)
+        on_lot_done: Progress callback, called once per lot
+
+    Returns: PortfolioReports with paths aligned to *lots*
+    """
+    prepared = [_with_massing_views(lot) for lot in lots]
+    reports = PortfolioReports(lot_paths=[None] * len(lots), errors=[None] * len(lots))
+
+    def _done(index: int, path: Optional[str], error: Optional[str]) -> None:
+        reports.lot_paths[index] = path
+        reports.errors[index] = error
+        if on_lot_done:
+            on_lot_done(index, path, error)
+
+    futures = _submit_lot_reports(prepared)
+    if futures is None:
+        for i, lot in enumerate(prepared):
+            _build_lot_report(i, lot, _done)
+
+    # Combined document builds here while the workers produce per-lot files
+    reports.combined_path = generate_portfolio_report(prepared, unavailable=unavailable)
+
+    if futures is not None:
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                _done(i, future.result(), None)
+            except BrokenProcessPool:
+                logger.warning("Render pool failed; building lot %d in-process", i)
+                _reset_render_pool()
+                _build_lot_report(i, prepared[i], _done)
+            except Exception as e:
+                logger.warning("Portfolio lot %d failed: %s", i, e)
+                _done(i, None, str(e))
+    return reports
+
+
+def _with_massing_views(lot: dict) -> dict:
+    """Copy of *lot* with its massing models rendered to views."""
+    lot = dict(lot)
+    models = lot.pop("massing_models", None)
+    if lot.get("massing_views") is None:
+        lot["massing_views"] = {}
+        if models:
+            try:
+                from app.services.render_3d import render_all_massing_views
+                lot["massing_views"] = render_all_massing_views(models)
+            except Exception as e:
+                logger.warning("Massing render failed for portfolio lot: %s", e)
+    return lot
+
+
+def _report_kwargs(lot: dict) -> dict:
+    return {key: lot.get(key) for key in _REPORT_KWARGS}
+
+
+def _submit_lot_reports(lots: list[dict]) -> Optional[dict]:
+    """Submit every lot's PDF to the render pool; None if it is unavailable."""
+    if len(lots) < 2:
+        return None
+    try:
+        from app.services.render_3d import get_render_pool, submit_render_job
+        pool = get_render_pool()
+        if pool is None:
+            return None
+        return {
+            submit_render_job(pool, generate_report, lot["result"], **_report_kwargs(lot)): i
+            for i, lot in enumerate(lots)
+        }
+    except (BrokenProcessPool, OSError, RuntimeError) as e:
+        logger.warning("Render pool unavailable (%s); building lot reports serially", e)
+        return None
+
+
+def _reset_render_pool() -> None:
+    from app.services.render_3d import shutdown_render_pool
+    shutdown_render_pool()
+
+
+def _build_lot_report(index: int, lot: dict, done: LotCallback) -> None:
+    try:
+        done(index, generate_report(lot["result"], **_report_kwargs(lot)), None)
+    except Exception as e:
+        logger.warning("Portfolio lot %d failed: %s", index, e)
+        done(index, None, str(e))
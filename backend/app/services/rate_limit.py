@@ -0,0 +1,114 @@
+"""
+Token-bucket rate limits shared by every worker.
+
+A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+second; each request takes one.  Buckets live in Redis and are updated by
+one Lua script call per request, on Redis's clock, so every process on
+every node draws from the same bucket.  While Redis is unavailable each
+process falls back to its own in-process bucket.
+
+A request that finds the bucket empty reserves the next token and is told
+how long to wait for it, so bursts queue in arrival order instead of all
+retrying at once.  If the wait would exceed ``max_wait`` nothing is
+reserved and ``reserve`` returns None.
+
+``upstream.InstrumentedTransport`` applies ``settings.upstream_rate_limits``
+to every upstream request.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "nyc_zoning:ratelimit:"
+
+# KEYS[1]: bucket; ARGV: rate (tokens/s), burst, max wait (s).
+# Returns {1, wait in microseconds} with a token reserved, or {0, wait}.
+_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = math.max(0, (1 - tokens) / rate)
+if wait > max_wait then
+  return {0, math.ceil(wait * 1000000)}
+end
+tokens = tokens - 1
+redis.call('HSET', KEYS[1], 'tokens', string.format('%.6f', tokens),
+           'ts', string.format('%.6f', now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {1, math.ceil(wait * 1000000)}
+"""
+
+
+class TokenBucket:
+    """In-process token bucket with the same reservation rule as the script."""
+
+    def __init__(self, rate: float, burst: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Reserve a token: seconds until it is due, or None if over *max_wait*."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def local_bucket(name: str, rate: float, burst: float) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None or (bucket.rate, bucket.burst) != (rate, max(1.0, burst)):
+            bucket = _buckets[name] = TokenBucket(rate, burst)
+        return bucket
+
+
+def reset() -> None:
+    """Forget in-process buckets (tests, settings changes)."""
+    with _buckets_lock:
+        _buckets.clear()
+
+
+async def reserve(name: str, rate: float, burst: float, max_wait: float) -> Optional[float]:
+    """Reserve a token from bucket *name* (shared through Redis when available).
+
+    Returns the seconds the caller must wait before using it, or None if
+    that would be longer than *max_wait* (no token is taken).
+    """
+    from app.services.cache import RedisUnavailable, redis_command
+
+    try:
+        result = await redis_command("eval", _RESERVE_SCRIPT, 1, KEY_PREFIX + name,
+                                     rate, max(1.0, burst), max_wait)
+    except RedisUnavailable:
+        return local_bucket(name, rate, burst).reserve(max_wait)
+    except Exception as e:
+        logger.warning("Rate limit script for %s failed: %s", name, e)
+        return local_bucket(name, rate, burst).reserve(max_wait)
+    granted, wait_us = result
+    return int(wait_us) / 1e6 if int(granted) else None
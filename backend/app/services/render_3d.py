@@ -6,13 +6,26 @@ images of building massing models.  Each floor is rendered as an extruded
 polygon, colored by use type, with dimension annotations and a legend.
 
 All inputs come from ``build_massing_model()`` in ``massing_builder.py``.
+
+A faster software-rasterized backend lives in ``render_raster.py``;
+``render_massing_views()`` picks one via ``settings.massing_renderer``.
+``render_all_massing_views()`` renders every scenario of a report at once
+in a process pool.
 """
 
 from __future__ import annotations
 
+import atexit
+import inspect
 import io
 import logging
 import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from typing import Optional
 
 import matplotlib
@@ -20,12 +33,23 @@ matplotlib.use("Agg")  # Non-interactive backend for server-side rendering
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib import font_manager
 from matplotlib.collections import PolyCollection
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app.config import settings
+from app.services.metrics import register_collector
+from app.services.render_cache import get_render_cache, massing_fingerprint
+from app.services.timing import span
 
 logger = logging.getLogger(__name__)
 
+RENDERER_MATPLOTLIB = "matplotlib"
+RENDERER_RASTER = "raster"
+RENDERERS = (RENDERER_MATPLOTLIB, RENDERER_RASTER)
+
 # ──────────────────────────────────────────────────────────────────
 # USE-TYPE COLORS (match massing_builder.py palette)
 # ──────────────────────────────────────────────────────────────────
@@ -144,6 +168,7 @@ def render_perspective_view(
     dpi: int = 150,
     elevation: float = 25,
     azimuth: float = -50,
+    title: bool = True,
 ) -> bytes:
     """Render an isometric-style 3D perspective view of the massing model.
 
@@ -153,6 +178,7 @@ def render_perspective_view(
         width/height: Image dimensions in pixels.
         dpi: Render resolution.
         elevation/azimuth: Camera angles for the 3D view.
+        title: Draw the title (cached views get theirs from ``_add_title``).
 
     Returns:
         PNG image bytes.
@@ -396,8 +422,9 @@ def render_perspective_view(
     ax.grid(False)  # Remove background grid per user request
 
     # ── Title ──
-    title = scenario_name or "Building Massing"
-    ax.set_title(title, fontsize=10, fontweight="bold", color="#1a1a2e", pad=5)
+    if title:
+        ax.set_title(scenario_name or "Building Massing",
+                     fontsize=10, fontweight="bold", color="#1a1a2e", pad=5)
 
     # ── Legend (right side of figure) ──
     legend_patches = []
@@ -506,12 +533,17 @@ def _annotate_edge_length(
     )
 
 
+def _plan_title(scenario_name: str) -> str:
+    return f"{scenario_name} — Plan View" if scenario_name else "Plan View"
+
+
 def render_plan_view(
     massing_model: dict,
     scenario_name: str = "",
     width: int = 600,
     height: int = 600,
     dpi: int = 150,
+    title: bool = True,
 ) -> bytes:
     """Render a top-down plan view showing floor plate outlines.
 
@@ -522,6 +554,7 @@ def render_plan_view(
         scenario_name: Title text.
         width/height: Image dimensions in pixels.
         dpi: Render resolution.
+        title: Draw the title (cached views get theirs from ``_add_title``).
 
     Returns:
         PNG image bytes.
@@ -706,8 +739,9 @@ def render_plan_view(
                     arrowprops=dict(arrowstyle="->", color="#333333", lw=1.5))
 
     # ── Title ──
-    title = f"{scenario_name} — Plan View" if scenario_name else "Plan View"
-    ax.set_title(title, fontsize=10, fontweight="bold", color="#1a1a2e", pad=8)
+    if title:
+        ax.set_title(_plan_title(scenario_name),
+                     fontsize=10, fontweight="bold", color="#1a1a2e", pad=8)
 
     # ── Clean up ──
     ax.tick_params(labelsize=6, colors="#999999")
@@ -759,31 +793,288 @@ def render_plan_view(
 def render_massing_views(
     massing_model: dict,
     scenario_name: str = "",
+    renderer: Optional[str] = None,
 ) -> dict[str, bytes]:
     """Render both perspective and plan views for a massing model.
 
+    Results are served from the render cache when an identical model
+    (same geometry, renderer and camera) was rendered before; the cached
+    views are untitled and *scenario_name* is drawn on after the lookup.
+
     Args:
         massing_model: Output from ``build_massing_model()``.
         scenario_name: Scenario title for labeling.
+        renderer: ``"matplotlib"`` or ``"raster"``; defaults to
+            ``settings.massing_renderer``.
 
     Returns:
         Dict with keys ``"perspective"`` and ``"plan"``, each containing
         PNG image bytes.  Values may be empty bytes if rendering fails.
     """
+    renderer = _resolve_renderer(renderer or settings.massing_renderer)
+    cache = get_render_cache()
+    key = _cache_key(massing_model, renderer)
+
+    views = cache.get(key)
+    if views is None:
+        views = _render_views(massing_model, renderer)
+        cache.put(key, views)
+    return _add_titles(views, scenario_name)
+
+
+def _render_views(massing_model: dict, renderer: str) -> dict[str, bytes]:
+    """Render both views, untitled, without consulting the cache."""
     result = {"perspective": b"", "plan": b""}
+    perspective_fn, plan_fn = _get_renderer(renderer)
 
     try:
-        result["perspective"] = render_perspective_view(
-            massing_model, scenario_name=scenario_name,
-        )
+        result["perspective"] = perspective_fn(massing_model, title=False)
     except Exception as e:
-        logger.warning("Perspective rendering failed for '%s': %s", scenario_name, e)
+        logger.warning("Perspective rendering failed: %s", e)
 
     try:
-        result["plan"] = render_plan_view(
-            massing_model, scenario_name=scenario_name,
-        )
+        result["plan"] = plan_fn(massing_model, title=False)
     except Exception as e:
-        logger.warning("Plan view rendering failed for '%s': %s", scenario_name, e)
+        logger.warning("Plan view rendering failed: %s", e)
 
     return result
+
+
+def _add_titles(views: dict[str, bytes], scenario_name: str) -> dict[str, bytes]:
+    """Draw the scenario title above untitled views from ``_render_views``."""
+    return {
+        # Centred over the 3D axes, left of the legend, as in the renderers
+        "perspective": _add_title(views["perspective"], scenario_name or "Building Massing", 0.41),
+        "plan": _add_title(views["plan"], _plan_title(scenario_name), 0.5),
+    }
+
+
+def _add_title(png: bytes, title: str, center: float, dpi: int = 150) -> bytes:
+    """Return *png* with a band above it holding *title*, 10pt bold at *dpi*."""
+    if not png:
+        return png
+    img = Image.open(io.BytesIO(png)).convert("RGB")
+    font = _title_font(dpi)
+    band = font.size * 2
+    out = Image.new("RGB", (img.width, img.height + band), "white")
+    out.paste(img, (0, band))
+    ImageDraw.Draw(out).text((img.width * center, band / 2), title,
+                             font=font, fill="#1a1a2e", anchor="mm")
+    buf = io.BytesIO()
+    out.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=4)
+def _title_font(dpi: int) -> ImageFont.FreeTypeFont:
+    path = font_manager.findfont(font_manager.FontProperties(family="DejaVu Sans", weight="bold"))
+    return ImageFont.truetype(path, max(1, round(10 * dpi / 72)))
+
+
+def _resolve_renderer(name: str) -> str:
+    if name not in RENDERERS:
+        logger.warning("Unknown massing renderer '%s', using matplotlib", name)
+        return RENDERER_MATPLOTLIB
+    return name
+
+
+def _cache_key(massing_model: dict, renderer: str) -> str:
+    return massing_fingerprint(
+        massing_model, renderer, camera=_camera_params(*_get_renderer(renderer)),
+    )
+
+
+@lru_cache(maxsize=8)
+def _camera_params(perspective_fn, plan_fn) -> dict:
+    """Default canvas/camera keyword arguments of a renderer's view functions."""
+    params = {}
+    for view, fn in (("perspective", perspective_fn), ("plan", plan_fn)):
+        params[view] = {
+            name: p.default for name, p in inspect.signature(fn).parameters.items()
+            if p.default is not inspect.Parameter.empty and name not in ("scenario_name", "title")
+        }
+    return params
+
+
+def _get_renderer(name: str):
+    """Return (perspective_fn, plan_fn) for a renderer name."""
+    if name == RENDERER_RASTER:
+        from app.services.render_raster import (
+            render_perspective_view_raster, render_plan_view_raster,
+        )
+        return render_perspective_view_raster, render_plan_view_raster
+    return render_perspective_view, render_plan_view
+
+
+# ──────────────────────────────────────────────────────────────────
+# PARALLEL RENDER STAGE
+# ──────────────────────────────────────────────────────────────────
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_in_flight = 0  # Jobs submitted through submit_render_job and not yet done
+
+
+@span("render.massing")
+def render_all_massing_views(
+    massing_models: dict[str, dict],
+    renderer: Optional[str] = None,
+) -> dict[str, dict[str, bytes]]:
+    """Render perspective and plan views for every scenario concurrently.
+
+    Cached views are looked up first; each remaining distinct model is
+    rendered once, in a worker process so total wall time is roughly that
+    of the slowest scenario.  Falls back to rendering in this process when
+    only one model misses, ``settings.render_workers`` is 1, or the pool is
+    unavailable.
+
+    Args:
+        massing_models: Dict mapping scenario names to ``build_massing_model()``
+            output.
+        renderer: Renderer name; defaults to ``settings.massing_renderer``.
+
+    Returns:
+        Dict mapping scenario names to ``render_massing_views()`` output.
+    """
+    if not massing_models:
+        return {}
+    renderer = _resolve_renderer(renderer or settings.massing_renderer)
+    cache = get_render_cache()
+
+    keys = {name: _cache_key(model, renderer) for name, model in massing_models.items()}
+    untitled: dict[str, dict[str, bytes]] = {}  # cache key -> views
+    misses: dict[str, dict] = {}                # cache key -> model
+    for name, key in keys.items():
+        if key in untitled or key in misses:
+            continue
+        cached = cache.get(key)
+        if cached is not None:
+            untitled[key] = cached
+        else:
+            misses[key] = massing_models[name]
+
+    rendered = None
+    if len(misses) > 1 and _pool_size() > 1:
+        try:
+            pool = _get_pool()
+            futures = {
+                key: submit_render_job(pool, _render_views, model, renderer)
+                for key, model in misses.items()
+            }
+            rendered = {key: future.result() for key, future in futures.items()}
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            logger.warning("Render pool failed (%s); rendering serially", e)
+            shutdown_render_pool()
+
+    if rendered is None:
+        rendered = {key: _render_views(model, renderer) for key, model in misses.items()}
+
+    for key, views in rendered.items():
+        cache.put(key, views)
+        untitled[key] = views
+    return {name: _add_titles(untitled[key], name) for name, key in keys.items()}
+
+
+def shutdown_render_pool() -> None:
+    """Stop the render worker processes (they restart on next use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _pool_size() -> int:
+    return max(1, settings.render_workers or os.cpu_count() or 1)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Return the shared render pool, creating it on first use.
+
+    Uses the spawn start method: forking a threaded server process can
+    deadlock on locks held by other threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_size(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_render_worker,
+            )
+        return _pool
+
+
+def get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared render pool, or None when rendering is configured serial."""
+    return _get_pool() if _pool_size() > 1 else None
+
+
+def submit_render_job(pool: ProcessPoolExecutor, fn, *args, **kwargs) -> Future:
+    """``pool.submit`` that counts the job as in flight until it finishes."""
+    global _in_flight
+    future = pool.submit(fn, *args, **kwargs)
+    with _pool_lock:
+        _in_flight += 1
+    future.add_done_callback(_job_done)
+    return future
+
+
+def _job_done(_future: Future) -> None:
+    global _in_flight
+    with _pool_lock:
+        _in_flight -= 1
+
+
+def render_pool_stats() -> dict:
+    """Worker count and in-flight jobs of the shared render pool."""
+    with _pool_lock:
+        started = _pool is not None
+        in_flight = _in_flight
+    workers = _pool_size() if started else 0
+    return {
+        "workers": workers,
+        "in_flight": in_flight,
+        "busy": min(in_flight, workers),
+        "queued": max(0, in_flight - workers),
+    }
+
+
+def _pool_samples(field: str):
+    def collect():
+        yield {}, render_pool_stats()[field]
+    return collect
+
+
+register_collector("render_pool_workers", "Render worker processes started",
+                   "gauge", _pool_samples("workers"))
+register_collector("render_pool_busy_workers", "Render workers running a job",
+                   "gauge", _pool_samples("busy"))
+register_collector("render_pool_queued_jobs", "Render jobs waiting for a free worker",
+                   "gauge", _pool_samples("queued"))
+
+
+def warm_render_pool() -> None:
+    """Start every render worker now so the first report doesn't wait.
+
+    Each worker runs ``_init_render_worker`` (imports, fonts, styles) as it
+    starts; one no-op job per worker forces them all to spawn.
+    """
+    if _pool_size() <= 1:
+        return
+    pool = _get_pool()
+    for future in [pool.submit(_noop) for _ in range(_pool_size())]:
+        future.result()
+
+
+def _init_render_worker() -> None:
+    from app.services.resources import warm_resources
+    from app.services import render_raster  # noqa: F401  (heavy imports up front)
+    warm_resources()
+
+
+def _noop() -> None:
+    return None
+
+
+atexit.register(shutdown_render_pool)
@@ -0,0 +1,328 @@
+"""
+Cache for rendered massing images.
+
+Massing images are a pure function of the massing model geometry, the
+renderer and its camera/canvas parameters (views are cached untitled and
+``render_3d`` draws the scenario title on after the lookup).  This module
+fingerprints those inputs and keeps the resulting PNGs in two tiers:
+
+  - memory: LRU bounded by total bytes (``settings.render_cache_memory_mb``)
+  - disk:   one PNG per view under ``settings.render_cache_dir``, evicted
+            oldest-first beyond ``settings.render_cache_disk_mb``
+
+Repeat reports for the same lot, and scenarios whose massing is identical,
+then cost a hash lookup instead of a render.
+
+The same two-tier cache keeps fetched map images (``get_map_image_cache``,
+one ``"image"`` view per entry) so report maps survive restarts and can be
+filled ahead of time by ``scripts/warm_cache.py``.  Unlike renders, map
+images come from external services that change under the same key (new
+zoning, new imagery), so their entries expire after
+``settings.map_cache_max_age_hours``.
+
+Invalidations (``invalidation``) for the ``render`` / ``map_images``
+namespaces clear both tiers of the matching cache.  An ``all`` message,
+which every worker also applies on resubscribing, clears only the memory
+tiers: the disk directories are shared by all workers and would otherwise
+be wiped on every bus reconnect.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import settings
+from app.services.invalidation import Invalidation, register_handler
+from app.services.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Bump when renderer output changes for the same inputs
+RENDER_CACHE_VERSION = 2
+
+VIEWS = ("perspective", "plan")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "output", "render_cache")
+DEFAULT_MAP_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "output", "map_cache")
+
+
+# ──────────────────────────────────────────────────────────────────
+# FINGERPRINT
+# ──────────────────────────────────────────────────────────────────
+
+def massing_fingerprint(
+    massing_model: dict,
+    renderer: str,
+    camera: Optional[dict] = None,
+) -> str:
+    """Hash everything the renderers draw from a massing model.
+
+    Only the fields the views actually read are included (lot and buildable
+    polygons, floors, bulkhead, summary stats, total height), so the derived
+    mesh and warnings don't cause spurious misses.
+    """
+    scenarios = massing_model.get("scenarios") or [{}]
+    scenario = scenarios[0]
+    payload = {
+        "v": RENDER_CACHE_VERSION,
+        "renderer": renderer,
+        "camera": camera or {},
+        "lot": massing_model.get("lot"),
+        "buildable": massing_model.get("buildable_footprint"),
+        "height": massing_model.get("total_height_ft"),
+        "floors": scenario.get("floors"),
+        "bulkhead": scenario.get("bulkhead"),
+        "summary": scenario.get("summary"),
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# ──────────────────────────────────────────────────────────────────
+# TWO-TIER CACHE
+# ──────────────────────────────────────────────────────────────────
+
+class RenderCache:
+    """Bounded memory + disk cache of ``{view: image bytes}`` entries.
+
+    Every entry has the same *views* (``{"perspective", "plan"}`` for
+    massing renders).  With *max_age* (seconds), entries older than that
+    are misses; on disk a file's mtime is when it was stored and its
+    atime when it was last used.
+    """
+
+    def __init__(self, memory_bytes: int, disk_dir: Optional[str], disk_bytes: int,
+                 views: tuple[str, ...] = VIEWS, max_age: Optional[float] = None):
+        self.views = views
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir if disk_dir and disk_bytes > 0 else None
+        self.disk_bytes = disk_bytes
+        self.max_age = max_age
+        self._memory: OrderedDict[str, tuple[float, dict[str, bytes]]] = OrderedDict()
+        self._memory_used = 0
+        self._disk_used: Optional[int] = None  # Scanned lazily
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict[str, bytes]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._fresh(entry[0]):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._memory_pop(key)
+
+        entry = self._disk_get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._memory_put(key, *entry)
+        return entry[1]
+
+    def put(self, key: str, views: dict[str, bytes]) -> None:
+        # Failed renders come back as empty bytes; don't pin those
+        if not all(views.get(v) for v in self.views):
+            return
+        stored = time.time()
+        with self._lock:
+            self._memory_put(key, stored, views)
+        self._disk_put(key, views)
+
+    def clear(self, disk: bool = True) -> None:
+        """Drop every entry from memory and, with *disk*, from disk too."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+        if not disk or not self.disk_dir:
+            return
+        try:
+            entries = list(os.scandir(self.disk_dir))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name.endswith(".png"):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass  # Another worker got there first
+        with self._lock:
+            self._disk_used = None
+
+    def _fresh(self, stored: float) -> bool:
+        return self.max_age is None or time.time() - stored < self.max_age
+
+    # ── Memory tier ──
+
+    def _memory_put(self, key: str, stored: float, views: dict[str, bytes]) -> None:
+        size = _views_size(views)
+        if size > self.memory_bytes:
+            return
+        self._memory_pop(key)
+        self._memory[key] = (stored, views)
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_used -= _views_size(evicted)
+
+    def _memory_pop(self, key: str) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= _views_size(old[1])
+
+    # ── Disk tier ──
+
+    def _path(self, key: str, view: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.{view}.png")
+
+    def _disk_get(self, key: str) -> Optional[tuple[float, dict[str, bytes]]]:
+        """(time stored, views) from disk, or None if missing or expired."""
+        if not self.disk_dir:
+            return None
+        views = {}
+        stored = time.time()
+        try:
+            for view in self.views:
+                path = self._path(key, view)
+                written = os.stat(path).st_mtime
+                if not self._fresh(written):
+                    os.remove(path)
+                    return None
+                stored = min(stored, written)
+                with open(path, "rb") as f:
+                    views[view] = f.read()
+                os.utime(path, (time.time(), written))  # Mark as recently used for eviction
+        except OSError:
+            return None
+        return stored, views
+
+    def _disk_put(self, key: str, views: dict[str, bytes]) -> None:
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            for view in self.views:
+                path = self._path(key, view)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(views[view])
+                os.replace(tmp, path)
+            with self._lock:
+                if self._disk_used is None:
+                    self._disk_used = _dir_size(self.disk_dir)
+                else:
+                    self._disk_used += _views_size(views)
+                over = self._disk_used > self.disk_bytes
+            if over:
+                self._disk_evict()
+        except OSError as e:
+            logger.warning("Render cache write failed: %s", e)
+
+    def _disk_evict(self) -> None:
+        """Delete least recently used PNGs until under 90% of the limit."""
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".png"):
+                st = entry.stat()
+                entries.append((st.st_atime, st.st_size, entry.path))
+        entries.sort()
+        used = sum(size for _, size, _ in entries)
+        target = self.disk_bytes * 0.9
+        for _, size, path in entries:
+            if used <= target:
+                break
+            try:
+                os.remove(path)
+                used -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_used = used
+
+
+def _views_size(views: dict[str, bytes]) -> int:
+    return sum(len(v) for v in views.values())
+
+
+def _dir_size(path: str) -> int:
+    return sum(e.stat().st_size for e in os.scandir(path) if e.name.endswith(".png"))
+
+
+# ──────────────────────────────────────────────────────────────────
+# SHARED INSTANCE
+# ──────────────────────────────────────────────────────────────────
+
+_cache: Optional[RenderCache] = None
+_map_cache: Optional[RenderCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """Return the process-wide render cache configured from settings."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RenderCache(
+                memory_bytes=settings.render_cache_memory_mb * 1024 * 1024,
+                disk_dir=settings.render_cache_dir or DEFAULT_CACHE_DIR,
+                disk_bytes=settings.render_cache_disk_mb * 1024 * 1024,
+            )
+        return _cache
+
+
+def get_map_image_cache() -> RenderCache:
+    """Return the process-wide map image cache configured from settings."""
+    global _map_cache
+    with _cache_lock:
+        if _map_cache is None:
+            _map_cache = RenderCache(
+                memory_bytes=settings.map_cache_memory_mb * 1024 * 1024,
+                disk_dir=settings.map_cache_dir or DEFAULT_MAP_CACHE_DIR,
+                disk_bytes=settings.map_cache_disk_mb * 1024 * 1024,
+                views=("image",),
+                max_age=settings.map_cache_max_age_hours * 3600 or None,
+            )
+        return _map_cache
+
+
+def _apply_invalidation(message: Invalidation) -> None:
+    for cache, namespace in ((_cache, "render"), (_map_cache, "map_images")):
+        if cache is None:
+            continue
+        if message.kind == "namespace" and message.value == namespace:
+            cache.clear()
+        elif message.kind == "all":
+            cache.clear(disk=False)
+
+
+register_handler(_apply_invalidation)
+
+
+def _render_cache_requests():
+    cache = _cache
+    if cache is not None:
+        yield {"result": "hit"}, cache.hits
+        yield {"result": "miss"}, cache.misses
+
+
+def _render_cache_hit_ratio():
+    cache = _cache
+    if cache is not None and cache.hits + cache.misses:
+        yield {}, cache.hits / (cache.hits + cache.misses)
+
+
+register_collector("render_cache_requests_total", "Massing render cache lookups by result",
+                   "counter", _render_cache_requests)
+register_collector("render_cache_hit_ratio", "Massing render cache hits / lookups",
+                   "gauge", _render_cache_hit_ratio)
@@ -0,0 +1,625 @@
+"""
+Software-rasterized 3D massing renderer for PDF report embedding.
+
+A faster alternative to the matplotlib ``mplot3d`` renderer in
+``render_3d.py``.  The massing mesh is projected with NumPy using the same
+camera model as ``mplot3d`` (elevation/azimuth, 4:4:3 box aspect) and the
+shaded faces are painted back-to-front directly with Pillow.  No figure,
+axes or artist machinery is involved; ``scripts/bench_render_3d.py``
+measures about 105 ms per scenario (both views) against about 550 ms with
+matplotlib for an R7A 50x100 lot, roughly 5x faster.
+
+Images are drawn at ``SUPERSAMPLE``× resolution and downsampled with a
+Lanczos filter for anti-aliasing.  Face colors and shading come from the
+same helpers as the matplotlib renderer so both backends produce matching
+output; select the backend with ``settings.massing_renderer``.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import os
+from functools import lru_cache
+
+import matplotlib
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app.services.render_3d import (
+    USE_COLORS, USE_LABELS, _extrude_floor_faces, _hex_to_rgb, _plan_title,
+)
+
+SUPERSAMPLE = 2
+
+TITLE_COLOR = (26, 26, 46)        # #1a1a2e
+TEXT_COLOR = (51, 51, 51)         # #333333
+MUTED_COLOR = (136, 136, 136)     # #888888
+DIM_RED = (217, 74, 74)           # #D94A4A
+DIM_BLUE = (44, 95, 138)          # #2C5F8A
+YARD_RED = (204, 68, 68)          # #CC4444
+BUILDABLE_BLUE = (74, 144, 217)   # #4A90D9
+EDGE_GREY = (64, 64, 64)
+BOX_ASPECT = np.array([4.0, 4.0, 3.0])  # mplot3d default box aspect
+EYE_DISTANCE = 10.0                      # mplot3d camera distance (box units)
+
+# Same typeface as the matplotlib renderer (bundled with matplotlib)
+_MPL_FONT_DIR = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+
+
+# ──────────────────────────────────────────────────────────────────
+# DRAWING PRIMITIVES
+# ──────────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=32)
+def _font(size_pt: float, dpi: int, bold: bool = False) -> ImageFont.FreeTypeFont:
+    """DejaVu Sans sized in points at *dpi*, scaled for supersampling."""
+    size = max(1, round(size_pt * dpi / 72 * SUPERSAMPLE))
+    name = "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"
+    try:
+        return ImageFont.truetype(os.path.join(_MPL_FONT_DIR, name), size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+def _px(pt: float, dpi: int) -> int:
+    """Convert a line width in points to supersampled pixels."""
+    return max(1, round(pt * dpi / 72 * SUPERSAMPLE))
+
+
+def _rgb(color) -> tuple[int, int, int]:
+    """Accept '#RRGGBB', a 0-1 float tuple or a 0-255 int tuple; return 0-255 RGB."""
+    if isinstance(color, str):
+        color = _hex_to_rgb(color)
+    elif all(isinstance(c, int) for c in color[:3]):
+        return tuple(color[:3])
+    return tuple(int(round(c * 255)) for c in color[:3])
+
+
+def _rgba(color, alpha: float) -> tuple[int, int, int, int]:
+    return (*_rgb(color), int(round(alpha * 255)))
+
+
+def _text(
+    img: Image.Image, draw: ImageDraw.ImageDraw, xy, text: str, font,
+    fill=TEXT_COLOR, anchor: str = "mm", angle: float = 0.0,
+    box=None, pad: int = 4,
+) -> None:
+    """Draw (optionally rotated, optionally boxed) text at *xy*."""
+    if not angle:
+        if box:
+            l, t, r, b = draw.textbbox(xy, text, font=font, anchor=anchor, align="center")
+            draw.rounded_rectangle([l - pad, t - pad, r + pad, b + pad],
+                                   radius=pad, fill=box)
+        draw.text(xy, text, font=font, fill=fill, anchor=anchor, align="center")
+        return
+
+    l, t, r, b = font.getbbox(text)
+    tile = Image.new("RGBA", (r - l + 2 * pad, b - t + 2 * pad), (255, 255, 255, 0))
+    tile_draw = ImageDraw.Draw(tile)
+    if box:
+        tile_draw.rounded_rectangle([0, 0, tile.width - 1, tile.height - 1],
+                                    radius=pad, fill=box)
+    tile_draw.text((pad - l, pad - t), text, font=font, fill=fill)
+    tile = tile.rotate(angle, expand=True, resample=Image.BICUBIC)
+    img.paste(tile, (int(xy[0] - tile.width / 2), int(xy[1] - tile.height / 2)), tile)
+
+
+def _dashed(draw: ImageDraw.ImageDraw, pts, fill, width: int, dash: float, gap: float) -> None:
+    """Draw a dashed polyline through *pts*."""
+    for (x0, y0), (x1, y1) in zip(pts, pts[1:]):
+        seg = math.hypot(x1 - x0, y1 - y0)
+        if seg == 0:
+            continue
+        ux, uy = (x1 - x0) / seg, (y1 - y0) / seg
+        t = 0.0
+        while t < seg:
+            t2 = min(t + dash, seg)
+            draw.line([(x0 + ux * t, y0 + uy * t), (x0 + ux * t2, y0 + uy * t2)],
+                      fill=fill, width=width)
+            t += dash + gap
+
+
+def _arrow(draw: ImageDraw.ImageDraw, p0, p1, fill, width: int, head: float, both: bool = False) -> None:
+    """Draw a line from *p0* to *p1* with an arrowhead at *p1* (and *p0*)."""
+    draw.line([p0, p1], fill=fill, width=width)
+    ends = [(p0, p1), (p1, p0)] if both else [(p0, p1)]
+    for (ax, ay), (bx, by) in ends:
+        ang = math.atan2(by - ay, bx - ax)
+        left = (bx - head * math.cos(ang - 0.4), by - head * math.sin(ang - 0.4))
+        right = (bx - head * math.cos(ang + 0.4), by - head * math.sin(ang + 0.4))
+        draw.polygon([(bx, by), left, right], fill=fill)
+
+
+def _finish(img: Image.Image, width: int, height: int) -> bytes:
+    """Downsample the supersampled canvas and encode as PNG."""
+    if SUPERSAMPLE > 1:
+        img = img.reduce(SUPERSAMPLE)
+        if img.size != (width, height):
+            img = img.resize((width, height), Image.BILINEAR)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+# ──────────────────────────────────────────────────────────────────
+# CAMERA
+# ──────────────────────────────────────────────────────────────────
+
+class _Camera:
+    """Perspective camera mirroring mplot3d's elevation/azimuth view.
+
+    Data coordinates are normalized into the 4:4:3 axes box (like
+    ``mplot3d`` does with independent x/y/z limits), rotated into view
+    space, divided by distance from an eye ``EYE_DISTANCE`` box units
+    away, and fitted into the pixel *viewport* ``(left, top, w, h)``.
+    """
+
+    def __init__(self, limits, elevation: float, azimuth: float, viewport):
+        lo = np.array([lim[0] for lim in limits], dtype=float)
+        span = np.array([lim[1] - lim[0] for lim in limits], dtype=float)
+        span[span == 0] = 1.0
+        self.lo, self.span = lo, span
+
+        el, az = math.radians(elevation), math.radians(azimuth)
+        self.eye = np.array([math.cos(el) * math.cos(az), math.cos(el) * math.sin(az), math.sin(el)])
+        self.basis = np.array([
+            [-math.sin(az), math.cos(az), 0.0],
+            [-math.sin(el) * math.cos(az), -math.sin(el) * math.sin(az), math.cos(el)],
+        ])
+
+        corners = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)]) * BOX_ASPECT
+        uv = self._view(corners - BOX_ASPECT / 2)
+        (umin, vmin), (umax, vmax) = uv.min(axis=0), uv.max(axis=0)
+        left, top, vw, vh = viewport
+        self.scale = min(vw / (umax - umin), vh / (vmax - vmin))
+        self.cx = left + vw / 2 - (umin + umax) / 2 * self.scale
+        self.cy = top + vh / 2 + (vmin + vmax) / 2 * self.scale
+
+    def normalize(self, pts) -> np.ndarray:
+        return (np.asarray(pts, dtype=float) - self.lo) / self.span * BOX_ASPECT - BOX_ASPECT / 2
+
+    def _view(self, n: np.ndarray) -> np.ndarray:
+        """Normalized box coordinates → perspective-divided view plane."""
+        persp = EYE_DISTANCE / (EYE_DISTANCE - n @ self.eye)
+        return (n @ self.basis.T) * persp[:, None]
+
+    def project(self, pts) -> tuple[list[tuple[float, float]], float]:
+        """Project 3D points to screen; return (pixels, mean depth)."""
+        n = self.normalize(pts)
+        uv = self._view(n)
+        xs = self.cx + uv[:, 0] * self.scale
+        ys = self.cy - uv[:, 1] * self.scale
+        return list(zip(xs.tolist(), ys.tolist())), float((n @ self.eye).mean())
+
+    def point(self, x: float, y: float, z: float) -> tuple[float, float]:
+        return self.project([[x, y, z]])[0][0]
+
+    def faces_viewer(self, footprint) -> list[bool]:
+        """For each footprint edge, whether its side face faces the camera."""
+        ring = self.normalize([[p[0], p[1], 0.0] for p in footprint])[:, :2]
+        nxt = np.roll(ring, -1, axis=0)
+        signed_area = float(np.sum(ring[:, 0] * nxt[:, 1] - nxt[:, 0] * ring[:, 1]))
+        orient = 1.0 if signed_area >= 0 else -1.0
+        d = nxt - ring
+        # Outward normal of a CCW ring is (dy, -dx)
+        normals = np.stack([d[:, 1], -d[:, 0]], axis=1) * orient
+        return (normals @ self.eye[:2] > 0).tolist()
+
+
+# ──────────────────────────────────────────────────────────────────
+# PERSPECTIVE (3D) VIEW
+# ──────────────────────────────────────────────────────────────────
+
+def render_perspective_view_raster(
+    massing_model: dict,
+    scenario_name: str = "",
+    width: int = 800,
+    height: int = 550,
+    dpi: int = 150,
+    elevation: float = 25,
+    azimuth: float = -50,
+    title: bool = True,
+) -> bytes:
+    """Rasterized equivalent of ``render_3d.render_perspective_view``.
+
+    Returns:
+        PNG image bytes (empty if the model has no floors).
+    """
+    scenarios = massing_model.get("scenarios", [])
+    if not scenarios:
+        return b""
+    scenario = scenarios[0]
+    floors = scenario.get("floors", [])
+    if not floors:
+        return b""
+
+    lot_poly = massing_model.get("lot", {}).get("polygon", [])
+    buildable_poly = massing_model.get("buildable_footprint", {}).get("polygon", [])
+    bulkhead = scenario.get("bulkhead")
+    total_height = massing_model.get("total_height_ft", 0)
+
+    all_x = [pt[0] for f in floors for pt in f.get("footprint", [])] + [pt[0] for pt in lot_poly]
+    all_y = [pt[1] for f in floors for pt in f.get("footprint", [])] + [pt[1] for pt in lot_poly]
+    if not all_x:
+        return b""
+    all_z = [0] + [f.get("elevation_ft", 0) + f.get("height_ft", 0) for f in floors]
+
+    x_min, x_max = min(all_x), max(all_x)
+    y_min, y_max = min(all_y), max(all_y)
+    z_max = max(all_z) or 50
+    x_pad = max((x_max - x_min) * 0.15, 5)
+    y_pad = max((y_max - y_min) * 0.15, 5)
+    z_pad = z_max * 0.1
+
+    s = SUPERSAMPLE
+    W, H = width * s, height * s
+    img = Image.new("RGB", (W, H), "white")
+    draw = ImageDraw.Draw(img, "RGBA")
+
+    # Same layout fractions as the matplotlib figure (3D axes on the left 78%)
+    title_h = _font(10, dpi).size * 2 if title else 0
+    viewport = (0.02 * W, title_h, 0.78 * W, H - title_h - 0.02 * H)
+    cam = _Camera(
+        [(x_min - x_pad, x_max + x_pad), (y_min - y_pad, y_max + y_pad), (0, z_max + z_pad)],
+        elevation, azimuth, viewport,
+    )
+    thin = _px(0.5, dpi)
+
+    # ── Ground plane and buildable footprint ──
+    if len(lot_poly) >= 3:
+        pix, _ = cam.project([[p[0], p[1], 0] for p in lot_poly])
+        draw.polygon(pix, fill=_rgba((0.85, 0.85, 0.85), 0.15))
+        draw.line(pix + [pix[0]], fill=_rgba((0.5, 0.5, 0.5), 0.8), width=_px(1.0, dpi))
+    if len(buildable_poly) >= 3:
+        pix, _ = cam.project([[p[0], p[1], 0] for p in buildable_poly])
+        draw.polygon(pix, fill=_rgba(BUILDABLE_BLUE, 0.2))
+        _dashed(draw, pix + [pix[0]], _rgba(BUILDABLE_BLUE, 0.5), _px(0.8, dpi), 6 * s, 4 * s)
+
+    # ── Floors + bulkhead: painter's algorithm ──
+    # Floors are stacked prisms, so paint bottom-to-top; within a floor,
+    # paint the camera-facing side faces far-to-near, then the top face.
+    solids = []
+    for floor in floors:
+        fp = floor.get("footprint", [])
+        if len(fp) < 3:
+            continue
+        z_bot = floor.get("elevation_ft", 0)
+        z_top = z_bot + floor.get("height_ft", 10)
+        use = floor.get("use", "residential")
+        solids.append((z_bot, fp, z_top, floor.get("color", USE_COLORS.get(use, "#CCCCCC"))))
+    if bulkhead and len(bulkhead.get("footprint") or []) >= 3:
+        bh_bot = bulkhead.get("elevation_ft", z_max)
+        solids.append((bh_bot, bulkhead["footprint"], bh_bot + bulkhead.get("height_ft", 15),
+                       bulkhead.get("color", "#777777")))
+
+    polys = []
+    for order, (z_bot, fp, z_top, color) in enumerate(sorted(solids, key=lambda sd: sd[0])):
+        faces = _extrude_floor_faces(fp, z_bot, z_top, color)
+        visible = cam.faces_viewer(fp)
+        for (verts, rgba), show in zip(faces[1:], visible):
+            if show:
+                pix, depth = cam.project(verts)
+                polys.append(((order, 0, depth), pix, rgba))
+        pix, depth = cam.project(faces[0][0])
+        polys.append(((order, 1, depth), pix, faces[0][1]))
+
+    for _, pix, rgba in sorted(polys, key=lambda p: p[0]):
+        # Stroke separately: polygon(width>1) composites a full-canvas mask
+        draw.polygon(pix, fill=_rgb(rgba))
+        draw.line(pix + pix[:1], fill=EDGE_GREY, width=thin)
+
+    # ── Floor labels ──
+    label_font = _font(4.5, dpi)
+    for floor in floors:
+        fp = floor.get("footprint", [])
+        if not fp:
+            continue
+        floor_num = floor.get("floor_num", floor.get("floor", 0))
+        floor_area = floor.get("gross_area_sf", floor.get("plate_area_sf", 0))
+        z_mid = floor.get("elevation_ft", 0) + floor.get("height_ft", 10) / 2
+        fp_arr = np.array(fp)
+        lx, ly = fp_arr[int(np.argmax(fp_arr[:, 0] - fp_arr[:, 1]))]
+        area_str = f"F{floor_num} ({floor_area:,.0f} SF)" if floor_area else f"F{floor_num}"
+        draw.text(cam.point(lx + 2, ly - 2, z_mid), area_str, font=label_font,
+                  fill=TEXT_COLOR, anchor="lm")
+
+    # ── Dimension annotations ──
+    if total_height > 0:
+        fp_arr = np.array(floors[0].get("footprint", [[0, 0]]))
+        rx = fp_arr[:, 0].max() + 8
+        ry = fp_arr[:, 1].mean()
+        draw.line([cam.point(rx, ry, 0), cam.point(rx, ry, total_height)],
+                  fill=DIM_RED, width=_px(1.5, dpi))
+        for z in (0, total_height):
+            draw.line([cam.point(rx - 1, ry, z), cam.point(rx + 1, ry, z)],
+                      fill=DIM_RED, width=_px(1.0, dpi))
+        draw.text(cam.point(rx + 3, ry, total_height / 2), f"{total_height:.0f} ft",
+                  font=_font(6, dpi), fill=DIM_RED, anchor="lm")
+
+        rx2 = rx - 4
+        tick_font = _font(4, dpi)
+        for floor in sorted(floors, key=lambda f: f.get("elevation_ft", 0)):
+            z_bot = floor.get("elevation_ft", 0)
+            ht = floor.get("height_ft", 10)
+            draw.line([cam.point(rx2, ry, z_bot), cam.point(rx2 + 2, ry, z_bot)],
+                      fill=MUTED_COLOR, width=thin)
+            draw.text(cam.point(rx2 - 1, ry, z_bot + ht / 2), f"{ht:.0f}'",
+                      font=tick_font, fill=MUTED_COLOR, anchor="rm")
+        draw.line([cam.point(rx2, ry, total_height), cam.point(rx2 + 2, ry, total_height)],
+                  fill=MUTED_COLOR, width=thin)
+
+        if len(fp_arr) >= 2:
+            y_front, y_rear = fp_arr[:, 1].min(), fp_arr[:, 1].max()
+            x_left, x_right = fp_arr[:, 0].min(), fp_arr[:, 0].max()
+            z_dim = -3
+            dim_font = _font(5, dpi)
+            draw.line([cam.point(x_left, y_front - 2, z_dim), cam.point(x_right, y_front - 2, z_dim)],
+                      fill=DIM_BLUE, width=_px(1.0, dpi))
+            draw.text(cam.point((x_left + x_right) / 2, y_front - 4, z_dim),
+                      f"{x_right - x_left:.0f}'", font=dim_font, fill=DIM_BLUE, anchor="ma")
+            draw.line([cam.point(x_left - 2, y_front, z_dim), cam.point(x_left - 2, y_rear, z_dim)],
+                      fill=DIM_BLUE, width=_px(1.0, dpi))
+            draw.text(cam.point(x_left - 4, (y_front + y_rear) / 2, z_dim),
+                      f"{y_rear - y_front:.0f}'", font=dim_font, fill=DIM_BLUE, anchor="rm")
+
+    # ── Title ──
+    if title:
+        draw.text((0.02 * W + 0.78 * W / 2, title_h / 2), scenario_name or "Building Massing",
+                  font=_font(10, dpi, bold=True), fill=TITLE_COLOR, anchor="mm")
+
+    # ── Legend (right side) ──
+    used_colors: dict[str, str] = {}
+    for floor in sorted(floors, key=lambda f: f.get("elevation_ft", 0)):
+        if len(floor.get("footprint", [])) < 3:
+            continue
+        use = floor.get("use", "residential")
+        label = USE_LABELS.get(use, use.replace("_", " ").title())
+        used_colors.setdefault(label, floor.get("color", USE_COLORS.get(use, "#CCCCCC")))
+    if bulkhead and bulkhead.get("footprint"):
+        used_colors["Bulkhead"] = bulkhead.get("color", "#777777")
+
+    def _axes_pt(ax_rect, fx, fy):
+        left, bottom, aw, ah = ax_rect
+        return (left + fx * aw) * W, (1 - (bottom + fy * ah)) * H
+
+    if used_colors:
+        legend_rect = (0.80, 0.30, 0.18, 0.40)
+        draw.text(_axes_pt(legend_rect, 0.0, 1.02), "Uses", font=_font(8, dpi, bold=True),
+                  fill=TITLE_COLOR, anchor="ld")
+        item_font = _font(7, dpi)
+        for i, (label, color_hex) in enumerate(used_colors.items()):
+            y = 0.9 - i * 0.15
+            x0, y0 = _axes_pt(legend_rect, 0.05, y + 0.04)
+            x1, y1 = _axes_pt(legend_rect, 0.20, y - 0.04)
+            draw.rectangle([x0, y0, x1, y1], fill=_rgb(color_hex), outline=(102, 102, 102), width=thin)
+            draw.text(_axes_pt(legend_rect, 0.25, y), label, font=item_font,
+                      fill=TEXT_COLOR, anchor="lm")
+
+    # ── Summary stats ──
+    summary = scenario.get("summary", {})
+    stats_lines = []
+    if summary.get("total_gross_sf"):
+        stats_lines.append(f"Gross SF: {summary['total_gross_sf']:,.0f}")
+    if summary.get("floors"):
+        stats_lines.append(f"Floors: {summary['floors']}")
+    if summary.get("max_height"):
+        stats_lines.append(f"Height: {summary['max_height']:.0f} ft")
+    if summary.get("units"):
+        stats_lines.append(f"Units: {summary['units']}")
+    if summary.get("far_used"):
+        stats_lines.append(f"FAR: {summary['far_used']:.2f}")
+    stats_rect = (0.80, 0.05, 0.18, 0.22)
+    for i, line in enumerate(stats_lines):
+        draw.text(_axes_pt(stats_rect, 0.05, 0.9 - i * 0.18), line, font=_font(7, dpi),
+                  fill=TEXT_COLOR, anchor="la")
+
+    return _finish(img, width, height)
+
+
+# ──────────────────────────────────────────────────────────────────
+# PLAN (TOP-DOWN) VIEW
+# ──────────────────────────────────────────────────────────────────
+
+def render_plan_view_raster(
+    massing_model: dict,
+    scenario_name: str = "",
+    width: int = 600,
+    height: int = 600,
+    dpi: int = 150,
+    title: bool = True,
+) -> bytes:
+    """Rasterized equivalent of ``render_3d.render_plan_view``.
+
+    Returns:
+        PNG image bytes (empty if the model has no floors).
+    """
+    scenarios = massing_model.get("scenarios", [])
+    if not scenarios:
+        return b""
+    scenario = scenarios[0]
+    floors = scenario.get("floors", [])
+    if not floors:
+        return b""
+
+    lot_poly = massing_model.get("lot", {}).get("polygon", [])
+    buildable_poly = massing_model.get("buildable_footprint", {}).get("polygon", [])
+
+    all_x = [pt[0] for f in floors for pt in f.get("footprint", [])] + [pt[0] for pt in lot_poly]
+    all_y = [pt[1] for f in floors for pt in f.get("footprint", [])] + [pt[1] for pt in lot_poly]
+    if not all_x:
+        return b""
+    dx = (max(all_x) - min(all_x)) or 1.0
+    dy = (max(all_y) - min(all_y)) or 1.0
+    arrow_x = max(all_x) + dx * 0.12
+    arrow_y = max(all_y) - dy * 0.1
+    arrow_len = dy * 0.12
+
+    s = SUPERSAMPLE
+    W, H = width * s, height * s
+    img = Image.new("RGB", (W, H), "white")
+    draw = ImageDraw.Draw(img, "RGBA")
+
+    # Equal-aspect data → pixel transform (room for title and edge labels)
+    title_h = _font(10, dpi).size * 2.2 if title else 0
+    margin = 0.06 * W
+    bx0, bx1 = min(all_x) - dx * 0.1, arrow_x + dx * 0.06
+    by0, by1 = min(all_y) - dy * 0.1, arrow_y + arrow_len + dy * 0.08
+    vw, vh = W - 2 * margin, H - title_h - 2 * margin
+    scale = min(vw / (bx1 - bx0), vh / (by1 - by0))
+    ox = margin + (vw - (bx1 - bx0) * scale) / 2
+    oy = title_h + margin + (vh - (by1 - by0) * scale) / 2
+
+    def to_px(x, y):
+        return ox + (x - bx0) * scale, oy + (by1 - y) * scale
+
+    def ring(coords):
+        pix = [to_px(p[0], p[1]) for p in coords]
+        return pix + [pix[0]]
+
+    def edge_label(p1, p2, offset, size_pt, color):
+        ex, ey = p2[0] - p1[0], p2[1] - p1[1]
+        length = math.hypot(ex, ey)
+        if length < 1.0:
+            return
+        lx = (p1[0] + p2[0]) / 2 - ey / length * offset
+        ly = (p1[1] + p2[1]) / 2 + ex / length * offset
+        angle = math.degrees(math.atan2(ey, ex))
+        if angle > 90:
+            angle -= 180
+        elif angle < -90:
+            angle += 180
+        _text(img, draw, to_px(lx, ly), f"{length:.0f}'", _font(size_pt, dpi),
+              fill=_rgb(color), angle=angle, box=(255, 255, 255, 204), pad=2 * s)
+
+    # ── Lot boundary ──
+    if len(lot_poly) >= 3:
+        pix = ring(lot_poly)
+        draw.polygon(pix[:-1], fill=_rgba("#999999", 0.05))
+        _dashed(draw, pix, (102, 102, 102), _px(1.5, dpi), 7 * s, 4 * s)
+        for k in range(len(lot_poly)):
+            edge_label(lot_poly[k], lot_poly[(k + 1) % len(lot_poly)], 3.5, 6, "#555555")
+
+    # ── Buildable footprint + yard dimensions ──
+    if len(buildable_poly) >= 3:
+        pix = ring(buildable_poly)
+        draw.polygon(pix[:-1], fill=_rgba(BUILDABLE_BLUE, 0.20))
+        draw.line(pix, fill=BUILDABLE_BLUE, width=_px(2.0, dpi), joint="curve")
+        for k in range(len(buildable_poly)):
+            edge_label(buildable_poly[k], buildable_poly[(k + 1) % len(buildable_poly)],
+                       2.0, 5.5, "#2C5F8A")
+
+        if len(lot_poly) >= 3:
+            lot_arr, bp_arr = np.array(lot_poly), np.array(buildable_poly)
+            lot_minx, lot_miny = lot_arr.min(axis=0)
+            lot_maxx, lot_maxy = lot_arr.max(axis=0)
+            bp_minx, bp_miny = bp_arr.min(axis=0)
+            bp_maxx, bp_maxy = bp_arr.max(axis=0)
+            yard_font = _font(5, dpi)
+            lw, head = _px(0.8, dpi), 5 * s
+            box = (255, 255, 255, 204)
+            mid_x = (bp_minx + bp_maxx) / 2
+            mid_y = (bp_miny + bp_maxy) / 2
+            yards = [
+                (lot_maxy - bp_maxy, (mid_x, lot_maxy), (mid_x, bp_maxy), "Rear: {:.0f}'"),
+                (bp_miny - lot_miny, (mid_x, lot_miny), (mid_x, bp_miny), "Front: {:.0f}'"),
+                (bp_minx - lot_minx, (lot_minx, mid_y), (bp_minx, mid_y), "{:.0f}'"),
+                (lot_maxx - bp_maxx, (lot_maxx, mid_y), (bp_maxx, mid_y), "{:.0f}'"),
+            ]
+            for gap, a, b, fmt in yards:
+                if gap > 1:
+                    _arrow(draw, to_px(*a), to_px(*b), YARD_RED, lw, head, both=True)
+                    _text(img, draw, to_px((a[0] + b[0]) / 2, (a[1] + b[1]) / 2),
+                          fmt.format(gap), yard_font, fill=YARD_RED, box=box, pad=2 * s)
+
+    # ── Floor plate groups (consecutive floors with the same footprint) ──
+    floor_groups: list[dict] = []
+    for floor in sorted(floors, key=lambda f: f.get("floor_num", f.get("floor", 0))):
+        fp = floor.get("footprint", [])
+        if len(fp) < 3:
+            continue
+        fp_key = tuple(tuple(round(c, 1) for c in p) for p in fp)
+        floor_num = floor.get("floor_num", floor.get("floor", 0))
+        if floor_groups and floor_groups[-1]["fp_key"] == fp_key:
+            floor_groups[-1]["floor_nums"].append(floor_num)
+            continue
+        use = floor.get("use", "residential")
+        floor_groups.append({
+            "fp_key": fp_key,
+            "footprint": fp,
+            "floor_nums": [floor_num],
+            "use": use,
+            "color": floor.get("color", USE_COLORS.get(use, "#CCCCCC")),
+            "area": floor.get("gross_area_sf", floor.get("plate_area_sf", 0)),
+        })
+
+    label_font = _font(6, dpi)
+    for i, group in enumerate(sorted(floor_groups, key=lambda g: g["area"], reverse=True)):
+        pix = ring(group["footprint"])
+        color = _rgb(group["color"])
+        draw.polygon(pix[:-1], fill=(*color, int(min(0.15 + i * 0.08, 0.5) * 255)))
+        draw.line(pix, fill=color, width=_px(max(1.5 - i * 0.2, 0.3), dpi), joint="curve")
+
+        nums = group["floor_nums"]
+        if len(nums) == 1:
+            floor_label = f"F{nums[0]}"
+        elif nums[-1] - nums[0] == len(nums) - 1:
+            floor_label = f"F{nums[0]}-{nums[-1]}"
+        else:
+            floor_label = f"F{','.join(str(n) for n in nums)}"
+        area_label = f"{group['area']:,.0f} SF" if group["area"] else ""
+        use_label = USE_LABELS.get(group["use"], group["use"].title())
+        fp_arr = np.array(group["footprint"])
+        _text(img, draw, to_px(fp_arr[:, 0].mean(), fp_arr[:, 1].mean()),
+              f"{floor_label}\n{use_label}\n{area_label}", label_font,
+              fill=TITLE_COLOR, box=(255, 255, 255, 217), pad=3 * s)
+
+    # ── North arrow ──
+    _arrow(draw, to_px(arrow_x, arrow_y), to_px(arrow_x, arrow_y + arrow_len),
+           TEXT_COLOR, _px(1.5, dpi), 6 * s)
+    tip_x, tip_y = to_px(arrow_x, arrow_y + arrow_len)
+    draw.text((tip_x, tip_y - 2 * s), "N", font=_font(8, dpi), fill=TEXT_COLOR, anchor="md")
+
+    # ── Title ──
+    if title:
+        draw.text((W / 2, title_h / 2), _plan_title(scenario_name),
+                  font=_font(10, dpi, bold=True), fill=TITLE_COLOR, anchor="mm")
+
+    # ── Buildable area note (lower-left) ──
+    bp_area = massing_model.get("buildable_footprint", {}).get("area_sf", 0)
+    lot_area_sf = massing_model.get("lot", {}).get("area_sf", 0)
+    if bp_area and lot_area_sf:
+        area_text = f"Buildable: {bp_area:,.0f} SF ({bp_area / lot_area_sf * 100:.0f}% coverage)"
+    elif bp_area:
+        area_text = f"Buildable: {bp_area:,.0f} SF"
+    else:
+        area_text = ""
+    if area_text:
+        tx, ty = margin, H - margin * 0.6
+        l, t, r, b = draw.textbbox((tx, ty), area_text, font=_font(6, dpi), anchor="ld")
+        pad = 4 * s
+        draw.rounded_rectangle([l - pad, t - pad, r + pad, b + pad], radius=pad,
+                               fill=(255, 255, 255, 230), outline=BUILDABLE_BLUE, width=s)
+        draw.text((tx, ty), area_text, font=_font(6, dpi), fill=DIM_BLUE, anchor="ld")
+
+    # ── Legend (lower-right) ──
+    legend_font = _font(6, dpi)
+    entries = [("Lot Boundary", (102, 102, 102), True), ("Buildable Footprint", BUILDABLE_BLUE, False)]
+    line_len, row_h, pad = 18 * s, legend_font.size * 1.6, 4 * s
+    text_w = max(draw.textlength(label, font=legend_font) for label, _, _ in entries)
+    box_w = line_len + 3 * pad + text_w
+    box_h = row_h * len(entries) + pad
+    bx, by = W - margin * 0.6 - box_w, H - margin * 0.6 - box_h
+    draw.rounded_rectangle([bx, by, bx + box_w, by + box_h], radius=pad,
+                           fill=(255, 255, 255, 230), outline=(204, 204, 204), width=s)
+    for i, (label, color, dashed) in enumerate(entries):
+        cy = by + pad / 2 + row_h * (i + 0.5)
+        seg = [(bx + pad, cy), (bx + pad + line_len, cy)]
+        if dashed:
+            _dashed(draw, seg, color, _px(1.5, dpi), 5 * s, 3 * s)
+        else:
+            draw.line(seg, fill=color, width=_px(2.0, dpi))
+        draw.text((bx + 2 * pad + line_len, cy), label, font=legend_font,
+                  fill=TEXT_COLOR, anchor="lm")
+
+    return _finish(img, width, height)
@@ -18,13 +18,17 @@ Sections:
 
 from __future__ import annotations
 
+import copy
 import logging
 import os
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
-from typing import Optional
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Optional
 
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -36,10 +40,17 @@ from reportlab.platypus import (
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
 from app.models.schemas import CalculationResult, DevelopmentScenario
+from app.services.resources import get_font
+from app.services.timing import span
 
 logger = logging.getLogger(__name__)
 
+# Write image and page streams as binary instead of ASCII85: 20% smaller
+# streams, and skips ReportLab's pure-Python encoder on every image.
+rl_config.useA85 = 0
+
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "output")
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024  # Streamed reports larger than this spill to disk
 
 # ── Institutional Palette (charcoal / off-white / deep blue / muted gold) ──
 BLUE = colors.HexColor('#1C3D5A')           # Deep blue (primary)
@@ -57,6 +68,7 @@ BADGE_BLUE = colors.HexColor('#E8EDF2')      # Cool badge bg
 BADGE_GREEN = colors.HexColor('#E8F0E8')     # Muted green badge
 WHITE = colors.white
 OFF_WHITE = colors.HexColor('#FAFAF8')       # Paper-white
+FOOTER_GREY = colors.HexColor('#AAAAAA')     # Footer date / page number
 
 PAGE_W, PAGE_H = letter
 MARGIN = 0.85 * inch
@@ -94,21 +106,20 @@ def _draw_logo(canvas, x, y, size="small"):
     canvas.restoreState()
 
 
-def _header_footer_first(canvas, doc):
-    """Cover page — logo + thin rule; no page number."""
-    canvas.saveState()
+HEADER_FORM_FIRST = "mrHeaderFirst"
+HEADER_FORM_LATER = "mrHeaderLater"
+
+
+def _draw_header_first(canvas, doc):
+    """Cover page header chrome: logo + thin rule."""
     _draw_logo(canvas, doc.leftMargin, PAGE_H - 38, size="small")
     canvas.setStrokeColor(GRID_COLOR)
     canvas.setLineWidth(0.5)
     canvas.line(doc.leftMargin, PAGE_H - 52, PAGE_W - doc.rightMargin, PAGE_H - 52)
-    canvas.restoreState()
-
 
-def _header_footer_later(canvas, doc):
-    """Subsequent pages — minimal header and footer."""
-    canvas.saveState()
 
-    # ── Header — thin single rule ──
+def _draw_header_later(canvas, doc):
+    """Header chrome and footer rule shared by every page after the cover."""
     _draw_logo(canvas, doc.leftMargin, PAGE_H - 38, size="small")
     canvas.setFillColor(GREY)
     canvas.setFont('Helvetica', 7.5)
@@ -117,12 +128,40 @@ def _header_footer_later(canvas, doc):
     canvas.setStrokeColor(GRID_COLOR)
     canvas.setLineWidth(0.5)
     canvas.line(doc.leftMargin, PAGE_H - 52, PAGE_W - doc.rightMargin, PAGE_H - 52)
-
-    # ── Footer — light grey, minimal ──
-    canvas.setStrokeColor(GRID_COLOR)
     canvas.setLineWidth(0.25)
     canvas.line(doc.leftMargin, 40, PAGE_W - doc.rightMargin, 40)
-    canvas.setFillColor(colors.HexColor('#AAAAAA'))
+
+
+def _draw_form(canvas, doc, name, draw):
+    """Draw constant page chrome through a Form XObject.
+
+    The chrome is drawn into the form on the first page that uses it and
+    every later page references it, so the logo paths and header text are
+    written to the PDF once per document instead of once per page.
+    """
+    if not canvas.hasForm(name):
+        canvas.beginForm(name)
+        canvas.saveState()
+        draw(canvas, doc)
+        canvas.restoreState()
+        canvas.endForm()
+    canvas.doForm(name)
+
+
+def _header_footer_first(canvas, doc):
+    """Cover page — logo + thin rule; no page number."""
+    canvas.saveState()
+    _draw_form(canvas, doc, HEADER_FORM_FIRST, _draw_header_first)
+    canvas.restoreState()
+
+
+def _header_footer_later(canvas, doc):
+    """Subsequent pages — minimal header and footer."""
+    canvas.saveState()
+    _draw_form(canvas, doc, HEADER_FORM_LATER, _draw_header_later)
+
+    # ── Footer — light grey, minimal; only the date and page number vary ──
+    canvas.setFillColor(FOOTER_GREY)
     canvas.setFont('Helvetica', 7)
     canvas.drawString(doc.leftMargin, 28,
                       datetime.now().strftime('%B %d, %Y'))
@@ -134,8 +173,13 @@ def _header_footer_later(canvas, doc):
 # STYLES
 # ──────────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=1)
 def _get_styles():
-    """Build all report paragraph styles — institutional typography."""
+    """Build all report paragraph styles — institutional typography.
+
+    Built once per process and shared by every report; treat the returned
+    stylesheet as read-only (derive variants with ``ParagraphStyle(parent=...)``).
+    """
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(
         name='ReportTitle', fontSize=30, fontName='Helvetica-Bold',
@@ -207,25 +251,173 @@ def _get_styles():
 
 
 # ──────────────────────────────────────────────────────────────────
-# TABLE, IMAGE & SECTION HELPERS
+# TEMPLATES (constant content, built once per process)
 # ──────────────────────────────────────────────────────────────────
 
-def _section_header(text, section_num=None, styles=None):
-    """Section header — thin rule beneath, no heavy bar. Architectural minimal."""
-    label = text  # Drop numbering for cleaner look
-    sty = (styles or {}).get('SectionHeaderWhite') or ParagraphStyle(
-        'SHW', fontSize=18, fontName='Helvetica-Bold', textColor=DARK, leading=24,
-    )
-    p = Paragraph(label, sty)
-    t = Table([[p]], colWidths=[CONTENT_W])
-    t.setStyle(TableStyle([
+# Constant table layouts.  Table.setStyle only reads a TableStyle, so one
+# instance per layout is shared by every table in every report.
+_TABLE_STYLES = {
+    'section_header': [
         ('BACKGROUND', (0, 0), (-1, -1), WHITE),
         ('TOPPADDING', (0, 0), (-1, -1), 10),
         ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
         ('LEFTPADDING', (0, 0), (-1, -1), 0),
         ('RIGHTPADDING', (0, 0), (-1, -1), 0),
         ('LINEBELOW', (0, 0), (-1, -1), 1, BLUE),
-    ]))
+    ],
+    # Two-column page layouts
+    'columns': [
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+    ],
+    'columns_flush_x': [
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+    ],
+    'column_stack': [
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 2),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ],
+    'column_stack_right': [
+        ('LEFTPADDING', (0, 0), (-1, -1), 2),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ],
+    'cards_outer': [
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 2),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 2),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ],
+    # Cover info bar and metric strips
+    'info_bar': [
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, 0), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 2),
+        ('TOPPADDING', (0, 1), (-1, 1), 2),
+        ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
+        ('LINEBELOW', (0, 0), (-1, 0), 0, WHITE),
+        ('LINEABOVE', (0, 0), (-1, 0), 0.5, GRID_COLOR),
+        ('LINEBELOW', (0, 1), (-1, 1), 0.5, GRID_COLOR),
+        ('BACKGROUND', (0, 0), (-1, -1), LIGHT_BG),
+    ],
+    'program_metrics': [
+        ('BACKGROUND', (0, 0), (-1, -1), LIGHT_BG),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 2),
+        ('TOPPADDING', (0, 1), (-1, 1), 0),
+        ('BOTTOMPADDING', (0, 1), (-1, 1), 10),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LINEBEFORE', (1, 0), (1, -1), 0.25, GRID_COLOR),
+        ('LINEBEFORE', (2, 0), (2, -1), 0.25, GRID_COLOR),
+        ('LINEBEFORE', (3, 0), (3, -1), 0.25, GRID_COLOR),
+    ],
+    # Map grid cells
+    'map_cell': [
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ],
+    'map_row': [
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ],
+    # Program callout cards (gold rule on the left)
+    'callout_body': [
+        ('TOPPADDING', (0, 0), (-1, -1), 1),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+    ],
+    'callout': [
+        ('BACKGROUND', (0, 0), (-1, -1), GOLD_LIGHT),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('LEFTPADDING', (0, 0), (-1, -1), 12),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('LINEBEFORE', (0, 0), (0, -1), 3, GOLD),
+    ],
+    # Development scenario case studies
+    'scenario_bar': [
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 10),
+        ('LINEBEFORE', (0, 0), (0, -1), 3, GOLD),
+        ('LINEABOVE', (0, 0), (-1, 0), 0.75, GRID_COLOR),
+    ],
+    'massing_side': [
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ],
+    'massing_image': [
+        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+    ],
+}
+
+DISCLAIMERS = (
+    "This report is for preliminary feasibility analysis only.",
+    "All calculations should be verified by a licensed architect and zoning attorney.",
+    "Special permits, variances, and certifications are not included in this analysis.",
+    "Environmental review (CEQR/SEQRA) requirements are not addressed.",
+    "Landmark and historic district restrictions may apply and are not fully evaluated.",
+    "Actual development potential should be confirmed with NYC Department of Buildings "
+    "and Department of City Planning.",
+    "3D massing renderings are diagrammatic and are not to architectural scale.",
+)
+
+
+@lru_cache(maxsize=None)
+def _table_style(name: str) -> TableStyle:
+    """Shared TableStyle for a constant layout in ``_TABLE_STYLES``."""
+    return TableStyle(_TABLE_STYLES[name])
+
+
+@lru_cache(maxsize=256)
+def _paragraph_prototype(text: str, style_name: str) -> Paragraph:
+    return Paragraph(text, _get_styles()[style_name])
+
+
+def _static_paragraph(text: str, style_name: str = 'Body') -> Paragraph:
+    """Paragraph with constant text, parsed once per process.
+
+    Layout state (wrap/split) lives on the flowable, so each report gets a
+    shallow copy of the prototype that shares its parsed fragments.
+    """
+    return copy.copy(_paragraph_prototype(text, style_name))
+
+
+def warm_templates() -> None:
+    """Prebuild the constant table styles and disclaimer paragraphs."""
+    for name in _TABLE_STYLES:
+        _table_style(name)
+    for text in DISCLAIMERS:
+        _paragraph_prototype(f"\u2022 {text}", 'SmallBody')
+
+
+# ──────────────────────────────────────────────────────────────────
+# TABLE, IMAGE & SECTION HELPERS
+# ──────────────────────────────────────────────────────────────────
+
+def _section_header(text, section_num=None, styles=None):
+    """Section header — thin rule beneath, no heavy bar. Architectural minimal."""
+    p = _static_paragraph(text, 'SectionHeaderWhite')  # Drop numbering for cleaner look
+    t = Table([[p]], colWidths=[CONTENT_W])
+    t.setStyle(_table_style('section_header'))
     return t
 
 
@@ -285,13 +477,27 @@ def _make_data_table(data: list[list[str]], col_widths=None) -> Table:
     return t
 
 
-def _image_from_bytes(image_bytes: bytes, width: float, height: float) -> RLImage:
-    """Convert raw PNG/JPEG bytes to a ReportLab Image flowable."""
+def _image_from_bytes(image_bytes: bytes, width: float, height: float,
+                      kind: str = "auto", prepare: bool = True) -> RLImage:
+    """Convert raw PNG/JPEG bytes to a ReportLab Image flowable.
+
+    Unless *prepare* is False (bytes already prepared for this placement),
+    the image is resized to *width* × *height* points at the configured
+    report DPI and re-encoded first (see ``image_prep``).
+    """
+    if prepare:
+        from app.services.image_prep import prepare_image
+        image_bytes = prepare_image(image_bytes, width, height, kind=kind)
     buf = BytesIO(image_bytes)
     return RLImage(buf, width=width, height=height)
 
 
-def _enhance_satellite_image(image_bytes: bytes, lot_geometry=None) -> bytes:
+SATELLITE_REFERENCE_PX = 800  # Overlay sizes below are designed for an 800px tile
+
+
+def _enhance_satellite_image(image_bytes: bytes, lot_geometry=None,
+                             width: Optional[float] = None,
+                             height: Optional[float] = None) -> bytes:
     """Enhance satellite image for institutional presentation.
 
     - Desaturate and darken for professional tone
@@ -299,15 +505,23 @@ def _enhance_satellite_image(image_bytes: bytes, lot_geometry=None) -> bytes:
     - Add north arrow (upper-right)
     - Add scale indicator (lower-right)
     - Add subtle vignette/shadow at edges
+
+    The image is decoded once and, when *width* × *height* (points) is
+    given, downsampled to its placement size first.  All overlays are drawn
+    on one transparent layer and composited in a single pass, scaled so they
+    keep their proportions at any output size.
     """
     try:
-        from PIL import Image as PILImage, ImageEnhance, ImageDraw, ImageFont
-        from io import BytesIO as PILBuf
+        from PIL import Image as PILImage, ImageEnhance, ImageDraw
+        from app.services.image_prep import decode_image, encode_image, placement_px, KIND_PHOTO
 
-        pil_img = PILImage.open(PILBuf(image_bytes))
-        if pil_img.mode != 'RGB':
-            pil_img = pil_img.convert('RGB')
+        size_px = placement_px(width, height) if width and height else None
+        pil_img = decode_image(image_bytes, size_px).convert('RGB')
         w, h = pil_img.size
+        s = w / SATELLITE_REFERENCE_PX
+
+        def _px(v):
+            return max(1, round(v * s))
 
         # Desaturate + darken
         enhancer = ImageEnhance.Color(pil_img)
@@ -315,7 +529,8 @@ def _enhance_satellite_image(image_bytes: bytes, lot_geometry=None) -> bytes:
         enhancer = ImageEnhance.Brightness(pil_img)
         pil_img = enhancer.enhance(0.82)
 
-        draw = ImageDraw.Draw(pil_img)
+        overlay = PILImage.new('RGBA', pil_img.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
 
         # ── Lot boundary outline ──
         if lot_geometry:
@@ -353,56 +568,55 @@ def _enhance_satellite_image(image_bytes: bytes, lot_geometry=None) -> bytes:
                         px = pad * w + (1 - 2 * pad) * w * (lng - min_lng) / lng_range
                         py = pad * h + (1 - 2 * pad) * h * (1 - (lat - min_lat) / lat_range)
                         pixels.append((px, py))
-                    # Draw boundary outline — thin white with slight glow
-                    for width_px, color in [(4, (255, 255, 255, 60)), (2, (255, 255, 255, 180))]:
-                        pil_img_rgba = pil_img.convert('RGBA')
-                        overlay = PILImage.new('RGBA', pil_img_rgba.size, (0, 0, 0, 0))
-                        overlay_draw = ImageDraw.Draw(overlay)
-                        overlay_draw.line(pixels + [pixels[0]], fill=color, width=width_px)
-                        pil_img = PILImage.alpha_composite(pil_img_rgba, overlay).convert('RGB')
-                        draw = ImageDraw.Draw(pil_img)
+                    # Boundary outline — thin white with slight glow.  Both
+                    # strokes go on their own layer so the core line doesn't
+                    # replace the glow beneath it, then join the overlay.
+                    glow = PILImage.new('RGBA', pil_img.size, (0, 0, 0, 0))
+                    glow_draw = ImageDraw.Draw(glow)
+                    glow_draw.line(pixels + [pixels[0]], fill=(255, 255, 255, 60), width=_px(4))
+                    core = PILImage.new('RGBA', pil_img.size, (0, 0, 0, 0))
+                    ImageDraw.Draw(core).line(pixels + [pixels[0]], fill=(255, 255, 255, 180),
+                                              width=_px(2))
+                    overlay = PILImage.alpha_composite(glow, core)
+                    draw = ImageDraw.Draw(overlay)
             except Exception:
                 pass  # Geometry parsing failed, skip boundary
 
+        white = (255, 255, 255, 255)
+
         # ── North arrow (upper-right corner) ──
-        arrow_x = w - 45
-        arrow_y = 20
-        arrow_len = 30
+        arrow_x = w - _px(45)
+        arrow_y = _px(20)
+        arrow_len = _px(30)
         # Stem
-        draw.line([(arrow_x, arrow_y + arrow_len), (arrow_x, arrow_y + 4)],
-                  fill=(255, 255, 255), width=2)
+        draw.line([(arrow_x, arrow_y + arrow_len), (arrow_x, arrow_y + _px(4))],
+                  fill=white, width=_px(2))
         # Arrowhead
-        draw.polygon([(arrow_x, arrow_y), (arrow_x - 6, arrow_y + 10),
-                       (arrow_x + 6, arrow_y + 10)],
-                      fill=(255, 255, 255))
+        draw.polygon([(arrow_x, arrow_y), (arrow_x - _px(6), arrow_y + _px(10)),
+                       (arrow_x + _px(6), arrow_y + _px(10))],
+                      fill=white)
         # "N" label
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 12)
-        except Exception:
-            font = ImageFont.load_default()
-        draw.text((arrow_x - 4, arrow_y + arrow_len + 2), "N",
-                  fill=(255, 255, 255), font=font)
+        font = get_font(_px(12))
+        draw.text((arrow_x - _px(4), arrow_y + arrow_len + _px(2)), "N",
+                  fill=white, font=font)
 
         # ── Scale bar (lower-right) ──
-        bar_len = 80
-        bar_y = h - 25
-        bar_x = w - bar_len - 20
-        draw.rectangle([(bar_x, bar_y), (bar_x + bar_len, bar_y + 4)],
-                        fill=(255, 255, 255))
-        draw.line([(bar_x, bar_y - 3), (bar_x, bar_y + 7)],
-                  fill=(255, 255, 255), width=1)
-        draw.line([(bar_x + bar_len, bar_y - 3), (bar_x + bar_len, bar_y + 7)],
-                  fill=(255, 255, 255), width=1)
-        try:
-            small_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 9)
-        except Exception:
-            small_font = ImageFont.load_default()
-        draw.text((bar_x + bar_len // 2 - 10, bar_y + 6), "~100 ft",
-                  fill=(255, 255, 255), font=small_font)
-
-        buf = PILBuf()
-        pil_img.save(buf, format='JPEG', quality=92)
-        return buf.getvalue()
+        bar_len = _px(80)
+        bar_y = h - _px(25)
+        bar_x = w - bar_len - _px(20)
+        draw.rectangle([(bar_x, bar_y), (bar_x + bar_len, bar_y + _px(4))],
+                        fill=white)
+        draw.line([(bar_x, bar_y - _px(3)), (bar_x, bar_y + _px(7))],
+                  fill=white, width=_px(1))
+        draw.line([(bar_x + bar_len, bar_y - _px(3)), (bar_x + bar_len, bar_y + _px(7))],
+                  fill=white, width=_px(1))
+        small_font = get_font(_px(9))
+        draw.text((bar_x + bar_len // 2 - _px(10), bar_y + _px(6)), "~100 ft",
+                  fill=white, font=small_font)
+
+        # Single compositing pass for every overlay
+        pil_img = PILImage.alpha_composite(pil_img.convert('RGBA'), overlay)
+        return encode_image(pil_img.convert('RGB'), KIND_PHOTO)
     except Exception:
         return image_bytes
 
@@ -428,8 +642,9 @@ def _build_cover_page(story, styles, lot, env, report_id, map_images=None):
         try:
             lot_geom = getattr(lot, 'geometry', None)
             sat_bytes = _enhance_satellite_image(
-                map_images["satellite_bytes"], lot_geometry=lot_geom)
-            img = _image_from_bytes(sat_bytes, 4.5 * inch, 4.5 * inch)
+                map_images["satellite_bytes"], lot_geometry=lot_geom,
+                width=4.5 * inch, height=4.5 * inch)
+            img = _image_from_bytes(sat_bytes, 4.5 * inch, 4.5 * inch, prepare=False)
             # Center the square image
             img.hAlign = 'CENTER'
             story.append(img)
@@ -486,18 +701,7 @@ def _build_cover_page(story, styles, lot, env, report_id, map_images=None):
     ncols = len(info_cells[0])
     col_w = CONTENT_W / ncols
     info_t = Table(info_cells, colWidths=[col_w] * ncols)
-    info_t.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 2),
-        ('TOPPADDING', (0, 1), (-1, 1), 2),
-        ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
-        ('LINEBELOW', (0, 0), (-1, 0), 0, WHITE),
-        ('LINEABOVE', (0, 0), (-1, 0), 0.5, GRID_COLOR),
-        ('LINEBELOW', (0, 1), (-1, 1), 0.5, GRID_COLOR),
-        ('BACKGROUND', (0, 0), (-1, -1), LIGHT_BG),
-    ]))
+    info_t.setStyle(_table_style('info_bar'))
     story.append(info_t)
     story.append(Spacer(1, 18))
 
@@ -607,12 +811,7 @@ def _build_property_maps(story, styles, lot, map_images):
                 [img],
                 [Paragraph(note, map_note_style)],
             ], colWidths=[map_w])
-            cell_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('TOPPADDING', (0, 0), (-1, -1), 0),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
+            cell_table.setStyle(_table_style('map_cell'))
             return cell_table
         except Exception:
             return None
@@ -648,10 +847,7 @@ def _build_property_maps(story, styles, lot, map_images):
     # Top row
     if top_left and top_right:
         row_t = Table([[top_left, top_right]], colWidths=[half_w, half_w])
-        row_t.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        row_t.setStyle(_table_style('map_row'))
         story.append(row_t)
         story.append(Spacer(1, 6))
     elif top_left:
@@ -664,10 +860,7 @@ def _build_property_maps(story, styles, lot, map_images):
     # Bottom row
     if bottom_left and bottom_right:
         row_b = Table([[bottom_left, bottom_right]], colWidths=[half_w, half_w])
-        row_b.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        row_b.setStyle(_table_style('map_row'))
         story.append(row_b)
         story.append(Spacer(1, 6))
     elif bottom_left:
@@ -779,13 +972,7 @@ def _build_site_summary(story, styles, lot, env):
         [left_table, right_table],
     ]
     outer = Table(outer_data, colWidths=[col_half, col_half])
-    outer.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 2),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 2),
-        ('TOPPADDING', (0, 0), (-1, -1), 2),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-    ]))
+    outer.setStyle(_table_style('cards_outer'))
     story.append(outer)
     story.append(Spacer(1, 8))
 
@@ -1065,23 +1252,11 @@ def _build_zoning_overview(story, styles, lot, env, map_images=None):
 
     # Compose Districts + FAR side-by-side
     zo_left_inner = Table([[zo_left_hdr], [zo_left_t]], colWidths=[zo_col_half])
-    zo_left_inner.setStyle(TableStyle([
-        ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 2),
-        ('TOPPADDING', (0, 0), (-1, -1), 0), ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    zo_left_inner.setStyle(_table_style('column_stack'))
     zo_right_inner = Table([[zo_right_hdr], [zo_right_t]], colWidths=[zo_col_half])
-    zo_right_inner.setStyle(TableStyle([
-        ('LEFTPADDING', (0, 0), (-1, -1), 2), ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ('TOPPADDING', (0, 0), (-1, -1), 0), ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    zo_right_inner.setStyle(_table_style('column_stack_right'))
     zo_two_col = Table([[zo_left_inner, zo_right_inner]], colWidths=[zo_col_half + 4, zo_col_half + 4])
-    zo_two_col.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ('TOPPADDING', (0, 0), (-1, -1), 0), ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-    ]))
+    zo_two_col.setStyle(_table_style('columns'))
     story.append(zo_two_col)
     story.append(Spacer(1, 6))
 
@@ -1284,18 +1459,7 @@ def _build_programs_section(story, styles, result):
 
         col_w = CONTENT_W / 4
         mt = Table([metric_cells, metric_labels], colWidths=[col_w] * 4)
-        mt.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), LIGHT_BG),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 2),
-            ('TOPPADDING', (0, 1), (-1, 1), 0),
-            ('BOTTOMPADDING', (0, 1), (-1, 1), 10),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LINEBEFORE', (1, 0), (1, -1), 0.25, GRID_COLOR),
-            ('LINEBEFORE', (2, 0), (2, -1), 0.25, GRID_COLOR),
-            ('LINEBEFORE', (3, 0), (3, -1), 0.25, GRID_COLOR),
-        ]))
+        mt.setStyle(_table_style('program_metrics'))
         story.append(mt)
         story.append(Spacer(1, 10))
 
@@ -1457,22 +1621,10 @@ def _build_program_card(prog, styles):
         content_rows.append([Paragraph(desc, desc_style)])
 
     inner = Table(content_rows, colWidths=[CONTENT_W - 20])
-    inner.setStyle(TableStyle([
-        ('TOPPADDING', (0, 0), (-1, -1), 1),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-        ('LEFTPADDING', (0, 0), (-1, -1), 0),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-    ]))
+    inner.setStyle(_table_style('callout_body'))
 
     outer = Table([[inner]], colWidths=[CONTENT_W - 8])
-    outer.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), GOLD_LIGHT),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('LEFTPADDING', (0, 0), (-1, -1), 12),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('LINEBEFORE', (0, 0), (0, -1), 3, GOLD),
-    ]))
+    outer.setStyle(_table_style('callout'))
 
     return KeepTogether([outer])
 
@@ -1602,22 +1754,11 @@ def _build_calculation_breakdown(story, styles, lot, env):
 
     # ── Assemble two-column layout ──
     left_inner = Table([[p] for p in left_parts], colWidths=[calc_half])
-    left_inner.setStyle(TableStyle([
-        ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 2),
-        ('TOPPADDING', (0, 0), (-1, -1), 0), ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    left_inner.setStyle(_table_style('column_stack'))
     right_inner = Table([[p] for p in right_parts], colWidths=[calc_half])
-    right_inner.setStyle(TableStyle([
-        ('LEFTPADDING', (0, 0), (-1, -1), 2), ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ('TOPPADDING', (0, 0), (-1, -1), 0), ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    right_inner.setStyle(_table_style('column_stack_right'))
     two_col = Table([[left_inner, right_inner]], colWidths=[calc_half + 4, calc_half + 4])
-    two_col.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-    ]))
+    two_col.setStyle(_table_style('columns_flush_x'))
     story.append(two_col)
     story.append(Spacer(1, 8))
 
@@ -1748,9 +1889,33 @@ def _build_scenario_manifest_table(scenario, styles):
     return t
 
 
-def _build_development_scenarios(story, styles, scenarios, lot=None, envelope=None, massing_models=None):
+def _render_massing_stage(massing_models: Optional[dict]) -> dict:
+    """Render every scenario's massing views up front, in parallel.
+
+    Returns a dict mapping scenario names to ``{"perspective", "plan"}``
+    PNG bytes; empty if there are no models or the renderer is unavailable.
+    """
+    if not massing_models:
+        return {}
+    # Lazy-import the renderer so we don't crash if matplotlib is missing
+    try:
+        from app.services.render_3d import render_all_massing_views
+    except Exception:
+        return {}
+    try:
+        return render_all_massing_views(massing_models)
+    except Exception as e:
+        logger.warning("Massing render stage failed: %s", e)
+        return {}
+
+
+def _build_development_scenarios(story, styles, scenarios, lot=None, envelope=None,
+                                 massing_models=None, massing_views=None):
     """Section 7: Investment case study format — scenario name, executive takeaway,
-    key metrics row, detailed program, optional 3D massing, and development summary."""
+    key metrics row, detailed program, optional 3D massing, and development summary.
+
+    *massing_views* holds pre-rendered images from ``_render_massing_stage``;
+    if omitted they are rendered here from *massing_models*."""
     story.append(PageBreak())
     story.append(_section_header("Development Scenarios", section_num=7, styles=styles))
     story.append(Spacer(1, 4))
@@ -1761,13 +1926,8 @@ def _build_development_scenarios(story, styles, scenarios, lot=None, envelope=No
     ))
     story.append(Spacer(1, 6))
 
-    # Lazy-import the renderer so we don't crash if matplotlib is missing
-    render_fn = None
-    try:
-        from app.services.render_3d import render_massing_views
-        render_fn = render_massing_views
-    except Exception:
-        pass
+    if massing_views is None:
+        massing_views = _render_massing_stage(massing_models)
 
     col_half = CONTENT_W / 2 - 4  # Half width for two-column layout
     kv_half = [1.2 * inch, col_half - 1.2 * inch]  # KV table widths within half
@@ -1780,13 +1940,7 @@ def _build_development_scenarios(story, styles, scenarios, lot=None, envelope=No
                            textColor=DARK, leading=16),
         )
         sc_bar = Table([[sc_title]], colWidths=[CONTENT_W])
-        sc_bar.setStyle(TableStyle([
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('LINEBEFORE', (0, 0), (0, -1), 3, GOLD),
-            ('LINEABOVE', (0, 0), (-1, 0), 0.75, GRID_COLOR),
-        ]))
+        sc_bar.setStyle(_table_style('scenario_bar'))
         story.append(sc_bar)
 
         # ── Highlight badges ──
@@ -1945,36 +2099,18 @@ def _build_development_scenarios(story, styles, scenarios, lot=None, envelope=No
 
         # Inner tables for each column (stack flowables vertically)
         left_inner = Table([[p] for p in left_cell], colWidths=[col_half])
-        left_inner.setStyle(TableStyle([
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 2),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        left_inner.setStyle(_table_style('column_stack'))
         right_inner = Table([[p] for p in right_cell], colWidths=[col_half])
-        right_inner.setStyle(TableStyle([
-            ('LEFTPADDING', (0, 0), (-1, -1), 2),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        right_inner.setStyle(_table_style('column_stack_right'))
 
         two_col = Table([[left_inner, right_inner]], colWidths=[col_half + 4, col_half + 4])
-        two_col.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-        ]))
+        two_col.setStyle(_table_style('columns'))
         story.append(two_col)
 
         # ── 3D MASSING IMAGES (side-by-side: perspective + plan) ──
-        if render_fn and massing_models and scenario.name in massing_models:
+        if scenario.name in massing_views:
             try:
-                views = render_fn(massing_models[scenario.name], scenario.name)
+                views = massing_views[scenario.name]
                 has_persp = bool(views.get("perspective"))
                 has_plan = bool(views.get("plan"))
 
@@ -1983,38 +2119,29 @@ def _build_development_scenarios(story, styles, scenarios, lot=None, envelope=No
                     story.append(Spacer(1, 4))
                     story.append(Paragraph("3D Massing Views",
                                            styles['SubSection']))
-                    persp_img = _image_from_bytes(views["perspective"], 3.6 * inch, 2.5 * inch)
-                    plan_img = _image_from_bytes(views["plan"], 2.8 * inch, 2.8 * inch)
+                    persp_img = _image_from_bytes(views["perspective"], 3.6 * inch, 2.5 * inch, kind="graphic")
+                    plan_img = _image_from_bytes(views["plan"], 2.8 * inch, 2.8 * inch, kind="graphic")
                     side_t = Table(
                         [[persp_img, plan_img]],
                         colWidths=[3.8 * inch, 3.0 * inch],
                     )
-                    side_t.setStyle(TableStyle([
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                        ('TOPPADDING', (0, 0), (-1, -1), 2),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-                    ]))
+                    side_t.setStyle(_table_style('massing_side'))
                     story.append(side_t)
                 elif has_persp:
                     story.append(Spacer(1, 4))
                     story.append(Paragraph("3D Massing \u2014 Perspective View",
                                            styles['SubSection']))
-                    img = _image_from_bytes(views["perspective"], 5.0 * inch, 3.5 * inch)
+                    img = _image_from_bytes(views["perspective"], 5.0 * inch, 3.5 * inch, kind="graphic")
                     img_t = Table([[img]], colWidths=[CONTENT_W])
-                    img_t.setStyle(TableStyle([
-                        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-                    ]))
+                    img_t.setStyle(_table_style('massing_image'))
                     story.append(img_t)
                 elif has_plan:
                     story.append(Spacer(1, 4))
                     story.append(Paragraph("3D Massing \u2014 Plan View",
                                            styles['SubSection']))
-                    img2 = _image_from_bytes(views["plan"], 3.0 * inch, 3.0 * inch)
+                    img2 = _image_from_bytes(views["plan"], 3.0 * inch, 3.0 * inch, kind="graphic")
                     img_t2 = Table([[img2]], colWidths=[CONTENT_W])
-                    img_t2.setStyle(TableStyle([
-                        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-                    ]))
+                    img_t2.setStyle(_table_style('massing_image'))
                     story.append(img_t2)
 
                 story.append(Paragraph(
@@ -2398,18 +2525,8 @@ def _build_disclaimers(story, styles, report_id):
     story.append(_section_header("Disclaimers & Limitations", section_num=11, styles=styles))
     story.append(Spacer(1, 4))
 
-    disclaimers = [
-        "This report is for preliminary feasibility analysis only.",
-        "All calculations should be verified by a licensed architect and zoning attorney.",
-        "Special permits, variances, and certifications are not included in this analysis.",
-        "Environmental review (CEQR/SEQRA) requirements are not addressed.",
-        "Landmark and historic district restrictions may apply and are not fully evaluated.",
-        "Actual development potential should be confirmed with NYC Department of Buildings "
-        "and Department of City Planning.",
-        "3D massing renderings are diagrammatic and are not to architectural scale.",
-    ]
-    for d in disclaimers:
-        story.append(Paragraph(f"\u2022 {d}", styles['SmallBody']))
+    for d in DISCLAIMERS:
+        story.append(_static_paragraph(f"\u2022 {d}", 'SmallBody'))
 
     story.append(Spacer(1, 10))
     story.append(Paragraph(
@@ -2422,42 +2539,95 @@ def _build_disclaimers(story, styles, report_id):
 
 
 # ──────────────────────────────────────────────────────────────────
-# MAIN ENTRY POINTS
+# PORTFOLIO SUMMARY
 # ──────────────────────────────────────────────────────────────────
 
-def generate_report(
-    result: CalculationResult,
-    parking_layout_result=None,
-    assemblage_data: Optional[dict] = None,
-    map_images: Optional[dict] = None,
-    massing_models: Optional[dict] = None,
-) -> str:
-    """Generate a comprehensive PDF feasibility report.
+def _build_portfolio_summary(story, styles, results: list[CalculationResult],
+                             report_id, unavailable: Optional[list[str]] = None):
+    """Portfolio cover + side-by-side comparison of every lot."""
+    story.append(Spacer(1, 1.6 * inch))
+    story.append(Paragraph("Portfolio Feasibility Analysis", styles['ReportTitle']))
+    story.append(Spacer(1, 6))
+    n = len(results)
+    story.append(Paragraph(
+        f"{n} {'lot' if n == 1 else 'lots'}  \u2022  {datetime.now().strftime('%B %d, %Y')}"
+        f"  \u2022  Report ID: {report_id}",
+        styles['Subtitle'],
+    ))
+    story.append(Spacer(1, 30))
+    story.append(_section_header("Portfolio Summary", styles=styles))
+    story.append(Spacer(1, 4))
+    story.append(Paragraph(
+        "Maximum development potential of each lot across all evaluated scenarios. "
+        "A full feasibility report for each lot follows in the order listed.",
+        styles['Body'],
+    ))
+    story.append(Spacer(1, 4))
 
-    Args:
-        result: CalculationResult with lot profile, zoning envelope, and scenarios
-        parking_layout_result: Optional ParkingLayoutResult for detailed parking analysis
-        assemblage_data: Optional dict with assemblage delta information
-        map_images: Optional dict with satellite_bytes / street_bytes / zoning_map_bytes
-        massing_models: Optional dict mapping scenario names to massing model dicts
+    cell = ParagraphStyle('_pfCell', fontSize=8, fontName='Helvetica',
+                          textColor=DARK, leading=10)
+    rows = [["Property", "Zoning", "Lot Area", "Max FAR", "Max ZFA", "Height (ft)", "Units"]]
+    total_area = total_zfa = total_units = 0
+    for result in results:
+        lot, env, scenarios = result.lot_profile, result.zoning_envelope, result.scenarios
+        max_far = max(env.residential_far or 0, env.commercial_far or 0, env.cf_far or 0)
+        max_zfa = max(((sc.zoning_floor_area or sc.total_gross_sf or 0) for sc in scenarios), default=0)
+        max_height = max((sc.max_height_ft or 0 for sc in scenarios), default=0)
+        max_units = max((sc.total_units or 0 for sc in scenarios), default=0)
+        total_area += lot.lot_area or 0
+        total_zfa += max_zfa
+        total_units += max_units
+        address = lot.address or "Address Not Available"
+        rows.append([
+            Paragraph(f"<b>{address}</b><br/>{_format_bbl(lot.bbl)}", cell),
+            Paragraph(", ".join(lot.zoning_districts) or "N/A", cell),
+            f"{lot.lot_area:,.0f}" if lot.lot_area else "N/A",
+            f"{max_far:.2f}" if max_far else "N/A",
+            f"{max_zfa:,.0f}" if max_zfa else "N/A",
+            f"{max_height:.0f}" if max_height else "\u2014",
+            str(max_units) if max_units else "\u2014",
+        ])
+    rows.append(["Total", "", f"{total_area:,.0f}", "", f"{total_zfa:,.0f}", "",
+                 str(total_units) if total_units else "\u2014"])
 
-    Returns: file path to the generated PDF
-    """
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    report_id = str(uuid.uuid4())[:8]
-    bbl = result.lot_profile.bbl
-    filename = f"zoning_feasibility_{bbl}_{report_id}.pdf"
-    filepath = os.path.join(OUTPUT_DIR, filename)
+    w = CONTENT_W
+    t = _make_data_table(rows, col_widths=[w * 0.32, w * 0.14, w * 0.11, w * 0.09,
+                                           w * 0.12, w * 0.11, w * 0.11])
+    t.setStyle(TableStyle([('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')]))
+    story.append(t)
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, pagesize=letter,
+    if unavailable:
+        story.append(Spacer(1, 8))
+        story.append(Paragraph(
+            "Not included (lot data unavailable): "
+            + ", ".join(_format_bbl(bbl) for bbl in unavailable) + ".",
+            styles['NoteText'],
+        ))
+
+
+# ──────────────────────────────────────────────────────────────────
+# MAIN ENTRY POINTS
+# ──────────────────────────────────────────────────────────────────
+
+def _new_doc(sink: BinaryIO) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
+        sink, pagesize=letter,
         topMargin=1.0 * inch, bottomMargin=0.8 * inch,
         leftMargin=MARGIN, rightMargin=MARGIN,
     )
 
-    styles = _get_styles()
-    story = []
+
+def _build_lot_story(
+    story,
+    styles,
+    result: CalculationResult,
+    report_id: str,
+    parking_layout_result=None,
+    assemblage_data: Optional[dict] = None,
+    map_images: Optional[dict] = None,
+    massing_views: Optional[dict] = None,
+):
+    """Append every section of one lot's report to *story*."""
     lot = result.lot_profile
     env = result.zoning_envelope
 
@@ -2485,7 +2655,7 @@ def generate_report(
     # 7. Development scenarios (with 3D massing, badges, inline manifest)
     _build_development_scenarios(story, styles, result.scenarios,
                                  lot=lot, envelope=env,
-                                 massing_models=massing_models)
+                                 massing_views=massing_views)
 
     # 8. Scenario comparison table
     _build_comparison_table(story, styles, result.scenarios)
@@ -2499,13 +2669,99 @@ def generate_report(
     # 11. Notes & disclaimers
     _build_disclaimers(story, styles, report_id)
 
-    doc.build(story,
-              onFirstPage=_header_footer_first,
-              onLaterPages=_header_footer_later)
 
-    with open(filepath, 'wb') as f:
-        f.write(buffer.getvalue())
+def build_report(
+    result: CalculationResult,
+    sink: BinaryIO,
+    parking_layout_result=None,
+    assemblage_data: Optional[dict] = None,
+    map_images: Optional[dict] = None,
+    massing_models: Optional[dict] = None,
+    report_id: Optional[str] = None,
+    massing_views: Optional[dict] = None,
+) -> str:
+    """Build the PDF feasibility report and write it to *sink*.
+
+    This is the single report pipeline; ``generate_report`` (disk),
+    ``generate_report_bytes`` (bytes) and ``spool_report`` (temp file for
+    streaming responses) are thin wrappers around it.
+
+    Args:
+        result: CalculationResult with lot profile, zoning envelope, and scenarios
+        sink: Writable binary file-like object (file, spooled temp file, socket buffer)
+        parking_layout_result: Optional ParkingLayoutResult for detailed parking analysis
+        assemblage_data: Optional dict with assemblage delta information
+        map_images: Optional dict with satellite_bytes / street_bytes / zoning_map_bytes
+        massing_models: Optional dict mapping scenario names to massing model dicts
+        report_id: Optional report ID printed in the document (generated if omitted)
+        massing_views: Optional pre-rendered views (``render_all_massing_views``
+            output); *massing_models* is not rendered when given
+
+    Returns: the report ID
+    """
+    report_id = report_id or str(uuid.uuid4())[:8]
+    doc = _new_doc(sink)
+
+    # Render all scenario massing images concurrently before story assembly
+    if massing_views is None:
+        massing_views = _render_massing_stage(massing_models)
+
+    story = []
+    with span("report.story"):
+        _build_lot_story(story, _get_styles(), result, report_id,
+                         parking_layout_result=parking_layout_result,
+                         assemblage_data=assemblage_data, map_images=map_images,
+                         massing_views=massing_views)
+
+    with span("report.build"):
+        doc.build(story,
+                  onFirstPage=_header_footer_first,
+                  onLaterPages=_header_footer_later)
+    return report_id
+
+
+def _write_report_file(filepath: str, build) -> None:
+    """Run ``build(file)`` into a temp file and rename it to *filepath*.
 
+    Download endpoints never see a partial report.
+    """
+    tmp_path = filepath + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            build(f)
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def generate_report(
+    result: CalculationResult,
+    parking_layout_result=None,
+    assemblage_data: Optional[dict] = None,
+    map_images: Optional[dict] = None,
+    massing_models: Optional[dict] = None,
+    massing_views: Optional[dict] = None,
+) -> str:
+    """Generate a comprehensive PDF feasibility report in ``OUTPUT_DIR``.
+
+    The PDF is written straight to a temporary file that is renamed into
+    place once complete, so download endpoints never see a partial report.
+
+    Returns: file path to the generated PDF
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    report_id = str(uuid.uuid4())[:8]
+    bbl = result.lot_profile.bbl
+    filename = f"zoning_feasibility_{bbl}_{report_id}.pdf"
+    filepath = os.path.join(OUTPUT_DIR, filename)
+
+    _write_report_file(filepath, lambda f: build_report(
+        result, f, parking_layout_result=parking_layout_result,
+        assemblage_data=assemblage_data, map_images=map_images,
+        massing_models=massing_models, report_id=report_id,
+        massing_views=massing_views,
+    ))
     return filepath
 
 
@@ -2516,42 +2772,105 @@ def generate_report_bytes(
     map_images: Optional[dict] = None,
     massing_models: Optional[dict] = None,
 ) -> bytes:
-    """Generate PDF report and return as bytes (for API streaming).
+    """Generate PDF report and return as bytes.
 
-    Same as generate_report but returns raw bytes instead of writing to disk.
+    Prefer ``spool_report`` for HTTP responses; this holds the whole
+    document in memory.
     """
     buffer = BytesIO()
-    report_id = str(uuid.uuid4())[:8]
+    build_report(result, buffer, parking_layout_result=parking_layout_result,
+                 assemblage_data=assemblage_data, map_images=map_images,
+                 massing_models=massing_models)
+    return buffer.getvalue()
 
-    doc = SimpleDocTemplate(
-        buffer, pagesize=letter,
-        topMargin=1.0 * inch, bottomMargin=0.8 * inch,
-        leftMargin=MARGIN, rightMargin=MARGIN,
-    )
 
+def spool_report(
+    result: CalculationResult,
+    parking_layout_result=None,
+    assemblage_data: Optional[dict] = None,
+    map_images: Optional[dict] = None,
+    massing_models: Optional[dict] = None,
+    max_memory: int = SPOOL_MAX_MEMORY,
+) -> tuple[SpooledTemporaryFile, str]:
+    """Generate PDF report into a spooled temp file for streaming.
+
+    Reports up to *max_memory* bytes stay in memory; larger (image-heavy)
+    ones spill to disk.  The file is rewound and must be closed by the
+    caller.
+
+    Returns: (file, report_id)
+    """
+    spool = SpooledTemporaryFile(max_size=max_memory, mode="w+b")
+    try:
+        report_id = build_report(result, spool, parking_layout_result=parking_layout_result,
+                                 assemblage_data=assemblage_data, map_images=map_images,
+                                 massing_models=massing_models)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, report_id
+
+
+def build_portfolio_report(
+    lots: list[dict],
+    sink: BinaryIO,
+    report_id: Optional[str] = None,
+    unavailable: Optional[list[str]] = None,
+) -> str:
+    """Build one combined PDF for a portfolio of lots and write it to *sink*.
+
+    The document opens with a portfolio summary comparing every lot,
+    followed by each lot's full report.
+
+    Args:
+        lots: One dict per lot with a ``result`` (CalculationResult) and any
+            of ``build_report``'s ``parking_layout_result``, ``assemblage_data``,
+            ``map_images`` and ``massing_views``
+        sink: Writable binary file-like object
+        report_id: Optional report ID printed in the document (generated if omitted)
+        unavailable: BBLs that could not be analyzed, listed in the summary
+
+    Returns: the report ID
+    """
+    report_id = report_id or str(uuid.uuid4())[:8]
+    doc = _new_doc(sink)
     styles = _get_styles()
-    story = []
-    lot = result.lot_profile
-    env = result.zoning_envelope
 
-    _build_cover_page(story, styles, lot, env, report_id, map_images=map_images)
-    _build_property_maps(story, styles, lot, map_images)
-    _build_site_summary(story, styles, lot, env)
-    _build_highlighted_features(story, styles, lot, env, scenarios=result.scenarios)
-    _build_zoning_overview(story, styles, lot, env, map_images=map_images)
-    _build_programs_section(story, styles, result)
-    _build_calculation_breakdown(story, styles, lot, env)
-    _build_development_scenarios(story, styles, result.scenarios,
-                                 lot=lot, envelope=env, massing_models=massing_models)
-    _build_comparison_table(story, styles, result.scenarios)
-    _build_parking_analysis(story, styles, result.scenarios, parking_layout_result)
-    _build_assemblage_section(story, styles, assemblage_data)
-    _build_disclaimers(story, styles, report_id)
+    story = []
+    with span("report.story"):
+        _build_portfolio_summary(story, styles, [lot["result"] for lot in lots],
+                                 report_id, unavailable=unavailable)
+        for lot in lots:
+            story.append(PageBreak())
+            _build_lot_story(story, styles, lot["result"], report_id,
+                             parking_layout_result=lot.get("parking_layout_result"),
+                             assemblage_data=lot.get("assemblage_data"),
+                             map_images=lot.get("map_images"),
+                             massing_views=lot.get("massing_views") or {})
+
+    with span("report.build"):
+        doc.build(story,
+                  onFirstPage=_header_footer_first,
+                  onLaterPages=_header_footer_later)
+    return report_id
+
+
+def generate_portfolio_report(
+    lots: list[dict],
+    unavailable: Optional[list[str]] = None,
+) -> str:
+    """Generate the combined portfolio PDF in ``OUTPUT_DIR``.
 
-    doc.build(story,
-              onFirstPage=_header_footer_first,
-              onLaterPages=_header_footer_later)
-    return buffer.getvalue()
+    Returns: file path to the generated PDF
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    report_id = str(uuid.uuid4())[:8]
+    filepath = os.path.join(OUTPUT_DIR, f"portfolio_feasibility_{report_id}.pdf")
+    _write_report_file(filepath, lambda f: build_portfolio_report(
+        lots, f, report_id=report_id, unavailable=unavailable,
+    ))
+    return filepath
 
 
 # ──────────────────────────────────────────────────────────────────
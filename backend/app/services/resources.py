@@ -0,0 +1,107 @@
+"""
+Process-wide font and style resources for map images and PDF reports.
+
+Fonts are resolved once per process — ``settings.font_dir`` first, then the
+platform locations the map and report code have always tried (macOS
+Helvetica, system DejaVu), then the DejaVu fonts bundled with matplotlib —
+and each (weight, size) is loaded once and shared.
+
+``warm_resources()`` preloads fonts, the ReportLab stylesheet and the
+report's constant templates.  It runs at API startup and in every render
+worker process before its first job, so no request pays the loading cost.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from functools import lru_cache
+from typing import Optional
+
+from PIL import ImageFont
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+FONT_REGULAR = "regular"
+FONT_BOLD = "bold"
+
+# (filename, face index) in preference order; Helvetica.ttc face 1 is bold
+FONT_FILES = {
+    FONT_REGULAR: [("Helvetica.ttc", 0), ("DejaVuSans.ttf", 0)],
+    FONT_BOLD: [("Helvetica.ttc", 1), ("DejaVuSans-Bold.ttf", 0)],
+}
+
+SYSTEM_FONT_DIRS = [
+    "/System/Library/Fonts",
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+]
+
+# Sizes used by map overlays and the satellite enhancement (px)
+WARM_FONT_SIZES = (9, 10, 12, 14)
+
+
+# ──────────────────────────────────────────────────────────────────
+# FONTS
+# ──────────────────────────────────────────────────────────────────
+
+def font_dirs() -> list[str]:
+    """Directories searched for fonts, in order."""
+    dirs = [settings.font_dir] if settings.font_dir else []
+    dirs += SYSTEM_FONT_DIRS
+    try:
+        import matplotlib
+        dirs.append(os.path.join(matplotlib.get_data_path(), "fonts", "ttf"))
+    except ImportError:
+        pass
+    return dirs
+
+
+@lru_cache(maxsize=None)
+def font_path(weight: str = FONT_REGULAR) -> Optional[tuple[str, int]]:
+    """Resolve ``(path, face index)`` for a font weight, or None if none found."""
+    for directory in font_dirs():
+        for filename, index in FONT_FILES[weight]:
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                return path, index
+    logger.warning("No TrueType font found for weight '%s'; using Pillow default", weight)
+    return None
+
+
+@lru_cache(maxsize=128)
+def get_font(size: int, weight: str = FONT_REGULAR) -> ImageFont.ImageFont:
+    """Shared Pillow font at *size* px.  Font objects are safe to reuse."""
+    resolved = font_path(weight)
+    if resolved:
+        path, index = resolved
+        try:
+            return ImageFont.truetype(path, size, index=index)
+        except OSError as e:
+            logger.warning("Could not load font %s: %s", path, e)
+    return ImageFont.load_default(size=size)
+
+
+# ──────────────────────────────────────────────────────────────────
+# WARM-UP
+# ──────────────────────────────────────────────────────────────────
+
+def warm_resources() -> None:
+    """Load fonts, report styles and templates so the first request doesn't have to."""
+    for weight in FONT_FILES:
+        for size in WARM_FONT_SIZES:
+            get_font(size, weight)
+    try:
+        from app.services.report import _get_styles, warm_templates
+        _get_styles()
+        warm_templates()
+    except Exception as e:
+        logger.warning("Report style warm-up failed: %s", e)
+
+
+def reset_resources() -> None:
+    """Forget resolved fonts (e.g. after changing ``settings.font_dir``)."""
+    font_path.cache_clear()
+    get_font.cache_clear()
@@ -0,0 +1,110 @@
+"""
+Single-flight coalescing of identical concurrent async calls.
+
+When a listing goes out, many users look up the same lot within seconds.
+``coalesce`` makes concurrent calls with the same key share one in-flight
+call instead of each hitting geocoding, PLUTO, Carto and the calculator::
+
+    @coalesce("pluto", key=lambda bbl, app_token="": bbl)
+    async def fetch_pluto_data(bbl, app_token=""): ...
+
+The first caller starts the call in its own task; callers arriving while
+it runs await the same task.  When a call was shared, each waiter gets its
+own deep copy of the result, so callers may mutate what they get back.
+Exceptions are shared the same way.  A waiter that is cancelled (client
+disconnect) does not cancel the shared call for the others.  Nothing is
+cached once the call completes — that is the cache layer's job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import inspect
+import json
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional
+
+from app.services.metrics import Counter
+
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Coalesced calls by name: run (started the call) or shared (joined one in flight)",
+    ("name", "result"),
+)
+
+
+class _Call:
+    __slots__ = ("task", "shared")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.shared = False
+
+
+class SingleFlight:
+    """In-flight calls of one function, keyed by call key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Await ``fn(*args, **kwargs)``, joining an identical call in flight."""
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+        if call is not None and call.task.get_loop() is loop:
+            SINGLEFLIGHT_CALLS.inc(self.name, "shared")
+            call.shared = True
+        else:
+            SINGLEFLIGHT_CALLS.inc(self.name, "run")
+            call = self._calls[key] = _Call(loop.create_task(fn(*args, **kwargs)))
+            call.task.add_done_callback(lambda task: self._forget(key, call))
+
+        result = await asyncio.shield(call.task)
+        # Once shared, nobody gets the original: waiters resume one by one
+        # and an earlier one could otherwise mutate it under a later one
+        return copy.deepcopy(result) if call.shared else result
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            call.task.exception()  # Mark retrieved even if every waiter went away
+
+
+def default_key(*args, **kwargs) -> str:
+    """Key from the call arguments (JSON; non-JSON values by ``str``)."""
+    return json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+def coalesce(name: str, key: Optional[Callable[..., Hashable]] = None):
+    """Decorator: coalesce concurrent calls of an async function by *key*.
+
+    Args:
+        name: Label for ``singleflight_calls_total``
+        key: Called with the function's arguments; defaults to ``default_key``
+    """
+    key_fn = key or default_key
+
+    def decorator(fn):
+        if not inspect.iscoroutinefunction(fn):
+            raise TypeError(f"coalesce({name!r}) needs an async function")
+        flight = SingleFlight(name)
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await flight.do(key_fn(*args, **kwargs), fn, *args, **kwargs)
+
+        wrapper.singleflight = flight
+        return wrapper
+
+    return decorator
+
+
+def normalize_address(address: str) -> str:
+    """Case- and whitespace-insensitive form of an address for keys."""
+    return " ".join((address or "").lower().replace(",", " ").split())
@@ -28,9 +28,11 @@ from __future__ import annotations
 import re
 import logging
 
-import httpx
-
 from app.config import settings
+from app.services.cache import TTL_STREET_WIDTH, swr_cached
+from app.services.singleflight import coalesce
+from app.services.timing import span
+from app.services.upstream import upstream_client
 
 logger = logging.getLogger(__name__)
 
@@ -89,6 +91,11 @@ def _parse_street_width(width_str: str) -> float | None:
         return None
 
 
+@swr_cached(
+    "street_width", TTL_STREET_WIDTH,
+    key=lambda longitude, latitude, search_radius_m=50: f"{latitude:.6f},{longitude:.6f},{search_radius_m:g}",
+    decode=tuple, cacheable=lambda result: result[0] is not None, versioned=False,
+)
 async def fetch_street_width_from_dcm(
     longitude: float,
     latitude: float,
@@ -125,7 +132,7 @@ async def fetch_street_width_from_dcm(
     ).format(lng=longitude, lat=latitude, radius=search_radius_m)
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with upstream_client(timeout=10) as client:
             resp = await client.get(CARTO_SQL_URL, params={"q": sql})
             if resp.status_code != 200:
                 logger.warning("Carto SQL API returned %d", resp.status_code)
@@ -195,7 +202,7 @@ async def fetch_street_width_by_name(
     sql += "GROUP BY streetwidt ORDER BY cnt DESC LIMIT 1"
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with upstream_client(timeout=10) as client:
             resp = await client.get(CARTO_SQL_URL, params={"q": sql})
             if resp.status_code != 200:
                 return None
@@ -245,7 +252,7 @@ async def fetch_street_width_from_geoclient(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with upstream_client(timeout=10) as client:
             resp = await client.get(url, params=params, headers=headers)
             if resp.status_code != 200:
                 return None
@@ -376,6 +383,8 @@ def is_wide_street_heuristic(address: str, borough: int = 0) -> bool:
 # MAIN ENTRY POINT
 # ──────────────────────────────────────────────────────────────────
 
+@span("street_width")
+@coalesce("street_width")
 async def determine_street_width(
     address: str,
     borough: int = 0,
@@ -0,0 +1,159 @@
+"""
+Lightweight stage timing for the analysis and report pipeline.
+
+``span`` works as a context manager or as a decorator on sync and async
+functions::
+
+    with span("calculate"):
+        calc_result = calculator.calculate(lot_profile)
+
+    @span("pluto")
+    async def fetch_pluto_data(bbl, app_token=""): ...
+
+Every span is observed into a process-wide histogram per stage name
+(``histograms()``).  A request that opts in with ``collect_timings()``
+also gets its own per-stage totals — including spans run in tasks and
+threads started from it (``asyncio.gather``, ``asyncio.to_thread``), since
+the collector travels in a context variable.  Spans in worker processes
+are not collected.
+"""
+
+from __future__ import annotations
+
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Iterator, Optional
+
+# Histogram bucket upper bounds (seconds), Prometheus-style
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram for one stage."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self._counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def snapshot(self) -> dict:
+        """``{"buckets": [(le, cumulative count), ...], "count", "sum"}``."""
+        cumulative, running = [], 0
+        for le, n in zip(self.buckets + (float("inf"),), self._counts):
+            running += n
+            cumulative.append((le, running))
+        return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+
+class Timings:
+    """Per-request stage totals collected by ``collect_timings()``."""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: dict[str, list] = {}  # name -> [seconds, calls]
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stage = self._stages.setdefault(name, [0.0, 0])
+            stage[0] += seconds
+            stage[1] += 1
+
+    def as_dict(self) -> dict:
+        """``{"total_ms": ..., "stages": {name: {"ms": ..., "calls": n}}}``.
+
+        Stages are in the order they first finished.  Concurrent stages
+        overlap, so stage times can add up to more than ``total_ms``.
+        """
+        with self._lock:
+            stages = {
+                name: {"ms": round(seconds * 1000, 1), "calls": calls}
+                for name, (seconds, calls) in self._stages.items()
+            }
+        return {
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 1),
+            "stages": stages,
+        }
+
+
+_histograms: dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+_collector: ContextVar[Optional[Timings]] = ContextVar("timings", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    """Record a stage duration measured elsewhere."""
+    with _histograms_lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(seconds)
+    timings = _collector.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+class span:
+    """Time a block (``with span(name):``) or every call of a function."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = 0.0
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        record(self.name, time.perf_counter() - self._start)
+
+    def __call__(self, fn):
+        name = self.name
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+@contextmanager
+def collect_timings(enabled: bool = True) -> Iterator[Optional[Timings]]:
+    """Collect the spans of the enclosed work; yields None when disabled."""
+    if not enabled:
+        yield None
+        return
+    timings = Timings()
+    token = _collector.set(timings)
+    try:
+        yield timings
+    finally:
+        _collector.reset(token)
+
+
+def histograms() -> dict[str, dict]:
+    """Snapshot of every stage histogram, keyed by stage name."""
+    with _histograms_lock:
+        return {name: hist.snapshot() for name, hist in sorted(_histograms.items())}
+
+
+def reset_histograms() -> None:
+    with _histograms_lock:
+        _histograms.clear()
@@ -0,0 +1,331 @@
+"""
+HTTP clients for the external APIs the engine calls.
+
+Every service creates its client with ``upstream_client(timeout=...)``
+instead of ``httpx.AsyncClient``.  Each request to an upstream (named by
+host, ``UPSTREAM_HOSTS``) then:
+
+  - is measured — latency, status and timeouts per upstream on ``/metrics``
+  - gets an adaptive timeout: a multiple of the upstream's recent latency
+    percentile, so a degraded upstream is abandoned in a few seconds
+    instead of the caller's full 10–30 s
+  - passes through a per-upstream circuit breaker: after repeated failures
+    requests fail immediately with ``UpstreamUnavailable`` and the caller's
+    fallback runs; after ``upstream_breaker_reset_seconds`` one probe
+    request is let through and its outcome closes or re-opens the circuit
+  - if the circuit lets it through, takes a token from the upstream's rate
+    limit (``upstream_rate_limits``, shared by every worker, see
+    ``rate_limit``): when the bucket is empty the request waits its turn,
+    or fails with ``UpstreamThrottled`` if the wait would exceed
+    ``upstream_rate_max_wait_seconds``
+
+``UpstreamUnavailable`` is an ``httpx.TransportError``, so existing
+``except httpx.HTTPError`` / ``except Exception`` fallbacks handle it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import httpx
+
+from app.config import settings
+from app.services import rate_limit
+from app.services.metrics import Counter, LatencyHistogram, register_collector
+
+UPSTREAM_HOSTS = {
+    "data.cityofnewyork.us": "socrata",
+    "planninglabs.carto.com": "carto",
+    "geosearch.planninglabs.nyc": "geosearch",
+    "geoservice.planning.nyc.gov": "geoservice",
+    "api.nyc.gov": "geoclient",
+    "server.arcgisonline.com": "esri",
+    "services5.arcgis.com": "esri",
+    "maps.googleapis.com": "google",
+    "overpass-api.de": "overpass",
+    "nominatim.openstreetmap.org": "nominatim",
+    "zoning.planningdigital.com": "zoning_planningdigital",
+}
+
+# Successful-request latencies kept per upstream, and the minimum before
+# the adaptive timeout applies
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+
+UPSTREAM_LATENCY = LatencyHistogram(
+    "upstream_request_duration_seconds",
+    "Latency of requests to external APIs, until response headers",
+    ("upstream",),
+)
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total",
+    "Requests to external APIs by response status (or timeout/error)",
+    ("upstream", "status"),
+)
+UPSTREAM_TIMEOUTS = Counter(
+    "upstream_timeouts_total",
+    "Requests to external APIs that timed out",
+    ("upstream",),
+)
+UPSTREAM_SHORT_CIRCUITS = Counter(
+    "upstream_short_circuits_total",
+    "Requests failed immediately because the upstream's circuit was open",
+    ("upstream",),
+)
+UPSTREAM_RATE_LIMIT_WAIT = LatencyHistogram(
+    "upstream_rate_limit_wait_seconds",
+    "Time requests to external APIs waited for a rate limit token",
+    ("upstream",),
+)
+UPSTREAM_THROTTLED = Counter(
+    "upstream_throttled_total",
+    "Requests failed immediately because the rate limit wait was too long",
+    ("upstream",),
+)
+
+
+class UpstreamUnavailable(httpx.TransportError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class UpstreamThrottled(UpstreamUnavailable):
+    """Raised instead of queueing longer than the rate limit's max wait."""
+
+
+def upstream_name(host: str) -> str:
+    """Metric label for a request host."""
+    return UPSTREAM_HOSTS.get(host, host or "unknown")
+
+
+# ──────────────────────────────────────────────────────────────────
+# CIRCUIT BREAKER
+# ──────────────────────────────────────────────────────────────────
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; claims the probe when half-open."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = HALF_OPEN
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def release(self) -> None:
+        """Give up a probe without an outcome (e.g. the caller was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+
+# ──────────────────────────────────────────────────────────────────
+# PER-UPSTREAM STATE
+# ──────────────────────────────────────────────────────────────────
+
+_breakers: dict[str, CircuitBreaker] = {}
+_latencies: dict[str, deque] = {}
+_state_lock = threading.Lock()
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    with _state_lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            breaker = _breakers[upstream] = CircuitBreaker(
+                settings.upstream_breaker_failures,
+                settings.upstream_breaker_reset_seconds,
+            )
+        return breaker
+
+
+def _record_latency(upstream: str, seconds: float) -> None:
+    with _state_lock:
+        window = _latencies.get(upstream)
+        if window is None:
+            window = _latencies[upstream] = deque(maxlen=LATENCY_WINDOW)
+        window.append(seconds)
+
+
+def adaptive_timeout(upstream: str) -> Optional[float]:
+    """Timeout (seconds) derived from recent latency; None until enough samples."""
+    if settings.upstream_timeout_multiplier <= 0:
+        return None
+    with _state_lock:
+        window = sorted(_latencies.get(upstream, ()))
+    if len(window) < LATENCY_MIN_SAMPLES:
+        return None
+    pct = min(max(settings.upstream_timeout_percentile, 0.0), 1.0)
+    latency = window[int(pct * (len(window) - 1))]
+    return max(settings.upstream_timeout_min_seconds, latency * settings.upstream_timeout_multiplier)
+
+
+def reset_upstreams() -> None:
+    """Forget breaker state, latency history and in-process rate limit
+    buckets (tests, settings changes)."""
+    with _state_lock:
+        _breakers.clear()
+        _latencies.clear()
+    rate_limit.reset()
+
+
+async def wait_for_rate_limit(upstream: str, request: Optional[httpx.Request] = None) -> float:
+    """Take a token from *upstream*'s rate limit, waiting until it is due.
+
+    Returns the seconds waited; raises ``UpstreamThrottled`` if the wait
+    would exceed ``upstream_rate_max_wait_seconds``.
+    """
+    limit = settings.upstream_rate_limits.get(upstream)
+    if not limit:
+        return 0.0
+    rate, burst = limit
+    max_wait = settings.upstream_rate_max_wait_seconds
+    wait = await rate_limit.reserve(upstream, rate, burst, max_wait)
+    if wait is None:
+        UPSTREAM_THROTTLED.inc(upstream)
+        raise UpstreamThrottled(
+            f"{upstream} rate limit: next slot more than {max_wait:.0f}s away", request=request)
+    UPSTREAM_RATE_LIMIT_WAIT.observe(wait, upstream)
+    if wait > 0:
+        await asyncio.sleep(wait)
+    return wait
+
+
+def _circuit_states():
+    with _state_lock:
+        breakers = sorted(_breakers.items())
+    for upstream, breaker in breakers:
+        yield {"upstream": upstream}, _STATE_VALUES[breaker.state]
+
+
+def _timeouts():
+    with _state_lock:
+        upstreams = sorted(_latencies)
+    for upstream in upstreams:
+        timeout = adaptive_timeout(upstream)
+        if timeout is not None:
+            yield {"upstream": upstream}, timeout
+
+
+register_collector("upstream_circuit_state",
+                   "Upstream circuit breaker state (0 closed, 1 half-open, 2 open)",
+                   "gauge", _circuit_states)
+register_collector("upstream_adaptive_timeout_seconds",
+                   "Current adaptive timeout per upstream", "gauge", _timeouts)
+
+
+# ──────────────────────────────────────────────────────────────────
+# CLIENT
+# ──────────────────────────────────────────────────────────────────
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper applying rate limits, breakers, adaptive timeouts and metrics."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = upstream_name(request.url.host)
+        breaker = get_breaker(upstream)
+        if not breaker.allow():
+            UPSTREAM_SHORT_CIRCUITS.inc(upstream)
+            raise UpstreamUnavailable(f"{upstream} circuit open", request=request)
+        # Only requests that will be sent take a token others may need
+        try:
+            await wait_for_rate_limit(upstream, request)
+        except BaseException:
+            breaker.release()
+            raise
+        _apply_timeout(request, adaptive_timeout(upstream))
+
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TimeoutException:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, upstream)
+            UPSTREAM_REQUESTS.inc(upstream, "timeout")
+            UPSTREAM_TIMEOUTS.inc(upstream)
+            breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, upstream)
+            UPSTREAM_REQUESTS.inc(upstream, "error")
+            breaker.record_failure()
+            raise
+        elapsed = time.perf_counter() - start
+        UPSTREAM_LATENCY.observe(elapsed, upstream)
+        UPSTREAM_REQUESTS.inc(upstream, response.status_code)
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            _record_latency(upstream, elapsed)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _apply_timeout(request: httpx.Request, seconds: Optional[float]) -> None:
+    """Lower the request's timeouts to *seconds* (never raise them)."""
+    if seconds is None:
+        return
+    timeouts = dict(request.extensions.get("timeout") or {})
+    for key in ("connect", "read", "write", "pool"):
+        current = timeouts.get(key)
+        timeouts[key] = seconds if current is None else min(current, seconds)
+    request.extensions["timeout"] = timeouts
+
+
+def upstream_client(timeout: float, **kwargs) -> httpx.AsyncClient:
+    """``httpx.AsyncClient`` routed through the upstream's breaker and metrics."""
+    transport = InstrumentedTransport(kwargs.pop("transport", None))
+    return httpx.AsyncClient(timeout=timeout, transport=transport, **kwargs)
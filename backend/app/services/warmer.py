@@ -0,0 +1,152 @@
+"""
+Cache warmer — pre-analyze high-demand lots off-peak.
+
+For each BBL the warmer runs the SaaS preview pipeline (geocode, PLUTO,
+geometry, zoning layers, street width, calculator), fetches every report
+map and renders the massing views.  That fills the caches daytime requests
+read from:
+
+  - Redis lot data (``cache.swr_cached`` fetchers)
+  - the map image cache and the massing render cache (memory + disk)
+
+Lots are warmed at bounded concurrency; ``stop_at`` stops starting new
+lots when the off-peak window closes.  Run it from ``scripts/warm_cache.py``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional
+
+from app.config import settings
+from app.services.deadline import wait_abandoned
+from app.services.geocoding import parse_bbl
+from app.services.upstream import upstream_client
+
+logger = logging.getLogger(__name__)
+
+WarmFn = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class WarmResult:
+    bbl: str
+    status: str  # "warmed", "failed" or "skipped"
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class WarmReport:
+    results: list[WarmResult] = field(default_factory=list)
+
+    def count(self, status: str) -> int:
+        return sum(1 for r in self.results if r.status == status)
+
+    def summary(self) -> dict:
+        return {status: self.count(status) for status in ("warmed", "failed", "skipped")}
+
+
+async def warm_lot(bbl: str) -> None:
+    """Run the report preparation pipeline for one lot, discarding the output.
+
+    Stages the pipeline abandons past their budgets are still filling their
+    caches; they are waited for so the lot is fully warm on return.
+    """
+    from app.api.reports_saas import _prepare_report_inputs, _run_analysis
+    from app.services.render_3d import render_all_massing_views
+
+    analysis = await _run_analysis(bbl=bbl)
+    inputs = await _prepare_report_inputs(analysis)
+    if inputs["massing_models"]:
+        await asyncio.to_thread(render_all_massing_views, inputs["massing_models"])
+    await wait_abandoned()
+
+
+async def warm_lots(
+    bbls: Iterable[str],
+    concurrency: int = 4,
+    stop_at: Optional[datetime] = None,
+    warm: WarmFn = warm_lot,
+    on_done: Optional[Callable[[WarmResult], None]] = None,
+) -> WarmReport:
+    """Warm every lot in *bbls* (duplicates once), *concurrency* at a time.
+
+    Lots not yet started when *stop_at* passes are reported as skipped.
+    A failing lot is recorded and does not stop the run.
+    """
+    unique = list(dict.fromkeys(bbls))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    report = WarmReport(results=[WarmResult(bbl, "skipped") for bbl in unique])
+
+    async def _one(result: WarmResult) -> None:
+        async with semaphore:
+            if stop_at and datetime.now() >= stop_at:
+                return
+            start = time.perf_counter()
+            try:
+                await warm(result.bbl)
+                result.status = "warmed"
+            except Exception as e:
+                result.status = "failed"
+                result.error = str(getattr(e, "detail", None) or e)
+                logger.warning("Warming %s failed: %s", result.bbl, result.error)
+            result.seconds = time.perf_counter() - start
+            if on_done:
+                on_done(result)
+
+    await asyncio.gather(*(_one(result) for result in report.results))
+    return report
+
+
+# ──────────────────────────────────────────────────────────────────
+# LOT SELECTION
+# ──────────────────────────────────────────────────────────────────
+
+def read_bbls(path: str) -> list[str]:
+    """BBLs from a text file (one per line) or a CSV with a ``bbl`` column.
+
+    A filtered PLUTO CSV export works as-is; its float-formatted BBLs
+    (``3012340001.00000000``) are accepted.  Invalid entries are skipped.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.readline()
+        f.seek(0)
+        header = [col.strip().lower() for col in next(csv.reader([sample]), [])]
+        if "bbl" in header:
+            raw = (row.get("bbl") or "" for row in _lower_keys(csv.DictReader(f)))
+        else:
+            raw = (line.split("#", 1)[0] for line in f)
+        return [bbl for bbl in (_normalize_bbl(value) for value in raw) if bbl]
+
+
+def _lower_keys(rows):
+    for row in rows:
+        yield {(key or "").strip().lower(): value for key, value in row.items()}
+
+
+def _normalize_bbl(value: str) -> Optional[str]:
+    value = re.sub(r"\.0*$", "", value.strip())
+    return parse_bbl(value) if value else None
+
+
+async def select_bbls(where: str, limit: int = 5000) -> list[str]:
+    """BBLs from the PLUTO dataset matching a SoQL ``$where`` filter.
+
+    e.g. ``"zonedist1 like 'R7%' AND borough = 'BK'"``.
+    """
+    from app.services.pluto import PLUTO_SOCRATA_URL
+
+    headers = {"X-App-Token": settings.socrata_app_token} if settings.socrata_app_token else {}
+    params = {"$select": "bbl", "$where": where, "$order": "bbl", "$limit": limit}
+    async with upstream_client(timeout=60) as client:
+        resp = await client.get(PLUTO_SOCRATA_URL, params=params, headers=headers)
+        resp.raise_for_status()
+        rows = resp.json()
+    return [bbl for bbl in (_normalize_bbl(str(row.get("bbl", ""))) for row in rows) if bbl]
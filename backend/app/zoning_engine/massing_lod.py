@@ -0,0 +1,169 @@
+"""
+Level-of-detail (LOD) reduction for massing model payloads.
+
+``build_massing_model()`` returns every floor with full-precision footprints
+and a triangulated mesh, which is more than list, thumbnail and comparison
+views need.  This module derives cheaper representations from a built model:
+
+  - ``full``:     the model unchanged (optionally with simplified polygons)
+  - ``blocks``:   consecutive floors with identical plates and use are
+                  collapsed into single extruded blocks
+  - ``envelope``: lot, buildable footprint and zoning envelope wireframe only
+
+The output keeps the same shape as the full model so the Three.js viewer
+can render any level without special-casing.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from shapely.geometry import Polygon
+
+from app.zoning_engine.massing_builder import _build_3d_geometry, _poly_to_coords
+
+
+# ──────────────────────────────────────────────────────────────────
+# CONSTANTS
+# ──────────────────────────────────────────────────────────────────
+
+LOD_FULL = "full"
+LOD_BLOCKS = "blocks"
+LOD_ENVELOPE = "envelope"
+
+LOD_LEVELS = (LOD_FULL, LOD_BLOCKS, LOD_ENVELOPE)
+
+PLATE_KEY_PRECISION = 1  # Decimal places when comparing floor plates (0.1 ft)
+
+
+# ──────────────────────────────────────────────────────────────────
+# MAIN ENTRY POINT
+# ──────────────────────────────────────────────────────────────────
+
+def apply_lod(model: dict, lod: str = LOD_FULL, tolerance: float = 0.0) -> dict:
+    """Reduce a massing model to the requested level of detail.
+
+    Args:
+        model: Output from ``build_massing_model()``.
+        lod: One of ``LOD_LEVELS``.
+        tolerance: Polygon simplification tolerance in feet (0 = none).
+
+    Returns:
+        A new massing model dict.  The input model is not modified.
+
+    Raises:
+        ValueError: If ``lod`` is not a known level or tolerance is negative.
+    """
+    if lod not in LOD_LEVELS:
+        raise ValueError(
+            f"Unknown massing LOD '{lod}'. Expected one of: {', '.join(LOD_LEVELS)}"
+        )
+    if tolerance < 0:
+        raise ValueError("Simplification tolerance must be >= 0.")
+
+    if "error" in model or (lod == LOD_FULL and not tolerance):
+        return model
+
+    result = dict(model)
+    result["lod"] = lod
+    if tolerance:
+        result["simplify_tolerance_ft"] = tolerance
+        result["lot"] = _simplify_keyed(model.get("lot"), "polygon", tolerance)
+        result["buildable_footprint"] = _simplify_keyed(
+            model.get("buildable_footprint"), "polygon", tolerance,
+        )
+
+    scenarios = []
+    for scenario in model.get("scenarios", []):
+        sc = dict(scenario)
+        floors = [_simplify_keyed(f, "footprint", tolerance) for f in scenario.get("floors", [])]
+        bulkhead = _simplify_keyed(scenario.get("bulkhead"), "footprint", tolerance)
+
+        if lod == LOD_ENVELOPE:
+            sc["floors"] = []
+            sc["bulkhead"] = None
+        elif lod == LOD_BLOCKS:
+            sc["floors"] = collapse_floors(floors)
+            sc["bulkhead"] = bulkhead
+        else:
+            sc["floors"] = floors
+            sc["bulkhead"] = bulkhead
+        scenarios.append(sc)
+    result["scenarios"] = scenarios
+
+    # Rebuild the mesh from whatever floors survived (empty for envelope)
+    if lod == LOD_ENVELOPE:
+        result["geometry_3d"] = {"vertices": [], "faces": [], "colors": []}
+    elif scenarios:
+        result["geometry_3d"] = _build_3d_geometry(
+            scenarios[0]["floors"], scenarios[0]["bulkhead"],
+        )
+
+    return result
+
+
+# ──────────────────────────────────────────────────────────────────
+# FLOOR COLLAPSING
+# ──────────────────────────────────────────────────────────────────
+
+def collapse_floors(floors: list[dict]) -> list[dict]:
+    """Merge runs of consecutive floors with the same plate and use.
+
+    Each block keeps the schema of a massing floor (so it renders as one
+    tall extrusion) with areas summed and ``floor_range`` / ``floor_count``
+    recording which floors it stands for.
+    """
+    blocks: list[dict] = []
+    last_key = None
+
+    for floor in sorted(floors, key=lambda f: f.get("elevation_ft", 0)):
+        key = (floor.get("use"), floor.get("is_penthouse", False), _plate_key(floor.get("footprint", [])))
+        if blocks and key == last_key:
+            block = blocks[-1]
+            block["height_ft"] = round(block["height_ft"] + floor.get("height_ft", 0), 1)
+            block["gross_area_sf"] = block.get("gross_area_sf", 0) + floor.get("gross_area_sf", 0)
+            block["net_area_sf"] = block.get("net_area_sf", 0) + floor.get("net_area_sf", 0)
+            block["floor_range"][1] = floor.get("floor_num")
+            block["floor_count"] += 1
+        else:
+            block = dict(floor)
+            block["height_ft"] = floor.get("height_ft", 0)
+            block["floor_range"] = [floor.get("floor_num"), floor.get("floor_num")]
+            block["floor_count"] = 1
+            blocks.append(block)
+        last_key = key
+
+    return blocks
+
+
+def _plate_key(footprint: list) -> tuple:
+    """Hashable key for comparing floor plates at ``PLATE_KEY_PRECISION``."""
+    return tuple(tuple(round(c, PLATE_KEY_PRECISION) for c in p) for p in footprint)
+
+
+# ──────────────────────────────────────────────────────────────────
+# POLYGON SIMPLIFICATION
+# ──────────────────────────────────────────────────────────────────
+
+def simplify_polygon(coords: list, tolerance: float) -> list:
+    """Simplify a ``[[x, y], ...]`` ring with Douglas-Peucker.
+
+    Returns the original coordinates if simplification would degenerate
+    the polygon (fewer than three vertices or an invalid shape).
+    """
+    if not tolerance or len(coords) < 4:
+        return coords
+    poly = Polygon(coords)
+    if poly.is_empty or not poly.is_valid:
+        return coords
+    simplified = _poly_to_coords(poly.simplify(tolerance, preserve_topology=True))
+    return simplified if len(simplified) >= 3 else coords
+
+
+def _simplify_keyed(item: Optional[dict], key: str, tolerance: float) -> Optional[dict]:
+    """Return a copy of ``item`` with ``item[key]`` simplified."""
+    if not item or not tolerance or not item.get(key):
+        return item
+    out = dict(item)
+    out[key] = simplify_polygon(item[key], tolerance)
+    return out
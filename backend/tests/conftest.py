@@ -0,0 +1,25 @@
+"""Shared fixtures for the backend tests."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.services import render_cache
+from app.services.render_cache import RenderCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_render_cache(monkeypatch):
+    """Fresh memory-only render cache so tests never hit earlier renders."""
+    cache = RenderCache(memory_bytes=16 * 1024 * 1024, disk_dir=None, disk_bytes=0)
+    monkeypatch.setattr(render_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_map_cache(monkeypatch):
+    """Fresh memory-only map image cache so tests never hit earlier fetches."""
+    cache = RenderCache(memory_bytes=16 * 1024 * 1024, disk_dir=None, disk_bytes=0,
+                        views=("image",))
+    monkeypatch.setattr(render_cache, "_map_cache", cache)
+    return cache
@@ -0,0 +1,132 @@
+"""Model builders shared by the backend tests."""
+
+from __future__ import annotations
+
+from app.models.schemas import (
+    LotProfile, PlutoData, ZoningEnvelope, DevelopmentScenario,
+    MassingFloor, CoreEstimate, ParkingResult, LossFactorResult,
+    SetbackRules,
+)
+from app.zoning_engine.massing_builder import build_massing_model
+
+
+def make_lot(
+    frontage: float = 50,
+    depth: float = 100,
+    area: float | None = None,
+    geometry: dict | None = None,
+    district: str = "R6",
+    street_width: str = "narrow",
+) -> LotProfile:
+    """Create a test lot."""
+    area = area or (frontage * depth)
+    pluto = PlutoData(
+        bbl="3012340001",
+        zonedist1=district,
+        lotarea=area,
+        lotfront=frontage,
+        lotdepth=depth,
+    )
+    return LotProfile(
+        bbl="3012340001",
+        borough=3,
+        block=1234,
+        lot=1,
+        pluto=pluto,
+        geometry=geometry,
+        zoning_districts=[district],
+        lot_area=area,
+        lot_frontage=frontage,
+        lot_depth=depth,
+        lot_type="interior",
+        street_width=street_width,
+    )
+
+
+def make_envelope(
+    res_far: float = 3.0,
+    max_height: float = 75,
+    rear_yard: float = 30,
+    front_yard: float = 0,
+    side_yards: bool = False,
+    side_yard_width: float = 0,
+    lot_coverage_max: float | None = None,
+    quality_housing: bool = True,
+    base_height_max: float = 65,
+    setback_above_base: float = 10,
+) -> ZoningEnvelope:
+    """Create a test zoning envelope."""
+    return ZoningEnvelope(
+        residential_far=res_far,
+        max_building_height=max_height,
+        rear_yard=rear_yard,
+        front_yard=front_yard,
+        side_yards_required=side_yards,
+        side_yard_width=side_yard_width,
+        lot_coverage_max=lot_coverage_max,
+        quality_housing=quality_housing,
+        base_height_max=base_height_max,
+        setbacks=SetbackRules(front_setback_above_base=setback_above_base),
+    )
+
+
+def make_scenario(
+    name: str = "Max Residential",
+    floors: list[MassingFloor] | None = None,
+    total_gross: float = 15000,
+    zfa: float = 12000,
+    units: int = 15,
+    num_floors: int = 5,
+    max_height: float = 52,
+) -> DevelopmentScenario:
+    """Create a test scenario with default floors."""
+    if floors is None:
+        floors = []
+        # Ground floor
+        floors.append(MassingFloor(
+            floor=1, use="residential", gross_sf=3500,
+            net_sf=2870, height_ft=12,
+        ))
+        # Upper floors
+        for i in range(2, num_floors + 1):
+            sf = 3500 if i <= 4 else 1000
+            floors.append(MassingFloor(
+                floor=i, use="residential", gross_sf=sf,
+                net_sf=sf * 0.82, height_ft=10,
+            ))
+
+    return DevelopmentScenario(
+        name=name,
+        description="Test scenario",
+        total_gross_sf=total_gross,
+        total_net_sf=total_gross * 0.82,
+        zoning_floor_area=zfa,
+        residential_sf=total_gross * 0.82,
+        total_units=units,
+        num_floors=num_floors,
+        max_height_ft=max_height,
+        far_used=2.5,
+        floors=floors,
+        core=CoreEstimate(
+            elevators=1, stairs=1,
+            elevator_sf_per_floor=70, stair_sf_per_floor=150,
+            mechanical_sf_per_floor=50, corridor_sf_per_floor=200,
+            total_core_sf_per_floor=470, core_percentage=13.4,
+        ),
+        parking=ParkingResult(total_spaces_required=5),
+        loss_factor=LossFactorResult(
+            gross_building_area=total_gross,
+            total_common_area=total_gross * 0.18,
+            net_rentable_area=total_gross * 0.82,
+            loss_factor_pct=18.0,
+            efficiency_ratio=82.0,
+        ),
+    )
+
+
+def make_massing_model(num_floors: int = 8) -> dict:
+    """Build an R6 massing model with *num_floors* floors."""
+    return build_massing_model(
+        make_lot(), make_scenario(num_floors=num_floors, max_height=90),
+        make_envelope(max_height=120), district="R6",
+    )
@@ -0,0 +1,160 @@
+"""Tests for admission control on expensive endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.admission import AdmissionMiddleware, client_key
+from app.config import settings
+from app.services import admission
+from app.services.admission import ADMISSION_REJECTED, AdmissionPool, Rejected
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pools():
+    admission.reset_pools()
+    yield
+    admission.reset_pools()
+
+
+async def _hold(pool: AdmissionPool, user: str, release: asyncio.Event, log: list, name: str):
+    async with pool.slot(user):
+        log.append(name)
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestPool:
+    def test_queues_in_order_then_rejects(self):
+        pool = AdmissionPool("analysis", limit=1, queue=2, per_user=5, queue_timeout=10)
+
+        async def _run():
+            release, log = asyncio.Event(), []
+            tasks = [asyncio.create_task(_hold(pool, "", release, log, name)) for name in "abc"]
+            await _settle()
+            assert (log, pool.active, pool.queued) == (["a"], 1, 2)
+            with pytest.raises(Rejected) as rejected:
+                async with pool.slot():
+                    pass
+            release.set()
+            await asyncio.gather(*tasks)
+            return log, rejected.value
+
+        log, rejected = asyncio.run(_run())
+        assert log == ["a", "b", "c"]
+        assert rejected.reason == "queue_full"
+        assert rejected.retry_after == 30  # 3 ahead x 10 s default / 1 slot
+        assert (pool.active, pool.queued) == (0, 0)
+
+    def test_per_user_cap_counts_queued_requests(self):
+        pool = AdmissionPool("report", limit=1, queue=5, per_user=2, queue_timeout=10)
+
+        async def _run():
+            release, log = asyncio.Event(), []
+            tasks = [asyncio.create_task(_hold(pool, "user_1", release, log, n)) for n in "ab"]
+            await _settle()
+            with pytest.raises(Rejected, match="user_limit"):
+                async with pool.slot("user_1"):
+                    pass
+            tasks.append(asyncio.create_task(_hold(pool, "user_2", release, log, "c")))
+            await _settle()
+            release.set()
+            await asyncio.gather(*tasks)
+            return log
+
+        before = ADMISSION_REJECTED.value("report", "user_limit")
+        assert asyncio.run(_run()) == ["a", "b", "c"]
+        assert ADMISSION_REJECTED.value("report", "user_limit") == before + 1
+
+    def test_queue_timeout_and_cancellation_free_their_place(self):
+        pool = AdmissionPool("analysis", limit=1, queue=5, per_user=5, queue_timeout=0.01)
+
+        async def _run():
+            release, log = asyncio.Event(), []
+            holder = asyncio.create_task(_hold(pool, "", release, log, "a"))
+            await _settle()
+            with pytest.raises(Rejected, match="queue_timeout"):
+                async with pool.slot():
+                    pass
+            pool.queue_timeout = 10
+            cancelled = asyncio.create_task(_hold(pool, "", release, log, "b"))
+            await _settle()
+            cancelled.cancel()
+            await _settle()
+            waiting = asyncio.create_task(_hold(pool, "", release, log, "c"))
+            await _settle()
+            assert pool.queued == 1
+            release.set()
+            await asyncio.gather(holder, waiting)
+            return log
+
+        assert asyncio.run(_run()) == ["a", "c"]
+        assert (pool.active, pool.queued) == (0, 0)
+
+
+def _app(release: asyncio.Event) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/v1/full-analysis")
+    async def full_analysis():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/api/lot/{bbl}")
+    async def lot(bbl: str):
+        return {"bbl": bbl}
+
+    app.add_middleware(AdmissionMiddleware)
+    return app
+
+
+class TestMiddleware:
+    def test_heavy_requests_queue_and_shed_while_cheap_ones_pass(self, monkeypatch):
+        monkeypatch.setattr(settings, "admission_pools", {"analysis": (1, 1, 5)})
+
+        async def _run():
+            release = asyncio.Event()
+            transport = httpx.ASGITransport(app=_app(release))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                heavy = [asyncio.create_task(client.post("/api/v1/full-analysis")) for _ in range(2)]
+                await _settle()
+                shed = await client.post("/api/v1/full-analysis")
+                cheap = await client.get("/api/lot/3012340001")
+                release.set()
+                return shed, cheap, await asyncio.gather(*heavy)
+
+        shed, cheap, heavy = asyncio.run(_run())
+        assert cheap.status_code == 200
+        assert shed.status_code == 429
+        assert int(shed.headers["Retry-After"]) >= 1
+        assert shed.json()["retry_after"] == int(shed.headers["Retry-After"])
+        assert [r.status_code for r in heavy] == [200, 200]
+
+    def test_portfolio_jobs_have_their_own_pool(self):
+        pool = admission.pool_for_route("POST", "/api/v1/saas/reports/portfolio")
+        assert pool is not None and pool.name == "portfolio"
+
+    def test_unconfigured_pool_not_limited(self, monkeypatch):
+        monkeypatch.setattr(settings, "admission_pools", {})
+        assert admission.pool_for_route("POST", "/api/v1/full-analysis") is None
+
+
+def _bearer(claims: dict) -> list[tuple[bytes, bytes]]:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+    return [(b"authorization", b"Bearer eyJhbGciOiJSUzI1NiJ9." + payload + b".sig")]
+
+
+def test_client_key():
+    assert client_key({"headers": _bearer({"sub": "user_2abc"})}) == "user_2abc"
+    assert client_key({"headers": [(b"authorization", b"Bearer not-a-jwt")]}) == ""
+    assert client_key({"headers": [], "client": ("10.0.0.1", 5000)}) == ""
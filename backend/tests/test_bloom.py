@@ -0,0 +1,31 @@
+"""Tests for the in-process Bloom filter."""
+
+from __future__ import annotations
+
+from app.services.bloom import BloomFilter
+
+
+class TestBloomFilter:
+    def test_added_keys_found(self):
+        bloom = BloomFilter(capacity=1000)
+        keys = [f"nyc_zoning:pluto:25v1:3{i:09d}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+        assert len(bloom) == 1000
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"added:{i}")
+        false_positives = sum(f"other:{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+    def test_starts_over_past_capacity(self):
+        bloom = BloomFilter(capacity=10)
+        for i in range(10):
+            bloom.add(f"old:{i}")
+        bloom.add("new")
+        assert "new" in bloom
+        assert len(bloom) == 1
+        assert sum(f"old:{i}" in bloom for i in range(10)) < 5
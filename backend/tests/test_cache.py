@@ -0,0 +1,627 @@
+"""Tests for the cache layer: local tier, Redis failover, stale-while-revalidate
+and PLUTO release keys."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.config import settings
+from app.models.schemas import BBLResponse
+import httpx
+
+from app.services import cache, cache_codec, geocoding, geometry
+from app.services.cache import (
+    TTL_NEGATIVE, LocalCache, NotFound, cache_bypass, cache_get, cache_get_many, cache_set,
+    cache_set_many, cache_swr, pluto_release, swr_cached,
+)
+from app.services.singleflight import default_key
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio commands the cache uses."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.round_trips = 0
+
+    async def ping(self):
+        return True
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        if ex:
+            self.ttls[key] = ex
+        return True
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+        return True
+
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        for key, ttl, value in self.commands:
+            self.redis.data[key] = value
+            self.redis.ttls[key] = ttl
+        return [True] * len(self.commands)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_local_cache():
+    cache.reset_local_cache()
+    yield
+    cache.reset_local_cache()
+
+
+@pytest.fixture()
+def redis(monkeypatch) -> FakeRedis:
+    fake = FakeRedis()
+
+    async def _get_redis():
+        return fake
+
+    monkeypatch.setattr(cache, "get_redis", _get_redis)
+    monkeypatch.setattr(settings, "pluto_release", "25v1")
+    return fake
+
+
+def _fetcher(values):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return values[min(len(calls), len(values)) - 1]
+
+    return calls, fetch
+
+
+def _age(redis: FakeRedis, key: str, seconds: float) -> None:
+    entry = cache_codec.decode(redis.data[key])
+    entry["t"] -= seconds
+    redis.data[key] = cache_codec.encode(entry)
+    cache._local.delete(key)
+
+
+class TestStaleWhileRevalidate:
+    """Fresh entries are served, stale ones served and refreshed once."""
+
+    def test_miss_then_hit(self, redis):
+        calls, fetch = _fetcher([{"lotarea": 2500}])
+
+        async def _run():
+            first = await cache_swr("pluto", "3012340001", fetch, soft_ttl=60)
+            second = await cache_swr("pluto", "3012340001", fetch, soft_ttl=60)
+            return first, second
+
+        assert asyncio.run(_run()) == ({"lotarea": 2500}, {"lotarea": 2500})
+        assert len(calls) == 1
+        key = "nyc_zoning:pluto:25v1:3012340001"
+        assert redis.ttls[key] == cache.TTL_LOT_DATA_HARD
+
+    def test_stale_served_and_refreshed_in_background(self, redis):
+        calls, fetch = _fetcher([{"v": 1}, {"v": 2}])
+        key = "nyc_zoning:pluto:25v1:3012340001"
+
+        async def _run():
+            await cache_swr("pluto", "3012340001", fetch, soft_ttl=60)
+            _age(redis, key, 120)
+            stale = await asyncio.gather(
+                cache_swr("pluto", "3012340001", fetch, soft_ttl=60),
+                cache_swr("pluto", "3012340001", fetch, soft_ttl=60),
+            )
+            await asyncio.gather(*cache._refresh_tasks.values())
+            fresh = await cache_swr("pluto", "3012340001", fetch, soft_ttl=60)
+            return stale, fresh
+
+        stale, fresh = asyncio.run(_run())
+        assert stale == [{"v": 1}, {"v": 1}]
+        assert fresh == {"v": 2}
+        assert len(calls) == 2  # one background refresh for both stale reads
+
+    def test_failed_lookups_not_stored(self, redis):
+        calls, fetch = _fetcher([None, {"v": 1}])
+
+        async def _run():
+            assert await cache_swr("geometry", "1", fetch, soft_ttl=60) is None
+            assert await cache_swr("geometry", "1", fetch, soft_ttl=60) == {"v": 1}
+
+        asyncio.run(_run())
+        assert len(calls) == 2
+
+    def test_bypass_fetches_and_stores(self, redis):
+        calls, fetch = _fetcher([{"v": 1}, {"v": 2}])
+
+        async def _run():
+            await cache_swr("pluto", "1", fetch, soft_ttl=60)
+            with cache_bypass():
+                assert await cache_swr("pluto", "1", fetch, soft_ttl=60) == {"v": 2}
+            return await cache_swr("pluto", "1", fetch, soft_ttl=60)
+
+        assert asyncio.run(_run()) == {"v": 2}
+        assert len(calls) == 2
+
+    def test_without_redis_uses_local_tier(self, monkeypatch):
+        async def _no_redis():
+            return None
+
+        monkeypatch.setattr(cache, "get_redis", _no_redis)
+        monkeypatch.setattr(settings, "pluto_release", "25v1")
+        calls, fetch = _fetcher([{"v": 1}])
+        asyncio.run(cache_swr("pluto", "1", fetch, soft_ttl=60))
+        assert asyncio.run(cache_swr("pluto", "1", fetch, soft_ttl=60)) == {"v": 1}
+        assert len(calls) == 1
+
+    def test_decorator_round_trips_models(self, redis):
+        calls = []
+
+        @swr_cached("geocode", 60, key=lambda address: address.lower(), model=BBLResponse)
+        async def _geocode(address):
+            calls.append(address)
+            return BBLResponse(bbl="3012340001", borough=3, block=1234, lot=1, latitude=40.7)
+
+        async def _run():
+            await _geocode("100 Main St")
+            return await _geocode("100 MAIN ST")
+
+        result = asyncio.run(_run())
+        assert isinstance(result, BBLResponse)
+        assert result.bbl == "3012340001" and result.latitude == 40.7
+        assert calls == ["100 Main St"]
+
+    def test_prefetch_loads_many_entries_in_one_round_trip(self, redis):
+        calls = []
+
+        @swr_cached("pluto", 60, key=lambda bbl: bbl)
+        async def _pluto(bbl):
+            calls.append(bbl)
+            return {"bbl": bbl}
+
+        bbls = ["3012340001", "3012340002", "3012340003"]
+
+        async def _run():
+            for bbl in bbls:
+                await _pluto(bbl)
+            cache.reset_local_cache()
+            redis.round_trips = 0
+            assert await _pluto.prefetch(bbls + ["3012340004"]) == 3
+            return [await _pluto(bbl) for bbl in bbls]
+
+        assert asyncio.run(_run()) == [{"bbl": bbl} for bbl in bbls]
+        assert calls == bbls
+        assert redis.round_trips == 1
+
+    def test_many_fetches_misses_together(self, redis):
+        batches, refreshed = [], []
+
+        @swr_cached("pluto", 60, key=lambda bbl: bbl, negative_ttl=600, missing=None)
+        async def _pluto(bbl):
+            refreshed.append(bbl)
+            return {"bbl": bbl, "v": 2}
+
+        async def _fetch_many(bbls):
+            batches.append(bbls)
+            return {bbl: NotFound(bbl) if bbl.endswith("4") else {"bbl": bbl, "v": 1}
+                    for bbl in bbls if not bbl.endswith("5")}
+
+        bbls = ["3012340001", "3012340002", "3012340003", "3012340004", "3012340005"]
+
+        async def _run():
+            await _pluto.prime_many({"3012340001": {"bbl": "3012340001", "v": 1}})
+            _age(redis, "nyc_zoning:pluto:25v1:3012340001", 120)
+            cache.reset_local_cache()
+            redis.round_trips = 0
+            first = await _pluto.many(bbls, _fetch_many)
+            round_trips = redis.round_trips
+            await asyncio.gather(*cache._refresh_tasks.values())
+            second = await _pluto.many(bbls[1:4], _fetch_many)
+            return first, second, round_trips
+
+        first, second, round_trips = asyncio.run(_run())
+        assert batches == [bbls[1:]]  # Cached lot not fetched; unanswered one not cached
+        assert round_trips == 2  # One MGET, one pipelined write
+        assert first == {
+            "3012340001": {"bbl": "3012340001", "v": 1},
+            "3012340002": {"bbl": "3012340002", "v": 1},
+            "3012340003": {"bbl": "3012340003", "v": 1},
+            "3012340004": None,
+        }
+        assert refreshed == ["3012340001"]  # Stale entry refreshed in the background
+        assert second == {bbl: first[bbl] for bbl in bbls[1:4]}
+        assert redis.ttls["nyc_zoning:pluto:25v1:3012340004"] == 600
+
+
+class TestNegativeResults:
+    """Definitive misses are remembered briefly; upstream failures are not."""
+
+    @staticmethod
+    def _missing(calls):
+        async def fetch():
+            calls.append(1)
+            raise NotFound("No PLUTO data for BBL 3999990001")
+        return fetch
+
+    def test_not_found_remembered(self, redis):
+        calls = []
+        fetch = self._missing(calls)
+
+        async def _run():
+            for _ in range(3):
+                with pytest.raises(NotFound, match="No PLUTO data"):
+                    await cache_swr("pluto", "3999990001", fetch, soft_ttl=60, negative_ttl=600)
+
+        asyncio.run(_run())
+        assert len(calls) == 1
+        key = "nyc_zoning:pluto:25v1:3999990001"
+        assert redis.ttls[key] == 600
+        assert key in cache._negative_filter
+        assert cache._local.get(key) is None  # Kept apart from lot data
+
+    def test_shared_with_other_workers(self, redis):
+        calls = []
+        fetch = self._missing(calls)
+
+        async def _run():
+            with pytest.raises(NotFound):
+                await cache_swr("pluto", "3999990001", fetch, soft_ttl=60, negative_ttl=600)
+            cache.reset_local_cache()  # Another process: only Redis has it
+            with pytest.raises(NotFound):
+                await cache_swr("pluto", "3999990001", fetch, soft_ttl=60, negative_ttl=600)
+
+        asyncio.run(_run())
+        assert len(calls) == 1
+
+    def test_not_remembered_without_negative_ttl(self, redis):
+        calls = []
+        fetch = self._missing(calls)
+
+        async def _run():
+            for _ in range(2):
+                with pytest.raises(NotFound):
+                    await cache_swr("pluto", "3999990001", fetch, soft_ttl=60)
+
+        asyncio.run(_run())
+        assert len(calls) == 2
+        assert redis.data == {}
+
+    def test_bypass_rechecks(self, redis):
+        calls = []
+
+        @swr_cached("pluto", 60, key=lambda bbl: bbl, negative_ttl=600, missing=None)
+        async def _pluto(bbl):
+            calls.append(bbl)
+            if len(calls) == 1:
+                raise NotFound(f"No PLUTO data for BBL {bbl}")
+            return {"bbl": bbl}
+
+        async def _run():
+            assert await _pluto("3012340001") is None
+            assert await _pluto("3012340001") is None
+            with cache_bypass():
+                assert await _pluto("3012340001") == {"bbl": "3012340001"}
+            return await _pluto("3012340001")
+
+        assert asyncio.run(_run()) == {"bbl": "3012340001"}
+        assert len(calls) == 2
+
+    def test_unknown_address_geocoded_once(self, redis, monkeypatch):
+        calls = []
+
+        async def _no_match(address):
+            calls.append(address)
+            return None
+
+        monkeypatch.setattr(geocoding, "_geocode_geosearch", _no_match)
+
+        async def _run():
+            for _ in range(2):
+                with pytest.raises(ValueError, match="Could not geocode") as exc:
+                    await geocoding.geocode_address("123 Nowhere Plaza")
+                assert isinstance(exc.value, geocoding.AddressNotFound)
+
+        asyncio.run(_run())
+        assert calls == ["123 Nowhere Plaza"]
+
+    def test_geocoder_outage_not_remembered(self, redis, monkeypatch):
+        calls = []
+
+        async def _timeout(address):
+            calls.append(address)
+            raise httpx.ReadTimeout("timed out")
+
+        monkeypatch.setattr(geocoding, "_geocode_geosearch", _timeout)
+
+        async def _run():
+            for _ in range(2):
+                with pytest.raises(ValueError) as exc:
+                    await geocoding.geocode_address("123 Nowhere Plaza")
+                assert not isinstance(exc.value, geocoding.AddressNotFound)
+
+        asyncio.run(_run())
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("status", [429, 403])
+    def test_geosearch_refusal_not_remembered(self, redis, monkeypatch, status):
+        calls = []
+
+        def _refuse(request):
+            calls.append(request.url.host)
+            return httpx.Response(status, request=request)
+
+        monkeypatch.setattr(geocoding, "upstream_client", lambda timeout=None: httpx.AsyncClient(
+            transport=httpx.MockTransport(_refuse)))
+
+        async def _run():
+            for _ in range(2):
+                with pytest.raises(ValueError) as exc:
+                    await geocoding.geocode_address("123 Nowhere Plaza")  # No borough
+                assert not isinstance(exc.value, geocoding.AddressNotFound)
+
+        asyncio.run(_run())
+        assert calls == ["geosearch.planninglabs.nyc"] * 2
+
+    def test_missing_geometry(self, redis, monkeypatch):
+        answers = {"mappluto_25v1": NotFound("No lot geometry for BBL 3999990001")}
+        queries = []
+
+        async def _carto(bbl, table):
+            queries.append(table)
+            answer = answers.get(table)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        monkeypatch.setattr(geometry, "_query_carto", _carto)
+
+        async def _run():
+            assert await geometry.fetch_lot_geometry("3999990001") is None
+            first = len(queries)
+            assert await geometry.fetch_lot_geometry("3999990001") is None
+            return first
+
+        first = asyncio.run(_run())
+        assert first == len(geometry._TABLE_NAMES)
+        assert len(queries) == first
+        key = "nyc_zoning:geometry:25v1:" + default_key("3999990001")
+        assert redis.ttls[key] == TTL_NEGATIVE
+
+    def test_geometry_failures_not_remembered(self, redis, monkeypatch):
+        queries = []
+
+        async def _carto(bbl, table):
+            queries.append(table)
+            return None
+
+        monkeypatch.setattr(geometry, "_query_carto", _carto)
+
+        async def _run():
+            assert await geometry.fetch_lot_geometry("3999990001") is None
+            assert await geometry.fetch_lot_geometry("3999990001") is None
+
+        asyncio.run(_run())
+        assert len(queries) == 2 * len(geometry._TABLE_NAMES)
+
+    @staticmethod
+    def _current_table_times_out(queries):
+        def _carto(request):
+            table = request.url.params["q"].split(" FROM ")[1].split()[0]
+            queries.append(table)
+            if table == geometry.CURRENT_MAPPLUTO_TABLE:
+                raise httpx.ReadTimeout("timed out", request=request)
+            if table == "mappluto_25v1":
+                return httpx.Response(200, json={"rows": []}, request=request)
+            return httpx.Response(400, json={"error": ["relation does not exist"]}, request=request)
+
+        return lambda timeout=None: httpx.AsyncClient(transport=httpx.MockTransport(_carto))
+
+    def test_geometry_timeout_not_remembered(self, redis, monkeypatch):
+        queries = []
+        monkeypatch.setattr(geometry, "upstream_client", self._current_table_times_out(queries))
+
+        async def _run():
+            assert await geometry.fetch_lot_geometry("3999990001") is None
+            assert await geometry.fetch_lot_geometry("3999990001") is None
+
+        asyncio.run(_run())
+        assert len(queries) == 2 * len(geometry._TABLE_NAMES)
+
+    def test_batched_geometry_timeout_not_remembered(self, redis, monkeypatch):
+        queries = []
+        monkeypatch.setattr(geometry, "upstream_client", self._current_table_times_out(queries))
+
+        rows, absent = asyncio.run(geometry.query_mappluto_many(["3999990001"], "bbl"))
+        assert (rows, absent) == ({}, set())
+
+
+class TestPlutoRelease:
+    """Cache keys follow the PLUTO release."""
+
+    @pytest.fixture(autouse=True)
+    def _unpinned(self, redis, monkeypatch):
+        monkeypatch.setattr(settings, "pluto_release", "")
+        monkeypatch.setattr(cache, "_release", None)
+
+    def test_new_release_misses(self, redis, monkeypatch):
+        releases = iter(["24v4", "25v1"])
+
+        async def _fake_release():
+            return next(releases)
+
+        monkeypatch.setattr(cache, "_fetch_pluto_release", _fake_release)
+        calls, fetch = _fetcher([{"v": 1}, {"v": 2}])
+
+        async def _run():
+            await cache_swr("pluto", "1", fetch, soft_ttl=60)
+            assert await cache_swr("pluto", "1", fetch, soft_ttl=60) == {"v": 1}
+            cache._release = (cache._release[0], time.monotonic() - settings.pluto_release_check_seconds)
+            return await cache_swr("pluto", "1", fetch, soft_ttl=60)
+
+        assert asyncio.run(_run()) == {"v": 2}
+        assert "nyc_zoning:pluto:25v1:1" in redis.data
+
+    def test_lookup_failure_keeps_last_known(self, redis, monkeypatch):
+        async def _down():
+            return None
+
+        monkeypatch.setattr(cache, "_fetch_pluto_release", _down)
+        redis.data[cache._RELEASE_KEY] = b"24v4"
+        assert asyncio.run(pluto_release()) == "24v4"
+
+
+class TestLocalCache:
+    """The in-process tier is an LRU bounded by size, with per-entry expiry."""
+
+    def test_evicts_least_recently_used(self):
+        local = LocalCache(max_bytes=25)
+        local.set("a", "x" * 9, 60)
+        local.set("b", "x" * 9, 60)
+        assert local.get("a")
+        local.set("c", "x" * 9, 60)
+        assert local.get("b") is None
+        assert local.get("a") and local.get("c")
+        assert local.used_bytes == 20
+
+    def test_expired_entries_miss(self, monkeypatch):
+        local = LocalCache(max_bytes=1024)
+        local.set("a", "1", 10)
+        now = time.monotonic()
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now + 11)
+        assert local.get("a") is None
+        assert local.used_bytes == 0
+
+    def test_redis_reads_kept_locally(self, redis):
+        redis.data["nyc_zoning:analysis:1"] = cache_codec.encode({"v": 1})
+
+        async def _run():
+            first = await cache_get("analysis", "1")
+            redis.data.clear()
+            return first, await cache_get("analysis", "1")
+
+        assert asyncio.run(_run()) == ({"v": 1}, {"v": 1})
+
+
+class TestBulkAccess:
+    """Batches go to Redis in one MGET / pipeline."""
+
+    def test_set_many_then_get_many(self, redis):
+        items = {"1": {"v": 1}, "2": [1, 2], "3": "three"}
+
+        async def _run():
+            assert await cache_set_many("analysis", items, ttl=120)
+            assert redis.round_trips == 1
+            cache.reset_local_cache()
+            redis.round_trips = 0
+            return await cache_get_many("analysis", ["1", "2", "3", "missing"])
+
+        assert asyncio.run(_run()) == items
+        assert redis.round_trips == 1
+        assert redis.ttls["nyc_zoning:analysis:1"] == 120
+
+    def test_plain_json_entries_still_read(self, redis):
+        redis.data["nyc_zoning:analysis:1"] = json.dumps({"v": 1}).encode()
+        assert asyncio.run(cache_get("analysis", "1")) == {"v": 1}
+
+
+class _DownRedis(FakeRedis):
+    async def get(self, key):
+        raise cache.RedisConnectionError("Connection refused")
+
+    async def setex(self, key, ttl, value):
+        raise cache.RedisConnectionError("Connection refused")
+
+
+class TestRedisFailover:
+    """An unreachable Redis is not retried on every call."""
+
+    def test_failed_connect_backs_off(self, monkeypatch):
+        attempts = []
+
+        class _Refused(FakeRedis):
+            async def ping(self):
+                attempts.append(1)
+                raise cache.RedisConnectionError("Connection refused")
+
+        monkeypatch.setattr(cache, "_redis_client", None)
+        monkeypatch.setattr(cache.redis, "from_url", lambda *a, **k: _Refused())
+
+        async def _run():
+            for _ in range(5):
+                assert await cache.get_redis() is None
+
+        asyncio.run(_run())
+        assert len(attempts) == 1
+        assert cache._redis_backoff == settings.redis_retry_min_seconds
+
+        cache._redis_retry_at = 0.0
+        asyncio.run(cache.get_redis())
+        assert len(attempts) == 2
+        assert cache._redis_backoff == 2 * settings.redis_retry_min_seconds
+
+    def test_concurrent_reconnect_shares_one_client(self, monkeypatch):
+        clients = []
+
+        class _Slow(FakeRedis):
+            async def ping(self):
+                await asyncio.sleep(0.01)
+                return True
+
+        def _from_url(*args, **kwargs):
+            clients.append(_Slow())
+            return clients[-1]
+
+        monkeypatch.setattr(cache, "_redis_client", None)
+        monkeypatch.setattr(cache.redis, "from_url", _from_url)
+
+        async def _run():
+            return await asyncio.gather(*(cache.get_redis() for _ in range(4)))
+
+        results = asyncio.run(_run())
+        assert len(clients) == 1
+        assert all(r is cache._redis_client is clients[0] for r in results)
+
+    def test_command_failure_drops_client_and_serves_locally(self, monkeypatch):
+        monkeypatch.setattr(cache, "_redis_client", _DownRedis())
+        monkeypatch.setattr(cache.redis, "from_url", lambda *a, **k: pytest.fail("reconnected"))
+
+        async def _run():
+            assert await cache_set("analysis", "1", {"v": 1})
+            return await cache_get("analysis", "1")
+
+        assert asyncio.run(_run()) == {"v": 1}
+        assert cache._redis_client is None
+        assert cache._redis_retry_at > time.monotonic()
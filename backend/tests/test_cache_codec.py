@@ -0,0 +1,70 @@
+"""Tests for the binary cache codec."""
+
+from __future__ import annotations
+
+import json
+
+from app.config import settings
+from app.models.schemas import (
+    DevelopmentScenario,
+    LotProfile,
+    MassingFloor,
+    PlutoData,
+    UnitMix,
+    UnitMixResult,
+)
+from app.services.cache_codec import decode, encode
+
+
+def _lot() -> LotProfile:
+    return LotProfile(
+        bbl="3012340001", borough=3, block=1234, lot=1, latitude=40.68,
+        pluto=PlutoData(bbl="3012340001", lotarea=2500.0, zonedist1="R7A"),
+        geometry={"type": "Polygon", "coordinates": [[[-73.9, 40.6], [-73.9, 40.7]]]},
+        zoning_districts=["R7A"], lot_area=2500.0,
+    )
+
+
+def _scenario() -> DevelopmentScenario:
+    return DevelopmentScenario(
+        name="Max Residential", description="As-of-right", total_gross_sf=10000.0,
+        total_net_sf=8200.0, total_units=11,
+        floors=[MassingFloor(floor=1, use="residential", gross_sf=2000.0, net_sf=1640.0,
+                             height_ft=10.0)],
+        unit_mix=UnitMixResult(units=[UnitMix(type="1BR", count=11, avg_sf=745)], total_units=11,
+                                average_unit_sf=745.0, units_per_floor=2.2),
+    )
+
+
+class TestRoundTrip:
+    """Models come back as models; everything else as plain JSON types."""
+
+    def test_models_round_trip(self):
+        value = {"lot_profile": _lot(), "scenarios": [_scenario()], "notes": ("a", "b")}
+        restored = decode(encode(value))
+
+        assert isinstance(restored["lot_profile"], LotProfile)
+        assert restored["lot_profile"] == value["lot_profile"]
+        assert isinstance(restored["lot_profile"].pluto, PlutoData)
+        assert restored["scenarios"] == value["scenarios"]
+        assert isinstance(restored["scenarios"][0].floors[0], MassingFloor)
+        assert restored["notes"] == ["a", "b"]
+
+    def test_large_values_compressed(self, monkeypatch):
+        monkeypatch.setattr(settings, "cache_compress_min_bytes", 1024)
+        value = {"floors": [{"floor": i, "gross_sf": 2000.0} for i in range(200)]}
+        raw = encode(value)
+        assert raw[1:2] != b"-"
+        assert len(raw) < len(json.dumps(value)) / 4
+        assert decode(raw) == value
+
+    def test_small_values_not_compressed(self):
+        assert encode({"v": 1})[:2] == b"j-"
+
+    def test_plain_json_entries(self):
+        assert decode('{"v": 1}') == {"v": 1}
+        assert decode(b'["a", 2]') == ["a", 2]
+
+    def test_only_app_models_rebuilt(self):
+        tagged = {"__model__": "os.path.PurePath", "data": {"x": 1}}
+        assert decode(json.dumps(tagged)) == tagged
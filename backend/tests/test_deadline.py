@@ -0,0 +1,121 @@
+"""Tests for report stage time budgets and load shedding."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import admission, deadline
+from app.services.deadline import STAGE_OUTCOMES, Deadline, Stage, run_stage, run_stages
+
+
+@pytest.fixture(autouse=True)
+def _budgets(monkeypatch):
+    monkeypatch.setattr(settings, "report_stage_budgets", {"satellite": 0.05, "street_view": 0.05})
+    monkeypatch.setattr(settings, "report_shed_inflight", 4)
+    admission.reset_pools()
+    yield
+    admission.reset_pools()
+
+
+def _returns(value, delay=0.0, calls=None):
+    async def run():
+        if calls is not None:
+            calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return run
+
+
+class TestBudgets:
+    def test_slow_stage_abandoned_others_kept(self):
+        before = STAGE_OUTCOMES.value("satellite", "timeout")
+        start = time.perf_counter()
+        results = asyncio.run(run_stages([
+            Stage("satellite", _returns(b"sat", delay=5)),
+            Stage("street", _returns(b"street")),
+        ]))
+        assert results == {"satellite": None, "street": b"street"}
+        assert time.perf_counter() - start < 1
+        assert STAGE_OUTCOMES.value("satellite", "timeout") == before + 1
+
+    def test_abandoned_stage_finishes_in_background(self):
+        finished = []
+
+        async def _slow_fetch():
+            await asyncio.sleep(0.1)
+            finished.append("cached")
+            return b"sat"
+
+        async def _run():
+            results = await run_stages([Stage("satellite", _slow_fetch)])
+            assert not finished
+            await asyncio.sleep(0.15)
+            return results
+
+        assert asyncio.run(_run()) == {"satellite": None}
+        assert finished == ["cached"]
+        assert not deadline._late
+
+    def test_wait_abandoned(self):
+        finished = []
+
+        async def _slow_fetch():
+            await asyncio.sleep(0.1)
+            finished.append("cached")
+            return b"sat"
+
+        async def _run():
+            results = await run_stages([Stage("satellite", _slow_fetch)])
+            await deadline.wait_abandoned()
+            return results
+
+        assert asyncio.run(_run()) == {"satellite": None}
+        assert finished == ["cached"]
+
+    def test_deadline_caps_every_stage(self):
+        async def _run():
+            return await run_stages([
+                Stage("zoning", _returns(b"zoning", delay=5)),  # No budget of its own
+                Stage("street", _returns(b"street")),
+            ], Deadline(0.05))
+
+        assert asyncio.run(_run()) == {"zoning": None, "street": b"street"}
+
+    def test_errors(self):
+        async def _fail():
+            raise RuntimeError("upstream exploded")
+
+        assert asyncio.run(run_stage(Stage("street_view", _fail, optional=True))) is None
+        with pytest.raises(RuntimeError):
+            asyncio.run(run_stage(Stage("satellite", _fail)))
+
+
+class TestShedding:
+    def _run(self):
+        calls = []
+        results = asyncio.run(run_stages([
+            Stage("satellite", _returns(b"sat", calls=calls)),
+            Stage("street_view", _returns(b"sv", calls=calls), optional=True),
+        ]))
+        return results, calls
+
+    def test_optional_stages_run_when_idle(self):
+        assert self._run() == ({"satellite": b"sat", "street_view": b"sv"}, [b"sat", b"sv"])
+
+    def test_shed_while_admission_queues(self, monkeypatch):
+        monkeypatch.setattr(admission, "queueing", lambda: True)
+        before = STAGE_OUTCOMES.value("street_view", "shed")
+        results, calls = self._run()
+        assert results == {"satellite": b"sat", "street_view": None}
+        assert calls == [b"sat"]  # Never started
+        assert STAGE_OUTCOMES.value("street_view", "shed") == before + 1
+
+    def test_shed_with_many_pipelines_running(self, monkeypatch):
+        monkeypatch.setattr(deadline, "_inflight", 4)
+        assert self._run()[0]["street_view"] == b"sv"  # 4 others running: at the limit
+        monkeypatch.setattr(settings, "report_shed_inflight", 3)
+        assert self._run()[0]["street_view"] is None
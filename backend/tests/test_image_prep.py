@@ -0,0 +1,114 @@
+"""Tests for report image preparation."""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from app.services.image_prep import (
+    KIND_GRAPHIC,
+    placement_px,
+    prepare_image,
+)
+from app.services.report import _enhance_satellite_image
+
+
+def _encode(img: Image.Image, fmt: str = "PNG") -> bytes:
+    buf = BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def _photo(size: int = 800, fmt: str = "PNG") -> bytes:
+    """Smooth random color field, like an aerial tile (many distinct colors)."""
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 255, (size // 8, size // 8, 3), dtype=np.uint8)
+    img = Image.fromarray(noise).resize((size, size), Image.BICUBIC)
+    return _encode(img.convert("RGBA") if fmt == "PNG" else img, fmt)
+
+
+def _graphic(size: int = 800) -> bytes:
+    img = Image.new("RGB", (size, size), "white")
+    img.paste((28, 61, 90), (100, 100, 400, 400))
+    return _encode(img)
+
+
+def _open(data: bytes) -> Image.Image:
+    return Image.open(BytesIO(data))
+
+
+# ──────────────────────────────────────────────────────────────────
+# SIZING
+# ──────────────────────────────────────────────────────────────────
+
+class TestPlacementSize:
+    """Images are resampled to their placed size at the report DPI."""
+
+    def test_placement_px(self):
+        assert placement_px(72, 144, dpi=150) == (150, 300)
+
+    def test_downsamples_to_placement(self):
+        out = _open(prepare_image(_photo(), 216, 216, dpi=150))  # 3 in
+        assert out.size == (450, 450)
+
+    def test_never_upsamples(self):
+        out = _open(prepare_image(_photo(size=200), 432, 432, dpi=150))  # 6 in
+        assert out.size == (200, 200)
+
+
+# ──────────────────────────────────────────────────────────────────
+# ENCODING
+# ──────────────────────────────────────────────────────────────────
+
+class TestEncoding:
+    """Photos become JPEG, flat graphics stay PNG, output shrinks."""
+
+    def test_photo_png32_becomes_jpeg(self):
+        src = _photo()
+        out = prepare_image(src, 216, 216)
+        assert _open(out).format == "JPEG"
+        assert len(out) < len(src) / 4
+
+    def test_flat_graphic_stays_png(self):
+        assert _open(prepare_image(_graphic(), 216, 216)).format == "PNG"
+
+    def test_explicit_graphic_kind(self):
+        assert _open(prepare_image(_photo(), 216, 216, kind=KIND_GRAPHIC)).format == "PNG"
+
+    def test_small_jpeg_passes_through(self):
+        src = _photo(size=200, fmt="JPEG")
+        assert prepare_image(src, 432, 432) is src
+
+    def test_undecodable_returns_input(self):
+        assert prepare_image(b"not an image", 100, 100) == b"not an image"
+
+
+# ──────────────────────────────────────────────────────────────────
+# SATELLITE ENHANCEMENT
+# ──────────────────────────────────────────────────────────────────
+
+class TestSatelliteEnhancement:
+    """Overlays are composited once at the placement size."""
+
+    GEOM = {
+        "type": "Polygon",
+        "coordinates": [[[-73.9, 40.7], [-73.8995, 40.7], [-73.8995, 40.7003],
+                         [-73.9, 40.7003], [-73.9, 40.7]]],
+    }
+
+    def test_output_at_placement_size(self):
+        out = _open(_enhance_satellite_image(_photo(), self.GEOM, width=324, height=324))
+        assert out.format == "JPEG"
+        assert out.size == placement_px(324, 324)
+
+    def test_boundary_drawn(self):
+        out = _open(_enhance_satellite_image(_photo(), self.GEOM, width=324, height=324))
+        w, h = out.size
+        # Left edge of the lot outline sits at 15% padding; it is near-white
+        edge = out.convert("L").getpixel((round(0.15 * w), h // 2))
+        assert edge > 200
+
+    def test_invalid_input_returned_unchanged(self):
+        assert _enhance_satellite_image(b"garbage") == b"garbage"
@@ -0,0 +1,168 @@
+"""Tests for the cross-worker cache invalidation bus."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import cache, invalidation
+from app.services.invalidation import Invalidation, handle_message
+
+
+@pytest.fixture(autouse=True)
+def _fresh_local_cache():
+    cache.reset_local_cache()
+    yield
+    cache.reset_local_cache()
+
+
+def _fill_local(*keys: str) -> None:
+    for key in keys:
+        cache._local.set(key, b"x", 60)
+
+
+def _local_keys() -> set[str]:
+    return set(cache._local._entries)
+
+
+PLUTO_1 = "nyc_zoning:pluto:25v1:3012340001"
+GEOMETRY_1 = 'nyc_zoning:geometry:25v1:["3012340001"]'
+PLUTO_2 = "nyc_zoning:pluto:25v1:3012340002"
+OTHER_BLOCK = "nyc_zoning:pluto:25v1:3012350001"
+STREET = "nyc_zoning:street_width:40.301234,-73.950000"
+
+
+class TestMessages:
+    def test_json_round_trip(self):
+        message = Invalidation("block", "301234", "host:1:abc")
+        assert Invalidation.from_json(message.to_json()) == message
+
+    @pytest.mark.parametrize("kind,value", [
+        ("lot", "3012340001"), ("bbl", "301234"), ("block", "3-01234"), ("namespace", ""),
+    ])
+    def test_rejects_invalid(self, kind, value):
+        with pytest.raises(ValueError):
+            Invalidation(kind, value)
+
+    def test_patterns_match_whole_bbls(self):
+        bbl = Invalidation("bbl", "3012340001").pattern()
+        assert bbl.search(GEOMETRY_1)
+        assert not bbl.search("nyc_zoning:pluto:25v1:30123400012")
+        block = Invalidation("block", "301234").pattern()
+        assert block.search(PLUTO_2)
+        assert not block.search(OTHER_BLOCK)
+        assert not block.search(STREET)
+
+
+class TestLocalCacheHandler:
+    """The local tier drops exactly the entries a message covers."""
+
+    def test_bbl(self):
+        _fill_local(PLUTO_1, GEOMETRY_1, PLUTO_2)
+        invalidation.apply(Invalidation("bbl", "3012340001"))
+        assert _local_keys() == {PLUTO_2}
+
+    def test_block(self):
+        _fill_local(PLUTO_1, PLUTO_2, OTHER_BLOCK, STREET)
+        invalidation.apply(Invalidation("block", "301234"))
+        assert _local_keys() == {OTHER_BLOCK, STREET}
+
+    def test_namespace(self):
+        _fill_local(PLUTO_1, GEOMETRY_1, STREET)
+        invalidation.apply(Invalidation("namespace", "pluto"))
+        assert _local_keys() == {GEOMETRY_1, STREET}
+
+    def test_all_also_rechecks_pluto_release(self, monkeypatch):
+        monkeypatch.setattr(cache, "_release", ("25v1", 0.0))
+        _fill_local(PLUTO_1, STREET)
+        invalidation.apply(Invalidation("all"))
+        assert _local_keys() == set()
+        assert cache._release is None
+
+
+class TestDelivery:
+    def test_own_messages_skipped(self):
+        _fill_local(PLUTO_1)
+        own = Invalidation("bbl", "3012340001", invalidation.ORIGIN)
+        assert handle_message(own.to_json()) is None
+        assert _local_keys() == {PLUTO_1}
+
+        remote = Invalidation("bbl", "3012340001", "other-host:7:ffff")
+        assert handle_message(remote.to_json().encode()) == remote
+        assert _local_keys() == set()
+
+    def test_malformed_ignored(self):
+        assert handle_message(b"not json") is None
+        assert handle_message('{"kind": "everything"}') is None
+
+    def test_publish_applies_locally_and_broadcasts(self, monkeypatch):
+        published = []
+
+        class _Redis:
+            async def publish(self, channel, payload):
+                published.append((channel, Invalidation.from_json(payload)))
+                return 1
+
+        async def _get_redis():
+            return _Redis()
+
+        monkeypatch.setattr(cache, "get_redis", _get_redis)
+        _fill_local(PLUTO_1, PLUTO_2)
+        assert asyncio.run(invalidation.invalidate_block(3, 1234))
+
+        assert _local_keys() == set()
+        [(channel, message)] = published
+        assert channel == invalidation.CHANNEL
+        assert (message.kind, message.value, message.origin) == ("block", "301234", invalidation.ORIGIN)
+
+    def test_listener_applies_messages_and_flushes_after_reconnect(self, monkeypatch):
+        remote = Invalidation("bbl", "3012340001", "other-host:7:ffff").to_json().encode()
+        sessions = [
+            [{"type": "message", "data": remote}, ConnectionError("connection reset")],
+            [],  # Second connection stays open
+        ]
+        applied = []
+
+        class _PubSub:
+            def __init__(self, items):
+                self.items = items
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def subscribe(self, channel):
+                assert channel == invalidation.CHANNEL
+
+            async def listen(self):
+                for item in self.items:
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+                await asyncio.Event().wait()
+
+        class _Client:
+            def pubsub(self, **kwargs):
+                return _PubSub(sessions.pop(0))
+
+            async def aclose(self):
+                pass
+
+        monkeypatch.setattr(invalidation.redis, "from_url", lambda *a, **k: _Client())
+        monkeypatch.setattr(settings, "redis_retry_min_seconds", 0.0)
+        monkeypatch.setattr(invalidation, "_handlers", [applied.append])
+
+        async def _run():
+            task = asyncio.get_running_loop().create_task(invalidation.listen())
+            while len(applied) < 2:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(_run())
+        assert [(m.kind, m.value) for m in applied] == [("bbl", "3012340001"), ("all", "")]
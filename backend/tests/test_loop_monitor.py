@@ -0,0 +1,58 @@
+"""Tests for the event-loop blocking detector."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from app.config import settings
+from app.services.loop_monitor import (
+    LOOP_BLOCKS, LOOP_LAG, LoopMonitor, call_site, start_monitor,
+)
+
+SITE = "tests/test_loop_monitor.py:_render_blocking"
+
+
+def _render_blocking(seconds: float) -> None:
+    time.sleep(seconds)  # Stands in for a synchronous SDK / ReportLab call
+
+
+class TestLoopMonitor:
+    def test_stall_counted_under_blocking_call_site(self):
+        before_blocks = LOOP_BLOCKS.value(SITE)
+        before_lag = (LOOP_LAG.snapshot() or {"sum": 0.0})["sum"]
+
+        async def _run():
+            monitor = LoopMonitor(interval=0.01, threshold=0.05)
+            monitor.start()
+            try:
+                await asyncio.sleep(0.05)
+                _render_blocking(0.3)
+                await asyncio.sleep(0.05)
+            finally:
+                monitor.stop()
+
+        asyncio.run(_run())
+        assert LOOP_BLOCKS.value(SITE) == before_blocks + 1  # Once per stall
+        assert LOOP_LAG.snapshot()["sum"] - before_lag >= 0.25  # The stall shows up as lag
+
+    def test_quiet_loop_reports_nothing(self):
+        async def _run():
+            monitor = LoopMonitor(interval=0.01, threshold=0.2)
+            monitor.start()
+            await asyncio.sleep(0.05)
+            monitor.stop()
+
+        before = LOOP_BLOCKS.value(SITE)
+        asyncio.run(_run())
+        assert LOOP_BLOCKS.value(SITE) == before
+
+    def test_call_site_is_innermost_project_frame(self):
+        site = call_site(sys._getframe())
+        assert site == "tests/test_loop_monitor.py:test_call_site_is_innermost_project_frame"
+        assert call_site(None) == "unknown"
+
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.setattr(settings, "loop_monitor_enabled", False)
+        assert start_monitor() is None
@@ -218,7 +218,7 @@ class TestFetchSatelliteImage:
         """Should return None when ESRI times out and Google key is not set."""
         import httpx
 
-        with patch("app.services.maps.httpx.AsyncClient") as mock_client_class:
+        with patch("app.services.upstream.httpx.AsyncClient") as mock_client_class:
             mock_client = AsyncMock()
             mock_client.get.side_effect = httpx.TimeoutException("timeout")
             mock_client_class.return_value.__aenter__ = AsyncMock(return_value=mock_client)
@@ -236,7 +236,7 @@ class TestFetchSatelliteImage:
     @pytest.mark.asyncio
     async def test_returns_none_on_http_error(self):
         """Should return None on non-200 response."""
-        with patch("app.services.maps.httpx.AsyncClient") as mock_client_class:
+        with patch("app.services.upstream.httpx.AsyncClient") as mock_client_class:
             mock_resp = MagicMock()
             mock_resp.status_code = 500
             mock_resp.headers = {}
@@ -262,7 +262,7 @@ class TestFetchStreetMapImage:
         """Should return None when all sources fail."""
         import httpx
 
-        with patch("app.services.maps.httpx.AsyncClient") as mock_client_class:
+        with patch("app.services.upstream.httpx.AsyncClient") as mock_client_class:
             mock_client = AsyncMock()
             mock_client.get.side_effect = httpx.TimeoutException("timeout")
             mock_client_class.return_value.__aenter__ = AsyncMock(return_value=mock_client)
@@ -307,3 +307,59 @@ async def test_esri_street_real():
     if result is not None:
         assert isinstance(result, bytes)
         assert len(result) > 1000
+
+
+
+class TestMapImageCache:
+    def test_fetched_image_is_reused(self, monkeypatch, isolated_map_cache):
+        import asyncio
+        from io import BytesIO
+        from PIL import Image
+        from app.services import maps
+
+        calls = []
+
+        async def _fake_fetch(url, bbox, width, height):
+            calls.append((width, height))
+            buf = BytesIO()
+            Image.new("RGB", (width, height), "white").save(buf, format="PNG")
+            return buf.getvalue()
+
+        monkeypatch.setattr(maps, "_fetch_esri_image", _fake_fetch)
+        monkeypatch.setattr(maps, "_city_base_images", {})
+
+        async def _run():
+            first = await maps.fetch_city_overview_map(BROOKLYN_LAT, BROOKLYN_LNG)
+            again = await maps.fetch_city_overview_map(BROOKLYN_LAT, BROOKLYN_LNG, width=800)
+            other = await maps.fetch_city_overview_map(BROOKLYN_LAT + 0.01, BROOKLYN_LNG)
+            return first, again, other
+
+        first, again, other = asyncio.run(_run())
+        assert first and again == first and other != first
+        assert isolated_map_cache.hits == 1 and isolated_map_cache.misses == 2
+        assert calls == [(800, 500)]
+
+    def test_concurrent_fetches_share_one_call_that_caches(self, monkeypatch, isolated_map_cache):
+        import asyncio
+        from app.services import maps
+
+        calls = []
+
+        async def _slow_satellite(lat, lng, geometry=None, width=800, height=600):
+            calls.append((lat, lng))
+            await asyncio.sleep(0.05)
+            return b"png"
+
+        monkeypatch.setattr(maps, "fetch_satellite_image", maps._cached_image("satellite")(_slow_satellite))
+
+        async def _run():
+            abandoned = asyncio.ensure_future(maps.fetch_satellite_image(BROOKLYN_LAT, BROOKLYN_LNG))
+            shared = asyncio.ensure_future(maps.fetch_satellite_image(BROOKLYN_LAT, BROOKLYN_LNG))
+            await asyncio.sleep(0.01)
+            abandoned.cancel()  # e.g. its report stage ran out of time
+            assert await shared == b"png"
+            return await maps.fetch_satellite_image(BROOKLYN_LAT, BROOKLYN_LNG)
+
+        assert asyncio.run(_run()) == b"png"
+        assert len(calls) == 1
+        assert isolated_map_cache.hits == 1
@@ -0,0 +1,127 @@
+"""Tests for massing model level-of-detail reduction."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.zoning_engine.massing_builder import build_massing_model
+from app.zoning_engine.massing_lod import (
+    apply_lod,
+    collapse_floors,
+    simplify_polygon,
+    LOD_BLOCKS,
+    LOD_ENVELOPE,
+    LOD_FULL,
+)
+from tests.factories import make_lot, make_envelope, make_scenario
+
+
+def make_massing_model(num_floors: int = 5) -> dict:
+    return build_massing_model(
+        make_lot(), make_scenario(num_floors=num_floors), make_envelope(), district="R6",
+    )
+
+
+# ──────────────────────────────────────────────────────────────────
+# FLOOR COLLAPSING
+# ──────────────────────────────────────────────────────────────────
+
+class TestCollapseFloors:
+    """Identical consecutive plates merge into extruded blocks."""
+
+    def test_identical_floors_collapse(self):
+        floors = [
+            {"floor_num": n, "use": "residential", "elevation_ft": 10 * (n - 1),
+             "height_ft": 10, "footprint": [[0, 0], [50, 0], [50, 70], [0, 70]],
+             "gross_area_sf": 3500, "net_area_sf": 2870}
+            for n in range(1, 6)
+        ]
+        blocks = collapse_floors(floors)
+        assert len(blocks) == 1
+        assert blocks[0]["height_ft"] == 50
+        assert blocks[0]["gross_area_sf"] == 17500
+        assert blocks[0]["floor_range"] == [1, 5]
+        assert blocks[0]["floor_count"] == 5
+
+    def test_use_change_starts_new_block(self):
+        fp = [[0, 0], [50, 0], [50, 70], [0, 70]]
+        floors = [
+            {"floor_num": 1, "use": "commercial", "elevation_ft": 0, "height_ft": 15, "footprint": fp},
+            {"floor_num": 2, "use": "residential", "elevation_ft": 15, "height_ft": 10, "footprint": fp},
+            {"floor_num": 3, "use": "residential", "elevation_ft": 25, "height_ft": 10, "footprint": fp},
+        ]
+        blocks = collapse_floors(floors)
+        assert [b["use"] for b in blocks] == ["commercial", "residential"]
+        assert blocks[1]["elevation_ft"] == 15
+        assert blocks[1]["height_ft"] == 20
+
+    def test_input_not_mutated(self):
+        model = make_massing_model()
+        before = [dict(f) for f in model["scenarios"][0]["floors"]]
+        apply_lod(model, LOD_BLOCKS)
+        assert model["scenarios"][0]["floors"] == before
+
+
+# ──────────────────────────────────────────────────────────────────
+# APPLY LOD
+# ──────────────────────────────────────────────────────────────────
+
+class TestApplyLod:
+    """Test the public LOD entry point."""
+
+    def test_full_is_passthrough(self):
+        model = make_massing_model()
+        assert apply_lod(model, LOD_FULL) is model
+
+    def test_blocks_reduces_floors_and_mesh(self):
+        model = make_massing_model()
+        reduced = apply_lod(model, LOD_BLOCKS)
+        assert len(reduced["scenarios"][0]["floors"]) < len(model["scenarios"][0]["floors"])
+        assert len(reduced["geometry_3d"]["faces"]) < len(model["geometry_3d"]["faces"])
+        # Total height and summary are preserved
+        assert reduced["total_height_ft"] == model["total_height_ft"]
+        assert reduced["scenarios"][0]["summary"] == model["scenarios"][0]["summary"]
+
+    def test_blocks_preserve_stack_height(self):
+        model = make_massing_model()
+        blocks = apply_lod(model, LOD_BLOCKS)["scenarios"][0]["floors"]
+        floors = model["scenarios"][0]["floors"]
+        assert sum(b["height_ft"] for b in blocks) == pytest.approx(
+            sum(f["height_ft"] for f in floors)
+        )
+
+    def test_envelope_only(self):
+        reduced = apply_lod(make_massing_model(), LOD_ENVELOPE)
+        sc = reduced["scenarios"][0]
+        assert sc["floors"] == []
+        assert sc["bulkhead"] is None
+        assert sc["zoning_envelope"]["wireframe"]
+        assert reduced["geometry_3d"]["vertices"] == []
+
+    def test_unknown_lod_raises(self):
+        with pytest.raises(ValueError):
+            apply_lod(make_massing_model(), "ultra")
+
+    def test_negative_tolerance_raises(self):
+        with pytest.raises(ValueError):
+            apply_lod(make_massing_model(), LOD_FULL, tolerance=-1)
+
+
+# ──────────────────────────────────────────────────────────────────
+# SIMPLIFICATION
+# ──────────────────────────────────────────────────────────────────
+
+class TestSimplifyPolygon:
+    """Douglas-Peucker footprint simplification."""
+
+    def test_removes_near_collinear_vertices(self):
+        ring = [[0, 0], [25, 0.05], [50, 0], [50, 70], [0, 70]]
+        assert len(simplify_polygon(ring, 0.5)) == 4
+
+    def test_zero_tolerance_is_noop(self):
+        ring = [[0, 0], [25, 0.05], [50, 0], [50, 70], [0, 70]]
+        assert simplify_polygon(ring, 0) is ring
+
+    def test_never_degenerates(self):
+        ring = [[0, 0], [1, 0], [1, 1], [0, 1]]
+        assert len(simplify_polygon(ring, 100)) >= 3
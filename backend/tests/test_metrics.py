@@ -0,0 +1,175 @@
+"""Tests for the Prometheus metrics registry, upstream and route instrumentation."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.metrics import REQUEST_LATENCY, REQUESTS, MetricsMiddleware
+from app.api.metrics import router as metrics_router
+from app.services import cache
+from app.services.metrics import (
+    Counter,
+    LatencyHistogram,
+    register_collector,
+    render_metrics,
+    reset_metrics,
+)
+from app.services.render_3d import render_pool_stats
+from app.services.upstream import (
+    UPSTREAM_LATENCY,
+    UPSTREAM_REQUESTS,
+    UPSTREAM_TIMEOUTS,
+    reset_upstreams,
+    upstream_client,
+    upstream_name,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics():
+    reset_metrics()
+    reset_upstreams()
+    cache.reset_local_cache()
+    yield
+    reset_metrics()
+    reset_upstreams()
+    cache.reset_local_cache()
+
+
+class TestExposition:
+    """Counters, histograms and collectors render in the text format."""
+
+    def test_counter_and_histogram(self):
+        jobs = Counter("test_jobs_total", "Test jobs", ("kind",))
+        jobs.inc("a")
+        jobs.inc("a", amount=2)
+        jobs.inc('say "hi"\n')
+        latency = LatencyHistogram("test_latency_seconds", "Test latency", ("kind",))
+        latency.observe(0.02, "a")
+        latency.observe(3.0, "a")
+
+        text = render_metrics()
+        assert "# TYPE test_jobs_total counter" in text
+        assert 'test_jobs_total{kind="a"} 3' in text
+        assert 'test_jobs_total{kind="say \\"hi\\"\\n"} 1' in text
+        assert "# TYPE test_latency_seconds histogram" in text
+        assert 'test_latency_seconds_bucket{kind="a",le="0.025"} 1' in text
+        assert 'test_latency_seconds_bucket{kind="a",le="+Inf"} 2' in text
+        assert 'test_latency_seconds_count{kind="a"} 2' in text
+
+    def test_wrong_label_count(self):
+        counter = Counter("test_labels_total", "Test", ("a", "b"))
+        with pytest.raises(ValueError):
+            counter.inc("only-one")
+
+    def test_collector_read_at_scrape(self):
+        depth = {"value": 1}
+        register_collector("test_queue_depth", "Test queue", "gauge",
+                           lambda: [({"kind": "x"}, depth["value"])])
+        assert 'test_queue_depth{kind="x"} 1' in render_metrics()
+        depth["value"] = 4
+        assert 'test_queue_depth{kind="x"} 4' in render_metrics()
+
+    def test_failing_collector_is_skipped(self):
+        def _broken():
+            raise RuntimeError("store unavailable")
+        register_collector("test_broken", "Broken", "gauge", _broken)
+        assert "# TYPE test_broken gauge" in render_metrics()
+
+
+class TestUpstreamClient:
+    """Requests through upstream_client are recorded per upstream."""
+
+    def test_host_names(self):
+        assert upstream_name("data.cityofnewyork.us") == "socrata"
+        assert upstream_name("server.arcgisonline.com") == "esri"
+        assert upstream_name("example.org") == "example.org"
+
+    def test_status_and_timeouts(self):
+        def _handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/slow":
+                raise httpx.ReadTimeout("timed out", request=request)
+            return httpx.Response(200 if request.url.path == "/ok" else 503)
+
+        async def _run():
+            async with upstream_client(timeout=5, transport=httpx.MockTransport(_handler)) as client:
+                await client.get("https://data.cityofnewyork.us/ok")
+                await client.get("https://data.cityofnewyork.us/down")
+                with pytest.raises(httpx.TimeoutException):
+                    await client.get("https://planninglabs.carto.com/slow")
+
+        asyncio.run(_run())
+        assert UPSTREAM_REQUESTS.value("socrata", 200) == 1
+        assert UPSTREAM_REQUESTS.value("socrata", 503) == 1
+        assert UPSTREAM_REQUESTS.value("carto", "timeout") == 1
+        assert UPSTREAM_TIMEOUTS.value("carto") == 1
+        assert UPSTREAM_LATENCY.snapshot("socrata")["count"] == 2
+
+
+class TestRouteMetrics:
+    """The middleware labels requests by route template."""
+
+    @pytest.fixture()
+    def client(self) -> TestClient:
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+
+        @app.get("/lots/{bbl}")
+        async def _lot(bbl: str):
+            return {"bbl": bbl}
+
+        return TestClient(app)
+
+    def test_route_template_label(self, client):
+        client.get("/lots/3012340001")
+        client.get("/lots/3012340002")
+        client.get("/nowhere")
+        assert REQUESTS.value("GET", "/lots/{bbl}", 200) == 2
+        assert REQUESTS.value("GET", "unmatched", 404) == 1
+        assert REQUEST_LATENCY.snapshot("GET", "/lots/{bbl}")["count"] == 2
+
+    def test_metrics_endpoint(self, client):
+        client.get("/lots/3012340001")
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'http_requests_total{method="GET",route="/lots/{bbl}",status="200"} 1' in resp.text
+        assert "# TYPE stage_duration_seconds histogram" in resp.text
+        assert "# TYPE render_pool_workers gauge" in resp.text
+
+
+class TestCacheMetrics:
+    """Redis lookups are counted by prefix and result."""
+
+    def test_hits_and_misses(self, monkeypatch):
+        class _FakeRedis:
+            async def get(self, key):
+                return json.dumps({"bbl": "1"}) if key.endswith(":hit") else None
+
+        async def _get_redis():
+            return _FakeRedis()
+
+        monkeypatch.setattr(cache, "get_redis", _get_redis)
+
+        async def _run():
+            await cache.cache_get("pluto", "hit")
+            await cache.cache_get("pluto", "hit")
+            await cache.cache_get("pluto", "gone")
+
+        asyncio.run(_run())
+        assert cache.CACHE_REQUESTS.value("pluto", "hit") == 2
+        assert cache.CACHE_REQUESTS.value("pluto", "miss") == 1
+        assert 'cache_hit_ratio{cache="pluto"} 0.6666666666666666' in render_metrics()
+
+
+class TestRenderPoolStats:
+    def test_idle_pool(self):
+        stats = render_pool_stats()
+        assert stats["in_flight"] == 0 and stats["queued"] == 0
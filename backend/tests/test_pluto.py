@@ -0,0 +1,224 @@
+"""Tests for PLUTO lookups: one MapPLUTO query, Socrata fallback."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import cache, geometry, pluto
+from app.services.geometry import fetch_lot_geometry
+from app.services.pluto import PLUTO_FIELDS, fetch_pluto_data
+from app.services.upstream import reset_upstreams, upstream_client
+
+POLYGON = {"type": "Polygon", "coordinates": [[[-73.95, 40.68], [-73.94, 40.68], [-73.95, 40.69]]]}
+
+
+@pytest.fixture(autouse=True)
+def _local_only(monkeypatch):
+    async def _no_redis():
+        return None
+
+    monkeypatch.setattr(cache, "get_redis", _no_redis)
+    monkeypatch.setattr(settings, "pluto_release", "25v1")
+    cache.reset_local_cache()
+    reset_upstreams()
+    yield
+    cache.reset_local_cache()
+    reset_upstreams()
+
+
+def _upstream(monkeypatch, handler):
+    requests = []
+
+    def _record(request):
+        requests.append(request)
+        return handler(request)
+
+    transport = httpx.MockTransport(_record)
+    for module in (pluto, geometry):
+        monkeypatch.setattr(module, "upstream_client",
+                            lambda timeout, **kw: upstream_client(timeout, transport=transport))
+    return requests
+
+
+def _carto_row(**overrides):
+    row = {"bbl": 3012340001.0, "address": "100 MAIN STREET", "zonedist1": "R7A",
+           "lotarea": 2500, "numbldgs": 1, "zipcode": 11201, "cd": 302,
+           "geom": json.dumps(POLYGON)}
+    row.update(overrides)
+    return row
+
+
+def _query(request) -> dict:
+    return {k: v[0] for k, v in parse_qs(urlparse(str(request.url)).query).items()}
+
+
+class TestCombinedFetch:
+    def test_one_carto_query_serves_pluto_and_geometry(self, monkeypatch):
+        requests = _upstream(monkeypatch, lambda r: httpx.Response(200, json={"rows": [_carto_row()]}))
+
+        async def _run():
+            return (await fetch_pluto_data("3012340001"),
+                    await fetch_lot_geometry("3012340001"))
+
+        data, geometry = asyncio.run(_run())
+        assert len(requests) == 1
+        sql = _query(requests[0])["q"]
+        assert "ST_AsGeoJSON(the_geom)" in sql
+        assert all(field in sql for field in PLUTO_FIELDS)
+        assert data.bbl == "3012340001"
+        assert data.zipcode == "11201" and data.cd == 302 and data.lotarea == 2500.0
+        assert geometry == POLYGON
+
+    def test_socrata_fallback_when_carto_unavailable(self, monkeypatch):
+        def _handler(request):
+            if request.url.host.endswith("carto.com"):
+                return httpx.Response(400, json={"error": ["relation does not exist"]})
+            return httpx.Response(200, json=[{"bbl": "3012340001", "zonedist1": "R6", "lotarea": "2000"}])
+
+        requests = _upstream(monkeypatch, _handler)
+        data = asyncio.run(fetch_pluto_data("3012340001", "token"))
+
+        assert data.zonedist1 == "R6" and data.lotarea == 2000.0
+        socrata = requests[-1]
+        assert socrata.url.host == "data.cityofnewyork.us"
+        assert _query(socrata)["$select"] == ",".join(PLUTO_FIELDS)
+        assert socrata.headers["X-App-Token"] == "token"
+
+    def test_unknown_lot(self, monkeypatch):
+        def _handler(request):
+            if request.url.host.endswith("carto.com"):
+                return httpx.Response(200, json={"rows": []})
+            return httpx.Response(200, json=[])
+
+        requests = _upstream(monkeypatch, _handler)
+
+        async def _run():
+            assert await fetch_pluto_data("3999990001") is None
+            assert await fetch_lot_geometry("3999990001") is None
+            sent = len(requests)
+            assert await fetch_lot_geometry("3999990001") is None
+            assert await fetch_pluto_data("3999990001") is None
+            return sent
+
+        sent = asyncio.run(_run())
+        assert len(requests) == sent  # Retries served from cache
+
+    def test_older_release_only_for_geometry(self, monkeypatch):
+        def _handler(request):
+            if request.url.host.endswith("carto.com"):
+                rows = [_carto_row(zonedist1="R5")] if "mappluto_25v1" in _query(request)["q"] else []
+                return httpx.Response(200, json={"rows": rows})
+            return httpx.Response(200, json=[{"bbl": "3012340001", "zonedist1": "R7A"}])
+
+        requests = _upstream(monkeypatch, _handler)
+
+        async def _run():
+            return (await fetch_pluto_data("3012340001"),
+                    await fetch_lot_geometry("3012340001"))
+
+        data, polygon = asyncio.run(_run())
+        assert data.zonedist1 == "R7A"  # Current PLUTO, not the 25v1 attributes
+        assert polygon == POLYGON
+        assert "FROM dcp_mappluto " in _query(requests[0])["q"]
+        assert requests[1].url.host == "data.cityofnewyork.us"
+
+
+def _sql_bbls(request) -> list[str]:
+    query = _query(request)
+    return re.findall(r"'(\d{10})'", query.get("q") or query["$where"])
+
+
+class TestBatchedFetch:
+    BBLS = [f"30123{lot:05d}" for lot in range(1, 151)]
+
+    def test_carto_chunks_serve_pluto_and_geometry(self, monkeypatch):
+        def _handler(request):
+            rows = [_carto_row(bbl=float(bbl), lotarea=int(bbl[-3:])) for bbl in _sql_bbls(request)]
+            return httpx.Response(200, json={"rows": rows})
+
+        requests = _upstream(monkeypatch, _handler)
+
+        async def _run():
+            data = await pluto.fetch_pluto_many(self.BBLS)
+            sent = len(requests)
+            return data, await geometry.fetch_lot_geometry_many(self.BBLS), sent
+
+        data, geometries, sent = asyncio.run(_run())
+        assert sent == 2 == len(requests)  # ceil(150 / 100); geometry came along
+        assert [len(_sql_bbls(r)) for r in requests] == [100, 50]
+        assert "WHERE bbl IN (" in _query(requests[0])["q"]
+        assert data["3012300150"].lotarea == 150.0
+        assert set(data) == set(geometries) == set(self.BBLS)
+        assert geometries["3012300001"] == POLYGON
+
+    def test_cached_lots_not_requested(self, monkeypatch):
+        requests = _upstream(monkeypatch, lambda r: httpx.Response(
+            200, json={"rows": [_carto_row(bbl=float(b)) for b in _sql_bbls(r)]}))
+
+        async def _run():
+            await fetch_pluto_data("3012300001")
+            return await pluto.fetch_pluto_many(self.BBLS[:3])
+
+        data = asyncio.run(_run())
+        assert len(data) == 3
+        assert _sql_bbls(requests[-1]) == self.BBLS[1:3]
+
+    def test_socrata_batch_for_lots_missing_from_mappluto(self, monkeypatch):
+        def _handler(request):
+            if request.url.host.endswith("carto.com"):
+                return httpx.Response(200, json={"rows": [_carto_row(bbl=3012300001.0)]})
+            records = [{"bbl": "3012300002.00000000", "zonedist1": "C4-4"}]
+            return httpx.Response(200, json=records)
+
+        requests = _upstream(monkeypatch, _handler)
+
+        async def _run():
+            data = await pluto.fetch_pluto_many(self.BBLS[:3], "token")
+            sent = len(requests)
+            assert await fetch_pluto_data("3012300003") is None
+            return data, sent
+
+        data, sent = asyncio.run(_run())
+        assert len(requests) == sent  # Negative results cached
+        socrata = [r for r in requests if r.url.host == "data.cityofnewyork.us"]
+        assert len(socrata) == 1
+        assert _sql_bbls(socrata[0]) == self.BBLS[1:3]
+        assert socrata[0].headers["X-App-Token"] == "token"
+        assert data["3012300001"].zonedist1 == "R7A"
+        assert data["3012300002"].bbl == "3012300002" and data["3012300002"].zonedist1 == "C4-4"
+        assert data["3012300003"] is None
+
+    def test_bypass_prefetch_serves_per_lot_reads(self, monkeypatch):
+        requests = _upstream(monkeypatch, lambda r: httpx.Response(
+            200, json={"rows": [_carto_row(bbl=float(b)) for b in _sql_bbls(r)]}))
+
+        async def _run():
+            await fetch_pluto_data(self.BBLS[0])  # Cached before the nocache request
+            with cache.cache_bypass():
+                await pluto.fetch_pluto_many(self.BBLS[:3])
+                sent = len(requests)
+                for bbl in self.BBLS[:3]:
+                    assert (await fetch_pluto_data(bbl)).bbl == bbl
+                    assert await fetch_lot_geometry(bbl) == POLYGON
+            return sent
+
+        sent = asyncio.run(_run())
+        assert len(requests) == sent == 2
+        assert _sql_bbls(requests[1]) == self.BBLS[:3]  # The bypass re-fetched the cached lot
+
+    def test_failed_lookups_left_out(self, monkeypatch):
+        requests = _upstream(monkeypatch, lambda r: httpx.Response(503))
+
+        async def _run():
+            return await pluto.fetch_pluto_many(self.BBLS[:2])
+
+        assert asyncio.run(_run()) == {}
+        assert requests  # Nothing cached: the per-lot path retries and reports the error
+        assert cache._negative.get('nyc_zoning:pluto:25v1:3012300001') is None
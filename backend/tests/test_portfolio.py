@@ -0,0 +1,116 @@
+"""Tests for multi-lot portfolio report generation."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.models.schemas import CalculationResult
+from app.services import maps, report
+from app.services.portfolio import render_portfolio
+from app.services.report import build_portfolio_report, build_report
+from app.zoning_engine.calculator import ZoningCalculator
+from app.zoning_engine.massing_builder import build_massing_model
+from tests.factories import make_lot
+
+
+def _lot(district: str, bbl: str) -> dict:
+    lot = make_lot(district=district)
+    lot.bbl = bbl
+    calc = ZoningCalculator().calculate(lot)
+    result = CalculationResult(
+        lot_profile=lot,
+        zoning_envelope=calc["zoning_envelope"],
+        scenarios=calc["scenarios"],
+    )
+    models = {}
+    for scenario in result.scenarios[:1]:
+        model = build_massing_model(lot=lot, scenario=scenario,
+                                    envelope=result.zoning_envelope, district=district)
+        if model and "error" not in model:
+            models[scenario.name] = model
+    return {"result": result, "massing_models": models}
+
+
+@pytest.fixture(scope="module")
+def lots() -> list[dict]:
+    return [_lot("R7A", "3012340001"), _lot("R6", "3012340002")]
+
+
+class TestPortfolioDocument:
+    """One combined PDF: summary table, then every lot."""
+
+    def test_combined_pdf(self, lots):
+        single = BytesIO()
+        build_report(lots[0]["result"], single)
+        combined = BytesIO()
+        report_id = build_portfolio_report(lots, combined, report_id="pf123456",
+                                           unavailable=["1000010001"])
+        assert report_id == "pf123456"
+        data = combined.getvalue()
+        assert data.startswith(b"%PDF")
+        assert data.count(b"/Type /Page\n") > 2 * single.getvalue().count(b"/Type /Page\n")
+
+
+class TestRenderPortfolio:
+    """Per-lot PDFs plus the combined PDF, with progress per lot."""
+
+    def test_serial(self, lots, tmp_path, monkeypatch):
+        monkeypatch.setattr(report, "OUTPUT_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "render_workers", 1)
+        progress = []
+        reports = render_portfolio(lots, on_lot_done=lambda i, path, err: progress.append((i, err)))
+
+        assert sorted(progress) == [(0, None), (1, None)]
+        assert reports.errors == [None, None]
+        assert os.path.basename(reports.combined_path).startswith("portfolio_feasibility_")
+        for path, lot in zip(reports.lot_paths, lots):
+            assert lot["result"].lot_profile.bbl in os.path.basename(path)
+            with open(path, "rb") as f:
+                assert f.read(4) == b"%PDF"
+        # Inputs are not modified; massing views were rendered once for both builds
+        assert "massing_views" not in lots[0]
+
+    def test_lot_failure_is_reported(self, lots, tmp_path, monkeypatch):
+        monkeypatch.setattr(report, "OUTPUT_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "render_workers", 1)
+        real = report.generate_report
+
+        def _flaky(result, **kwargs):
+            if result.lot_profile.bbl == "3012340002":
+                raise RuntimeError("boom")
+            return real(result, **kwargs)
+
+        monkeypatch.setattr("app.services.portfolio.generate_report", _flaky)
+        reports = render_portfolio(lots)
+        assert reports.lot_paths[0] and reports.lot_paths[1] is None
+        assert reports.errors[1] == "boom"
+        assert os.path.isfile(reports.combined_path)
+
+
+class TestSharedBaseMap:
+    """The city overview base map is fetched once and shared across lots."""
+
+    def test_city_base_fetched_once(self, monkeypatch):
+        calls = []
+
+        async def _fake_fetch(url, bbox, width, height):
+            calls.append((width, height))
+            buf = BytesIO()
+            Image.new("RGB", (width, height), "white").save(buf, format="PNG")
+            return buf.getvalue()
+
+        monkeypatch.setattr(maps, "_fetch_esri_image", _fake_fetch)
+        monkeypatch.setattr(maps, "_city_base_images", {})
+
+        async def _run():
+            return [await maps.fetch_city_overview_map(40.70 + i * 0.01, -73.95) for i in range(3)]
+
+        images = asyncio.run(_run())
+        assert all(images) and images[0] != images[1]
+        assert calls == [(800, 500)]
@@ -0,0 +1,55 @@
+"""Tests for the parallel massing render stage."""
+
+from __future__ import annotations
+
+from app.config import settings
+from app.services import render_3d
+from app.services.render_3d import (
+    RENDERER_RASTER,
+    render_all_massing_views,
+    render_massing_views,
+    shutdown_render_pool,
+)
+from tests.factories import make_massing_model
+
+
+def _models() -> dict[str, dict]:
+    return {"Four Floors": make_massing_model(4), "Eight Floors": make_massing_model(8)}
+
+
+class TestRenderAllMassingViews:
+    """Every scenario comes back keyed by name with both views."""
+
+    def test_empty(self):
+        assert render_all_massing_views({}) == {}
+
+    def test_serial_when_one_worker(self, monkeypatch):
+        def _no_pool():
+            raise AssertionError("pool should not be used")
+
+        monkeypatch.setattr(settings, "render_workers", 1)
+        monkeypatch.setattr(render_3d, "_get_pool", _no_pool)
+        views = render_all_massing_views(_models(), renderer=RENDERER_RASTER)
+        assert set(views) == {"Four Floors", "Eight Floors"}
+        assert all(v["perspective"] and v["plan"] for v in views.values())
+
+    def test_pool_matches_serial(self, monkeypatch, isolated_render_cache):
+        monkeypatch.setattr(settings, "render_workers", 2)
+        models = _models()
+        try:
+            views = render_all_massing_views(models, renderer=RENDERER_RASTER)
+        finally:
+            shutdown_render_pool()
+        isolated_render_cache.clear()
+        for name, model in models.items():
+            assert views[name] == render_massing_views(model, name, renderer=RENDERER_RASTER)
+
+    def test_cached_scenarios_skip_rendering(self, monkeypatch):
+        models = _models()
+        first = render_all_massing_views(models, renderer=RENDERER_RASTER)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("should be served from cache")
+
+        monkeypatch.setattr(render_3d, "_render_views", _fail)
+        assert render_all_massing_views(models, renderer=RENDERER_RASTER) == first
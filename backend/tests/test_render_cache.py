@@ -0,0 +1,152 @@
+"""Tests for the rendered massing image cache."""
+
+from __future__ import annotations
+
+import copy
+import os
+import time
+
+from app.services import invalidation, render_3d, render_cache
+from app.services.invalidation import Invalidation
+from app.services.render_cache import RenderCache, massing_fingerprint
+from app.services.render_3d import RENDERER_RASTER, render_all_massing_views, render_massing_views
+from tests.factories import make_massing_model
+
+
+def _views(size: int = 10, fill: bytes = b"x") -> dict[str, bytes]:
+    return {"perspective": fill * size, "plan": fill * size}
+
+
+# ──────────────────────────────────────────────────────────────────
+# FINGERPRINT
+# ──────────────────────────────────────────────────────────────────
+
+class TestFingerprint:
+    """The fingerprint tracks exactly what the renderers draw."""
+
+    def test_stable_across_copies(self):
+        model = make_massing_model()
+        assert massing_fingerprint(model, "raster") == \
+            massing_fingerprint(copy.deepcopy(model), "raster")
+
+    def test_ignores_derived_mesh(self):
+        model = make_massing_model()
+        other = dict(model, geometry_3d={}, warnings=["x"])
+        assert massing_fingerprint(model, "raster") == massing_fingerprint(other, "raster")
+
+    def test_sensitive_to_inputs(self):
+        model = make_massing_model()
+        base = massing_fingerprint(model, "raster", camera={"dpi": 150})
+        taller = copy.deepcopy(model)
+        taller["scenarios"][0]["floors"][-1]["height_ft"] += 1
+        assert massing_fingerprint(taller, "raster", camera={"dpi": 150}) != base
+        assert massing_fingerprint(model, "matplotlib", camera={"dpi": 150}) != base
+        assert massing_fingerprint(model, "raster", camera={"dpi": 300}) != base
+
+
+# ──────────────────────────────────────────────────────────────────
+# CACHE TIERS
+# ──────────────────────────────────────────────────────────────────
+
+class TestRenderCache:
+    """Memory LRU and disk tiers stay within their byte limits."""
+
+    def test_memory_lru_eviction(self):
+        cache = RenderCache(memory_bytes=50, disk_dir=None, disk_bytes=0)
+        cache.put("a", _views())
+        cache.put("b", _views())
+        cache.get("a")               # a is now most recently used
+        cache.put("c", _views())     # 60 bytes > 50: evicts b
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_empty_views_not_cached(self):
+        cache = RenderCache(memory_bytes=1000, disk_dir=None, disk_bytes=0)
+        cache.put("a", {"perspective": b"png", "plan": b""})
+        assert cache.get("a") is None
+
+    def test_disk_round_trip(self, tmp_path):
+        cache = RenderCache(memory_bytes=1000, disk_dir=str(tmp_path), disk_bytes=1000)
+        cache.put("a", _views())
+        fresh = RenderCache(memory_bytes=1000, disk_dir=str(tmp_path), disk_bytes=1000)
+        assert fresh.get("a") == _views()
+
+    def test_disk_eviction(self, tmp_path):
+        cache = RenderCache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=100)
+        for key in "abcd":
+            cache.put(key, _views(size=20))
+        used = sum(os.path.getsize(tmp_path / f) for f in os.listdir(tmp_path))
+        assert used <= 100
+        assert cache.get("d") is not None
+
+    def test_max_age(self, tmp_path, monkeypatch):
+        cache = RenderCache(memory_bytes=1000, disk_dir=str(tmp_path), disk_bytes=1000,
+                            max_age=60)
+        cache.put("a", _views())
+        assert cache.get("a") == _views()
+        later = time.time() + 61
+        monkeypatch.setattr(render_cache.time, "time", lambda: later)
+        assert cache.get("a") is None  # Expired in memory, and on disk
+        fresh = RenderCache(memory_bytes=1000, disk_dir=str(tmp_path), disk_bytes=1000,
+                            max_age=60)
+        assert fresh.get("a") is None
+
+    def test_clear_empties_disk(self, tmp_path):
+        cache = RenderCache(memory_bytes=1000, disk_dir=str(tmp_path), disk_bytes=1000)
+        cache.put("a", _views())
+        cache.clear()
+        assert cache.get("a") is None
+        assert not os.listdir(tmp_path)
+
+    def test_resubscribe_keeps_disk_tier(self, monkeypatch, tmp_path):
+        cache = RenderCache(memory_bytes=1000, disk_dir=str(tmp_path), disk_bytes=1000)
+        monkeypatch.setattr(render_cache, "_cache", cache)
+        cache.put("a", _views())
+        invalidation.apply(Invalidation("all"), source="resubscribe")
+        assert cache._memory_used == 0
+        assert cache.get("a") == _views()  # Served from disk
+
+        invalidation.apply(Invalidation("namespace", "render"))
+        assert cache.get("a") is None
+        assert not os.listdir(tmp_path)
+
+
+# ──────────────────────────────────────────────────────────────────
+# RENDER INTEGRATION
+# ──────────────────────────────────────────────────────────────────
+
+class TestCachedRender:
+    """``render_massing_views`` renders each distinct model once."""
+
+    def test_second_render_is_cache_hit(self, monkeypatch, isolated_render_cache):
+        calls = []
+        real = render_3d._render_views
+
+        def _counting(*args):
+            calls.append(args[1])
+            return real(*args)
+
+        monkeypatch.setattr(render_3d, "_render_views", _counting)
+        model = make_massing_model()
+        first = render_massing_views(model, "A", renderer=RENDERER_RASTER)
+        second = render_massing_views(copy.deepcopy(model), "A", renderer=RENDERER_RASTER)
+        assert first == second
+        assert calls == [RENDERER_RASTER]
+        assert isolated_render_cache.hits == 1
+
+    def test_scenario_names_share_renders(self, monkeypatch):
+        calls = []
+        real = render_3d._render_views
+
+        def _counting(*args):
+            calls.append(args[1])
+            return real(*args)
+
+        monkeypatch.setattr(render_3d, "_render_views", _counting)
+        views = render_all_massing_views(
+            {"Max FAR": make_massing_model(), "Community Facility": make_massing_model()}, renderer=RENDERER_RASTER,
+        )
+        assert calls == [RENDERER_RASTER]
+        assert views["Max FAR"]["perspective"] != views["Community Facility"]["perspective"]
+        assert views["Max FAR"]["plan"] != views["Community Facility"]["plan"]
@@ -0,0 +1,83 @@
+"""Tests for the software-rasterized massing renderer."""
+
+from __future__ import annotations
+
+import io
+
+from PIL import Image
+
+from app.services.render_3d import RENDERER_RASTER, render_massing_views
+from app.services.render_raster import (
+    render_perspective_view_raster,
+    render_plan_view_raster,
+)
+from tests.factories import make_massing_model
+
+
+def _image(data: bytes) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+
+# ──────────────────────────────────────────────────────────────────
+# VIEWS
+# ──────────────────────────────────────────────────────────────────
+
+class TestRasterViews:
+    """Both views produce PNGs at the requested size."""
+
+    def test_perspective_png(self):
+        img = _image(render_perspective_view_raster(make_massing_model(), "Max Residential"))
+        assert img.format == "PNG"
+        assert img.size == (800, 550)
+
+    def test_plan_png(self):
+        img = _image(render_plan_view_raster(make_massing_model(), "Max Residential", width=400, height=400))
+        assert img.format == "PNG"
+        assert img.size == (400, 400)
+
+    def test_building_is_drawn(self):
+        img = _image(render_perspective_view_raster(make_massing_model())).convert("L")
+        # Building faces occupy a meaningful share of the canvas
+        dark = sum(1 for p in img.getdata() if p < 200)
+        assert dark > img.width * img.height * 0.05
+
+    def test_empty_model_returns_empty_bytes(self):
+        assert render_perspective_view_raster({}) == b""
+        assert render_plan_view_raster({"scenarios": [{"floors": []}]}) == b""
+
+
+# ──────────────────────────────────────────────────────────────────
+# RENDERER SELECTION
+# ──────────────────────────────────────────────────────────────────
+
+class TestRendererSelection:
+    """``render_massing_views`` dispatches on the configured renderer."""
+
+    def test_raster_renderer(self):
+        views = render_massing_views(make_massing_model(), "Max Residential", renderer=RENDERER_RASTER)
+        assert set(views) == {"perspective", "plan"}
+        assert all(_image(v).format == "PNG" for v in views.values())
+
+    def test_setting_selects_renderer(self, monkeypatch):
+        from app.config import settings
+        import app.services.render_raster as render_raster
+
+        buf = io.BytesIO()
+        Image.new("RGB", (40, 30), "white").save(buf, format="PNG")
+        blank = buf.getvalue()
+
+        calls = []
+        monkeypatch.setattr(settings, "massing_renderer", RENDERER_RASTER)
+        monkeypatch.setattr(render_raster, "render_plan_view_raster",
+                            lambda *a, **k: calls.append("plan") or blank)
+        monkeypatch.setattr(render_raster, "render_perspective_view_raster",
+                            lambda *a, **k: calls.append("perspective") or blank)
+        views = render_massing_views(make_massing_model())
+        assert sorted(calls) == ["perspective", "plan"]
+        assert all(_image(v).size[0] == 40 for v in views.values())
+
+    def test_unknown_renderer_falls_back(self):
+        views = render_massing_views(make_massing_model(), "Max Residential", renderer="opengl")
+        assert set(views) == {"perspective", "plan"}
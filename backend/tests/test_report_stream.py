@@ -0,0 +1,108 @@
+"""Tests for the single report builder and PDF delivery endpoints."""
+
+from __future__ import annotations
+
+import os
+from io import BytesIO
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.models.schemas import CalculationResult
+from app.services import report
+from app.services.report import build_report, generate_report, spool_report
+from app.zoning_engine.calculator import ZoningCalculator
+from tests.factories import make_lot
+
+
+@pytest.fixture(scope="module")
+def result() -> CalculationResult:
+    lot = make_lot(district="R7A")
+    calc = ZoningCalculator().calculate(lot)
+    return CalculationResult(
+        lot_profile=lot,
+        zoning_envelope=calc["zoning_envelope"],
+        scenarios=calc["scenarios"],
+    )
+
+
+# ──────────────────────────────────────────────────────────────────
+# BUILDER
+# ──────────────────────────────────────────────────────────────────
+
+class TestBuildReport:
+    """One pipeline, any writable sink."""
+
+    def test_writes_pdf_to_sink(self, result):
+        sink = BytesIO()
+        report_id = build_report(result, sink, report_id="abc12345")
+        assert report_id == "abc12345"
+        assert sink.getvalue().startswith(b"%PDF")
+
+    def test_generate_report_writes_complete_file(self, result, tmp_path, monkeypatch):
+        monkeypatch.setattr(report, "OUTPUT_DIR", str(tmp_path))
+        path = generate_report(result)
+        assert os.path.dirname(path) == str(tmp_path)
+        assert os.listdir(tmp_path) == [os.path.basename(path)]
+        with open(path, "rb") as f:
+            data = f.read()
+        assert data.startswith(b"%PDF") and data.rstrip().endswith(b"%%EOF")
+
+    def test_spool_report_is_rewound(self, result):
+        spool, report_id = spool_report(result, max_memory=1024)
+        try:
+            assert len(report_id) == 8
+            assert spool.read(4) == b"%PDF"
+        finally:
+            spool.close()
+
+
+# ──────────────────────────────────────────────────────────────────
+# ENDPOINTS
+# ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+
+class TestPdfDelivery:
+    """Stored reports honor Range; generated reports stream in chunks."""
+
+    def test_stored_report_range_request(self, result, client, tmp_path, monkeypatch):
+        monkeypatch.setattr(report, "OUTPUT_DIR", str(tmp_path))
+        path = generate_report(result)
+        report_id = path.rsplit("_", 1)[1].removesuffix(".pdf")
+        with open(path, "rb") as f:
+            data = f.read()
+
+        full = client.get(f"/api/v1/reports/{report_id}")
+        assert full.status_code == 200
+        assert full.headers["accept-ranges"] == "bytes"
+        assert full.content == data
+
+        part = client.get(f"/api/v1/reports/{report_id}", headers={"Range": "bytes=0-1023"})
+        assert part.status_code == 206
+        assert part.headers["content-range"] == f"bytes 0-1023/{len(data)}"
+        assert part.content == data[:1024]
+
+        tail = client.get(f"/api/v1/reports/{report_id}", headers={"Range": "bytes=-100"})
+        assert tail.status_code == 206
+        assert tail.content == data[-100:]
+
+    def test_stream_endpoint(self, result, client, monkeypatch):
+        async def _prepare(bbl):
+            return result, None
+
+        monkeypatch.setattr(routes, "_prepare_report", _prepare)
+        monkeypatch.setattr(routes, "STREAM_CHUNK_SIZE", 4096)
+        resp = client.get("/api/report/3012340001/stream")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/pdf"
+        assert int(resp.headers["content-length"]) == len(resp.content)
+        assert "zoning_feasibility_3012340001_" in resp.headers["content-disposition"]
+        assert resp.content.startswith(b"%PDF")
@@ -0,0 +1,72 @@
+"""Tests for the report's precompiled templates."""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+
+from app.models.schemas import CalculationResult
+from app.services.report import (
+    DISCLAIMERS,
+    HEADER_FORM_FIRST,
+    HEADER_FORM_LATER,
+    _TABLE_STYLES,
+    _paragraph_prototype,
+    _section_header,
+    _static_paragraph,
+    _table_style,
+    build_report,
+    warm_templates,
+)
+from app.zoning_engine.calculator import ZoningCalculator
+from tests.factories import make_lot
+
+
+@pytest.fixture(scope="module")
+def result() -> CalculationResult:
+    lot = make_lot(district="R7A")
+    calc = ZoningCalculator().calculate(lot)
+    return CalculationResult(
+        lot_profile=lot,
+        zoning_envelope=calc["zoning_envelope"],
+        scenarios=calc["scenarios"],
+    )
+
+
+class TestSharedTemplates:
+    """Constant styles and paragraphs are built once and reused."""
+
+    def test_table_style_shared(self):
+        assert _table_style("columns") is _table_style("columns")
+        t1, t2 = _section_header("Site Summary"), _section_header("Site Summary")
+        assert t1 is not t2
+
+    def test_static_paragraph_copies_share_parsed_text(self):
+        p1 = _static_paragraph("Disclaimers &amp; Limitations", "SectionHeaderWhite")
+        p2 = _static_paragraph("Disclaimers &amp; Limitations", "SectionHeaderWhite")
+        assert p1 is not p2
+        assert p1.frags is p2.frags
+
+    def test_layout_does_not_touch_prototype(self, result):
+        build_report(result, BytesIO())
+        proto = _paragraph_prototype(f"• {DISCLAIMERS[0]}", "SmallBody")
+        assert "blPara" not in vars(proto)
+
+    def test_warm_templates(self):
+        _table_style.cache_clear()
+        warm_templates()
+        assert _table_style.cache_info().currsize == len(_TABLE_STYLES)
+
+
+class TestHeaderForms:
+    """Page chrome is written once per document as a Form XObject."""
+
+    def test_header_forms_defined_once(self, result):
+        sink = BytesIO()
+        build_report(result, sink)
+        data = sink.getvalue()
+        assert data.startswith(b"%PDF")
+        assert data.count(b"/Subtype /Form") == 2
+        assert f"FormXob.{HEADER_FORM_FIRST}".encode() in data
+        assert f"FormXob.{HEADER_FORM_LATER}".encode() in data
@@ -0,0 +1,59 @@
+"""Tests for the process-wide font and style registry."""
+
+from __future__ import annotations
+
+import os
+import shutil
+
+import matplotlib
+import pytest
+
+from app.config import settings
+from app.services import resources
+from app.services.report import _get_styles
+from app.services.resources import (
+    FONT_BOLD,
+    font_path,
+    get_font,
+    reset_resources,
+    warm_resources,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    reset_resources()
+    yield
+    reset_resources()
+
+
+class TestFonts:
+    """Fonts resolve once and are shared."""
+
+    def test_font_is_shared(self):
+        assert get_font(12) is get_font(12)
+        assert get_font(12) is not get_font(14)
+
+    def test_font_dir_searched_first(self, tmp_path, monkeypatch):
+        bundled = os.path.join(matplotlib.get_data_path(), "fonts", "ttf", "DejaVuSans-Bold.ttf")
+        shutil.copy(bundled, tmp_path / "DejaVuSans-Bold.ttf")
+        monkeypatch.setattr(settings, "font_dir", str(tmp_path))
+        assert font_path(FONT_BOLD) == (str(tmp_path / "DejaVuSans-Bold.ttf"), 0)
+        assert get_font(14, FONT_BOLD).size == 14
+
+    def test_missing_fonts_fall_back_to_default(self, monkeypatch):
+        monkeypatch.setattr(resources, "font_dirs", lambda: [])
+        assert font_path() is None
+        assert get_font(10) is not None
+
+
+class TestWarmUp:
+    """Warm-up fills the caches ahead of the first request."""
+
+    def test_warm_resources(self):
+        warm_resources()
+        assert get_font.cache_info().currsize >= len(resources.WARM_FONT_SIZES)
+
+    def test_styles_built_once(self):
+        assert _get_styles() is _get_styles()
+        assert "SectionTitle" in _get_styles()
@@ -0,0 +1,159 @@
+"""Tests for single-flight coalescing of concurrent identical calls."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import lots
+from app.config import settings
+from app.services import cache, geometry
+from app.services.singleflight import SINGLEFLIGHT_CALLS, coalesce, normalize_address
+
+
+def _counting(delay: float = 0.01):
+    calls = []
+
+    async def _work(key, payload=None):
+        calls.append(key)
+        await asyncio.sleep(delay)
+        if key == "bad":
+            raise ValueError("no such lot")
+        return {"key": key, "floors": [1, 2]}
+
+    return calls, _work
+
+
+class TestCoalesce:
+    """Concurrent identical calls share one execution."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        calls, work = _counting()
+        fn = coalesce("test.share")(work)
+
+        async def _run():
+            return await asyncio.gather(*(fn("3012340001") for _ in range(5)))
+
+        results = asyncio.run(_run())
+        assert calls == ["3012340001"]
+        assert all(r == results[0] for r in results)
+        # Each waiter owns its copy
+        results[0]["floors"].append(3)
+        assert results[1]["floors"] == [1, 2]
+        assert fn.singleflight.in_flight() == 0
+
+    def test_different_keys_run_separately(self):
+        calls, work = _counting()
+        fn = coalesce("test.keys")(work)
+
+        async def _run():
+            await asyncio.gather(fn("a"), fn("b"), fn("a", payload={"x": 1}))
+
+        asyncio.run(_run())
+        assert sorted(calls) == ["a", "a", "b"]
+
+    def test_custom_key(self):
+        calls, work = _counting()
+        fn = coalesce("test.custom", key=lambda key, payload=None: normalize_address(key))(work)
+
+        async def _run():
+            await asyncio.gather(fn("100 Main St, Brooklyn"), fn("100  MAIN ST BROOKLYN"))
+
+        asyncio.run(_run())
+        assert len(calls) == 1
+
+    def test_completed_calls_are_not_cached(self):
+        calls, work = _counting()
+        fn = coalesce("test.sequential")(work)
+
+        async def _run():
+            await fn("a")
+            await fn("a")
+
+        asyncio.run(_run())
+        assert calls == ["a", "a"]
+
+    def test_exception_is_shared(self):
+        calls, work = _counting()
+        fn = coalesce("test.error")(work)
+
+        async def _run():
+            return await asyncio.gather(fn("bad"), fn("bad"), return_exceptions=True)
+
+        results = asyncio.run(_run())
+        assert calls == ["bad"]
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_cancelled_waiter_does_not_cancel_others(self):
+        calls, work = _counting(delay=0.05)
+        fn = coalesce("test.cancel")(work)
+
+        async def _run():
+            first = asyncio.ensure_future(fn("a"))
+            second = asyncio.ensure_future(fn("a"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(_run())["key"] == "a"
+        assert calls == ["a"]
+
+    def test_counts_exported(self):
+        _, work = _counting()
+        fn = coalesce("test.metrics")(work)
+
+        async def _run():
+            await asyncio.gather(fn("a"), fn("a"), fn("a"))
+
+        asyncio.run(_run())
+        assert SINGLEFLIGHT_CALLS.value("test.metrics", "run") == 1
+        assert SINGLEFLIGHT_CALLS.value("test.metrics", "shared") == 2
+
+    def test_requires_async_function(self):
+        with pytest.raises(TypeError):
+            coalesce("test.sync")(lambda: None)
+
+
+class TestCoalescedFetchers:
+    """Lot fetchers share upstream calls across concurrent requests."""
+
+    def test_lot_geometry(self, monkeypatch):
+        queries = []
+
+        async def _fake_carto(bbl, table_name):
+            queries.append((bbl, table_name))
+            await asyncio.sleep(0.01)
+            return {"geometry": {"type": "Polygon", "coordinates": []}, "bbl": bbl}
+
+        monkeypatch.setattr(geometry, "_query_carto", _fake_carto)
+        monkeypatch.setattr(settings, "pluto_release", "25v1")
+        cache.reset_local_cache()
+
+        async def _run():
+            return await asyncio.gather(*(geometry.fetch_lot_geometry("3012340001") for _ in range(4)))
+
+        results = asyncio.run(_run())
+        assert len(queries) == 1
+        assert all(r == results[0] for r in results)
+
+    def test_resolve_lot_keyed_by_normalized_bbl(self, monkeypatch):
+        lookups = []
+
+        async def _no_pluto(bbl, app_token=""):
+            lookups.append(bbl)
+            await asyncio.sleep(0.01)
+            return None
+
+        monkeypatch.setattr(lots, "fetch_pluto_data", _no_pluto)
+
+        async def _run():
+            return await asyncio.gather(
+                *(lots.resolve_lot(bbl=raw) for raw in ("3012340001", "3-01234-0001", "3/01234/0001")),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(_run())
+        assert lookups == ["3012340001"]
+        assert all(isinstance(r, HTTPException) and r.status_code == 404 for r in results)
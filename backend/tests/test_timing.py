@@ -0,0 +1,132 @@
+"""Tests for stage timing spans, per-request timings and histograms."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.services.timing import (
+    BUCKETS,
+    Histogram,
+    collect_timings,
+    histograms,
+    reset_histograms,
+    span,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_histograms():
+    reset_histograms()
+    yield
+    reset_histograms()
+
+
+class TestSpan:
+    """Spans time blocks and functions into histograms and the collector."""
+
+    def test_context_manager(self):
+        with collect_timings() as timings:
+            with span("stage"):
+                pass
+            with span("stage"):
+                pass
+        stages = timings.as_dict()["stages"]
+        assert stages["stage"]["calls"] == 2
+        assert histograms()["stage"]["count"] == 2
+
+    def test_decorates_sync_and_async(self):
+        @span("sync_stage")
+        def double(x):
+            return 2 * x
+
+        @span("async_stage")
+        async def triple(x):
+            await asyncio.sleep(0.01)
+            return 3 * x
+
+        with collect_timings() as timings:
+            assert double(2) == 4
+            assert asyncio.run(triple(2)) == 6
+        stages = timings.as_dict()["stages"]
+        assert set(stages) == {"sync_stage", "async_stage"}
+        assert stages["async_stage"]["ms"] >= 10
+        assert triple.__name__ == "triple"
+
+    def test_collects_across_tasks_and_threads(self):
+        @span("fetch")
+        async def fetch():
+            await asyncio.sleep(0)
+
+        def blocking():
+            with span("blocking"):
+                pass
+
+        async def pipeline():
+            with collect_timings() as timings:
+                await asyncio.gather(fetch(), fetch())
+                await asyncio.to_thread(blocking)
+            return timings
+
+        stages = asyncio.run(pipeline()).as_dict()["stages"]
+        assert stages["fetch"]["calls"] == 2
+        assert stages["blocking"]["calls"] == 1
+
+    def test_disabled_collection_still_feeds_histograms(self):
+        with collect_timings(False) as timings:
+            with span("stage"):
+                pass
+        assert timings is None
+        assert histograms()["stage"]["count"] == 1
+
+    def test_exception_is_recorded_and_raised(self):
+        with pytest.raises(ValueError):
+            with span("failing"):
+                raise ValueError
+        assert histograms()["failing"]["count"] == 1
+
+
+class TestHistogram:
+    """Buckets are cumulative, Prometheus-style."""
+
+    def test_cumulative_buckets(self):
+        hist = Histogram()
+        for seconds in (0.001, 0.02, 0.02, 100):
+            hist.observe(seconds)
+        snap = hist.snapshot()
+        buckets = dict(snap["buckets"])
+        assert buckets[0.005] == 1
+        assert buckets[0.025] == 3
+        assert buckets[BUCKETS[-1]] == 3
+        assert buckets[float("inf")] == 4
+        assert snap["count"] == 4 and snap["sum"] == pytest.approx(100.041)
+
+
+class TestFullAnalysisTimings:
+    """``debug=true`` adds a timings block to the full analysis response."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        async def _analysis(request, nocache):
+            with span("calculate"):
+                pass
+            return {"scenarios": []}
+
+        monkeypatch.setattr(routes, "_full_analysis", _analysis)
+        app = FastAPI()
+        app.include_router(routes.router)
+        return TestClient(app)
+
+    def test_debug_timings(self, client):
+        resp = client.post("/api/v1/full-analysis?debug=true", json={"bbl": "3012340001"})
+        timings = resp.json()["timings"]
+        assert timings["stages"]["calculate"]["calls"] == 1
+        assert timings["total_ms"] >= 0
+
+    def test_no_timings_by_default(self, client):
+        resp = client.post("/api/v1/full-analysis", json={"bbl": "3012340001"})
+        assert "timings" not in resp.json()
@@ -0,0 +1,271 @@
+"""Tests for upstream circuit breakers, adaptive timeouts and rate limits."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import cache, rate_limit
+from app.services.rate_limit import TokenBucket
+from app.services.upstream import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    UPSTREAM_RATE_LIMIT_WAIT,
+    UPSTREAM_SHORT_CIRCUITS,
+    UPSTREAM_THROTTLED,
+    CircuitBreaker,
+    UpstreamThrottled,
+    UpstreamUnavailable,
+    adaptive_timeout,
+    get_breaker,
+    reset_upstreams,
+    upstream_client,
+)
+
+CARTO = "https://planninglabs.carto.com/api/v2/sql"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_upstreams(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_breaker_failures", 3)
+    monkeypatch.setattr(settings, "upstream_breaker_reset_seconds", 30.0)
+    monkeypatch.setattr(settings, "upstream_rate_limits", {})
+    reset_upstreams()
+    yield
+    reset_upstreams()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Closed -> open after N failures -> one half-open probe."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(3, 30, clock=_Clock())
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED and breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_half_open_single_probe(self):
+        clock = _Clock()
+        breaker = CircuitBreaker(1, 30, clock=clock)
+        breaker.record_failure()
+        clock.now += 31
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()  # probe already in flight
+        breaker.record_success()
+        assert breaker.state == CLOSED and breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        clock = _Clock()
+        breaker = CircuitBreaker(1, 30, clock=clock)
+        breaker.record_failure()
+        clock.now += 31
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_released_probe_can_be_retried(self):
+        clock = _Clock()
+        breaker = CircuitBreaker(1, 30, clock=clock)
+        breaker.record_failure()
+        clock.now += 31
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+
+
+class TestUpstreamClient:
+    """Requests short-circuit once an upstream keeps failing."""
+
+    def test_short_circuit_skips_the_request(self):
+        calls = []
+
+        def _handler(request):
+            calls.append(request.url.host)
+            raise httpx.ConnectTimeout("timed out", request=request)
+
+        async def _run():
+            async with upstream_client(timeout=5, transport=httpx.MockTransport(_handler)) as client:
+                for _ in range(3):
+                    with pytest.raises(httpx.TimeoutException):
+                        await client.get(CARTO)
+                with pytest.raises(UpstreamUnavailable):
+                    await client.get(CARTO)
+                # Other upstreams are unaffected
+                with pytest.raises(httpx.TimeoutException):
+                    await client.get("https://data.cityofnewyork.us/resource/x.json")
+
+        before = UPSTREAM_SHORT_CIRCUITS.value("carto")
+        asyncio.run(_run())
+        assert calls.count("planninglabs.carto.com") == 3
+        assert get_breaker("carto").state == OPEN
+        assert UPSTREAM_SHORT_CIRCUITS.value("carto") == before + 1
+
+    def test_server_errors_count_as_failures(self):
+        async def _run():
+            transport = httpx.MockTransport(lambda request: httpx.Response(502))
+            async with upstream_client(timeout=5, transport=transport) as client:
+                for _ in range(3):
+                    await client.get(CARTO)
+
+        asyncio.run(_run())
+        assert get_breaker("carto").state == OPEN
+
+    def test_service_fallback_runs_when_open(self):
+        from app.services.geometry import fetch_lot_geometry
+
+        get_breaker("carto").record_failure()
+        get_breaker("carto").record_failure()
+        get_breaker("carto").record_failure()
+        assert asyncio.run(fetch_lot_geometry("3012340001")) is None
+
+
+class TestAdaptiveTimeout:
+    """Timeouts follow recent latency, within the floor and the caller's limit."""
+
+    def _run(self, handler, timeout=10.0, requests=1):
+        async def _go():
+            async with upstream_client(timeout=timeout,
+                                       transport=httpx.MockTransport(handler)) as client:
+                for _ in range(requests):
+                    await client.get(CARTO)
+        asyncio.run(_go())
+
+    def test_needs_samples(self):
+        self._run(lambda request: httpx.Response(200), requests=5)
+        assert adaptive_timeout("carto") is None
+
+    def test_applied_to_requests(self, monkeypatch):
+        monkeypatch.setattr(settings, "upstream_timeout_min_seconds", 2.0)
+        self._run(lambda request: httpx.Response(200), requests=25)
+        assert adaptive_timeout("carto") == 2.0  # fast upstream: the floor
+
+        seen = []
+
+        def _handler(request):
+            seen.append(request.extensions["timeout"]["read"])
+            return httpx.Response(200)
+
+        self._run(_handler)
+        self._run(_handler, timeout=1.0)
+        assert seen == [2.0, 1.0]  # never above the caller's timeout
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "upstream_timeout_multiplier", 0)
+        self._run(lambda request: httpx.Response(200), requests=25)
+        assert adaptive_timeout("carto") is None
+
+
+class TestRateLimit:
+    """Requests queue for a token; too long a queue fails fast."""
+
+    @pytest.fixture(autouse=True)
+    def _local_buckets(self, monkeypatch):
+        async def _no_redis():
+            return None
+
+        monkeypatch.setattr(cache, "get_redis", _no_redis)
+        monkeypatch.setattr(settings, "upstream_rate_max_wait_seconds", 1.0)
+
+    def test_bucket_reserves_in_order(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+        assert [bucket.reserve(10) for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+        assert bucket.reserve(1.2) is None  # Would wait 1.5 s; nothing reserved
+        clock.now += 1.5
+        assert bucket.reserve(0) == 0.0
+
+    def _get(self, handler, requests):
+        async def _go():
+            async with upstream_client(timeout=5, transport=httpx.MockTransport(handler)) as client:
+                for _ in range(requests):
+                    await client.get(CARTO)
+        asyncio.run(_go())
+
+    def test_requests_wait_for_a_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "upstream_rate_limits", {"carto": (20.0, 1.0)})
+        before = (UPSTREAM_RATE_LIMIT_WAIT.snapshot("carto") or {"count": 0, "sum": 0.0})
+
+        async def _burst():
+            transport = httpx.MockTransport(lambda request: httpx.Response(200))
+            async with upstream_client(timeout=5, transport=transport) as client:
+                await asyncio.gather(*(client.get(CARTO) for _ in range(3)))
+
+        asyncio.run(_burst())
+        after = UPSTREAM_RATE_LIMIT_WAIT.snapshot("carto")
+        assert after["count"] == before["count"] + 3
+        # Queued in turn: 0, 1/rate, 2/rate
+        assert after["sum"] - before["sum"] == pytest.approx(0.05 + 0.10, abs=0.02)
+
+    def test_throttled_when_queue_too_long(self, monkeypatch):
+        monkeypatch.setattr(settings, "upstream_rate_limits", {"carto": (0.1, 1.0)})
+        calls = []
+        before = UPSTREAM_THROTTLED.value("carto")
+        self._get(lambda request: calls.append(1) or httpx.Response(200), requests=1)
+        with pytest.raises(UpstreamThrottled):
+            self._get(lambda request: calls.append(1) or httpx.Response(200), requests=1)
+        assert calls == [1]
+        assert UPSTREAM_THROTTLED.value("carto") == before + 1
+        assert get_breaker("carto").state == CLOSED  # Not an upstream failure
+
+    def test_open_circuit_takes_no_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "upstream_rate_limits", {"carto": (0.1, 1.0)})
+        for _ in range(3):
+            get_breaker("carto").record_failure()
+        with pytest.raises(UpstreamUnavailable) as exc:
+            self._get(lambda request: httpx.Response(200), requests=1)
+        assert not isinstance(exc.value, UpstreamThrottled)
+        assert not rate_limit._buckets  # Failed fast without reserving
+
+    def test_throttled_probe_releases_breaker(self, monkeypatch):
+        clock = _Clock()
+        monkeypatch.setattr(settings, "upstream_rate_limits", {"carto": (0.1, 1.0)})
+        rate_limit.local_bucket("carto", 0.1, 1.0).reserve(0)  # Bucket now empty
+        breaker = get_breaker("carto")
+        breaker._clock = clock
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 31
+        with pytest.raises(UpstreamThrottled):
+            self._get(lambda request: httpx.Response(200), requests=1)
+        assert breaker.state == HALF_OPEN and breaker.allow()  # Probe still available
+
+    def test_unlisted_upstreams_not_limited(self, monkeypatch):
+        monkeypatch.setattr(settings, "upstream_rate_limits", {"socrata": (0.1, 1.0)})
+        self._get(lambda request: httpx.Response(200), requests=5)
+
+    def test_shared_bucket_in_redis(self, monkeypatch):
+        calls = []
+
+        class _Redis:
+            async def eval(self, script, numkeys, *args):
+                calls.append(args)
+                return [1, 20000] if len(calls) == 1 else [0, 3000000]
+
+        async def _get_redis():
+            return _Redis()
+
+        monkeypatch.setattr(cache, "get_redis", _get_redis)
+        assert asyncio.run(rate_limit.reserve("socrata", 5.0, 10.0, 1.0)) == 0.02
+        assert asyncio.run(rate_limit.reserve("socrata", 5.0, 10.0, 1.0)) is None
+        assert calls[0] == ("nyc_zoning:ratelimit:socrata", 5.0, 10.0, 1.0)
+        assert not rate_limit._buckets  # Local buckets only without Redis
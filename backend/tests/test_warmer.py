@@ -0,0 +1,69 @@
+"""Tests for the off-peak cache warmer."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+
+from app.services.warmer import read_bbls, warm_lots
+
+
+def _warm_fn(fail: set[str] = frozenset()):
+    state = {"running": 0, "peak": 0, "seen": []}
+
+    async def _warm(bbl: str) -> None:
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        state["seen"].append(bbl)
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        if bbl in fail:
+            raise HTTPException(status_code=404, detail=f"No PLUTO data for BBL {bbl}")
+
+    return state, _warm
+
+
+class TestWarmLots:
+    """Lots are warmed at bounded concurrency; failures don't stop the run."""
+
+    def test_bounded_concurrency_and_dedupe(self):
+        state, warm = _warm_fn()
+        bbls = [f"30123400{i:02d}" for i in range(1, 11)] + ["3012340001"]
+        done = []
+        report = asyncio.run(warm_lots(bbls, concurrency=3, warm=warm, on_done=done.append))
+
+        assert state["peak"] == 3
+        assert sorted(state["seen"]) == sorted(set(bbls))
+        assert report.summary() == {"warmed": 10, "failed": 0, "skipped": 0}
+        assert len(done) == 10
+
+    def test_failures_recorded(self):
+        _, warm = _warm_fn(fail={"3012340002"})
+        report = asyncio.run(warm_lots(["3012340001", "3012340002"], warm=warm))
+        failed = [r for r in report.results if r.status == "failed"]
+        assert [r.bbl for r in failed] == ["3012340002"]
+        assert failed[0].error == "No PLUTO data for BBL 3012340002"
+        assert report.count("warmed") == 1
+
+    def test_stop_at_skips_remaining(self):
+        state, warm = _warm_fn()
+        past = datetime.now() - timedelta(minutes=1)
+        report = asyncio.run(warm_lots(["3012340001", "3012340002"], stop_at=past, warm=warm))
+        assert state["seen"] == []
+        assert report.summary() == {"warmed": 0, "failed": 0, "skipped": 2}
+
+
+class TestReadBbls:
+    def test_plain_list(self, tmp_path):
+        path = tmp_path / "hot.txt"
+        path.write_text("3012340001\n# rezoning area\n3-01234-0002  # listing\nnot-a-bbl\n\n")
+        assert read_bbls(str(path)) == ["3012340001", "3012340002"]
+
+    def test_pluto_csv(self, tmp_path):
+        path = tmp_path / "pluto.csv"
+        path.write_text("Borough,Block,Lot,BBL,ZoneDist1\n"
+                        "BK,1234,1,3012340001.00000000,R7A\n"
+                        "BK,1234,2,3012340002,R6\n")
+        assert read_bbls(str(path)) == ["3012340001", "3012340002"]
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark the 3D massing image renderers used in PDF reports.
+
+Runs the zoning calculator on a synthetic lot, builds a massing model for
+every scenario, and times ``render_massing_views()`` with each renderer
+(matplotlib and the software rasterizer).
+
+Usage:
+    python3 scripts/bench_render_3d.py
+    python3 scripts/bench_render_3d.py --iterations 20 --district R7A
+    python3 scripts/bench_render_3d.py --out /tmp/massing_renders
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add backend to path for direct import
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from app.models.schemas import LotProfile, PlutoData  # noqa: E402
+from app.services.render_3d import RENDERERS, render_massing_views  # noqa: E402
+from app.zoning_engine.calculator import ZoningCalculator  # noqa: E402
+from app.zoning_engine.massing_builder import build_massing_model  # noqa: E402
+
+
+# ──────────────────────────────────────────────────────────────────
+# SYNTHETIC MODELS
+# ──────────────────────────────────────────────────────────────────
+
+def build_models(district: str, frontage: float, depth: float) -> dict[str, dict]:
+    """Run the calculator on a rectangular lot and build all massing models."""
+    area = frontage * depth
+    lot = LotProfile(
+        bbl="3012340001",
+        borough=3,
+        block=1234,
+        lot=1,
+        pluto=PlutoData(bbl="3012340001", zonedist1=district, lotarea=area,
+                        lotfront=frontage, lotdepth=depth),
+        zoning_districts=[district],
+        lot_area=area,
+        lot_frontage=frontage,
+        lot_depth=depth,
+        lot_type="interior",
+        street_width="wide",
+    )
+    result = ZoningCalculator().calculate(lot)
+
+    models = {}
+    for scenario in result["scenarios"]:
+        model = build_massing_model(lot, scenario, result["zoning_envelope"], district=district)
+        if model and "error" not in model:
+            models[scenario.name] = model
+    return models
+
+
+# ──────────────────────────────────────────────────────────────────
+# BENCHMARK
+# ──────────────────────────────────────────────────────────────────
+
+def bench(models: dict[str, dict], renderer: str, iterations: int) -> list[float]:
+    """Time one full pass over all scenarios, *iterations* times (ms)."""
+    # Warm-up pass: imports, font loading, matplotlib setup
+    for name, model in models.items():
+        render_massing_views(model, name, renderer=renderer)
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for name, model in models.items():
+            render_massing_views(model, name, renderer=renderer)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def write_images(models: dict[str, dict], out_dir: str) -> None:
+    """Write every view from every renderer for side-by-side comparison."""
+    os.makedirs(out_dir, exist_ok=True)
+    for renderer in RENDERERS:
+        for name, model in models.items():
+            views = render_massing_views(model, name, renderer=renderer)
+            slug = name.lower().replace(" ", "_")
+            for view, data in views.items():
+                with open(os.path.join(out_dir, f"{slug}_{view}_{renderer}.png"), "wb") as f:
+                    f.write(data)
+    print(f"Images written to {out_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark 3D massing renderers")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--district", default="R7A")
+    parser.add_argument("--frontage", type=float, default=50)
+    parser.add_argument("--depth", type=float, default=100)
+    parser.add_argument("--out", help="Directory to write rendered PNGs for comparison")
+    args = parser.parse_args()
+
+    models = build_models(args.district, args.frontage, args.depth)
+    if not models:
+        print("No massing models could be built for this lot.")
+        return 1
+
+    floors = sum(len(m["scenarios"][0]["floors"]) for m in models.values())
+    print(f"{args.district} {args.frontage:.0f}' x {args.depth:.0f}': "
+          f"{len(models)} scenarios, {floors} floors, {args.iterations} iterations\n")
+    print(f"{'Renderer':<12} {'Mean ms':>10} {'Median ms':>10} {'Min ms':>10} {'Per scenario':>14}")
+    print("-" * 60)
+
+    results = {}
+    for renderer in RENDERERS:
+        samples = bench(models, renderer, args.iterations)
+        results[renderer] = statistics.median(samples)
+        print(f"{renderer:<12} {statistics.mean(samples):>10.1f} {results[renderer]:>10.1f} "
+              f"{min(samples):>10.1f} {results[renderer] / len(models):>14.1f}")
+
+    baseline, fastest = results[RENDERERS[0]], min(results.values())
+    print(f"\nSpeedup vs {RENDERERS[0]}: {baseline / fastest:.1f}x")
+
+    if args.out:
+        write_images(models, args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tell every API and report worker to drop in-process cache entries.
+
+Publishes on the Redis invalidation channel the workers subscribe to
+(``REDIS_URL``).  Use it after ingesting a PLUTO release, deploying an
+engine change, or correcting a lot's data.
+
+Usage:
+    python3 scripts/invalidate_cache.py --bbl 3012340001 --bbl 3012340002
+    python3 scripts/invalidate_cache.py --block 3-01234
+    python3 scripts/invalidate_cache.py --namespace pluto --namespace geometry
+    python3 scripts/invalidate_cache.py --all
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add backend to path for direct import
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.geocoding import parse_bbl  # noqa: E402
+from app.services.invalidation import Invalidation, publish  # noqa: E402
+
+
+def parse_block(value: str) -> str:
+    """``3-01234``, ``3/1234`` or ``301234`` -> ``"301234"``."""
+    digits = value.replace("/", "-").split("-")
+    if len(digits) == 2 and all(d.strip().isdigit() for d in digits):
+        return f"{int(digits[0])}{int(digits[1]):05d}"
+    return value.strip()
+
+
+def build_messages(args) -> list[Invalidation]:
+    if args.all:
+        return [Invalidation("all")]
+    messages = []
+    for raw in args.bbl:
+        bbl = parse_bbl(raw)
+        if not bbl:
+            raise ValueError(f"Invalid BBL: {raw!r}")
+        messages.append(Invalidation("bbl", bbl))
+    messages += [Invalidation("block", parse_block(b)) for b in args.block]
+    messages += [Invalidation("namespace", n) for n in args.namespace]
+    return messages
+
+
+async def run(messages: list[Invalidation]) -> int:
+    failed = 0
+    for message in messages:
+        if await publish(message):
+            print(f"Published {message.kind} {message.value}".rstrip())
+        else:
+            print(f"Could not publish {message.kind} {message.value} (Redis unavailable)")
+            failed += 1
+    return 0 if failed == 0 else 2
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Invalidate in-process caches on every worker")
+    parser.add_argument("--bbl", action="append", default=[], help="Lot BBL (repeatable)")
+    parser.add_argument("--block", action="append", default=[],
+                        help="Tax block as BORO-BLOCK, e.g. 3-01234 (repeatable)")
+    parser.add_argument("--namespace", action="append", default=[],
+                        help="Cache prefix, e.g. pluto, geometry, render (repeatable)")
+    parser.add_argument("--all", action="store_true", help="Flush every in-process cache")
+    args = parser.parse_args()
+    try:
+        messages = build_messages(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if not messages:
+        parser.error("Nothing to invalidate (give --bbl, --block, --namespace or --all).")
+    return asyncio.run(run(messages))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Warm the lot data, map image and massing render caches for high-demand lots.
+
+Runs the report preparation pipeline for every BBL given — the same work a
+SaaS preview plus report does, minus the PDF — so daytime requests for
+those lots are served from cache.  Run it off-peak against the same Redis
+and cache directories as the API (``REDIS_URL``, ``RENDER_CACHE_DIR``,
+``MAP_CACHE_DIR``).
+
+Usage:
+    python3 scripts/warm_cache.py 3012340001 1000010001
+    python3 scripts/warm_cache.py --file listings.csv --concurrency 8
+    python3 scripts/warm_cache.py --where "zonedist1 like 'R7%' AND borough = 'BK'" --limit 2000
+
+    # Nightly at 01:00, stopping new lots at 06:00 (crontab):
+    0 1 * * * cd /app && python3 scripts/warm_cache.py --file /data/hot_lots.csv --stop-at 06:00
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add backend to path for direct import
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.geocoding import parse_bbl  # noqa: E402
+from app.services.render_3d import shutdown_render_pool  # noqa: E402
+from app.services.warmer import read_bbls, select_bbls, warm_lots  # noqa: E402
+
+
+def parse_stop_at(value: str) -> datetime:
+    """Next occurrence of a local ``HH:MM`` time."""
+    hour, minute = (int(part) for part in value.split(":"))
+    now = datetime.now()
+    stop = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return stop if stop > now else stop + timedelta(days=1)
+
+
+def _print_result(result) -> None:
+    line = f"{result.bbl}  {result.status:<7} {result.seconds:6.1f}s"
+    if result.error:
+        line += f"  {result.error}"
+    print(line, flush=True)
+
+
+async def run(args) -> int:
+    bbls = [bbl for bbl in (parse_bbl(b) for b in args.bbls) if bbl]
+    if args.file:
+        bbls += read_bbls(args.file)
+    if args.where:
+        bbls += await select_bbls(args.where, args.limit)
+    if not bbls:
+        print("No BBLs to warm (give BBLs, --file or --where).")
+        return 1
+
+    stop_at = parse_stop_at(args.stop_at) if args.stop_at else None
+    print(f"Warming {len(set(bbls))} lots, {args.concurrency} at a time"
+          + (f", until {stop_at:%Y-%m-%d %H:%M}" if stop_at else ""), flush=True)
+
+    report = await warm_lots(bbls, concurrency=args.concurrency, stop_at=stop_at,
+                             on_done=_print_result)
+    summary = report.summary()
+    print(f"\nWarmed {summary['warmed']}, failed {summary['failed']}, "
+          f"skipped {summary['skipped']}")
+    return 0 if summary["failed"] == 0 else 2
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-analyze lots to warm the report caches")
+    parser.add_argument("bbls", nargs="*", help="BBLs to warm")
+    parser.add_argument("--file", help="Text file of BBLs (one per line) or CSV with a bbl column")
+    parser.add_argument("--where", help="SoQL filter selecting lots from the PLUTO dataset")
+    parser.add_argument("--limit", type=int, default=5000, help="Max lots selected by --where")
+    parser.add_argument("--concurrency", type=int, default=4, help="Lots warmed at a time")
+    parser.add_argument("--stop-at", help="Local HH:MM after which no new lots are started")
+    args = parser.parse_args()
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_render_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())